@@ -0,0 +1,328 @@
+# Business network API countries
+
+# Utils
+from business_network_API.utils import normalize_text
+
+
+# ISO 3166-1 alpha-2 code -> English name
+COUNTRIES = {
+    'AD': 'Andorra',
+    'AE': 'United Arab Emirates',
+    'AF': 'Afghanistan',
+    'AG': 'Antigua and Barbuda',
+    'AI': 'Anguilla',
+    'AL': 'Albania',
+    'AM': 'Armenia',
+    'AO': 'Angola',
+    'AQ': 'Antarctica',
+    'AR': 'Argentina',
+    'AS': 'American Samoa',
+    'AT': 'Austria',
+    'AU': 'Australia',
+    'AW': 'Aruba',
+    'AX': 'Aland Islands',
+    'AZ': 'Azerbaijan',
+    'BA': 'Bosnia and Herzegovina',
+    'BB': 'Barbados',
+    'BD': 'Bangladesh',
+    'BE': 'Belgium',
+    'BF': 'Burkina Faso',
+    'BG': 'Bulgaria',
+    'BH': 'Bahrain',
+    'BI': 'Burundi',
+    'BJ': 'Benin',
+    'BL': 'Saint Barthelemy',
+    'BM': 'Bermuda',
+    'BN': 'Brunei',
+    'BO': 'Bolivia',
+    'BQ': 'Bonaire, Sint Eustatius and Saba',
+    'BR': 'Brazil',
+    'BS': 'Bahamas',
+    'BT': 'Bhutan',
+    'BV': 'Bouvet Island',
+    'BW': 'Botswana',
+    'BY': 'Belarus',
+    'BZ': 'Belize',
+    'CA': 'Canada',
+    'CC': 'Cocos (Keeling) Islands',
+    'CD': 'Democratic Republic of the Congo',
+    'CF': 'Central African Republic',
+    'CG': 'Congo',
+    'CH': 'Switzerland',
+    'CI': "Cote d'Ivoire",
+    'CK': 'Cook Islands',
+    'CL': 'Chile',
+    'CM': 'Cameroon',
+    'CN': 'China',
+    'CO': 'Colombia',
+    'CR': 'Costa Rica',
+    'CU': 'Cuba',
+    'CV': 'Cabo Verde',
+    'CW': 'Curacao',
+    'CX': 'Christmas Island',
+    'CY': 'Cyprus',
+    'CZ': 'Czechia',
+    'DE': 'Germany',
+    'DJ': 'Djibouti',
+    'DK': 'Denmark',
+    'DM': 'Dominica',
+    'DO': 'Dominican Republic',
+    'DZ': 'Algeria',
+    'EC': 'Ecuador',
+    'EE': 'Estonia',
+    'EG': 'Egypt',
+    'EH': 'Western Sahara',
+    'ER': 'Eritrea',
+    'ES': 'Spain',
+    'ET': 'Ethiopia',
+    'FI': 'Finland',
+    'FJ': 'Fiji',
+    'FK': 'Falkland Islands',
+    'FM': 'Micronesia',
+    'FO': 'Faroe Islands',
+    'FR': 'France',
+    'GA': 'Gabon',
+    'GB': 'United Kingdom',
+    'GD': 'Grenada',
+    'GE': 'Georgia',
+    'GF': 'French Guiana',
+    'GG': 'Guernsey',
+    'GH': 'Ghana',
+    'GI': 'Gibraltar',
+    'GL': 'Greenland',
+    'GM': 'Gambia',
+    'GN': 'Guinea',
+    'GP': 'Guadeloupe',
+    'GQ': 'Equatorial Guinea',
+    'GR': 'Greece',
+    'GS': 'South Georgia and the South Sandwich Islands',
+    'GT': 'Guatemala',
+    'GU': 'Guam',
+    'GW': 'Guinea-Bissau',
+    'GY': 'Guyana',
+    'HK': 'Hong Kong',
+    'HM': 'Heard Island and McDonald Islands',
+    'HN': 'Honduras',
+    'HR': 'Croatia',
+    'HT': 'Haiti',
+    'HU': 'Hungary',
+    'ID': 'Indonesia',
+    'IE': 'Ireland',
+    'IL': 'Israel',
+    'IM': 'Isle of Man',
+    'IN': 'India',
+    'IO': 'British Indian Ocean Territory',
+    'IQ': 'Iraq',
+    'IR': 'Iran',
+    'IS': 'Iceland',
+    'IT': 'Italy',
+    'JE': 'Jersey',
+    'JM': 'Jamaica',
+    'JO': 'Jordan',
+    'JP': 'Japan',
+    'KE': 'Kenya',
+    'KG': 'Kyrgyzstan',
+    'KH': 'Cambodia',
+    'KI': 'Kiribati',
+    'KM': 'Comoros',
+    'KN': 'Saint Kitts and Nevis',
+    'KP': 'North Korea',
+    'KR': 'South Korea',
+    'KW': 'Kuwait',
+    'KY': 'Cayman Islands',
+    'KZ': 'Kazakhstan',
+    'LA': 'Laos',
+    'LB': 'Lebanon',
+    'LC': 'Saint Lucia',
+    'LI': 'Liechtenstein',
+    'LK': 'Sri Lanka',
+    'LR': 'Liberia',
+    'LS': 'Lesotho',
+    'LT': 'Lithuania',
+    'LU': 'Luxembourg',
+    'LV': 'Latvia',
+    'LY': 'Libya',
+    'MA': 'Morocco',
+    'MC': 'Monaco',
+    'MD': 'Moldova',
+    'ME': 'Montenegro',
+    'MF': 'Saint Martin',
+    'MG': 'Madagascar',
+    'MH': 'Marshall Islands',
+    'MK': 'North Macedonia',
+    'ML': 'Mali',
+    'MM': 'Myanmar',
+    'MN': 'Mongolia',
+    'MO': 'Macao',
+    'MP': 'Northern Mariana Islands',
+    'MQ': 'Martinique',
+    'MR': 'Mauritania',
+    'MS': 'Montserrat',
+    'MT': 'Malta',
+    'MU': 'Mauritius',
+    'MV': 'Maldives',
+    'MW': 'Malawi',
+    'MX': 'Mexico',
+    'MY': 'Malaysia',
+    'MZ': 'Mozambique',
+    'NA': 'Namibia',
+    'NC': 'New Caledonia',
+    'NE': 'Niger',
+    'NF': 'Norfolk Island',
+    'NG': 'Nigeria',
+    'NI': 'Nicaragua',
+    'NL': 'Netherlands',
+    'NO': 'Norway',
+    'NP': 'Nepal',
+    'NR': 'Nauru',
+    'NU': 'Niue',
+    'NZ': 'New Zealand',
+    'OM': 'Oman',
+    'PA': 'Panama',
+    'PE': 'Peru',
+    'PF': 'French Polynesia',
+    'PG': 'Papua New Guinea',
+    'PH': 'Philippines',
+    'PK': 'Pakistan',
+    'PL': 'Poland',
+    'PM': 'Saint Pierre and Miquelon',
+    'PN': 'Pitcairn',
+    'PR': 'Puerto Rico',
+    'PS': 'Palestine',
+    'PT': 'Portugal',
+    'PW': 'Palau',
+    'PY': 'Paraguay',
+    'QA': 'Qatar',
+    'RE': 'Reunion',
+    'RO': 'Romania',
+    'RS': 'Serbia',
+    'RU': 'Russia',
+    'RW': 'Rwanda',
+    'SA': 'Saudi Arabia',
+    'SB': 'Solomon Islands',
+    'SC': 'Seychelles',
+    'SD': 'Sudan',
+    'SE': 'Sweden',
+    'SG': 'Singapore',
+    'SH': 'Saint Helena',
+    'SI': 'Slovenia',
+    'SJ': 'Svalbard and Jan Mayen',
+    'SK': 'Slovakia',
+    'SL': 'Sierra Leone',
+    'SM': 'San Marino',
+    'SN': 'Senegal',
+    'SO': 'Somalia',
+    'SR': 'Suriname',
+    'SS': 'South Sudan',
+    'ST': 'Sao Tome and Principe',
+    'SV': 'El Salvador',
+    'SX': 'Sint Maarten',
+    'SY': 'Syria',
+    'SZ': 'Eswatini',
+    'TC': 'Turks and Caicos Islands',
+    'TD': 'Chad',
+    'TF': 'French Southern Territories',
+    'TG': 'Togo',
+    'TH': 'Thailand',
+    'TJ': 'Tajikistan',
+    'TK': 'Tokelau',
+    'TL': 'Timor-Leste',
+    'TM': 'Turkmenistan',
+    'TN': 'Tunisia',
+    'TO': 'Tonga',
+    'TR': 'Turkey',
+    'TT': 'Trinidad and Tobago',
+    'TV': 'Tuvalu',
+    'TW': 'Taiwan',
+    'TZ': 'Tanzania',
+    'UA': 'Ukraine',
+    'UG': 'Uganda',
+    'UM': 'United States Minor Outlying Islands',
+    'US': 'United States',
+    'UY': 'Uruguay',
+    'UZ': 'Uzbekistan',
+    'VA': 'Holy See',
+    'VC': 'Saint Vincent and the Grenadines',
+    'VE': 'Venezuela',
+    'VG': 'British Virgin Islands',
+    'VI': 'U.S. Virgin Islands',
+    'VN': 'Vietnam',
+    'VU': 'Vanuatu',
+    'WF': 'Wallis and Futuna',
+    'WS': 'Samoa',
+    'YE': 'Yemen',
+    'YT': 'Mayotte',
+    'ZA': 'South Africa',
+    'ZM': 'Zambia',
+    'ZW': 'Zimbabwe',
+}
+
+
+# Other names of the countries used by the companies of the platform
+COUNTRY_ALIASES = {
+    'Emiratos Arabes Unidos': 'AE',
+    'Brasil': 'BR',
+    'República Popular China': 'CN',
+    'Alemania': 'DE',
+    'Republica Dominicana': 'DO',
+    'España': 'ES',
+    'Francia': 'FR',
+    'Reino Unido': 'GB',
+    'England': 'GB',
+    'Inglaterra': 'GB',
+    'Great Britain': 'GB',
+    'Italia': 'IT',
+    'Japón': 'JP',
+    'Corea del Sur': 'KR',
+    'México': 'MX',
+    'Holanda': 'NL',
+    'Países Bajos': 'NL',
+    'Holland': 'NL',
+    'Panamá': 'PA',
+    'Perú': 'PE',
+    'Rusia': 'RU',
+    'Suecia': 'SE',
+    'Suiza': 'CH',
+    'Bélgica': 'BE',
+    'Turquía': 'TR',
+    'Estados Unidos': 'US',
+    'USA': 'US',
+    'United States of America': 'US',
+    'EEUU': 'US',
+    'EE UU': 'US',
+    'Sudáfrica': 'ZA',
+    'La India': 'IN',
+    'Nueva Zelanda': 'NZ',
+    'Trinidad y Tobago': 'TT',
+    'Haití': 'HT',
+    'Dinamarca': 'DK',
+    'Noruega': 'NO',
+    'Finlandia': 'FI',
+    'Polonia': 'PL',
+    'Irlanda': 'IE',
+    'Grecia': 'GR',
+    'Egipto': 'EG',
+    'Marruecos': 'MA',
+    'Arabia Saudita': 'SA',
+    'Czech Republic': 'CZ',
+    'República Checa': 'CZ',
+    'Korea': 'KR',
+}
+
+
+COUNTRY_CODES_BY_NAME = {normalize_text(name): code for code, name in COUNTRIES.items()}
+COUNTRY_CODES_BY_NAME.update({normalize_text(alias): code for alias, code in COUNTRY_ALIASES.items()})
+
+
+def get_country_code(country):
+    """
+    Return the ISO 3166-1 alpha-2 code of the country given by its
+    code or by its name (In english or spanish). None if it is unknown.
+    """
+
+    normalized_country = normalize_text(country)
+
+    if normalized_country.upper() in COUNTRIES:
+        return normalized_country.upper()
+
+    return COUNTRY_CODES_BY_NAME.get(normalized_country)
@@ -5,6 +5,9 @@ from django.db import models
 from django.db.models import Manager, Q, QuerySet
 from django.utils import timezone
 
+# Signals
+from business_network_API.signals import post_queryset_delete
+
 
 class VisibilityQuerySet(QuerySet):
     """
@@ -13,9 +16,15 @@ class VisibilityQuerySet(QuerySet):
     """
 
     def delete(self):
-        return super(VisibilityQuerySet, self).update(
-            state = VisibilityModel.States.DELETED
+        ids = list(self.values_list('pk', flat = True))
+
+        deleted = super(VisibilityQuerySet, self).update(
+            state = VisibilityModel.States.DELETED,
+            changed_at = timezone.now()
         )
+        post_queryset_delete.send(sender = self.model, ids = ids)
+
+        return deleted
 
     def hard_delete(self):
         return super(VisibilityQuerySet, self).delete()
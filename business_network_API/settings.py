@@ -130,6 +130,16 @@ DATABASES = {
 
 # conectyadmindatabase0899
 
+# Cache
+# Shared by all the workers: the versions and generations of the cached data
+# (Market, coverage, tariffs, products) are bumped by one worker and read by all of them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get('MEMCACHED_LOCATION', '127.0.0.1:11211'),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -228,6 +238,99 @@ AWS_DEFAULT_ACL = None
 
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
+# Backend of the image, file and video storages. To run offline (Tests, benchmarks)
+# multimedia.backends.LocalMultimediaStorage or multimedia.backends.MemoryMultimediaStorage
+MULTIMEDIA_STORAGE_BACKEND = 'multimedia.storages.S3MultimediaStorage'
+
+MULTIMEDIA_LOCAL_STORAGE_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Url of the objects of the offline storages, served signed by multimedia.views.media
+MULTIMEDIA_MEDIA_URL = '/media/'
+
+# Url of the CDN in front of the image bucket (Ej: 'https://media.example.com/'), it must be able
+# to read the bucket (Ej: CloudFront with an origin access identity), the bucket stays private.
+# When it's set the images are public and read unsigned through it, otherwise they are signed.
+# The files and videos are always signed
+MULTIMEDIA_PUBLIC_IMAGES_URL = None
+# The keys of the objects are never overwritten, so their content never changes
+MULTIMEDIA_PUBLIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# Searches config
+SEARCH_FACETS_CACHE_TIMEOUT = 60 * 5 # seconds
+SEARCH_RESULTS_CACHE_TIMEOUT = 60 * 5 # seconds
+SEARCH_LOG_BUFFER_SIZE = 10000 # entries
+SEARCH_LOG_BATCH_SIZE = 500 # entries
+SEARCH_LOG_FLUSH_INTERVAL = 5 # seconds
+SEARCH_NEARBY_DEFAULT_RADIUS = 50 # km
+SEARCH_NEARBY_MAX_RADIUS = 2000 # km
+# Safety expiration, the coverage is refreshed on write of the sale locations
+SEARCH_COVERAGE_CACHE_TIMEOUT = 60 * 60 # seconds
+# The searches with this amount of results or less get spelling suggestions
+SEARCH_SUGGESTIONS_MAX_RESULTS = 2
+SEARCH_SUGGESTIONS_LIMIT = 3
+SEARCH_SYNONYMS_MAX_EXPANSIONS = 8
+SEARCH_SYNONYMS_CACHE_TIMEOUT = 60 * 60 # seconds
+
+# Market config
+# Lower than the expiration of the signed urls of the images cached with the products
+SHOWCASE_PRODUCT_CACHE_TIMEOUT = 60 * 10 # seconds
+POPULARITY_FLUSH_INTERVAL = 10 # seconds
+# Time in which the weight of the views in the trending scores is halved
+TRENDING_HALF_LIFE = 60 * 60 * 24 * 3 # seconds
+TRENDING_VIEW_WEIGHT = 1
+TRENDING_CLICK_WEIGHT = 5
+
+# Suppliers config
+# Safety expiration, the detail is invalidated on write of the product and its relations
+PRODUCT_DETAIL_CACHE_TIMEOUT = 60 * 60 * 6 # seconds
+
+# Changes feeds config
+CHANGES_PAGE_SIZE = 100 # objects
+CHANGES_MAX_PAGE_SIZE = 1000 # objects
+# The changes newer than this are left for the next sync, to let the concurrent writes commit
+CHANGES_SETTLE_TIME = 5 # seconds
+
+# Batch requests config
+BATCH_MAX_SIZE = 50 # objects
+
+# Multimedia config
+# Lower than the expiration of the signed urls (AWS_QUERYSTRING_EXPIRE, 1 hour by default)
+SIGNED_URL_CACHE_TIMEOUT = 60 * 30 # seconds
+# The uploads bigger than a part are sent in parts (Multipart upload), S3 requires parts of 5 MB at least
+MULTIMEDIA_UPLOAD_PART_SIZE = 8 * 1024 * 1024 # bytes
+MULTIMEDIA_UPLOAD_CONCURRENCY = 4 # parts
+# Width of the image variants that the endpoints show, the images are never upscaled
+IMAGE_VARIANT_WIDTHS = {
+    'thumbnail': 160, # px
+    'card': 480, # px
+    'large': 1280, # px
+}
+IMAGE_VARIANT_QUALITY = 80 # JPEG and WebP quality
+IMAGE_VARIANT_WORKERS = 2 # threads
+# Uploads straight from the clients to the buckets (Presigned POST)
+MULTIMEDIA_UPLOAD_URL_EXPIRATION = 60 * 15 # seconds
+# Prefix of the keys the clients upload to, finalize moves the objects out of it. The uploads
+# never finalized stay there, expire them with a lifecycle rule of the buckets on the prefix
+MULTIMEDIA_UPLOAD_STAGING_PREFIX = 'staging'
+MULTIMEDIA_IMAGE_MAX_SIZE = 50 * 1024 * 1024 # bytes
+MULTIMEDIA_IMAGE_CONTENT_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+# The size column of the files has 7 digits
+MULTIMEDIA_FILE_MAX_SIZE = 9 * 1024 * 1024 # bytes
+MULTIMEDIA_FILE_CONTENT_TYPES = ('application/pdf',)
+# Multi-file uploads, validated and uploaded by a pool of threads shared by the process
+MULTIMEDIA_UPLOAD_WORKERS = 8 # threads
+MULTIMEDIA_BULK_UPLOAD_MAX_FILES = 20 # files
+# Resumable uploads of the videos, every chunk is a part of MULTIMEDIA_UPLOAD_PART_SIZE
+# The size column of the videos has 9 digits
+MULTIMEDIA_VIDEO_MAX_SIZE = 500 * 1024 * 1024 # bytes
+MULTIMEDIA_VIDEO_CONTENT_TYPES = ('video/mp4', 'video/webm')
+# The sessions not finalized meanwhile are aborted by collect_orphaned_media
+MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION = 60 * 60 * 24 # seconds
+
+# Age of the uploads without references before they are collected as orphans
+MULTIMEDIA_ORPHAN_GRACE_PERIOD = 60 * 60 * 24 * 7 # seconds
+
 
 # Email config
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
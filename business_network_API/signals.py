@@ -0,0 +1,6 @@
+# Business network API / signals.py
+
+from django.dispatch import Signal
+
+# Sent by VisibilityQuerySet.delete, that deletes the rows with an update and sends no post_delete
+post_queryset_delete = Signal(providing_args=["sender", "ids"])
@@ -0,0 +1,21 @@
+# Business network API utils
+
+# Utils
+import unicodedata
+
+
+def normalize_text(value):
+    """
+    Return the value lowercased, without accents and with the
+    whitespaces collapsed. Useful to compare and cache free text.
+    """
+
+    if value is None:
+        return ''
+
+    decomposed_value = unicodedata.normalize('NFKD', str(value))
+    unaccented_value = ''.join(
+        char for char in decomposed_value if not unicodedata.combining(char)
+    )
+
+    return ' '.join(unaccented_value.lower().split())
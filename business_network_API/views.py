@@ -0,0 +1,337 @@
+# Business network API views
+
+# Django
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+
+# Django REST framework
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Documentation
+from drf_yasg import openapi
+
+# Models
+from business_network_API.models import VisibilityModel
+
+# Utils
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import time
+
+
+class NotModified(APIException):
+    """The data requested hasn't changed since the client got it."""
+
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Not modified.'
+
+
+class ConditionalResponseMixin:
+    """
+    Answer the GET requests with 304 Not Modified when the client already has the
+    data (If-None-Match or If-Modified-Since) before serializing anything.
+    The validators are the MAX(changed_at) and the count of the querysets of the
+    view (Models childs of VisibilityModel) and an optional version of the data.
+    The views set their Cache-Control policy with cache_control.
+    """
+
+    # Keyword arguments of django.utils.cache.patch_cache_control
+    cache_control = {'no_cache': True}
+
+    # If the response depends on the user that requests it
+    conditional_vary_on_user = False
+
+    conditional_validators = None
+
+    def get_conditional_querysets(self):
+        """
+        Return the querysets whose rows are serialized in the response.
+        By default the queryset of the view for the list and retrieve actions.
+        Returning None disables the conditional response.
+        """
+
+        action = getattr(self, 'action', None)
+
+        if action == 'list':
+            return [self.filter_queryset(self.get_queryset())]
+
+        if action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return [self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})]
+
+        return None
+
+    def get_conditional_version(self):
+        """Return a version of the data that changes on every write of it. (Optional)"""
+        return None
+
+    def get_conditional_validators(self):
+        """Return the (etag, last_modified) of the data requested or None to answer it normally."""
+        querysets = self.get_conditional_querysets()
+        version = self.get_conditional_version()
+
+        if querysets is None and version is None:
+            return None
+
+        # The responses contain signed urls, so the validators change before they expire
+        window = int(time.time() // settings.SIGNED_URL_CACHE_TIMEOUT)
+        last_modified = datetime.fromtimestamp(window * settings.SIGNED_URL_CACHE_TIMEOUT, timezone.utc)
+
+        validator = [self.request.get_full_path(), window, version]
+
+        if self.conditional_vary_on_user:
+            validator.append(self.request.user.pk)
+
+        for queryset in querysets or []:
+            aggregation = queryset.order_by().aggregate(
+                last_changed_at = Max('changed_at'), count = Count('pk')
+            )
+
+            # The object doesn't exist, the view answers it
+            if getattr(self, 'action', None) == 'retrieve' and not aggregation['count']:
+                return None
+
+            validator += [aggregation['last_changed_at'], aggregation['count']]
+
+            if aggregation['last_changed_at'] is not None:
+                last_modified = max(last_modified, aggregation['last_changed_at'])
+
+        etag = 'W/"{}"'.format(hashlib.sha1(repr(validator).encode()).hexdigest())
+
+        # A version can change without any changed_at, so the dates don't validate the data
+        if version is not None:
+            last_modified = None
+
+        return etag, last_modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        try:
+            self.conditional_validators = self.get_conditional_validators()
+        except Exception:
+            # The view answers the invalid requests with its own errors
+            self.conditional_validators = None
+
+        if self.conditional_validators is not None:
+            etag, last_modified = self.conditional_validators
+
+            response = get_conditional_response(
+                request, etag = etag,
+                last_modified = int(last_modified.timestamp()) if last_modified else None
+            )
+
+            if response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status = status.HTTP_304_NOT_MODIFIED)
+
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+            if self.conditional_validators is not None:
+                etag, last_modified = self.conditional_validators
+                response['ETag'] = etag
+
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified.timestamp())
+
+            patch_cache_control(response, **self.cache_control)
+
+            if self.conditional_vary_on_user:
+                patch_vary_headers(response, ('Authorization',))
+
+        return response
+
+
+CHANGES_PARAMETERS = [
+    openapi.Parameter(name = "since", in_ = openapi.IN_QUERY, type = "String",
+        description = """Token returned in `next` by the previous sync. 
+            Without it the feed starts from the beginning."""),
+    openapi.Parameter(name = "limit", in_ = openapi.IN_QUERY, type = "Integer",
+        description = "Maximum amount of changes to return."),
+]
+
+
+def encode_changes_token(changed_at, object_id):
+    """Return the opaque token of the position (changed_at, id) in a changes feed."""
+    position = '{}|{}'.format(changed_at.isoformat(), object_id)
+
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_changes_token(token):
+    """Return the position (changed_at, id) of a changes token, None if the token is empty."""
+    if not token:
+        return None
+
+    try:
+        position = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        changed_at, object_id = position.split('|')
+        changed_at = parse_datetime(changed_at)
+
+        if changed_at is None:
+            raise ValueError()
+
+        return changed_at, int(object_id)
+    except ValueError:
+        raise ValidationError('The since token is not valid, sync again without it')
+
+
+def get_changes_after(queryset, position, cutoff, limit):
+    """
+    Return up to limit objects of the queryset changed after the position
+    (changed_at, id) and before the cutoff, in (changed_at, id) order.
+    It is a range scan over the (changed_at, id) indexes.
+    """
+
+    queryset = queryset.filter( changed_at__lt = cutoff )
+
+    if position is not None:
+        changed_at, object_id = position
+        queryset = queryset.filter(
+            Q(changed_at__gt = changed_at) | Q(changed_at = changed_at, id__gt = object_id)
+        )
+
+    return list(queryset.order_by('changed_at', 'id')[:limit])
+
+
+class ChangesAPIView(APIView):
+    """
+    Feed of the objects created, updated and deleted since the position of
+    the token given in the param since. The response has the next token,
+    to request the following changes until has_more is false.
+    The views define the queryset with the deleted objects too,
+    the serializer_class of the payloads and the created_field.
+    """
+
+    permission_classes = [AllowAny]
+
+    queryset = None
+    serializer_class = None
+
+    # Date when the objects were created, to tell them apart from the updated
+    created_field = None
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def is_deleted(self, instance):
+        return instance.state == VisibilityModel.States.DELETED
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', settings.CHANGES_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError('The limit must be an integer')
+
+        return max(1, min(limit, settings.CHANGES_MAX_PAGE_SIZE))
+
+    def get_changes(self, position, cutoff, limit):
+        """Return the objects changed after the position, in (changed_at, id) order."""
+        return get_changes_after(self.get_queryset(), position, cutoff, limit)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = request.query_params.get('since')
+            position = decode_changes_token(since)
+            limit = self.get_limit()
+
+            # The recent changes could still have concurrent transactions
+            # committing older changed_at, so they are left for the next sync
+            cutoff = timezone.now() - timedelta(seconds = settings.CHANGES_SETTLE_TIME)
+
+            changes = self.get_changes(position, cutoff, limit + 1)
+            has_more = len(changes) > limit
+            changes = changes[:limit]
+
+            data = {
+                'created': [],
+                'updated': [],
+                'deleted': [],
+                'results': [],
+                'next': since,
+                'has_more': has_more,
+            }
+
+            for instance in changes:
+                if self.is_deleted(instance):
+                    data['deleted'].append(instance.id)
+                    continue
+
+                created_at = getattr(instance, self.created_field)
+                if position is None or (created_at is not None and created_at > position[0]):
+                    data['created'].append(instance.id)
+                else:
+                    data['updated'].append(instance.id)
+
+                data['results'].append(self.serializer_class(instance).data)
+
+            if changes:
+                data['next'] = encode_changes_token(changes[-1].changed_at, changes[-1].id)
+
+            data_status = status.HTTP_200_OK
+        except ValidationError as e:
+            data = {"detail": e.detail[0] if isinstance(e.detail, list) else e.detail}
+            data_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data, status = data_status)
+
+
+def get_batch_lookups(request, param, to_python = str):
+    """
+    Return the distinct values in the comma separated param of a batch request,
+    in the order given. Raise a ValidationError if the param is empty, has an
+    invalid value or has more than BATCH_MAX_SIZE values.
+    """
+
+    lookups = []
+    for value in request.query_params.get(param, '').split(','):
+        value = value.strip()
+        if not value:
+            continue
+
+        try:
+            value = to_python(value)
+        except ValueError:
+            raise ValidationError("'{}' is not a valid value for the param {}".format(value, param))
+
+        if value not in lookups:
+            lookups.append(value)
+
+    if not lookups:
+        raise ValidationError('The param {} is required'.format(param))
+
+    if len(lookups) > settings.BATCH_MAX_SIZE:
+        raise ValidationError('At most {} objects can be requested at once'.format(settings.BATCH_MAX_SIZE))
+
+    return lookups
+
+
+def get_batch_data(lookups, data_by_lookup):
+    """
+    Return the response of a batch request with the results keyed by the lookups.
+    The objects not found have null as result and are listed in not_found.
+    """
+
+    return {
+        'results': {lookup: data_by_lookup.get(lookup) for lookup in lookups},
+        'not_found': [lookup for lookup in lookups if lookup not in data_by_lookup],
+    }
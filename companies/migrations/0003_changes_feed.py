@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_auto_20210217_2016'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['changed_at', 'id'], name='company_changed_at_idx'),
+        ),
+    ]
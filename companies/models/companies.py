@@ -124,6 +124,9 @@ class Company(VisibilityModel):
 
     class Meta:
         db_table = 'company'
+        indexes = [
+            models.Index(fields = ['changed_at', 'id'], name = 'company_changed_at_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         """Manage denormalization with the CompanyMember model."""
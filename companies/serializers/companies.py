@@ -21,7 +21,7 @@ from multimedia.serializers import ImageModelSerializer
 
 class CompanyModelSerializer(serializers.ModelSerializer):
 
-    logo = ImageModelSerializer(required = False)
+    logo = ImageModelSerializer( required = False, variant = 'thumbnail' )
 
     class Meta:
         model = Company
@@ -40,6 +40,25 @@ class CompanyModelSerializer(serializers.ModelSerializer):
         )
 
 
+class CompanyChangeModelSerializer(serializers.ModelSerializer):
+    """Compact company for the changes feed."""
+
+    class Meta:
+        model = Company
+
+        fields = (
+            'id',
+            'accountname',
+            'name',
+            'description',
+            'is_buyer',
+            'is_supplier',
+            'is_verified',
+            'logo',
+            'changed_at',
+        )
+
+
 class UpdateCompanySerializer(serializers.ModelSerializer):
     """Modelserializer for update a company"""
 
@@ -1,3 +1,75 @@
+# Companies tests
+
+# Django
 from django.test import TestCase
+from django.utils.http import http_date
+
+# Models
+from companies.models import Company
+from users.models import User
+
+# Utils
+import time
+
+
+class ConditionalCompanyTestCase(TestCase):
+    """The company is answered with 304 when the client already has it."""
+
+    def setUp(self):
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.company, _ = Company.objects.create(user, name = 'Acme', legal_identifier = '900123')
+        self.path = '/companies/{}/'.format(self.company.accountname)
+
+    def test_not_modified_since(self):
+        response = self.client.get(self.path)
+        last_modified = response['Last-Modified']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+
+        response = self.client.get(self.path, HTTP_IF_MODIFIED_SINCE = last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        # The ETag has precedence
+        response = self.client.get(self.path, HTTP_IF_MODIFIED_SINCE = last_modified, HTTP_IF_NONE_MATCH = 'W/"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_modified(self):
+        etag = self.client.get(self.path)['ETag']
+
+        self.company.description = 'Exportadora de frutas'
+        self.company.save()
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['description'], 'Exportadora de frutas')
+
+    def test_modified_since(self):
+        response = self.client.get(self.path, HTTP_IF_MODIFIED_SINCE = http_date(time.time() - 2 * 60 * 60))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_company_not_found(self):
+        etag = self.client.get(self.path)['ETag']
+        self.company.delete()
+
+        self.assertEqual(self.client.get(self.path, HTTP_IF_NONE_MATCH = etag).status_code, 404)
+
+
+class CompanyBatchTestCase(TestCase):
+
+    def test_companies_batch(self):
+        accountnames = []
+        for name in ('Acme', 'Andes'):
+            user = User.objects.create_user('owner@{}.com'.format(name.lower()), 'x12345678', name + ' Owner')
+            company, _ = Company.objects.create(user, name = name, legal_identifier = name)
+            accountnames.append(company.accountname)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/companies/batch/', {'accountnames': ','.join(accountnames + ['nobody'])})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([company and company['name'] for company in response.data['results'].values()], ['Acme', 'Andes', None])
+        self.assertEqual(response.data['not_found'], ['nobody'])
 
-# Create your tests here.
+        self.assertEqual(self.client.get('/companies/batch/').status_code, 400)
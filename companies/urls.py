@@ -11,6 +11,7 @@ from .views import (
     CompanyVerificationAPIView,
     CompanyVerificationTokenAPIView,
     CompanyViewSet,
+    CompanyChangesView,
     UnregisteredCompanyViewSet,
     UnregisteredRelationshipViewSet
 )
@@ -53,6 +54,8 @@ router.register(
 )
 
 urlpatterns = [
+    path('companies/changes/', CompanyChangesView.as_view(), name = 'company_changes'),
+
     path('companies/<accountname>/verification/', CompanyVerificationAPIView.as_view(), name = 'company_verification'),
 
     path('companies/verification/verify/', VerifyCompanyAPIView.as_view(), name = 'verify_company'),
@@ -7,12 +7,22 @@ from django.utils.decorators import method_decorator
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 # Documentation
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import CHANGES_PARAMETERS, ChangesAPIView, ConditionalResponseMixin
+
+# Batch requests
+from business_network_API.views import get_batch_data, get_batch_lookups
+
+# Cache
+from multimedia.cache import sign_images_data
+
 # Models
 from ..models import Company
 
@@ -22,6 +32,7 @@ from ..permissions import IsCompanyMemberWithEditPermission
 
 # Serializers
 from ..serializers import (
+    CompanyChangeModelSerializer,
     CompanyModelSerializer,
     SignupSerializer,
     SignupAccessSerializer, 
@@ -44,7 +55,8 @@ from ..serializers import (
     responses = { 200: CompanyModelSerializer, 404: openapi.Response("Not Found")}, security = []
 ))
 @method_decorator(name='update', decorator = swagger_auto_schema(auto_schema = None))
-class CompanyViewSet(mixins.RetrieveModelMixin,
+class CompanyViewSet(ConditionalResponseMixin,
+                    mixins.RetrieveModelMixin,
                     mixins.ListModelMixin,
                     mixins.UpdateModelMixin, 
                     viewsets.GenericViewSet):
@@ -52,11 +64,12 @@ class CompanyViewSet(mixins.RetrieveModelMixin,
 
     serializer_class = CompanyModelSerializer
     lookup_field = 'accountname'
+    cache_control = {'public': True, 'no_cache': True}
     lookup_value_regex = '[\w.]+'
 
     def get_permissions(self):
         """Assign permission based on action"""
-        if self.action in ['retrieve', 'list', 'signup']:
+        if self.action in ['retrieve', 'list', 'signup', 'batch']:
             permissions = [AllowAny]
         else:
             permissions = [IsAuthenticated, IsCompanyMemberWithEditPermission]
@@ -98,6 +111,36 @@ class CompanyViewSet(mixins.RetrieveModelMixin,
 
         return Response( signup_access_serializer.data, status = status.HTTP_201_CREATED )
 
+    @swagger_auto_schema( operation_id = "Retrieve a batch of companies", tags = ["Companies"],
+        manual_parameters = [
+            openapi.Parameter(name = "accountnames", in_ = openapi.IN_QUERY, type = "String", required = True,
+                description = "Comma separated accountnames of the companies.")
+        ],
+        responses = { 400: openapi.Response("Bad request") }, security = []
+    )
+    @action(detail = False, methods = ['get'])
+    def batch(self, request):
+        """Retrieve a batch of companies\n
+        Endpoint to retrieve several companies by their accountnames.\n
+        The companies are returned in `results` keyed by the accountname. The accountnames 
+        not found have null as result and are listed in `not_found`.
+        """
+        try:
+            accountnames = get_batch_lookups(request, 'accountnames')
+            companies = Company.objects.select_related('logo').prefetch_related('logo__variants').filter(
+                accountname__in = accountnames
+            )
+
+            companies_data = CompanyModelSerializer(companies, many = True, context = {'sign_paths': False}).data
+            sign_images_data([company['logo'] for company in companies_data if company['logo']])
+
+            data = get_batch_data(accountnames, {company['accountname']: company for company in companies_data})
+            data_status = status.HTTP_200_OK
+        except ValidationError as e:
+            data = {"detail": e.detail[0]}
+            data_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data, status = data_status)
 
     def get_queryset(self):
         """Return companies"""
@@ -157,4 +200,21 @@ class CompanyViewSet(mixins.RetrieveModelMixin,
             data = {"detail": str(e)}
             data_status = status.HTTP_400_BAD_REQUEST
         
-        return Response(data, status = data_status)
\ No newline at end of file
+        return Response(data, status = data_status)
+
+@method_decorator( name = 'get', decorator = swagger_auto_schema( 
+    operation_id = "List the company changes", tags = ["Companies"],
+    operation_description = """
+        Endpoint to sync the companies incrementally. Returns the ids of the companies created, 
+        updated and deleted since the token `since`, with the compact data of the created and 
+        updated ones in `results`.\n
+        Request again with the token `next` while `has_more` is true.""",
+    manual_parameters = CHANGES_PARAMETERS,
+    responses = { 400: openapi.Response("Bad request") }, security = []
+))
+class CompanyChangesView(ChangesAPIView):
+    """Changes feed of the companies."""
+
+    queryset = Company.all_objects.all()
+    serializer_class = CompanyChangeModelSerializer
+    created_field = 'register_date'
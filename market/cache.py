@@ -0,0 +1,89 @@
+# market/cache.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Models
+from market.models import ShowcaseProduct
+
+# Serializers
+from market.serializers.showcases import ShowcaseProductModelSerializer
+
+# Utils
+import time
+
+
+MARKET_GENERATION_KEY = 'market:generation'
+
+SHOWCASE_PRODUCT_KEY = 'market:showcase_product:{}'
+
+
+def get_market_generation():
+    """Return the generation of the market. It changes every time
+    the market is written, so it invalidates the data derived from it."""
+    generation = cache.get(MARKET_GENERATION_KEY)
+
+    if generation is None:
+        generation = get_initial_generation()
+        cache.add(MARKET_GENERATION_KEY, generation, None)
+        generation = cache.get(MARKET_GENERATION_KEY, generation)
+
+    return generation
+
+
+def get_initial_generation():
+    """Return the generation that seeds the counter when it's missing (Ej: evicted).
+    It's never one already used, so the data cached with the old ones is never valid again."""
+    return time.time_ns()
+
+
+def increment_market_generation():
+    try:
+        cache.incr(MARKET_GENERATION_KEY)
+    except ValueError:
+        cache.add(MARKET_GENERATION_KEY, get_initial_generation(), None)
+
+
+def bump_market_generation():
+    """Move the market to a new generation. It's moved again after the commit,
+    in case a read cached the old data with the new generation meanwhile."""
+    increment_market_generation()
+    transaction.on_commit(increment_market_generation)
+
+
+def get_showcase_products_data(ids):
+    """
+    Return the serialized showcase products with the ids given (in the same order),
+    read through a per object cache. The products not found are skipped.
+    """
+
+    keys = {product_id: SHOWCASE_PRODUCT_KEY.format(product_id) for product_id in ids}
+    cached_products = cache.get_many(keys.values())
+
+    missing_ids = [product_id for product_id in ids if keys[product_id] not in cached_products]
+
+    if missing_ids:
+        showcase_products = ShowcaseProduct.objects.select_related('principal_image').prefetch_related(
+            'principal_image__variants'
+        ).in_bulk(missing_ids)
+        missing_products = {
+            keys[product_id]: ShowcaseProductModelSerializer(showcase_product).data
+            for product_id, showcase_product in showcase_products.items()
+        }
+
+        cache.set_many(missing_products, settings.SHOWCASE_PRODUCT_CACHE_TIMEOUT)
+        cached_products.update(missing_products)
+
+    return [cached_products[keys[product_id]] for product_id in ids if keys[product_id] in cached_products]
+
+
+def invalidate_showcase_products(ids):
+    """Remove from the cache the showcase products with the ids given.
+        Are removed again after the commit, in case a read cached the old product meanwhile."""
+    keys = [SHOWCASE_PRODUCT_KEY.format(product_id) for product_id in ids]
+
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,51 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_products_price_currency(apps, schema_editor):
+    """Copy the price currency of the products to its showcase products."""
+    ShowcaseProduct = apps.get_model('market', 'ShowcaseProduct')
+    Product = apps.get_model('suppliers', 'Product')
+
+    ShowcaseProduct.objects.update(
+        price_currency_id = models.Subquery(
+            Product.objects.filter( id = models.OuterRef('product_id') ).values('price_currency_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0002_exchangerate'),
+        ('market', '0002_auto_20210218_1210'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='maximum_price_usd_cents',
+            field=models.BigIntegerField(blank=True, help_text='Maximum price normalized to USD cents with the exchange \n            rate of the price currency. Used to filter and sort across the market.', null=True),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='minimum_price_usd_cents',
+            field=models.BigIntegerField(blank=True, help_text='Minimum price normalized to USD cents with the exchange \n            rate of the price currency. Used to filter and sort across the market.', null=True),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='price_currency',
+            field=models.ForeignKey(help_text='Currency in which is configured the product prices', null=True, on_delete=django.db.models.deletion.PROTECT, to='suppliers.Currency'),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['minimum_price_usd_cents'], name='showcaseproduct_min_usd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['maximum_price_usd_cents'], name='showcaseproduct_max_usd_idx'),
+        ),
+        migrations.RunPython(copy_products_price_currency, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+def copy_products_hs_code(apps, schema_editor):
+    """Copy the HS code of the products to its showcase products."""
+    ShowcaseProduct = apps.get_model('market', 'ShowcaseProduct')
+    Product = apps.get_model('suppliers', 'Product')
+
+    ShowcaseProduct.objects.update(
+        hs_code = models.Subquery(
+            Product.objects.filter( id = models.OuterRef('product_id') ).values('hs_code')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0005_tariffheading_product_hs_code'),
+        ('market', '0003_showcaseproduct_usd_prices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='hs_code',
+            field=models.CharField(blank=True, help_text='Digits of the tariff heading of the product, for browsing by HS code.', max_length=10, null=True),
+        ),
+        migrations.RunPython(copy_products_hs_code, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['hs_code'], name='showcaseproduct_hs_code_idx', opclasses=['text_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+from business_network_API.utils import normalize_text
+
+
+def normalize_showcase_sections(apps, schema_editor):
+    """
+    Normalize the names of the sections merging the duplicated ones 
+    in the oldest of them, and count the products of each section.
+    """
+
+    ShowcaseSection = apps.get_model('market', 'ShowcaseSection')
+    ShowcaseProduct = apps.get_model('market', 'ShowcaseProduct')
+
+    sections_by_name = {}
+
+    for section in ShowcaseSection.objects.order_by('id'):
+        normalized_name = normalize_text(section.name)[:60]
+        kept_section = sections_by_name.get(normalized_name)
+
+        if kept_section is None:
+            section.normalized_name = normalized_name
+            section.save(update_fields = ['normalized_name'])
+            sections_by_name[normalized_name] = section
+        else:
+            ShowcaseProduct.objects.filter( showcase_section = section ).update( showcase_section = kept_section )
+            section.delete()
+
+    products_count = ShowcaseProduct.objects.values('showcase_section').annotate( count = models.Count('id') )
+
+    for row in products_count:
+        ShowcaseSection.objects.filter( id = row['showcase_section'] ).update( products_count = row['count'] )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0004_showcaseproduct_hs_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcasesection',
+            name='normalized_name',
+            field=models.CharField(help_text='Name lowercased, unaccented and with the whitespaces collapsed. Identifies the section', max_length=60, null=True),
+        ),
+        migrations.AddField(
+            model_name='showcasesection',
+            name='parent',
+            field=models.ForeignKey(blank=True, help_text='Section that contains this one', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='children', to='market.ShowcaseSection'),
+        ),
+        migrations.AddField(
+            model_name='showcasesection',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, help_text='Showcase products in the section or in its descendants'),
+        ),
+        migrations.RunPython(normalize_showcase_sections, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='showcasesection',
+            name='normalized_name',
+            field=models.CharField(help_text='Name lowercased, unaccented and with the whitespaces collapsed. Identifies the section', max_length=60, unique=True),
+        ),
+    ]
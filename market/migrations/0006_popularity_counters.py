@@ -0,0 +1,39 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_showcasesection_taxonomy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('showcase_product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='market.ShowcaseProduct')),
+                ('score', models.FloatField(default=0, help_text='Natural logarithm of the views and clicks of the product, each \n            one weighted by how recent it is. Greater is more trending.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'showcase_trending_score',
+            },
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='clicks_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times the detail of the product has been opened.'),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times the product has been displayed in the showcase or in the search results.'),
+        ),
+        migrations.AddIndex(
+            model_name='trendingscore',
+            index=models.Index(fields=['-score'], name='trending_score_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0006_popularity_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShowcaseProductDeletion',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id that the showcase product deleted had', primary_key=True, serialize=False)),
+                ('changed_at', models.DateTimeField(auto_now=True, help_text='Date when the showcase product was deleted')),
+            ],
+            options={
+                'db_table': 'showcaseproduct_deletion',
+            },
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='changed_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, help_text='Date when the product was published. Empty for the products published before tracking it.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['changed_at', 'id'], name='showcaseproduct_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproductdeletion',
+            index=models.Index(fields=['changed_at', 'id'], name='showcaseproduct_deletion_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:28
+
+from django.db import migrations, models
+from business_network_API.utils import normalize_text
+
+
+def resolve_showcase_products_sections(apps, schema_editor):
+    """
+    Move the showcase products to the section of the whole path of their category
+    (Ej: Alimentos > Frutas), the sections were shared by name whatever their
+    parent was. Recount the products of each section and its ancestors
+    and delete the sections left without products.
+    """
+
+    ShowcaseSection = apps.get_model('market', 'ShowcaseSection')
+    ShowcaseProduct = apps.get_model('market', 'ShowcaseProduct')
+
+    sections_ids = {}
+    parents_ids = {}
+
+    for section in ShowcaseSection.objects.all():
+        sections_ids[(section.parent_id, section.normalized_name)] = section.id
+        parents_ids[section.id] = section.parent_id
+
+    def resolve_section(name, parent_id):
+        normalized_name = normalize_text(name)[:60]
+
+        if (parent_id, normalized_name) not in sections_ids:
+            section = ShowcaseSection.objects.create(
+                name = name.strip()[:60], normalized_name = normalized_name, parent_id = parent_id
+            )
+            sections_ids[(parent_id, normalized_name)] = section.id
+            parents_ids[section.id] = parent_id
+
+        return sections_ids[(parent_id, normalized_name)]
+
+    products_counts = {}
+
+    for showcase_product in ShowcaseProduct.objects.select_related('product').only('id', 'product__category'):
+        category = showcase_product.product.category
+        names = [name for name in category.split('>') if normalize_text(name)]
+        section_id = None
+
+        for name in names or [category]:
+            section_id = resolve_section(name, section_id)
+
+        ShowcaseProduct.objects.filter( id = showcase_product.id ).update( showcase_section_id = section_id )
+
+        ancestors = []
+        while section_id is not None and section_id not in ancestors:
+            ancestors.append(section_id)
+            section_id = parents_ids[section_id]
+
+        for ancestor_id in ancestors:
+            products_counts[ancestor_id] = products_counts.get(ancestor_id, 0) + 1
+
+    ShowcaseSection.objects.update( products_count = 0 )
+
+    for section_id, products_count in products_counts.items():
+        ShowcaseSection.objects.filter( id = section_id ).update( products_count = products_count )
+
+    # The duplicates that were shared by name are left without products, they are deleted from the leaves up
+    while True:
+        deleted, _ = ShowcaseSection.objects.filter( products_count = 0, children__isnull = True ).delete()
+
+        if not deleted:
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0007_changes_feed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='showcasesection',
+            name='normalized_name',
+            field=models.CharField(help_text='Name lowercased, unaccented and with the whitespaces collapsed. Identifies the section inside its parent', max_length=60),
+        ),
+        migrations.AddConstraint(
+            model_name='showcasesection',
+            constraint=models.UniqueConstraint(fields=('parent', 'normalized_name'), name='showcasesection_parent_normalized_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='showcasesection',
+            constraint=models.UniqueConstraint(condition=models.Q(parent__isnull=True), fields=('normalized_name',), name='showcasesection_root_normalized_name'),
+        ),
+        migrations.RunPython(resolve_showcase_products_sections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:37
+
+from django.db import migrations, models
+
+
+def copy_popularity_counters(apps, schema_editor):
+    """Copy the counters of the products, suppliers and showcase products to their table."""
+    PopularityCounter = apps.get_model('market', 'PopularityCounter')
+
+    counted_models = [
+        ('suppliers.product', apps.get_model('suppliers', 'Product'), ('views_count',)),
+        ('suppliers.supplierprofile', apps.get_model('suppliers', 'SupplierProfile'), ('views_count',)),
+        ('market.showcaseproduct', apps.get_model('market', 'ShowcaseProduct'), ('views_count', 'clicks_count')),
+    ]
+
+    for entity_type, model, fields in counted_models:
+        rows = model._base_manager.exclude(
+            **{field: 0 for field in fields}
+        ).values_list('id', *fields).iterator()
+
+        PopularityCounter.objects.bulk_create((
+            PopularityCounter(entity_type = entity_type, entity_id = row[0], **dict(zip(fields, row[1:])))
+            for row in rows
+        ), batch_size = 1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_showcasesection_unique_in_parent'),
+        ('suppliers', '0007_changes_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularityCounter',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entity_type', models.CharField(help_text='Label of the model of the object counted. (Ej: suppliers.product)', max_length=60)),
+                ('entity_id', models.BigIntegerField(help_text='Id of the object counted')),
+                ('views_count', models.PositiveIntegerField(default=0, help_text='Times the object has been viewed. (The showcase products in the showcase or in the search results)')),
+                ('clicks_count', models.PositiveIntegerField(default=0, help_text='Times the detail of the showcase product has been opened.')),
+            ],
+            options={
+                'db_table': 'popularity_counter',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='popularitycounter',
+            constraint=models.UniqueConstraint(fields=('entity_type', 'entity_id'), name='popularity_counter_entity'),
+        ),
+        migrations.RunPython(copy_popularity_counters, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='showcaseproduct',
+            name='clicks_count',
+        ),
+        migrations.RemoveField(
+            model_name='showcaseproduct',
+            name='views_count',
+        ),
+    ]
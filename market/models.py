@@ -2,7 +2,7 @@ from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
 # Models
-from suppliers.models import Product
+from suppliers.models import Currency, Product
 from multimedia.models import Image
 
 # Create your models here.
@@ -11,9 +11,35 @@ class ShowcaseSection(models.Model):
     id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=60)
 
+    normalized_name = models.CharField(
+        help_text = _('Name lowercased, unaccented and with the whitespaces collapsed. Identifies the section inside its parent'),
+        max_length = 60
+    )
+
+    parent = models.ForeignKey(
+        'self', models.PROTECT, blank = True, null = True, related_name = 'children',
+        help_text = _('Section that contains this one')
+    )
+
+    products_count = models.PositiveIntegerField(
+        help_text = _('Showcase products in the section or in its descendants'),
+        default = 0
+    )
+
     class Meta:
         db_table = 'showcasesection'
 
+        # The sections without parent are apart because the NULLs are never equal in the unique constraints
+        constraints = [
+            models.UniqueConstraint(
+                fields = ['parent', 'normalized_name'], name = 'showcasesection_parent_normalized_name'
+            ),
+            models.UniqueConstraint(
+                fields = ['normalized_name'], condition = models.Q(parent__isnull = True),
+                name = 'showcasesection_root_normalized_name'
+            ),
+        ]
+
 class ShowcaseProduct(models.Model):
     id = models.BigAutoField(primary_key=True)
 
@@ -26,6 +52,11 @@ class ShowcaseProduct(models.Model):
         help_text = _('Value that is used in foreign trade to identify uniquely a product.'),
         max_length = 20, blank = True, null = True
     )
+
+    hs_code = models.CharField(
+        help_text = _('Digits of the tariff heading of the product, for browsing by HS code.'),
+        max_length = 10, blank = True, null = True
+    )
     
     description = models.TextField(
         help_text = _('description for add the principal characteristics of the product.'),
@@ -44,6 +75,23 @@ class ShowcaseProduct(models.Model):
         max_digits=15, decimal_places=2, null = True, blank = True
     )
 
+    price_currency = models.ForeignKey(
+        Currency, models.PROTECT, null = True,
+        help_text = _('Currency in which is configured the product prices')
+    )
+
+    minimum_price_usd_cents = models.BigIntegerField(
+        help_text = _("""Minimum price normalized to USD cents with the exchange 
+            rate of the price currency. Used to filter and sort across the market."""),
+        null = True, blank = True
+    )
+
+    maximum_price_usd_cents = models.BigIntegerField(
+        help_text = _("""Maximum price normalized to USD cents with the exchange 
+            rate of the price currency. Used to filter and sort across the market."""),
+        null = True, blank = True
+    )
+
     measurement_unit = models.CharField(
         help_text = _('Type of unit that is used to measure and offer the product.'),
         max_length = 30, blank = True, null = True
@@ -74,5 +122,100 @@ class ShowcaseProduct(models.Model):
         help_text = _("accountname of the supplier that is selling the product")
     )
 
+    created_at = models.DateTimeField(
+        help_text = _('Date when the product was published. Empty for the products published before tracking it.'),
+        auto_now_add = True, null = True
+    )
+
+    changed_at = models.DateTimeField(auto_now = True)
+
+    class Meta:
+        db_table = 'showcaseproduct'
+        indexes = [
+            models.Index(fields = ['minimum_price_usd_cents'], name = 'showcaseproduct_min_usd_idx'),
+            models.Index(fields = ['maximum_price_usd_cents'], name = 'showcaseproduct_max_usd_idx'),
+            models.Index(fields = ['hs_code'], name = 'showcaseproduct_hs_code_idx', opclasses = ['text_pattern_ops']),
+            models.Index(fields = ['changed_at', 'id'], name = 'showcaseproduct_changed_idx'),
+        ]
+
+
+class ShowcaseProductDeletion(models.Model):
+    """
+    Record of a showcase product removed from the market. The showcase
+    products are deleted, so this keeps the deletes in the changes feed.
+    """
+
+    id = models.BigIntegerField(
+        primary_key = True,
+        help_text = _('Id that the showcase product deleted had')
+    )
+
+    changed_at = models.DateTimeField(
+        help_text = _('Date when the showcase product was deleted'),
+        auto_now = True
+    )
+
+    class Meta:
+        db_table = 'showcaseproduct_deletion'
+        indexes = [
+            models.Index(fields = ['changed_at', 'id'], name = 'showcaseproduct_deletion_idx'),
+        ]
+
+class TrendingScore(models.Model):
+    """
+    Popularity of a showcase product decayed over time, used to rank
+    the showcase and the search results. Kept apart from the product
+    so the frequent writes don't touch the rows that are searched.
+    """
+
+    showcase_product = models.OneToOneField(
+        ShowcaseProduct, models.CASCADE, primary_key = True, 
+        related_name = 'trending_score'
+    )
+
+    score = models.FloatField(
+        help_text = _("""Natural logarithm of the views and clicks of the product, each 
+            one weighted by how recent it is. Greater is more trending."""),
+        default = 0
+    )
+
+    updated_at = models.DateTimeField(auto_now = True)
+
+    class Meta:
+        db_table = 'showcase_trending_score'
+        indexes = [
+            models.Index(fields = ['-score'], name = 'trending_score_idx'),
+        ]
+
+class PopularityCounter(models.Model):
+    """
+    Views and clicks of a product, supplier or showcase product. Kept apart
+    from the objects counted, as the trending scores, so the frequent writes
+    don't touch the rows that are searched and the saves of the objects
+    never write back old counts.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    entity_type = models.CharField(
+        help_text = _('Label of the model of the object counted. (Ej: suppliers.product)'),
+        max_length = 60
+    )
+
+    entity_id = models.BigIntegerField(help_text = _('Id of the object counted'))
+
+    views_count = models.PositiveIntegerField(
+        help_text = _('Times the object has been viewed. (The showcase products in the showcase or in the search results)'),
+        default = 0
+    )
+
+    clicks_count = models.PositiveIntegerField(
+        help_text = _('Times the detail of the showcase product has been opened.'),
+        default = 0
+    )
+
     class Meta:
-        db_table = 'showcaseproduct'
\ No newline at end of file
+        db_table = 'popularity_counter'
+        constraints = [
+            models.UniqueConstraint(fields = ['entity_type', 'entity_id'], name = 'popularity_counter_entity'),
+        ]
@@ -0,0 +1,209 @@
+# market/popularity.py
+
+# Django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# Models
+from market.models import PopularityCounter, ShowcaseProduct, TrendingScore
+from suppliers.models import Product
+
+# Utils
+from collections import defaultdict
+from datetime import datetime
+import atexit
+import logging
+import math
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Reference time of the trending scores. The weight of a view grows with its time
+# after the epoch instead of decaying the stored scores, so they never get rewritten.
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo = timezone.utc)
+
+
+class PopularityCounters:
+    """
+    In process counters of the views of the products and the suppliers.
+    The increments are aggregated by object and a background thread flushes
+    them periodically as batched updates, so the views never write in the request.
+    """
+
+    def __init__(self, flush_interval):
+        self.counts = defaultdict(int)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.thread_lock = threading.Lock()
+
+    def increment(self, model, ids):
+        """Add a view to the objects of the model with the ids given."""
+        with self.lock:
+            for object_id in ids:
+                self.counts[(model, object_id)] += 1
+
+        self.start()
+
+    def start(self):
+        """Start the writer thread the first time it is needed."""
+        if self.thread is not None:
+            return
+
+        with self.thread_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target = self.run, name = 'popularity-writer', daemon = True
+                )
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_interval)
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('The popularity counters could not be written')
+            finally:
+                connection.close()
+
+    def pop_counts(self):
+        """Return the views of every model by object id and reset the counters."""
+        with self.lock:
+            counts, self.counts = self.counts, defaultdict(int)
+
+        views = defaultdict(dict)
+        for (model, object_id), amount in counts.items():
+            views[model][object_id] = amount
+
+        return views
+
+    def flush(self):
+        """Write the counters aggregated and add them to the trending scores."""
+        views = self.pop_counts()
+
+        for model, amounts in views.items():
+            increment_counters(model, {object_id: (amount, 0) for object_id, amount in amounts.items()})
+
+        # Viewing the detail of a product is a click in its showcase product
+        products_views = views.get(Product, {})
+        clicks = defaultdict(int)
+        if products_views:
+            showcase_products = ShowcaseProduct.objects.filter(
+                product_id__in = products_views
+            ).values_list('id', 'product_id')
+
+            for showcase_product_id, product_id in showcase_products:
+                clicks[showcase_product_id] += products_views[product_id]
+
+            increment_counters(ShowcaseProduct, {object_id: (0, amount) for object_id, amount in clicks.items()})
+
+        weights = defaultdict(int)
+        for showcase_product_id, amount in views.get(ShowcaseProduct, {}).items():
+            weights[showcase_product_id] += amount * settings.TRENDING_VIEW_WEIGHT
+
+        for showcase_product_id, amount in clicks.items():
+            weights[showcase_product_id] += amount * settings.TRENDING_CLICK_WEIGHT
+
+        update_trending_scores(weights)
+
+
+popularity_counters = PopularityCounters(
+    flush_interval = settings.POPULARITY_FLUSH_INTERVAL
+)
+
+
+def record_views(model, ids):
+    """Count a view of the objects given, without failing the request if it can't."""
+    try:
+        popularity_counters.increment(model, ids)
+    except Exception:
+        logger.exception('The views could not be counted')
+
+
+def increment_counters(model, amounts):
+    """
+    Add the amounts (object id -> (views, clicks)) to the popularity counters
+    of the objects of the model in one upsert. The objects that don't exist
+    anymore are skipped.
+    """
+
+    existing_ids = model._base_manager.filter( id__in = amounts ).values_list('id', flat = True)
+
+    rows = [
+        (model._meta.label_lower, object_id, amounts[object_id][0], amounts[object_id][1])
+        for object_id in existing_ids
+    ]
+
+    if not rows:
+        return
+
+    sql = """
+        INSERT INTO {popularity_counter} AS pc (entity_type, entity_id, views_count, clicks_count)
+        VALUES {values}
+        ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+            views_count = pc.views_count + EXCLUDED.views_count,
+            clicks_count = pc.clicks_count + EXCLUDED.clicks_count
+    """.format(
+        popularity_counter = PopularityCounter._meta.db_table,
+        values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+def get_trending_weight(weight, now = None):
+    """
+    Return the weight given in the scale of the trending scores (The natural
+    logarithm), grown by the time passed since the epoch. Each TRENDING_HALF_LIFE
+    the new weights double, that is the same as halving all the previous ones.
+    """
+
+    now = now or timezone.now()
+    elapsed = (now - TRENDING_EPOCH).total_seconds()
+
+    return math.log(weight) + elapsed * math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def update_trending_scores(weights):
+    """
+    Add the weights (showcase product id -> weight) to the trending scores
+    in one upsert. The scores are logarithms, so they are summed with
+    log(e^a + e^b) = max(a, b) + log(1 + e^-|a - b|) to avoid overflows.
+    """
+
+    if not weights:
+        return
+
+    existing_ids = ShowcaseProduct.objects.filter(
+        id__in = weights
+    ).values_list('id', flat = True)
+
+    now = timezone.now()
+    rows = [
+        (showcase_product_id, get_trending_weight(weights[showcase_product_id], now), now)
+        for showcase_product_id in existing_ids
+    ]
+
+    if not rows:
+        return
+
+    sql = """
+        INSERT INTO {trending_score} AS ts (showcase_product_id, score, updated_at)
+        VALUES {values}
+        ON CONFLICT (showcase_product_id) DO UPDATE SET
+            score = GREATEST(ts.score, EXCLUDED.score) + LN(1 + EXP(-ABS(ts.score - EXCLUDED.score))),
+            updated_at = EXCLUDED.updated_at
+    """.format(
+        trending_score = TrendingScore._meta.db_table,
+        values = ', '.join(['(%s, %s, %s)'] * len(rows))
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
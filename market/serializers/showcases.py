@@ -16,7 +16,7 @@ from multimedia.serializers import ImageModelSerializer
 class ShowcaseProductModelSerializer(serializers.ModelSerializer):
     """Showcase product model serializer."""
 
-    principal_image = ImageModelSerializer()
+    principal_image = ImageModelSerializer( variant = 'card' )
 
     class Meta:
         """Showcase product meta class."""
@@ -27,9 +27,13 @@ class ShowcaseProductModelSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'tariff_heading',
+            'hs_code',
             'description',
             'minimum_price',
             'maximum_price',
+            'price_currency',
+            'minimum_price_usd_cents',
+            'maximum_price_usd_cents',
             'measurement_unit',
             'minimum_purchase',
             'principal_image',
@@ -38,6 +42,30 @@ class ShowcaseProductModelSerializer(serializers.ModelSerializer):
             'product'
         )
 
+class ShowcaseProductChangeModelSerializer(serializers.ModelSerializer):
+    """Compact showcase product for the changes feed."""
+
+    class Meta:
+        """Showcase product change meta class."""
+
+        model = ShowcaseProduct
+
+        fields = (
+            'id',
+            'name',
+            'hs_code',
+            'minimum_price',
+            'maximum_price',
+            'price_currency',
+            'minimum_price_usd_cents',
+            'maximum_price_usd_cents',
+            'principal_image',
+            'showcase_section',
+            'supplier_accountname',
+            'product',
+            'changed_at',
+        )
+
 class ShowcaseSectionModelSerializer(serializers.ModelSerializer):
     """Showcase section model serializer."""
 
@@ -58,6 +86,8 @@ class ShowcaseSectionModelSerializer(serializers.ModelSerializer):
         fields = (
             'id',
             'name',
+            'parent',
+            'products_count',
             'section_elements'
         )
 
@@ -1,41 +1,79 @@
+# Django
+from django.db.models import BigIntegerField, DecimalField, F, Value
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
 # Models
-from suppliers.models import Product
-from market.models import ShowcaseProduct, ShowcaseSection
+from suppliers.models import ExchangeRate, Product
+from multimedia.models import Image
+from market.models import ShowcaseProduct, ShowcaseProductDeletion, ShowcaseSection
+
+# Cache
+from market.cache import bump_market_generation, invalidate_showcase_products
+
+# Taxonomy
+from market.taxonomy import bump_showcase_sections_version, get_showcase_section_id, update_showcase_sections_count
+
+# Tariffs
+from suppliers.tariffs import update_tariff_headings_count
+
+# Vocabulary
+from searches.vocabulary import get_showcase_product_terms, update_vocabulary
 
 # Signals
-from suppliers.signals import post_product_delete, post_product_create, post_product_update
+from suppliers.signals import (
+    post_product_delete, post_product_create, 
+    post_product_update, post_exchange_rate_update
+)
+from multimedia.signals import post_image_duplicates_collapse, post_image_variants_create
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
 
-def get_showcase_section(name):
-    showcase_section = ShowcaseSection.objects.filter( name__iexact = name.strip() )
+def get_usd_cents_prices(instance):
+    """Return the minimum and maximum prices of the product normalized to USD cents."""
+    exchange_rate = ExchangeRate.objects.filter( currency_id = instance.price_currency_id ).first()
 
-    if showcase_section.exists():
-        return showcase_section.first()
-    else:
-        return ShowcaseSection.objects.create(name = name )
+    if exchange_rate is None:
+        return None, None
+
+    return (
+        exchange_rate.to_usd_cents(instance.minimum_price),
+        exchange_rate.to_usd_cents(instance.maximum_price)
+    )
 
 
 def create_showcase_product(instance):
-    showcase_section = get_showcase_section(name = instance.category)
+    showcase_section_id = get_showcase_section_id(instance.category)
+    minimum_price_usd_cents, maximum_price_usd_cents = get_usd_cents_prices(instance)
 
-    ShowcaseProduct.objects.create(
+    showcase_product = ShowcaseProduct.objects.create(
         name = instance.name,
         tariff_heading = instance.tariff_heading,
+        hs_code = instance.hs_code,
         description = instance.description,
         minimum_price = instance.minimum_price,
         maximum_price = instance.maximum_price,
+        price_currency_id = instance.price_currency_id,
+        minimum_price_usd_cents = minimum_price_usd_cents,
+        maximum_price_usd_cents = maximum_price_usd_cents,
         measurement_unit = instance.measurement_unit,
         minimum_purchase = instance.minimum_purchase,
         principal_image = instance.principal_image,
         product = instance,
-        showcase_section = showcase_section,
+        showcase_section_id = showcase_section_id,
         supplier_name = instance.supplier.display_name,
         supplier_accountname = instance.supplier.company.accountname
     )
+    update_tariff_headings_count(None, instance.hs_code)
+    update_showcase_sections_count(None, showcase_section_id)
+    update_vocabulary([], get_showcase_product_terms(showcase_product))
 
 
 def update_showcase_product(instance, showcase_product):
+    update_tariff_headings_count(showcase_product.hs_code, instance.hs_code)
+    previous_terms = get_showcase_product_terms(showcase_product)
+
     if not showcase_product.supplier_name:
         showcase_product.supplier_name = instance.supplier.display_name
     if not showcase_product.supplier_accountname:
@@ -43,15 +81,22 @@ def update_showcase_product(instance, showcase_product):
 
     showcase_product.name = instance.name
     showcase_product.tariff_heading = instance.tariff_heading
+    showcase_product.hs_code = instance.hs_code
     showcase_product.description = instance.description
     showcase_product.minimum_price = instance.minimum_price
     showcase_product.maximum_price = instance.maximum_price
+    showcase_product.price_currency_id = instance.price_currency_id
+    showcase_product.minimum_price_usd_cents, showcase_product.maximum_price_usd_cents = get_usd_cents_prices(instance)
     showcase_product.measurement_unit = instance.measurement_unit
     showcase_product.minimum_purchase = instance.minimum_purchase
     showcase_product.principal_image = instance.principal_image
-    showcase_product.showcase_section = get_showcase_section(name = instance.category)
+    showcase_section_id = get_showcase_section_id(instance.category)
+    update_showcase_sections_count(showcase_product.showcase_section_id, showcase_section_id)
+    showcase_product.showcase_section_id = showcase_section_id
     showcase_product.save()
 
+    update_vocabulary(previous_terms, get_showcase_product_terms(showcase_product))
+
 
 @receiver(post_product_update, sender=Product)
 def sync_showcase_update_product(sender, instance, created, **kwargs):
@@ -59,6 +104,8 @@ def sync_showcase_update_product(sender, instance, created, **kwargs):
 
     if not created:
         update_showcase_product(instance, showcase_product)
+        invalidate_showcase_products([showcase_product.id])
+        bump_market_generation()
 
 
 @receiver(post_product_create, sender=Product)
@@ -66,11 +113,52 @@ def sync_showcase_create_product(sender, instance, created, **kwargs):
 
     if created:
         create_showcase_product(instance)
+        bump_market_generation()
 
 
 @receiver(post_product_delete, sender=Product)
 def sync_delete_showcase_product(sender, instance, **kwargs):
     showcase_products = ShowcaseProduct.objects.filter( product = instance )
 
+    invalidate_showcase_products([product.id for product in showcase_products])
+
     for product in showcase_products:
-        product.delete()
\ No newline at end of file
+        update_tariff_headings_count(product.hs_code, None)
+        update_showcase_sections_count(product.showcase_section_id, None)
+        update_vocabulary(get_showcase_product_terms(product), [])
+        ShowcaseProductDeletion.objects.update_or_create( id = product.id )
+        product.delete()
+
+    bump_market_generation()
+
+
+@receiver(post_exchange_rate_update, sender=ExchangeRate)
+def sync_showcase_usd_prices(sender, instance, **kwargs):
+    """Recompute in bulk the normalized prices of the products in the currency."""
+    cents_rate = Value(instance.usd_rate * 100, output_field = DecimalField())
+
+    showcase_products = ShowcaseProduct.objects.filter( price_currency_id = instance.currency_id )
+    invalidate_showcase_products(showcase_products.values_list('id', flat = True))
+
+    showcase_products.update(
+        minimum_price_usd_cents = Cast(Round(F('minimum_price') * cents_rate), BigIntegerField()),
+        maximum_price_usd_cents = Cast(Round(F('maximum_price') * cents_rate), BigIntegerField()),
+        changed_at = timezone.now()
+    )
+    bump_market_generation()
+
+
+@receiver(post_image_variants_create, sender=Image)
+@receiver(post_image_duplicates_collapse, sender=Image)
+def invalidate_image_showcase_products(sender, instance, **kwargs):
+    """The showcase products show the variants of their principal image."""
+    invalidate_showcase_products(
+        ShowcaseProduct.objects.filter( principal_image = instance ).values_list('id', flat = True)
+    )
+    bump_market_generation()
+
+
+@receiver(post_delete, sender=ShowcaseSection)
+def invalidate_deleted_showcase_section(sender, instance, **kwargs):
+    """The products resolved to the section name afterwards get a new section."""
+    bump_showcase_sections_version()
@@ -0,0 +1,136 @@
+# market/taxonomy.py
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+# Models
+from market.models import ShowcaseSection
+
+# Utils
+from business_network_API.utils import normalize_text
+import time
+
+
+# Separator of the levels of a category (Ej: Alimentos > Frutas)
+SECTION_PATH_SEPARATOR = '>'
+
+SHOWCASE_SECTIONS_VERSION_KEY = 'market:showcase_sections:version'
+
+# Process local cache of (parent id, normalized name) -> section id, of a version of the sections
+_sections_ids = {}
+_sections_version = None
+
+
+def get_showcase_sections_version():
+    """Return the version of the sections. When it's missing (Ej: evicted) it's seeded
+    with a value never used before, so every process empties its cache of ids."""
+    version = cache.get(SHOWCASE_SECTIONS_VERSION_KEY)
+
+    if version is None:
+        version = time.time_ns()
+        cache.add(SHOWCASE_SECTIONS_VERSION_KEY, version, None)
+        version = cache.get(SHOWCASE_SECTIONS_VERSION_KEY, version)
+
+    return version
+
+
+def increment_showcase_sections_version():
+    try:
+        cache.incr(SHOWCASE_SECTIONS_VERSION_KEY)
+    except ValueError:
+        cache.add(SHOWCASE_SECTIONS_VERSION_KEY, time.time_ns(), None)
+
+
+def bump_showcase_sections_version():
+    """Make all the processes empty their cache of ids, now and after the commit."""
+    increment_showcase_sections_version()
+    transaction.on_commit(increment_showcase_sections_version)
+
+
+def get_sections_ids():
+    """Return the cache of ids of the process, emptied when there is a new version of the sections."""
+    global _sections_ids, _sections_version
+
+    version = get_showcase_sections_version()
+
+    if version != _sections_version:
+        _sections_ids, _sections_version = {}, version
+
+    return _sections_ids
+
+
+def resolve_showcase_section(name, parent_id = None, sections_ids = None):
+    """
+    Return the id of the section with the name given inside the parent given,
+    creating it if it doesn't exist. Concurrent writers get the same section
+    because the normalized name is unique inside its parent.
+    """
+
+    sections_ids = get_sections_ids() if sections_ids is None else sections_ids
+
+    normalized_name = normalize_text(name)[:60]
+    key = (parent_id, normalized_name)
+    section_id = sections_ids.get(key)
+
+    if section_id is None:
+        section, created = ShowcaseSection.objects.get_or_create(
+            parent_id = parent_id, normalized_name = normalized_name,
+            defaults = {'name': name.strip()[:60]}
+        )
+        section_id = section.id
+
+        if created:
+            # The section doesn't exist for the others until the transaction is commited
+            transaction.on_commit(lambda: sections_ids.setdefault(key, section_id))
+        else:
+            sections_ids[key] = section_id
+
+    return section_id
+
+
+def get_showcase_section_id(category):
+    """Return the id of the section of a product category, that can have
+    many levels separated by SECTION_PATH_SEPARATOR (Ej: Alimentos > Frutas)."""
+    names = [name for name in category.split(SECTION_PATH_SEPARATOR) if normalize_text(name)]
+    sections_ids = get_sections_ids()
+    section_id = None
+
+    for name in names or [category]:
+        section_id = resolve_showcase_section(name, section_id, sections_ids)
+
+    return section_id
+
+
+def get_showcase_section_ancestors(section_id):
+    """Return the ids of the section and all its ancestors."""
+    ancestors = []
+
+    while section_id is not None and section_id not in ancestors:
+        ancestors.append(section_id)
+        section_id = ShowcaseSection.objects.filter( id = section_id ).values_list('parent_id', flat = True).first()
+
+    return ancestors
+
+
+def update_showcase_sections_count(previous_section_id, section_id):
+    """Move a product from the section previous_section_id to section_id,
+    updating the products count of the sections and their ancestors."""
+    if previous_section_id == section_id:
+        return
+
+    previous_ancestors = set(get_showcase_section_ancestors(previous_section_id))
+    ancestors = set(get_showcase_section_ancestors(section_id))
+
+    removed = previous_ancestors - ancestors
+    if removed:
+        ShowcaseSection.objects.filter( id__in = removed, products_count__gt = 0 ).update(
+            products_count = F('products_count') - 1
+        )
+
+    added = ancestors - previous_ancestors
+    if added:
+        ShowcaseSection.objects.filter( id__in = added ).update(
+            products_count = F('products_count') + 1
+        )
@@ -1,3 +1,288 @@
-from django.test import TestCase
+# Market tests
 
-# Create your tests here.
+# Django
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Django REST framework
+from rest_framework.test import APIClient
+
+# Models
+from market.models import PopularityCounter, ShowcaseProduct, ShowcaseProductDeletion, ShowcaseSection, TrendingScore
+from suppliers.models import Currency, ExchangeRate, Product
+from users.models import User
+
+# Cache
+from market.cache import SHOWCASE_PRODUCT_KEY, get_showcase_products_data
+
+# Popularity
+from market.popularity import PopularityCounters, get_trending_weight, increment_counters, popularity_counters
+
+# Taxonomy
+from market.taxonomy import get_showcase_section_id
+
+# Signals
+from suppliers.signals import post_product_delete, post_product_update
+
+# Fixtures
+from searches.tests import MarketTestCase, MarketTransactionTestCase, postgresql_only
+
+# Utils
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+import importlib
+import math
+
+
+class ShowcasePricesTestCase(MarketTestCase):
+    """The showcase products keep their prices normalized to USD cents with the exchange rate of their currency."""
+
+    def set_exchange_rate(self, currency, usd_rate):
+        admin = User.objects.create_superuser('admin@acme.com', 'x12345678', full_name = 'Admin')
+        client = APIClient()
+        client.force_authenticate( user = admin )
+
+        return client.put('/currencies/{}/exchange-rate/'.format(currency.id), {'usd_rate': usd_rate}, format = 'json')
+
+    def test_prices_normalized_on_create(self):
+        product = self.create_product('Mango', minimum_price = 40000, maximum_price = 60000)
+        showcase_product = ShowcaseProduct.objects.get( product = product )
+
+        self.assertEqual(showcase_product.minimum_price_usd_cents, 1000)
+        self.assertEqual(showcase_product.maximum_price_usd_cents, 1500)
+
+    def test_currency_without_rate(self):
+        euro = Currency.objects.create( name = 'Euro', code = 'EUR', region = 'EU' )
+        product = self.create_product('Aceite', price_currency = euro)
+
+        self.assertIsNone(ShowcaseProduct.objects.get( product = product ).minimum_price_usd_cents)
+
+    def test_rate_update_recomputes_the_prices(self):
+        product = self.create_product('Mango', minimum_price = 40000)
+
+        response = self.set_exchange_rate(self.currency, '0.0005')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ShowcaseProduct.objects.get( product = product ).minimum_price_usd_cents, 2000)
+
+    def test_invalid_rate(self):
+        response = self.set_exchange_rate(self.currency, '0')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ExchangeRate.objects.get( currency = self.currency ).usd_rate, Decimal('0.00025'))
+
+
+class ShowcaseProductsCacheTestCase(MarketTransactionTestCase):
+
+    def test_products_read_through_the_cache(self):
+        showcase_ids = [
+            ShowcaseProduct.objects.get( product = self.create_product(name) ).id for name in ('Mango', 'Banano')
+        ]
+
+        with self.assertNumQueries(1): # The products without images
+            get_showcase_products_data(showcase_ids)
+
+        with self.assertNumQueries(0):
+            products = get_showcase_products_data(showcase_ids[::-1])
+
+        self.assertEqual([product['name'] for product in products], ['Banano', 'Mango'])
+        self.assertEqual(len(get_showcase_products_data([0] + showcase_ids)), 2)
+
+    def test_product_update_invalidated_after_the_commit(self):
+        product = self.create_product('Mango')
+        showcase_id = ShowcaseProduct.objects.get( product = product ).id
+        get_showcase_products_data([showcase_id])
+
+        with transaction.atomic():
+            Product.objects.filter( id = product.id ).update( name = 'Mango Tommy' )
+            product.refresh_from_db()
+            post_product_update.send( sender = Product, instance = product, created = False )
+
+            # A concurrent read, that still sees the product before the commit
+            cache.set(SHOWCASE_PRODUCT_KEY.format(showcase_id), {'name': 'Mango'})
+
+        self.assertEqual(get_showcase_products_data([showcase_id])[0]['name'], 'Mango Tommy')
+
+
+class ShowcaseTaxonomyTestCase(MarketTransactionTestCase):
+    """The sections are a tree, each one unique by its normalized name inside its parent."""
+
+    def get_section(self, product):
+        return ShowcaseProduct.objects.select_related('showcase_section__parent').get( product = product ).showcase_section
+
+    def get_counts(self):
+        return dict(ShowcaseSection.objects.values_list('name', 'products_count'))
+
+    def test_sections_resolved_by_the_whole_path(self):
+        section = self.get_section(self.create_product('Mango', category = 'Alimentos > Frutas'))
+
+        self.assertEqual((section.name, section.parent.name), ('Frutas', 'Alimentos'))
+        self.assertEqual(get_showcase_section_id(' alimentos >  FRUTAS '), section.id)
+        self.assertEqual(
+            ShowcaseSection.objects.get( id = get_showcase_section_id('Alimentos > Frutas > Tropicales') ).parent_id,
+            section.id
+        )
+
+        # The same name inside another parent is another section
+        self.assertNotEqual(get_showcase_section_id('Bebidas > Frutas'), section.id)
+        self.assertNotEqual(get_showcase_section_id('Frutas'), section.id)
+
+    def test_sections_ids_cached(self):
+        section_id = get_showcase_section_id('Alimentos > Frutas')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_showcase_section_id('Alimentos > Frutas'), section_id)
+
+    def test_deleted_section_resolved_again(self):
+        section_id = get_showcase_section_id('Alimentos > Frutas')
+
+        ShowcaseSection.objects.get( id = section_id ).delete()
+
+        new_section_id = get_showcase_section_id('Alimentos > Frutas')
+        self.assertNotEqual(new_section_id, section_id)
+        self.assertTrue(ShowcaseSection.objects.filter( id = new_section_id ).exists())
+
+    def test_section_of_a_rolled_back_transaction_not_cached(self):
+        try:
+            with transaction.atomic():
+                get_showcase_section_id('Alimentos > Frutas')
+                raise ValueError()
+        except ValueError:
+            pass
+
+        # Takes the ids of the sections rolled back
+        get_showcase_section_id('Bebidas > Cafe')
+
+        section = ShowcaseSection.objects.select_related('parent').get( id = get_showcase_section_id('Alimentos > Frutas') )
+        self.assertEqual((section.name, section.parent.name), ('Frutas', 'Alimentos'))
+
+    def test_products_count_of_the_ancestors(self):
+        self.create_product('Mango', category = 'Alimentos > Frutas')
+        product = self.create_product('Cafe', category = 'Alimentos > Bebidas')
+        self.assertEqual(self.get_counts(), {'Alimentos': 2, 'Frutas': 1, 'Bebidas': 1})
+
+        product.category = 'Alimentos > Frutas'
+        product.save()
+        post_product_update.send( sender = Product, instance = product, created = False )
+        self.assertEqual(self.get_counts(), {'Alimentos': 2, 'Frutas': 2, 'Bebidas': 0})
+
+    def test_sections_shared_by_name_merged(self):
+        product = self.create_product('Mango', category = 'Alimentos > Frutas')
+
+        # Before the sections were unique by parent, the products got any section with their name
+        shared_section = ShowcaseSection.objects.create( name = 'Frutas', normalized_name = 'frutas', products_count = 3 )
+        ShowcaseProduct.objects.filter( product = product ).update( showcase_section = shared_section )
+
+        migration = importlib.import_module('market.migrations.0008_showcasesection_unique_in_parent')
+        migration.resolve_showcase_products_sections(apps, None)
+
+        section = self.get_section(product)
+        self.assertEqual((section.name, section.parent.name), ('Frutas', 'Alimentos'))
+        self.assertFalse(ShowcaseSection.objects.filter( id = shared_section.id ).exists())
+        self.assertEqual(self.get_counts(), {'Alimentos': 1, 'Frutas': 1})
+
+
+class PopularityCountersTestCase(MarketTestCase):
+    """The views are counted in memory and flushed in batches to the popularity counters."""
+
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product('Mango')
+        self.showcase_product = ShowcaseProduct.objects.get( product = self.product )
+
+        # The views counted by other tests
+        popularity_counters.pop_counts()
+
+    def get_counts(self, obj):
+        counter = PopularityCounter.objects.filter(
+            entity_type = obj._meta.label_lower, entity_id = obj.id
+        ).first()
+
+        return (counter.views_count, counter.clicks_count) if counter else None
+
+    def test_views_aggregated_in_memory(self):
+        counters = PopularityCounters( flush_interval = 60 )
+        counters.start = mock.Mock()
+
+        counters.increment(Product, [1, 2])
+        counters.increment(Product, [1])
+        counters.increment(ShowcaseProduct, [1])
+
+        self.assertEqual(counters.pop_counts(), {Product: {1: 2, 2: 1}, ShowcaseProduct: {1: 1}})
+        self.assertEqual(counters.pop_counts(), {})
+
+    def test_counters_incremented(self):
+        increment_counters(Product, {self.product.id: (2, 0), 0: (1, 0)})
+        increment_counters(Product, {self.product.id: (1, 3)})
+
+        self.assertEqual(self.get_counts(self.product), (3, 3))
+        self.assertEqual(PopularityCounter.objects.count(), 1)
+
+    def test_flush(self):
+        self.client.get('/products/{}/'.format(self.product.id))
+        self.client.get('/products/{}/'.format(self.product.id))
+        popularity_counters.increment(ShowcaseProduct, [self.showcase_product.id])
+
+        with mock.patch('market.popularity.update_trending_scores') as update_trending_scores:
+            popularity_counters.flush()
+
+        self.assertEqual(self.get_counts(self.product), (2, 0))
+
+        # The views of the product detail are clicks in its showcase product
+        self.assertEqual(self.get_counts(self.showcase_product), (1, 2))
+        update_trending_scores.assert_called_once_with({
+            self.showcase_product.id: settings.TRENDING_VIEW_WEIGHT + 2 * settings.TRENDING_CLICK_WEIGHT
+        })
+
+        popularity_counters.flush()
+        self.assertEqual(self.get_counts(self.product), (2, 0))
+
+    def test_trending_weight_doubles_every_half_life(self):
+        now = timezone.now()
+        later = now + timedelta( seconds = settings.TRENDING_HALF_LIFE )
+
+        self.assertAlmostEqual(get_trending_weight(1, later) - get_trending_weight(1, now), math.log(2))
+        self.assertAlmostEqual(get_trending_weight(4, now) - get_trending_weight(2, now), math.log(2))
+
+    @postgresql_only
+    def test_trending_scores(self):
+        other_product = ShowcaseProduct.objects.get( product = self.create_product('Mango Azucar') )
+
+        popularity_counters.increment(ShowcaseProduct, [self.showcase_product.id])
+        popularity_counters.flush()
+        popularity_counters.increment(ShowcaseProduct, [other_product.id] * 3)
+        popularity_counters.flush()
+
+        scores = dict(TrendingScore.objects.values_list('showcase_product_id', 'score'))
+        self.assertAlmostEqual(scores[other_product.id] - scores[self.showcase_product.id], math.log(3), places = 3)
+
+        popularity_counters.increment(ShowcaseProduct, [self.showcase_product.id] * 3)
+        popularity_counters.flush()
+
+        response = self.client.get('/search/products/', {'q': 'mango', 'ordering': '-trending'})
+        self.assertEqual([product['name'] for product in response.data['results']], ['Mango', 'Mango Azucar'])
+
+
+class ShowcaseChangesTestCase(MarketTestCase):
+    """The showcase feed merges the showcase products with the records of the deleted ones."""
+
+    def test_deletions_in_the_feed(self):
+        started_at = timezone.now() - timedelta( hours = 1 )
+        products = [self.create_product(name) for name in ('Mango', 'Banano')]
+        showcase_ids = [ShowcaseProduct.objects.get( product = product ).id for product in products]
+        ShowcaseProduct.objects.update( changed_at = started_at, created_at = started_at )
+
+        post_product_delete.send( sender = Product, instance = products[0] )
+        ShowcaseProductDeletion.objects.update( changed_at = started_at + timedelta( minutes = 1 ) )
+
+        response = self.client.get('/market/showcase/changes/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['deleted']), ([showcase_ids[1]], [showcase_ids[0]]))
+
+        response = self.client.get('/market/showcase/changes/', {'since': response.data['next']})
+        self.assertEqual(response.data['results'], [])
@@ -1,8 +1,10 @@
 # market/urls.py
 
 from django.urls import include, path
-from market.views.showcases import ShowcaseFeedView
+from market.views.showcases import ShowcaseChangesView, ShowcaseFeedView
 
 urlpatterns = [
     path('showcase/', ShowcaseFeedView.as_view()),
+
+    path('showcase/changes/', ShowcaseChangesView.as_view()),
 ]
\ No newline at end of file
@@ -2,12 +2,14 @@
 
 # Django
 from django.db import transaction
+from django.db.models import F, Prefetch, Q
 from django.utils.decorators import method_decorator
 from django.http import Http404
 
 # Django REST framework
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
@@ -17,10 +19,22 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # Serializers
-from market.serializers.showcases import ShowcaseSerializer, ShowcaseSectionModelSerializer
+from market.serializers.showcases import (
+    ShowcaseProductChangeModelSerializer, ShowcaseSerializer, ShowcaseSectionModelSerializer
+)
 
 # Model
-from market.models import ShowcaseProduct, ShowcaseSection
+from market.models import ShowcaseProduct, ShowcaseProductDeletion, ShowcaseSection
+
+# Changes
+from business_network_API.views import CHANGES_PARAMETERS, ChangesAPIView, get_changes_after
+
+# Popularity
+from market.popularity import record_views
+
+# Utils
+import heapq
+import itertools
 
 
 @method_decorator( name = 'get', decorator = swagger_auto_schema( 
@@ -29,7 +43,15 @@ from market.models import ShowcaseProduct, ShowcaseSection
         Endpoint to list all the showcase of the main market of the platform.\n
         Lists all the data feed belonging to the market.
         The data contains products divided by categories.\n 
-        (The products are inside the list `section_elements` of the category)""",
+        (The products are inside the list `section_elements` of the category)\n
+        Only the sections with products are listed, use the param `section` 
+        to get a section and the sections inside it.\n
+        The products of each section are sorted from the most to the least trending.""",
+    manual_parameters = [
+        openapi.Parameter( name = "section", in_ = openapi.IN_QUERY, type = openapi.TYPE_INTEGER,
+            description = "Id of the section to list with its subsections", required = False
+        ),
+    ],
     responses = { 404: openapi.Response("Not Found") }, security = []
 ))
 class ShowcaseFeedView(ListAPIView):
@@ -38,9 +60,31 @@ class ShowcaseFeedView(ListAPIView):
         The data contains products divided by categories.
     """
 
-    queryset = ShowcaseSection.objects.all()
+    queryset = ShowcaseSection.objects.filter( 
+        products_count__gt = 0 
+    ).prefetch_related(Prefetch(
+        'showcaseproduct_set',
+        queryset = ShowcaseProduct.objects.select_related('principal_image').prefetch_related(
+            'principal_image__variants'
+        ).order_by(
+            F('trending_score__score').desc(nulls_last = True), 'id'
+        )
+    )).order_by('id')
     serializer_class = ShowcaseSectionModelSerializer
 
+    def get_queryset(self):
+        """Filter the sections by the section param, including its subsections."""
+        queryset = super().get_queryset()
+        section = self.request.query_params.get('section')
+
+        if section:
+            if not section.isdigit():
+                raise ValidationError("The section must be the id of a section")
+
+            queryset = queryset.filter( Q(id = section) | Q(parent_id = section) )
+
+        return queryset
+
     def list(self, request, *args, **kwargs):
 
         showcase_section_queryset = self.filter_queryset(self.get_queryset())
@@ -48,11 +92,52 @@ class ShowcaseFeedView(ListAPIView):
         page = self.paginate_queryset(showcase_section_queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
+            self.record_products_views(serializer.data)
             return self.get_paginated_response(serializer.data)
 
         serializer = self.get_serializer(showcase_section_queryset, many=True)
 
         data = serializer.data
         response_status = status.HTTP_200_OK
+        self.record_products_views(data)
+
+        return Response(data, response_status)
+
+    def record_products_views(self, sections):
+        """Count a view of every product displayed in the sections."""
+        record_views(ShowcaseProduct, [
+            product['id'] for section in sections for product in section['section_elements']
+        ])
+
+
+@method_decorator( name = 'get', decorator = swagger_auto_schema( 
+    operation_id = "List the showcase changes", tags = ["Market"],
+    operation_description = """
+        Endpoint to sync the market showcase incrementally. Returns the ids of the showcase products 
+        published, updated and removed since the token `since`, with the compact data of the 
+        published and updated ones in `results`.\n
+        Request again with the token `next` while `has_more` is true.""",
+    manual_parameters = CHANGES_PARAMETERS,
+    responses = { 400: openapi.Response("Bad request") }, security = []
+))
+class ShowcaseChangesView(ChangesAPIView):
+    """Changes feed of the showcase products, the deletes come from their deletion records."""
+
+    queryset = ShowcaseProduct.objects.all()
+    serializer_class = ShowcaseProductChangeModelSerializer
+    created_field = 'created_at'
+
+    def is_deleted(self, instance):
+        return isinstance(instance, ShowcaseProductDeletion)
+
+    def get_changes(self, position, cutoff, limit):
+        """Merge the showcase products and the deletions changed after the position."""
+        showcase_products = get_changes_after(self.get_queryset(), position, cutoff, limit)
+        deletions = get_changes_after(ShowcaseProductDeletion.objects.all(), position, cutoff, limit)
+
+        changes = heapq.merge(
+            showcase_products, deletions,
+            key = lambda instance: (instance.changed_at, instance.id)
+        )
 
-        return Response(data, response_status)
\ No newline at end of file
+        return list(itertools.islice(changes, limit))
@@ -0,0 +1,343 @@
+# multimedia/backends.py
+
+# Django
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.encoding import filepath_to_uri
+
+# Utils
+import hashlib
+import io
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import uuid
+
+
+MEDIA_URL_SALT = 'multimedia.media'
+
+MEDIA_UPLOAD_SALT = 'multimedia.media.uploads'
+
+
+def get_media_signature(bucket_name, name, expires):
+    """Return the signature of the url of the object of the bucket until the timestamp expires."""
+    return signing.Signer(salt = MEDIA_URL_SALT).signature('{}/{}:{}'.format(bucket_name, name, expires))
+
+
+def verify_media_signature(bucket_name, name, expires, signature):
+    """Return if the signature of the url of the object is valid and not expired."""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+
+    return expires >= time.time() and constant_time_compare(
+        signature or '', get_media_signature(bucket_name, name, expires)
+    )
+
+
+class PartsStream:
+    """Stream of the content of the objects given, one after the other, opened as they are read."""
+
+    def __init__(self, storage, names):
+        self.streams = (storage.open_stream(name) for name in names)
+        self.stream = None
+
+    def read(self, size = -1):
+        while True:
+            if self.stream is None:
+                self.stream = next(self.streams, None)
+                if self.stream is None:
+                    return b''
+
+            data = self.stream.read(size)
+            if data:
+                return data
+
+            self.stream.close()
+            self.stream = None
+
+
+class SignedMediaMixin:
+    """
+    Operations of the offline storages with the same semantics as the S3 ones:
+    the objects are named with the same keys inside a folder per bucket, the urls
+    are signed and expire, and the presigned POST uploads to multimedia.views.media.
+    The parts of the multipart uploads are objects inside UPLOADS_PREFIX until completed.
+    The objects of the public storages are also served unsigned, with
+    MULTIMEDIA_PUBLIC_CACHE_CONTROL. The subclasses store the objects and define bucket_name.
+    """
+
+    bucket_name = None
+
+    public = False
+    public_media_url = None
+
+    UPLOADS_PREFIX = '.uploads'
+
+    # Same expiration of the signed urls as S3Boto3Storage
+    querystring_expire = getattr(settings, 'AWS_QUERYSTRING_EXPIRE', 3600)
+
+    def url(self, name):
+        name = self._clean_name(name)
+        expires = int(time.time()) + self.querystring_expire
+
+        return '{media_url}{bucket_name}/{name}?expires={expires}&signature={signature}'.format(
+            media_url = settings.MULTIMEDIA_MEDIA_URL,
+            bucket_name = self.bucket_name,
+            name = filepath_to_uri(name),
+            expires = expires,
+            signature = get_media_signature(self.bucket_name, name, expires)
+        )
+
+    def public_url(self, name):
+        """Return the unsigned url of the object, it never expires."""
+        media_url = self.public_media_url or '{}{}/'.format(settings.MULTIMEDIA_MEDIA_URL, self.bucket_name)
+
+        return '{}{}'.format(media_url, filepath_to_uri(self._clean_name(name)))
+
+    def update_cache_control(self, name):
+        # The objects are served with the Cache-Control of their storage, nothing is stored
+        return False
+
+    def _clean_name(self, name):
+        return name.replace('\\', '/').lstrip('/')
+
+    def get_available_name(self, name, max_length = None):
+        # The objects are overwritten, as in the buckets
+        return self._clean_name(name)
+
+    def get_content_type(self, name):
+        return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    def get_object_metadata(self, name):
+        """Return the size and the content type of the object, None if it doesn't exist."""
+        if not self.exists(name):
+            return None
+
+        return {
+            'size': self.size(name),
+            'content_type': self.get_content_type(name),
+        }
+
+    def delete_objects(self, names):
+        """Delete the objects with the names given. Return the names of the ones that couldn't be deleted."""
+        failed_names = []
+
+        for name in names:
+            try:
+                self.delete(name)
+            except OSError:
+                failed_names.append(name)
+
+        return failed_names
+
+    def copy_object(self, source_name, name):
+        """Copy the object with the source name to the name given, with its content type."""
+        stream = self.open_stream(source_name)
+        try:
+            self.save_stream(name, stream, content_type = self.get_content_type(source_name))
+        finally:
+            stream.close()
+
+    def get_presigned_upload(self, name, content_type, max_size, expires_in):
+        """
+        Return the url and the form fields of the POST that uploads the object
+        with the name to the storage, with the same conditions as in S3.
+        """
+
+        policy = signing.dumps({
+            'bucket': self.bucket_name,
+            'key': self._clean_name(name),
+            'content_type': content_type,
+            'max_size': max_size,
+            'expires': int(time.time()) + expires_in,
+        }, salt = MEDIA_UPLOAD_SALT)
+
+        return {
+            'url': '{}{}/'.format(settings.MULTIMEDIA_MEDIA_URL, self.bucket_name),
+            'fields': {
+                'key': self._clean_name(name),
+                'Content-Type': content_type,
+                'policy': policy,
+            },
+        }
+
+
+    def get_part_name(self, upload_id, number):
+        return '{}/{}/{}'.format(self.UPLOADS_PREFIX, upload_id, number)
+
+    def create_multipart_upload(self, name, content_type):
+        """Start a multipart upload of the object with the name. Return the id of the upload."""
+        return uuid.uuid4().hex
+
+    def upload_part(self, name, upload_id, number, body):
+        """Store the part with the number given (From 1) of the multipart upload. Return its ETag, as S3."""
+        part_hash = hashlib.md5()
+
+        for chunk in iter(lambda: body.read(settings.MULTIMEDIA_UPLOAD_PART_SIZE), b''):
+            part_hash.update(chunk)
+
+        body.seek(0)
+        self.save_stream(self.get_part_name(upload_id, number), body)
+
+        return '"{}"'.format(part_hash.hexdigest())
+
+    def complete_multipart_upload(self, name, upload_id, parts):
+        """Join the parts uploaded, (number, ETag) in order, into the object with the name."""
+        part_names = [self.get_part_name(upload_id, number) for number, _ in parts]
+
+        for part_name in part_names:
+            if not self.exists(part_name):
+                raise FileNotFoundError('The part {} was not uploaded'.format(part_name))
+
+        self.save_stream(name, PartsStream(self, part_names), content_type = self.get_content_type(name))
+        self.abort_multipart_upload(name, upload_id)
+
+    def abort_multipart_upload(self, name, upload_id):
+        """Delete the parts of the multipart upload."""
+        prefix = '{}/{}'.format(self.UPLOADS_PREFIX, upload_id)
+
+        try:
+            _, part_names = self.listdir(prefix)
+        except FileNotFoundError:
+            return
+
+        self.delete_objects(['{}/{}'.format(prefix, part_name) for part_name in part_names])
+
+    def read_range(self, name, start, length):
+        """Return up to length bytes of the object from the start given."""
+        stream = self.open_stream(name)
+        try:
+            stream.seek(start)
+            return stream.read(length)
+        except ValueError:
+            # The memory maps don't seek after their end
+            return b''
+        finally:
+            stream.close()
+
+
+class LocalMultimediaStorage(SignedMediaMixin, FileSystemStorage):
+    """
+    Storage of the multimedia in a local directory per bucket, inside
+    MULTIMEDIA_LOCAL_STORAGE_ROOT. The objects are read memory mapped.
+    The content type is the one of the extension, as S3Boto3Storage guesses it.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('location', os.path.join(settings.MULTIMEDIA_LOCAL_STORAGE_ROOT, self.bucket_name))
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        # The existing objects are replaced, FileSystemStorage never overwrites them
+        if self.exists(name):
+            self.delete(name)
+
+        return super()._save(name, content)
+
+    def save_stream(self, name, stream, content_type = None):
+        """Store the stream given with the name, reading it once and in order. Return the name stored."""
+        name = self._clean_name(name)
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'wb') as destination:
+            for chunk in iter(lambda: stream.read(settings.MULTIMEDIA_UPLOAD_PART_SIZE), b''):
+                destination.write(chunk)
+
+        return name
+
+    def open_stream(self, name):
+        """Return a memory map of the object, it's read from the page cache without copies."""
+        with open(self.path(name), 'rb') as source:
+            if not os.fstat(source.fileno()).st_size:
+                return io.BytesIO()
+
+            return mmap.mmap(source.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+class MemoryMultimediaStorage(SignedMediaMixin, Storage):
+    """
+    Storage of the multimedia in the memory of the process, shared by all
+    the instances of the same bucket. For the tests and the benchmarks.
+    """
+
+    buckets = {}
+    lock = threading.Lock()
+
+    @property
+    def objects(self):
+        with self.lock:
+            return self.buckets.setdefault(self.bucket_name, {})
+
+    def _save(self, name, content):
+        return self.save_stream(name, content, getattr(content, 'content_type', None))
+
+    def _open(self, name, mode = 'rb'):
+        return ContentFile(self.objects[self._clean_name(name)]['content'], name = name)
+
+    def save_stream(self, name, stream, content_type = None):
+        """Store the stream given with the name, reading it once and in order. Return the name stored."""
+        name = self._clean_name(name)
+        content = b''.join(iter(lambda: stream.read(settings.MULTIMEDIA_UPLOAD_PART_SIZE), b''))
+
+        self.objects[name] = {
+            'content': content,
+            'content_type': content_type or self.get_content_type(name),
+            'modified_time': timezone.now(),
+        }
+
+        return name
+
+    def open_stream(self, name):
+        return io.BytesIO(self.objects[self._clean_name(name)]['content'])
+
+    def get_content_type(self, name):
+        stored_object = self.objects.get(self._clean_name(name))
+
+        if stored_object is not None:
+            return stored_object['content_type']
+
+        return super().get_content_type(name)
+
+    def delete(self, name):
+        self.objects.pop(self._clean_name(name), None)
+
+    def exists(self, name):
+        return self._clean_name(name) in self.objects
+
+    def size(self, name):
+        return len(self.objects[self._clean_name(name)]['content'])
+
+    def listdir(self, path):
+        path = self._clean_name(path).rstrip('/')
+        prefix = path + '/' if path else ''
+        directories, files = set(), []
+
+        for name in list(self.objects):
+            if not name.startswith(prefix):
+                continue
+
+            directory, separator, filename = name[len(prefix):].partition('/')
+            if separator:
+                directories.add(directory)
+            else:
+                files.append(directory)
+
+        return sorted(directories), files
+
+    def get_modified_time(self, name):
+        return self.objects[self._clean_name(name)]['modified_time']
+
+    def get_created_time(self, name):
+        return self.get_modified_time(name)
+
+    def get_accessed_time(self, name):
+        return self.get_modified_time(name)
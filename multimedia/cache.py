@@ -0,0 +1,62 @@
+# multimedia/cache.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Storages
+from multimedia.storages import ImageStorage
+
+# Utils
+import hashlib
+
+
+SIGNED_IMAGE_URL_KEY = 'multimedia:signed_image_url:{}'
+
+
+def get_signed_image_urls(relative_paths):
+    """
+    Return the signed url of every image relative path given (path -> url).
+    The urls are cached for less time than they are valid, so the data
+    that contains the images can be cached longer than the signatures.
+    If the image storage is public the urls are unsigned and never change.
+    """
+
+    image_storage = ImageStorage()
+
+    if image_storage.public:
+        return {
+            relative_path: image_storage.public_url(relative_path)
+            for relative_path in set(relative_paths) if relative_path
+        }
+
+    keys = {
+        relative_path: SIGNED_IMAGE_URL_KEY.format(hashlib.sha1(relative_path.encode()).hexdigest())
+        for relative_path in set(relative_paths) if relative_path
+    }
+    cached_urls = cache.get_many(keys.values())
+
+    missing_urls = {}
+    if len(cached_urls) < len(keys):
+        for relative_path, key in keys.items():
+            if key not in cached_urls:
+                missing_urls[key] = image_storage.url(relative_path)
+
+        cache.set_many(missing_urls, settings.SIGNED_URL_CACHE_TIMEOUT)
+        cached_urls.update(missing_urls)
+
+    return {relative_path: cached_urls[key] for relative_path, key in keys.items()}
+
+
+def sign_images_data(images_data):
+    """Replace the relative paths of the serialized images given (path and webp_path)
+    by their signed urls, all signed at once."""
+    fields = ('path', 'webp_path')
+    signed_urls = get_signed_image_urls([
+        image[field] for image in images_data for field in fields if image.get(field)
+    ])
+
+    for image in images_data:
+        for field in fields:
+            if field in image:
+                image[field] = signed_urls.get(image[field])
@@ -0,0 +1,194 @@
+# multimedia/deduplication.py
+
+# Django
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Value, When
+from django.utils import timezone
+
+# Models
+from multimedia.models import Image
+
+# Ingestion
+from multimedia.ingestion import get_stream_content_hash
+
+# References
+from multimedia.references import get_references, get_stored_paths
+
+# Signals
+from multimedia.signals import post_image_duplicates_collapse
+
+# Utils
+from collections import defaultdict
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_owner_scope(relative_path):
+    """Return the folder of the account in a path of the buckets (<folder>/<key>/<name>)."""
+    folder, separator, _ = (relative_path or '').partition('/')
+
+    return folder if separator else ''
+
+
+def delete_repeated_references(related_model, field_name, duplicates):
+    """
+    Delete the rows of the model that would repeat one of its unique together
+    once their foreign key points to the object kept (Ej: a product that has
+    as secondary images both the duplicate and the image kept).
+    """
+
+    field = related_model._meta.get_field(field_name)
+    manager = related_model._base_manager
+    ids = set(duplicates) | set(duplicates.values())
+
+    for unique_fields in related_model._meta.unique_together:
+        if field_name not in unique_fields:
+            continue
+
+        other_columns = [
+            related_model._meta.get_field(name).attname for name in unique_fields if name != field_name
+        ]
+        rows = manager.filter(**{field.attname + '__in': ids}).order_by('id').values(
+            'id', field.attname, *other_columns
+        )
+
+        seen_keys = set()
+        repeated_ids = []
+
+        # The rows that already point to the object kept are kept
+        for row in sorted(rows, key = lambda row: row[field.attname] in duplicates):
+            object_id = row[field.attname]
+            key = tuple(row[column] for column in other_columns) + (duplicates.get(object_id, object_id),)
+
+            if key in seen_keys:
+                repeated_ids.append(row['id'])
+            else:
+                seen_keys.add(key)
+
+        if repeated_ids:
+            manager.filter( id__in = repeated_ids ).delete()
+
+
+def rewrite_references(model, duplicates):
+    """
+    Point every foreign key to the duplicates given (duplicate id -> kept id)
+    to the objects kept, with one UPDATE ... CASE per foreign key.
+    The models with changed_at get it updated so the changes feeds send them again.
+    """
+
+    now = timezone.now()
+
+    for related_model, field_name in get_references(model):
+        delete_repeated_references(related_model, field_name, duplicates)
+
+        column = related_model._meta.get_field(field_name).attname
+        values = {
+            column: Case(
+                *[When(**{column: duplicate_id}, then = Value(kept_id)) for duplicate_id, kept_id in duplicates.items()],
+                output_field = BigIntegerField()
+            )
+        }
+
+        if any(field.name == 'changed_at' for field in related_model._meta.concrete_fields):
+            values['changed_at'] = now
+
+        related_model._base_manager.filter(**{column + '__in': duplicates}).update(**values)
+
+
+def get_contents(model, storage):
+    """
+    Return the content (owner scope, content hash) of every object uploaded (id -> content).
+    The objects uploaded without hash are hashed reading them from the bucket and the ones
+    without owner scope take it from their path. The objects that can't be read are left out.
+    """
+
+    contents = {}
+    objects = model.objects.filter( uploaded = True ).exclude(
+        relative_path__isnull = True
+    ).exclude( relative_path = '' ).values_list('id', 'relative_path', 'owner_scope', 'content_hash')
+
+    for object_id, relative_path, owner_scope, content_hash in objects.iterator():
+        owner_scope = owner_scope or get_owner_scope(relative_path)
+
+        if not content_hash:
+            try:
+                stream = storage.open_stream(relative_path)
+                try:
+                    content_hash = get_stream_content_hash(stream)
+                finally:
+                    stream.close()
+            except Exception:
+                logger.exception('The %s %s could not be read from the bucket', model.__name__, object_id)
+
+        if owner_scope and content_hash:
+            contents[object_id] = (owner_scope, content_hash)
+
+    return contents
+
+
+def collapse_duplicates(model, storage, batch_size = 100, dry_run = False):
+    """
+    Collapse the objects of the model with the same content uploaded by the same account
+    into the oldest one. The foreign keys to the duplicates are rewritten in bulk, then the
+    duplicates are deleted with their objects in the bucket, and the objects kept get their
+    owner scope and content hash. Every batch of contents is written in its own transaction.
+    With dry_run nothing is written, the objects are only read and hashed.
+    Return the amount of duplicates and of contents written (Or to write).
+    """
+
+    contents = get_contents(model, storage)
+
+    ids_by_content = defaultdict(list)
+    for object_id, content in contents.items():
+        ids_by_content[content].append(object_id)
+
+    stored_contents = {
+        object_id: (owner_scope, content_hash)
+        for object_id, owner_scope, content_hash in model.objects.filter(
+            id__in = contents
+        ).values_list('id', 'owner_scope', 'content_hash')
+    }
+
+    # Only the contents with duplicates or whose hash is not stored yet are written
+    groups = [
+        sorted(ids) for content, ids in ids_by_content.items()
+        if len(ids) > 1 or stored_contents[ids[0]] != content
+    ]
+    duplicates_count = sum(len(ids) - 1 for ids in groups)
+
+    if dry_run:
+        return duplicates_count, len(groups)
+
+    for start in range(0, len(groups), batch_size):
+        batch = groups[start:start + batch_size]
+        duplicates = {duplicate_id: ids[0] for ids in batch for duplicate_id in ids[1:]}
+
+        with transaction.atomic():
+            if duplicates:
+                paths = [path for paths in get_stored_paths(model, duplicates).values() for path in paths]
+
+                rewrite_references(model, duplicates)
+                model.objects.filter( id__in = duplicates ).delete()
+
+                transaction.on_commit(lambda paths = paths: storage.delete_objects(paths))
+
+            # The duplicates are deleted first, they have the same owner scope and hash
+            kept_objects = [
+                model(id = ids[0], owner_scope = contents[ids[0]][0], content_hash = contents[ids[0]][1])
+                for ids in batch
+            ]
+            model.objects.bulk_update(kept_objects, ['owner_scope', 'content_hash'])
+
+            if model is Image and duplicates:
+                kept_ids = set(duplicates.values())
+                transaction.on_commit(lambda kept_ids = kept_ids: send_collapse_signals(kept_ids))
+
+    return duplicates_count, len(groups)
+
+
+def send_collapse_signals(image_ids):
+    """Tell the caches of the data that shows the images that they now point to the images kept."""
+    for image in Image.objects.filter( id__in = image_ids ):
+        post_image_duplicates_collapse.send(sender = Image, instance = image)
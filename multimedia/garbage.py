@@ -0,0 +1,201 @@
+# multimedia/garbage.py
+
+# Django
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# Models
+from multimedia.models import Image, ImageVariant, MediaCollectionCheckpoint, VideoUploadSession
+
+# References
+from multimedia.references import get_references, get_stored_paths, get_unreferenced
+
+# Utils
+from datetime import timedelta
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_orphans(model, grace_period):
+    """Return the queryset of the objects of the model without references created before the grace period."""
+    cutoff = timezone.now() - timedelta(seconds = grace_period)
+
+    return get_unreferenced(model).filter( created_date__lt = cutoff )
+
+
+def claim_objects(model, objects):
+    """
+    Return the objects of the model given that still exist, with the orphans among them
+    moved back to the grace period (Their created_date is now). The uploads that return an
+    object already uploaded claim it, so it isn't collected before it gets referenced.
+    The UPDATE waits for a collection that locked them, and then they don't exist anymore.
+    """
+
+    ids = [instance.id for instance in objects]
+
+    if not ids:
+        return []
+
+    get_unreferenced(model).filter( id__in = ids ).update( created_date = timezone.now() )
+    kept_ids = set(model.objects.filter( id__in = ids ).values_list('id', flat = True))
+
+    return [instance for instance in objects if instance.id in kept_ids]
+
+
+def get_checkpoint(name):
+    checkpoint = MediaCollectionCheckpoint.objects.filter( model = name ).first()
+
+    return checkpoint.last_id if checkpoint else 0
+
+
+def save_checkpoint(name, last_id):
+    MediaCollectionCheckpoint.objects.update_or_create(
+        model = name, defaults = {'last_id': last_id}
+    )
+
+
+def delete_orphans_batch(model, storage, orphans, last_id, batch_size, dry_run = False):
+    """
+    Delete the next batch of orphans after the id given, in a transaction that
+    locks them (SELECT ... FOR UPDATE), so the rows that reference them meanwhile
+    wait and fail instead of pointing to a deleted object. The references committed
+    before the lock are seen by a new NOT EXISTS in the DELETE, the orphans that got
+    one are kept. The rows are deleted without cascading (Only the variants of the
+    images go with them) and their objects are deleted from the bucket after the commit.
+    Return the ids of the batch and the orphans, objects and bytes deleted
+    (Or to delete with dry_run).
+    """
+
+    with transaction.atomic():
+        if not dry_run:
+            orphans = orphans.select_for_update()
+
+        sizes = dict(orphans.filter( id__gt = last_id ).order_by('id').values_list('id', 'size')[:batch_size])
+
+        if not sizes:
+            return [], 0, 0, 0
+
+        ids = sorted(sizes)
+        paths = get_stored_paths(model, ids)
+
+        if dry_run:
+            deleted_ids = ids
+        else:
+            deleted_ids = delete_unreferenced_rows(model, ids)
+
+            deleted_paths = [path for object_id in deleted_ids for path in paths.get(object_id, [])]
+            transaction.on_commit(lambda: delete_stored_objects(model, storage, deleted_paths))
+
+    return (
+        ids,
+        len(deleted_ids),
+        sum(len(paths.get(object_id, [])) for object_id in deleted_ids),
+        sum(int(sizes[object_id] or 0) for object_id in deleted_ids)
+    )
+
+
+def delete_unreferenced_rows(model, ids):
+    """
+    Delete the rows of the model with the ids given that are still unreferenced,
+    checked again by the DELETE statements. They are raw deletes, so the rows that
+    reference them are never cascaded. Return the ids deleted.
+    """
+
+    unreferenced = get_unreferenced(model).filter( id__in = ids )
+
+    if model is Image:
+        variants = ImageVariant.objects.filter( image_id__in = unreferenced.values('id') )
+        variants._raw_delete(variants.db)
+
+    unreferenced._raw_delete(unreferenced.db)
+
+    kept_ids = set(model.objects.filter( id__in = ids ).values_list('id', flat = True))
+
+    return [object_id for object_id in ids if object_id not in kept_ids]
+
+
+def delete_stored_objects(model, storage, paths):
+    """Delete the objects of the rows deleted from the bucket, the ones that fail are left there."""
+    failed_paths = storage.delete_objects(paths)
+
+    if failed_paths:
+        logger.warning('%s objects of the %s could not be deleted: %s',
+            len(failed_paths), model.__name__, ', '.join(failed_paths))
+
+
+def collect_orphans(name, model, storage, grace_period, batch_size = 1000, dry_run = False, restart = False):
+    """
+    Delete the objects of the model that no row references and were created before
+    the grace period (The abandoned uploads and the ones detached), with their objects
+    in the bucket. It goes in batches by id and checkpoints the last id of every batch,
+    so an interrupted run resumes where it stopped. A complete run resets the checkpoint.
+    With dry_run nothing is deleted nor checkpointed.
+    Return the amount of orphans, objects in the bucket and bytes deleted (Or to delete).
+    The models that nothing can reference are never collected, all their objects would be orphans.
+    """
+
+    if not get_references(model):
+        logger.warning('Nothing references the %s, their orphans are not collected', model.__name__)
+        return 0, 0, 0
+
+    orphans = get_orphans(model, grace_period)
+
+    last_id = 0 if restart or dry_run else get_checkpoint(name)
+    totals = [0, 0, 0]
+
+    while True:
+        ids, *counts = delete_orphans_batch(model, storage, orphans, last_id, batch_size, dry_run)
+
+        if not ids:
+            break
+
+        totals = [total + count for total, count in zip(totals, counts)]
+        last_id = ids[-1]
+
+        if not dry_run:
+            save_checkpoint(name, last_id)
+
+    # The objects that become orphans later can have any id, the next run starts over
+    if not dry_run:
+        save_checkpoint(name, 0)
+
+    return tuple(totals)
+
+
+def abort_expired_uploads(storage, expiration, dry_run = False):
+    """
+    Delete the video upload sessions older than the expiration given, aborting
+    in the bucket the multipart uploads of the ones not finalized, so their parts
+    stop taking space. With dry_run nothing is aborted nor deleted.
+    Return the amount of multipart uploads aborted (Or to abort).
+    """
+
+    cutoff = timezone.now() - timedelta(seconds = expiration)
+    sessions = VideoUploadSession.objects.filter( created_date__lt = cutoff )
+    uploading_sessions = sessions.filter( state = VideoUploadSession.States.UPLOADING )
+
+    if dry_run:
+        return uploading_sessions.count()
+
+    aborted_ids = []
+
+    for session_id, relative_path, upload_id in uploading_sessions.values_list(
+        'id', 'relative_path', 'upload_id'
+    ).iterator():
+        try:
+            storage.abort_multipart_upload(relative_path, upload_id)
+        except Exception:
+            logger.exception('The upload of the video session %s could not be aborted', session_id)
+            continue
+
+        aborted_ids.append(session_id)
+
+    # The sessions that couldn't be aborted are kept for the next run
+    sessions.exclude(
+        Q(state = VideoUploadSession.States.UPLOADING) & ~Q(id__in = aborted_ids)
+    ).delete()
+
+    return len(aborted_ids)
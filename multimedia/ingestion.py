@@ -0,0 +1,297 @@
+# multimedia/ingestion.py
+
+# Pillow
+from PIL import Image as PillowImage, ImageFile
+
+# Utils
+import hashlib
+import struct
+
+
+def probe_image_stream(stream, chunk_size = 1024, max_header_size = 1024 * 1024):
+    """
+    Return the (format, width, height) of the image in the stream, reading
+    it only until its header is parsed (Up to max_header_size bytes).
+    Raise a ValueError if the stream is not an image.
+    """
+
+    parser = ImageFile.Parser()
+    read_size = 0
+
+    try:
+        while parser.image is None and read_size < max_header_size:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+
+            read_size += len(data)
+            parser.feed(data)
+    except (OSError, SyntaxError, PillowImage.DecompressionBombError):
+        pass
+
+    if parser.image is None:
+        raise ValueError('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+
+    return parser.image.format, parser.image.width, parser.image.height
+
+
+def probe_uploaded_image(image_object, max_header_size = 1024 * 1024):
+    """
+    Return the (format, width, height, content hash) of the uploaded image reading it
+    once in chunks: every chunk is hashed (SHA-256) and the first ones are fed to the
+    parser of the header too. The hash is needed before the upload, the content
+    already stored is never uploaded again. Raise a ValueError if the file is not an image.
+    """
+
+    parser = ImageFile.Parser()
+    content_hash = hashlib.sha256()
+    header_size = 0
+    is_invalid = False
+
+    for chunk in image_object.chunks():
+        content_hash.update(chunk)
+
+        if parser.image is None and not is_invalid and header_size < max_header_size:
+            header_size += len(chunk)
+
+            try:
+                parser.feed(chunk)
+            except (OSError, SyntaxError, PillowImage.DecompressionBombError):
+                is_invalid = True
+
+    image_object.seek(0)
+
+    if parser.image is None:
+        raise ValueError('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+
+    return parser.image.format, parser.image.width, parser.image.height, content_hash.hexdigest()
+
+
+def get_image_content_type(image_format):
+    """Return the MIME type of the Pillow image format given."""
+    return PillowImage.MIME.get(image_format)
+
+
+def get_content_hash(file_object):
+    """
+    Return the SHA-256 of the content of the uploaded file, reading it in chunks.
+    The uploads are already local (In memory or in a temporary file), so it's
+    hashed before the upload and the content already stored is never uploaded again.
+    """
+
+    content_hash = hashlib.sha256()
+
+    for chunk in file_object.chunks():
+        content_hash.update(chunk)
+
+    file_object.seek(0)
+
+    return content_hash.hexdigest()
+
+
+def get_stream_content_hash(stream, chunk_size = 1024 * 1024):
+    """Return the SHA-256 of the content of the stream, reading it once in chunks."""
+    content_hash = hashlib.sha256()
+
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+
+# Elements of the WebM (Matroska) files read to find the duration
+EBML_HEADER_ID = 0x1A45DFA3
+EBML_SEGMENT_ID = 0x18538067
+EBML_INFO_ID = 0x1549A966
+EBML_CLUSTER_ID = 0x1F43B675
+EBML_TIMECODE_SCALE_ID = 0x2AD7B1
+EBML_DURATION_ID = 0x4489
+
+
+def read_mp4_box(read_range, position):
+    """Return the (type, start of the content, end) of the MP4 box in the position, None after the last one."""
+    header = read_range(position, 16)
+    if len(header) < 8:
+        return None
+
+    size, box_type = struct.unpack('>I4s', header[:8])
+    start = position + 8
+
+    if size == 1:
+        if len(header) < 16:
+            return None
+        size = struct.unpack('>Q', header[8:16])[0]
+        start += 8
+
+    # The size 0 is a box until the end of the file, only the mdat can be
+    end = position + size if size else None
+
+    if end is not None and end < start:
+        raise ValueError('The MP4 box {!r} is corrupted.'.format(box_type))
+
+    return box_type, start, end
+
+
+def find_mp4_box(read_range, box_type, start, end = None, max_boxes = 1024):
+    """Return the (start of the content, end) of the first box of the type between start and end."""
+    position = start
+
+    for _ in range(max_boxes):
+        if end is not None and position >= end:
+            break
+
+        box = read_mp4_box(read_range, position)
+        if box is None:
+            break
+
+        found_type, content_start, box_end = box
+        if found_type == box_type:
+            return content_start, box_end
+
+        if box_end is None:
+            break
+
+        position = box_end
+
+    return None
+
+
+def probe_mp4_duration(read_range):
+    """Return the duration in seconds of the MP4 from its movie header (moov > mvhd)."""
+    moov = find_mp4_box(read_range, b'moov', 0)
+    mvhd = moov and find_mp4_box(read_range, b'mvhd', *moov)
+
+    if not mvhd:
+        raise ValueError("The MP4 doesn't have a movie header.")
+
+    header = read_range(mvhd[0], 32)
+
+    if header[:1] == b'\x01' and len(header) >= 32:
+        timescale, duration = struct.unpack('>IQ', header[20:32])
+    elif header[:1] == b'\x00' and len(header) >= 20:
+        timescale, duration = struct.unpack('>II', header[12:20])
+    else:
+        raise ValueError('The MP4 movie header is corrupted.')
+
+    if not timescale:
+        raise ValueError('The MP4 movie header is corrupted.')
+
+    return duration / timescale
+
+
+def read_ebml_vint(data, position, keep_marker = False):
+    """Return the (value, length) of the variable size integer of the EBML in the position.
+    The ids keep their marker bit, the sizes with all the bits in 1 are unknown (None)."""
+    if position >= len(data) or not data[position]:
+        raise ValueError('The WebM element is corrupted.')
+
+    first_byte = data[position]
+    length = 8 - first_byte.bit_length() + 1
+
+    if position + length > len(data):
+        raise ValueError('The WebM element is corrupted.')
+
+    value = first_byte if keep_marker else first_byte & (0xFF >> length)
+    for byte in data[position + 1:position + length]:
+        value = (value << 8) | byte
+
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = None
+
+    return value, length
+
+
+def read_ebml_element(read_range, position):
+    """Return the (id, start of the content, size) of the EBML element in the position, None at the end."""
+    header = read_range(position, 12)
+    if not header:
+        return None
+
+    element_id, id_length = read_ebml_vint(header, 0, keep_marker = True)
+    size, size_length = read_ebml_vint(header, id_length)
+
+    return element_id, position + id_length + size_length, size
+
+
+def probe_webm_duration(read_range, max_elements = 1024):
+    """
+    Return the duration in seconds of the WebM from its segment information
+    (Duration * TimecodeScale), it goes before the clusters of the frames.
+    """
+
+    element = read_ebml_element(read_range, 0)
+    if element is None or element[0] != EBML_HEADER_ID or element[2] is None:
+        raise ValueError("The file is not a WebM.")
+
+    segment = read_ebml_element(read_range, element[1] + element[2])
+    if segment is None or segment[0] != EBML_SEGMENT_ID:
+        raise ValueError("The WebM doesn't have a segment.")
+
+    position = segment[1]
+
+    for _ in range(max_elements):
+        element = read_ebml_element(read_range, position)
+        if element is None or element[0] == EBML_CLUSTER_ID or element[2] is None:
+            break
+
+        element_id, start, size = element
+        if element_id == EBML_INFO_ID:
+            if size > 1024 * 1024:
+                raise ValueError('The WebM segment information is corrupted.')
+
+            return read_webm_info_duration(read_range(start, size))
+
+        position = start + size
+
+    raise ValueError("The WebM doesn't have the duration in its segment information.")
+
+
+def read_webm_info_duration(info):
+    """Return the duration in seconds of the segment information of a WebM."""
+    timecode_scale, duration = 1000000, None
+    position = 0
+
+    while position < len(info):
+        element_id, id_length = read_ebml_vint(info, position, keep_marker = True)
+        size, size_length = read_ebml_vint(info, position + id_length)
+        start = position + id_length + size_length
+
+        if size is None:
+            break
+
+        content = info[start:start + size]
+
+        if element_id == EBML_TIMECODE_SCALE_ID and content:
+            timecode_scale = int.from_bytes(content, 'big')
+        elif element_id == EBML_DURATION_ID and len(content) in (4, 8):
+            duration = struct.unpack('>f' if len(content) == 4 else '>d', content)[0]
+
+        position = start + size
+
+    if duration is None:
+        raise ValueError("The WebM doesn't have the duration in its segment information.")
+
+    return duration * timecode_scale / 1e9
+
+
+def probe_video(read_range):
+    """
+    Return the (content type, duration in seconds) of the video, reading only the
+    headers of its container with ranged reads: read_range(start, length) returns the
+    bytes of the video from the start. Only MP4 and WebM are recognized.
+    Raise a ValueError if it's not a video or its duration can't be read.
+    """
+
+    header = read_range(0, 12)
+
+    if header[4:8] == b'ftyp':
+        content_type, duration = 'video/mp4', probe_mp4_duration(read_range)
+    elif header[:4] == EBML_HEADER_ID.to_bytes(4, 'big'):
+        content_type, duration = 'video/webm', probe_webm_duration(read_range)
+    else:
+        raise ValueError('Upload a valid video. The file you uploaded was either not a MP4 or WebM video or a corrupted video.')
+
+    if not duration > 0:
+        raise ValueError("The video doesn't have a duration.")
+
+    return content_type, duration
@@ -0,0 +1,113 @@
+# multimedia/management/commands/benchmark_bulk_upload.py
+
+# Django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Pillow
+from PIL import Image as PillowImage
+
+# Models
+from multimedia.models import Image
+
+# Serializers
+from multimedia.serializers import CreateImageSerializer, CreateImagesSerializer
+
+# Storages
+from multimedia.storages import ImageStorage
+
+# Utils
+from types import SimpleNamespace
+import io
+import os
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    """
+    Compare the upload of the photos of a product in one multi-file request
+    (Validated and uploaded concurrently, one bulk_create) against one request
+    per photo. The rows are rolled back and the objects deleted at the end.
+    With the offline storages --latency emulates the round trip to the bucket.
+    """
+
+    help = 'Benchmark the wall time of the multi-file image upload against sequential uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type = int, default = 10, help = 'Images per upload.')
+        parser.add_argument('--size', type = int, default = 1024, help = 'Width and height of the images in px.')
+        parser.add_argument('--iterations', type = int, default = 3)
+        parser.add_argument('--latency', type = float, default = 0, help = 'Seconds added to every upload to the storage.')
+        parser.add_argument('--folder', default = 'benchmark', help = 'Folder of the bucket where the images are uploaded.')
+
+    def handle(self, *args, **options):
+        request = SimpleNamespace(
+            auth = SimpleNamespace(payload = {'company_accountname': options['folder']}),
+            user = SimpleNamespace(username = options['folder'])
+        )
+        photos = [self.generate_photo(options['size']) for _ in range(options['count'])]
+
+        save_stream = ImageStorage.save_stream
+        if options['latency']:
+            def delayed_save_stream(storage, *args, **kwargs):
+                time.sleep(options['latency'])
+                return save_stream(storage, *args, **kwargs)
+
+            ImageStorage.save_stream = delayed_save_stream
+
+        results = {'sequential': [], 'bulk': []}
+        try:
+            for iteration in range(options['iterations']):
+                for name, upload in (('sequential', self.upload_sequential), ('bulk', self.upload_bulk)):
+                    # Every run uploads new contents, the images already uploaded are deduplicated
+                    files = [
+                        SimpleUploadedFile('{}.png'.format(index), photo + '{}-{}'.format(name, iteration).encode())
+                        for index, photo in enumerate(photos)
+                    ]
+                    results[name].append(self.measure(upload, files, request))
+        finally:
+            ImageStorage.save_stream = save_stream
+
+        self.stdout.write('{} images of {}x{} px'.format(options['count'], options['size'], options['size']))
+        for name, times in results.items():
+            self.stdout.write('{:>12}: {:.1f} ms'.format(name, statistics.median(times) * 1000))
+
+        self.stdout.write('Speedup: {:.1f}x'.format(
+            statistics.median(results['sequential']) / statistics.median(results['bulk'])
+        ))
+
+    def generate_photo(self, size):
+        """Return a PNG of random pixels, it doesn't compress as the photos."""
+        output = io.BytesIO()
+        PillowImage.frombytes('RGB', (size, size), os.urandom(size * size * 3)).save(output, 'PNG')
+
+        return output.getvalue()
+
+    def measure(self, upload, files, request):
+        with transaction.atomic():
+            start = time.perf_counter()
+            upload(files, request)
+            elapsed = time.perf_counter() - start
+
+            paths = list(Image.objects.filter(
+                owner_scope = request.auth.payload['company_accountname']
+            ).values_list('relative_path', flat = True))
+
+            transaction.set_rollback(True)
+
+        ImageStorage().delete_objects(paths)
+
+        return elapsed
+
+    def upload_sequential(self, files, request):
+        for upload_file in files:
+            image_serializer = CreateImageSerializer(data = {'image': upload_file}, context = {'request': request})
+            image_serializer.is_valid(raise_exception = True)
+            image_serializer.save()
+
+    def upload_bulk(self, files, request):
+        images_serializer = CreateImagesSerializer(data = {'images': files}, context = {'request': request})
+        images_serializer.is_valid(raise_exception = True)
+        images_serializer.save()
@@ -0,0 +1,143 @@
+# multimedia/management/commands/benchmark_image_ingestion.py
+
+# Django
+from django.conf import settings
+from django.core.files.images import get_image_dimensions
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management.base import BaseCommand
+from django import forms
+
+# Pillow
+from PIL import Image as PillowImage
+
+# Ingestion
+from multimedia.ingestion import get_image_content_type, probe_uploaded_image
+
+# Storages
+from multimedia.storages import ImageStorage
+
+# Utils
+import math
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import uuid
+
+
+class Command(BaseCommand):
+    """
+    Compare the single pass image ingestion (Header probe and hash of the local
+    upload in one read, then the streamed upload) against the previous one (Full validation, dimensions read twice
+    and then the upload). Every ingestion runs in its own process to measure its
+    peak RSS. Without --upload the bytes are read as the upload would and discarded.
+    """
+
+    help = 'Benchmark the throughput and peak memory of the image ingestion for 1-50 MB images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type = int, nargs = '+', default = [1, 5, 10, 25, 50], help = 'Sizes of the images in MB.')
+        parser.add_argument('--iterations', type = int, default = 3)
+        parser.add_argument('--upload', action = 'store_true', help = 'Upload the images to the image bucket and delete them after.')
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+        directory = tempfile.mkdtemp()
+
+        try:
+            self.stdout.write('{:>8} {:>12} {:>14} {:>14}'.format('Size', 'Ingestion', 'Throughput', 'Peak RSS'))
+
+            for size in options['sizes']:
+                path = os.path.join(directory, '{}.png'.format(size))
+                run_in_process(context, generate_image, path, size * 1024 * 1024)
+
+                for name, ingest in (('previous', ingest_previous), ('single pass', ingest_single_pass)):
+                    times, peaks = [], []
+
+                    for _ in range(options['iterations']):
+                        elapsed, peak = run_in_process(context, measure, ingest, path, options['upload'])
+                        times.append(elapsed)
+                        peaks.append(peak)
+
+                    mean_time = sum(times) / len(times)
+                    self.stdout.write('{:>5} MB {:>12} {:>9.1f} MB/s {:>11.1f} MB'.format(
+                        size, name, os.path.getsize(path) / mean_time / 1024 / 1024, max(peaks) / 1024
+                    ))
+        finally:
+            shutil.rmtree(directory)
+
+
+def run_in_process(context, function, *args):
+    """Run the function in a forked process and return its result."""
+    queue = context.Queue()
+    process = context.Process(target = lambda: queue.put(function(*args)))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    return result
+
+
+def generate_image(path, size):
+    """Write a PNG of random pixels (Uncompressible) of about the size given in bytes."""
+    side = int(math.sqrt(size / 3))
+    PillowImage.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(path, compress_level = 0)
+
+
+def get_uploaded_image(path):
+    """Return the image as Django receives the uploads bigger than FILE_UPLOAD_MAX_MEMORY_SIZE."""
+    uploaded_image = TemporaryUploadedFile(os.path.basename(path), 'image/png', os.path.getsize(path), None)
+
+    with open(path, 'rb') as image_file:
+        shutil.copyfileobj(image_file, uploaded_image)
+    uploaded_image.seek(0)
+
+    return uploaded_image
+
+
+def measure(ingest, path, upload):
+    """Return the time of the ingestion of the image and the growth of the peak RSS (KB) it caused."""
+    uploaded_image = get_uploaded_image(path)
+    initial_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    ingest(uploaded_image, upload)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - initial_peak
+
+
+def discard(stream):
+    """Read the stream in parts as the multipart upload does."""
+    while stream.read(settings.MULTIMEDIA_UPLOAD_PART_SIZE):
+        pass
+
+
+def ingest_previous(uploaded_image, upload):
+    forms.ImageField().to_python(uploaded_image)
+    get_image_dimensions(uploaded_image)[0]
+    get_image_dimensions(uploaded_image)[1]
+
+    if upload:
+        image_storage = ImageStorage()
+        name = image_storage.save('benchmark/{}.png'.format(uuid.uuid4().hex), uploaded_image)
+        image_storage.delete(name)
+    else:
+        uploaded_image.seek(0)
+        discard(uploaded_image)
+
+
+def ingest_single_pass(uploaded_image, upload):
+    image_format, _, _, _ = probe_uploaded_image(uploaded_image)
+
+    if upload:
+        image_storage = ImageStorage()
+        name = image_storage.save_stream(
+            'benchmark/{}.png'.format(uuid.uuid4().hex), uploaded_image,
+            content_type = get_image_content_type(image_format)
+        )
+        image_storage.delete(name)
+    else:
+        discard(uploaded_image)
@@ -0,0 +1,50 @@
+# multimedia/management/commands/collapse_duplicate_media.py
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from multimedia.models import File, Image
+
+# Storages
+from multimedia.storages import FileStorage, ImageStorage
+
+# Deduplication
+from multimedia.deduplication import collapse_duplicates
+
+
+class Command(BaseCommand):
+    """
+    Collapse the images and files uploaded more than once by the same account
+    into the oldest copy, rewriting the foreign keys to the duplicates in bulk.
+    The uploads without content hash (The previous ones and the direct uploads)
+    are hashed reading them from their bucket.
+    """
+
+    help = 'Deduplicate the images and files with the same content in the same account.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs = '+', choices = ['image', 'file'], default = ['image', 'file'])
+        parser.add_argument('--batch-size', type = int, default = 100, help = 'Contents collapsed per transaction.')
+        parser.add_argument('--dry-run', action = 'store_true', help = 'Report the duplicates without writing anything.')
+
+    def handle(self, *args, **options):
+        targets = {
+            'image': (Image, ImageStorage),
+            'file': (File, FileStorage),
+        }
+
+        for name in options['models']:
+            model, storage_class = targets[name]
+
+            duplicates_count, contents_count = collapse_duplicates(
+                model, storage_class(),
+                batch_size = options['batch_size'],
+                dry_run = options['dry_run']
+            )
+
+            self.stdout.write('{}: {} duplicates {} in {} contents'.format(
+                name, duplicates_count,
+                'to collapse' if options['dry_run'] else 'collapsed',
+                contents_count
+            ))
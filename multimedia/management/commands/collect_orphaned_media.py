@@ -0,0 +1,69 @@
+# multimedia/management/commands/collect_orphaned_media.py
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Models
+from multimedia.models import File, Image
+
+# Storages
+from multimedia.storages import FileStorage, ImageStorage, VideoStorage
+
+# Garbage
+from multimedia.garbage import abort_expired_uploads, collect_orphans
+
+
+class Command(BaseCommand):
+    """
+    Delete the images and files that nothing references once they are older
+    than the grace period (MULTIMEDIA_ORPHAN_GRACE_PERIOD): the uploads never attached,
+    the failed ones and the ones detached, like the secondary images of the products.
+    Their objects are deleted from the buckets in batches of up to 1000 keys.
+    Nothing references the videos yet, so they are never collected: for them only the
+    uploads not finalized before MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION are aborted.
+    """
+
+    help = 'Delete the orphaned images and files and their objects in the buckets, and abort the expired video uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs = '+', choices = ['image', 'file', 'video'], default = ['image', 'file', 'video'])
+        parser.add_argument('--grace-period', type = int, default = settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD, help = 'Seconds since the upload.')
+        parser.add_argument('--batch-size', type = int, default = 1000, help = 'Orphans deleted per transaction.')
+        parser.add_argument('--dry-run', action = 'store_true', help = 'Report the orphans without deleting them.')
+        parser.add_argument('--restart', action = 'store_true', help = 'Ignore the checkpoint of the previous run.')
+
+    def handle(self, *args, **options):
+        targets = {
+            'image': (Image, ImageStorage),
+            'file': (File, FileStorage),
+        }
+
+        for name in options['models']:
+            if name not in targets:
+                continue
+
+            model, storage_class = targets[name]
+
+            orphans_count, objects_count, size = collect_orphans(
+                name, model, storage_class(),
+                grace_period = options['grace_period'],
+                batch_size = options['batch_size'],
+                dry_run = options['dry_run'],
+                restart = options['restart']
+            )
+
+            self.stdout.write('{}: {} orphans {} with {} objects ({} bytes)'.format(
+                name, orphans_count,
+                'to delete' if options['dry_run'] else 'deleted',
+                objects_count, size
+            ))
+
+        if 'video' in options['models']:
+            aborted_count = abort_expired_uploads(
+                VideoStorage(), settings.MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION, dry_run = options['dry_run']
+            )
+
+            self.stdout.write('video: {} expired uploads {}'.format(
+                aborted_count, 'to abort' if options['dry_run'] else 'aborted'
+            ))
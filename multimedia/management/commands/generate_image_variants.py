@@ -0,0 +1,37 @@
+# multimedia/management/commands/generate_image_variants.py
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from multimedia.models import Image
+
+# Variants
+from multimedia.variants import generate_image_variants
+
+
+class Command(BaseCommand):
+    """
+    Generate the variants of the images uploaded before the variants existed,
+    or the ones whose generation failed. The variants that exist are skipped.
+    """
+
+    help = 'Generate the missing variants of the uploaded images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type = int, nargs = '+', help = 'Images to generate, all the ones without variants by default.')
+
+    def handle(self, *args, **options):
+        if options['ids']:
+            images = Image.objects.filter( id__in = options['ids'] )
+        else:
+            images = Image.objects.filter( uploaded = True, variants__isnull = True )
+
+        generated = 0
+        for image in images.iterator():
+            try:
+                generated += len(generate_image_variants(image))
+            except Exception as e:
+                self.stderr.write('The variants of the image {} could not be generated: {}'.format(image.id, e))
+
+        self.stdout.write('{} variants generated'.format(generated))
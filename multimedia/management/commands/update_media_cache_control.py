@@ -0,0 +1,65 @@
+# multimedia/management/commands/update_media_cache_control.py
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from multimedia.models import Image, ImageVariant
+
+# Storages
+from multimedia.storages import ImageStorage
+
+# Transfers
+from multimedia.transfers import uploads_pool
+
+# Utils
+from itertools import chain, islice
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Set MULTIMEDIA_PUBLIC_CACHE_CONTROL to the images and variants uploaded
+    before the image bucket was public, so the CDN and the browsers cache them
+    as immutable. Every object is copied over itself in the bucket, concurrently
+    by the uploads pool. The objects that already have it are skipped, so an
+    interrupted run can be run again.
+    """
+
+    help = 'Set the Cache-Control of the public media to the objects uploaded without it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type = int, default = 100, help = 'Objects updated concurrently.')
+
+    def handle(self, *args, **options):
+        storage = ImageStorage()
+
+        if not storage.public:
+            self.stdout.write('The image storage is not public, nothing to update')
+            return
+
+        paths = chain(
+            Image.objects.filter( uploaded = True ).exclude( relative_path = '' ).values_list(
+                'relative_path', flat = True
+            ).iterator(),
+            ImageVariant.objects.values_list('relative_path', flat = True).iterator()
+        )
+
+        counts = {'updated': 0, 'skipped': 0, 'failed': 0}
+
+        while True:
+            batch = list(islice(paths, options['batch_size']))
+            if not batch:
+                break
+
+            for path, (updated, exception) in zip(batch, uploads_pool.map(storage.update_cache_control, batch)):
+                if exception is not None:
+                    logger.warning('The Cache-Control of the image %s could not be updated: %s', path, exception)
+                    counts['failed'] += 1
+                else:
+                    counts['updated' if updated else 'skipped'] += 1
+
+        self.stdout.write('{updated} objects updated, {skipped} skipped, {failed} failed'.format(**counts))
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multimedia', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the content of the image', max_length=64),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multimedia', '0002_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('relative_path', models.TextField(help_text='path inside the storage - Not take in account domain (Ej: https://...)')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('format', models.CharField(help_text='Pillow format of the variant: JPEG, PNG or WEBP', max_length=4)),
+                ('size', models.PositiveIntegerField(help_text='Size of the variant in bytes')),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now, help_text='date when was created')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='multimedia.Image')),
+            ],
+            options={
+                'db_table': 'image_variant',
+                'unique_together': {('image', 'width', 'format')},
+            },
+        ),
+    ]
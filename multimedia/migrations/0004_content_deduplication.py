@@ -0,0 +1,36 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multimedia', '0003_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the content of the file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='owner_scope',
+            field=models.CharField(blank=True, help_text='Folder of the account that uploaded the file: its company accountname or its username', max_length=150),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='owner_scope',
+            field=models.CharField(blank=True, help_text='Folder of the account that uploaded the image: its company accountname or its username', max_length=150),
+        ),
+        migrations.AddConstraint(
+            model_name='file',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(_negated=True, owner_scope=''), models.Q(_negated=True, content_hash='')), fields=('owner_scope', 'content_hash'), name='file_owner_content_hash_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='image',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(_negated=True, owner_scope=''), models.Q(_negated=True, content_hash='')), fields=('owner_scope', 'content_hash'), name='image_owner_content_hash_uniq'),
+        ),
+    ]
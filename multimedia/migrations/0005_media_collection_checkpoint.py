@@ -0,0 +1,25 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multimedia', '0004_content_deduplication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaCollectionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(help_text='Model of the media collected: image, file or video', max_length=20, unique=True)),
+                ('last_id', models.BigIntegerField(help_text='Id of the last object checked, the next run starts after it')),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'media_collection_checkpoint',
+            },
+        ),
+    ]
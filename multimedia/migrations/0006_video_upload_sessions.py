@@ -0,0 +1,47 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multimedia', '0005_media_collection_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoUploadSession',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('owner_scope', models.CharField(help_text='Folder of the account that uploads the video: its company accountname or its username', max_length=150)),
+                ('name', models.CharField(help_text='Name of the video in the device of the client', max_length=120)),
+                ('relative_path', models.TextField(help_text='path inside the storage where the video is uploaded')),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.BigIntegerField(help_text='Size of the video in bytes')),
+                ('chunk_size', models.PositiveIntegerField(help_text='Size of every chunk in bytes, except the last one')),
+                ('upload_id', models.TextField(help_text='Id of the multipart upload in the bucket')),
+                ('state', models.CharField(choices=[('UPLOADING', 'Uploading'), ('COMPLETED', 'Completed'), ('ABORTED', 'Aborted')], default='UPLOADING', max_length=9)),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now, help_text='date when was created')),
+            ],
+            options={
+                'db_table': 'video_upload_session',
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoUploadPart',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('number', models.PositiveIntegerField(help_text='Number of the chunk, from 1')),
+                ('etag', models.CharField(help_text='ETag of the part returned by the bucket, to complete the upload', max_length=100)),
+                ('size', models.PositiveIntegerField(help_text='Size of the chunk in bytes')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parts', to='multimedia.VideoUploadSession')),
+            ],
+            options={
+                'db_table': 'video_upload_part',
+                'unique_together': {('session', 'number')},
+            },
+        ),
+    ]
@@ -2,6 +2,7 @@
 
 # Django
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
@@ -34,6 +35,16 @@ class File(models.Model):
         max_length=7
     )
 
+    owner_scope = models.CharField(
+        help_text = _("Folder of the account that uploaded the file: its company accountname or its username"),
+        max_length=150, blank=True
+    )
+
+    content_hash = models.CharField(
+        help_text = _("SHA-256 of the content of the file"),
+        max_length=64, blank=True
+    )
+
     class Types(Enum):
         PDF = ('PDF', 'application/pdf'),
 
@@ -56,6 +67,13 @@ class File(models.Model):
 
     class Meta:
         db_table = 'file'
+        # The same content is stored once per account, the uploads without hash are not deduplicated
+        constraints = [
+            models.UniqueConstraint(
+                fields = ['owner_scope', 'content_hash'], name = 'file_owner_content_hash_uniq',
+                condition = ~Q(owner_scope = '') & ~Q(content_hash = '')
+            ),
+        ]
 
 
 class Image(models.Model):
@@ -87,6 +105,16 @@ class Image(models.Model):
         max_length=8
     )
 
+    owner_scope = models.CharField(
+        help_text = _("Folder of the account that uploaded the image: its company accountname or its username"),
+        max_length=150, blank=True
+    )
+
+    content_hash = models.CharField(
+        help_text = _("SHA-256 of the content of the image"),
+        max_length=64, blank=True
+    )
+
     class Types(Enum):
         JPEG = ('JPEG', 'image/JPEG'),
         JPG = ('JPG', 'image/JPG'),
@@ -111,6 +139,49 @@ class Image(models.Model):
 
     class Meta:
         db_table = 'image'
+        # The same content is stored once per account, the uploads without hash are not deduplicated
+        constraints = [
+            models.UniqueConstraint(
+                fields = ['owner_scope', 'content_hash'], name = 'image_owner_content_hash_uniq',
+                condition = ~Q(owner_scope = '') & ~Q(content_hash = '')
+            ),
+        ]
+
+
+class ImageVariant(models.Model):
+    """Model that represents a resized version of an image, stored next to it."""
+
+    id = models.BigAutoField(primary_key=True)
+
+    image = models.ForeignKey(
+        Image,
+        on_delete = models.CASCADE,
+        related_name = 'variants'
+    )
+
+    relative_path = models.TextField(
+        help_text = _("path inside the storage - Not take in account domain (Ej: https://...)")
+    )
+
+    width = models.PositiveIntegerField()
+
+    height = models.PositiveIntegerField()
+
+    format = models.CharField(
+        help_text = _("Pillow format of the variant: JPEG, PNG or WEBP"),
+        max_length=4
+    )
+
+    size = models.PositiveIntegerField(help_text = _("Size of the variant in bytes"))
+
+    created_date = models.DateTimeField(
+        help_text = _('date when was created'), 
+        default=timezone.now
+    )
+
+    class Meta:
+        db_table = 'image_variant'
+        unique_together = (('image', 'width', 'format'),)
 
 
 class Video(models.Model):
@@ -164,4 +235,103 @@ class Video(models.Model):
     )
 
     class Meta:
-        db_table = 'video'
\ No newline at end of file
+        db_table = 'video'
+
+
+class MediaCollectionCheckpoint(models.Model):
+    """Last object checked by the collection of the orphaned media of a model, to resume it."""
+
+    id = models.BigAutoField(primary_key=True)
+
+    model = models.CharField(
+        help_text = _("Model of the media collected: image, file or video"),
+        max_length=20, unique=True
+    )
+
+    last_id = models.BigIntegerField(
+        help_text = _("Id of the last object checked, the next run starts after it")
+    )
+
+    updated_date = models.DateTimeField(auto_now = True)
+
+    class Meta:
+        db_table = 'media_collection_checkpoint'
+
+
+class VideoUploadSession(models.Model):
+    """
+    Resumable upload of a video in chunks, each chunk is a part of a multipart upload
+    to the bucket. The video is created when the upload is finalized.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    owner_scope = models.CharField(
+        help_text = _("Folder of the account that uploads the video: its company accountname or its username"),
+        max_length=150
+    )
+
+    name = models.CharField(
+        help_text = _("Name of the video in the device of the client"),
+        max_length=120
+    )
+
+    relative_path = models.TextField(
+        help_text = _("path inside the storage where the video is uploaded")
+    )
+
+    content_type = models.CharField(max_length=100)
+
+    size = models.BigIntegerField(help_text = _("Size of the video in bytes"))
+
+    chunk_size = models.PositiveIntegerField(
+        help_text = _("Size of every chunk in bytes, except the last one")
+    )
+
+    upload_id = models.TextField(
+        help_text = _("Id of the multipart upload in the bucket")
+    )
+
+    class States(models.TextChoices):
+        UPLOADING = 'UPLOADING', _('Uploading')
+        COMPLETED = 'COMPLETED', _('Completed')
+        ABORTED = 'ABORTED', _('Aborted')
+
+    state = models.CharField(
+        max_length=9,
+        choices = States.choices,
+        default = States.UPLOADING
+    )
+
+    created_date = models.DateTimeField(
+        help_text = _('date when was created'), 
+        default=timezone.now
+    )
+
+    class Meta:
+        db_table = 'video_upload_session'
+
+
+class VideoUploadPart(models.Model):
+    """Chunk of a video upload already stored as a part of its multipart upload."""
+
+    id = models.BigAutoField(primary_key=True)
+
+    session = models.ForeignKey(
+        VideoUploadSession,
+        on_delete = models.CASCADE,
+        related_name = 'parts'
+    )
+
+    number = models.PositiveIntegerField(help_text = _("Number of the chunk, from 1"))
+
+    etag = models.CharField(
+        help_text = _("ETag of the part returned by the bucket, to complete the upload"),
+        max_length=100
+    )
+
+    size = models.PositiveIntegerField(help_text = _("Size of the chunk in bytes"))
+
+    class Meta:
+        db_table = 'video_upload_part'
+        unique_together = (('session', 'number'),)
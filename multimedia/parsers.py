@@ -0,0 +1,45 @@
+# multimedia/parsers.py
+
+# Django
+from django.conf import settings
+from django.core.files import File
+
+# Django REST framework
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+# Utils
+import tempfile
+
+
+class ChunkParser(BaseParser):
+    """
+    Parser of the raw bytes of a chunk of an upload (application/octet-stream).
+    The body is copied from the request in blocks to a temporary file that stays
+    in memory only while it's small, so the big chunks never are in memory at once.
+    The data is the temporary file as a Django file, at its start.
+    """
+
+    media_type = 'application/octet-stream'
+
+    block_size = 64 * 1024
+    max_memory_size = 1024 * 1024
+
+    def parse(self, stream, media_type = None, parser_context = None):
+        chunk = tempfile.SpooledTemporaryFile(max_size = self.max_memory_size)
+
+        if stream is not None:
+            size = 0
+
+            for block in iter(lambda: stream.read(self.block_size), b''):
+                size += len(block)
+
+                if size > settings.MULTIMEDIA_UPLOAD_PART_SIZE:
+                    chunk.close()
+                    raise ParseError('The maximum size of a chunk is {} bytes'.format(settings.MULTIMEDIA_UPLOAD_PART_SIZE))
+
+                chunk.write(block)
+
+        chunk.seek(0)
+
+        return File(chunk, name = 'chunk')
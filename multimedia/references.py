@@ -0,0 +1,57 @@
+# multimedia/references.py
+
+# Django
+from django.db.models import Exists, OuterRef
+
+# Models
+from multimedia.models import Image, ImageVariant
+
+# Utils
+from collections import defaultdict
+
+
+def get_references(model):
+    """
+    Return the (model, field name) of every foreign key to the model given.
+    They are read from the relations of the model, so multimedia doesn't import the
+    apps that use it. The variants are not references, they belong to their image.
+    """
+
+    return [
+        (relation.related_model, relation.field.name)
+        for relation in model._meta.related_objects
+        if relation.one_to_many and relation.related_model is not ImageVariant
+    ]
+
+
+def get_unreferenced(model):
+    """
+    Return the queryset of the objects of the model that no row references,
+    one NOT EXISTS (Anti-join) per foreign key. The rows soft deleted still
+    reference their objects, they can be restored.
+    """
+
+    queryset = model.objects.all()
+
+    for related_model, field_name in get_references(model):
+        column = related_model._meta.get_field(field_name).attname
+        queryset = queryset.filter(
+            ~Exists(related_model._base_manager.filter(**{column: OuterRef('pk')}))
+        )
+
+    return queryset
+
+
+def get_stored_paths(model, ids):
+    """Return the paths in the bucket of the objects with the ids given, with their variants (id -> paths)."""
+    paths = defaultdict(list)
+    rows = list(model.objects.filter( id__in = ids ).values_list('id', 'relative_path'))
+
+    if model is Image:
+        rows += list(ImageVariant.objects.filter( image_id__in = ids ).values_list('image_id', 'relative_path'))
+
+    for object_id, path in rows:
+        if path:
+            paths[object_id].append(path)
+
+    return paths
@@ -1,2 +1,5 @@
 from multimedia.serializers.files import *
-from multimedia.serializers.images import *
\ No newline at end of file
+from multimedia.serializers.images import *
+from multimedia.serializers.uploads import *
+from multimedia.serializers.bulk import *
+from multimedia.serializers.videos import *
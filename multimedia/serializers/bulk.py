@@ -0,0 +1,209 @@
+# Serializer bulk uploads
+
+# Django rest framework
+from rest_framework import serializers
+
+# Django
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+# Models
+from multimedia.models import File, Image
+
+# Storages
+from multimedia.storages import FileStorage, ImageStorage
+
+# Serializers
+from multimedia.serializers.files import CreateFileSerializer, FileModelSerializer
+from multimedia.serializers.images import CreateImageSerializer, ImageModelSerializer
+from multimedia.serializers.uploads import get_upload_folder_name
+
+# Garbage collection
+from multimedia.garbage import claim_objects
+
+# Transfers
+from multimedia.transfers import uploads_pool
+
+# Variants
+from multimedia.variants import image_variants_pool
+
+# Utils
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkUploadSerializer(serializers.Serializer):
+    """
+    Serializer in charge of creating the many objects of one multipart request.
+    Every part is validated by the serializer of the single upload and the new
+    contents are uploaded to the bucket, both concurrently in the uploads pool.
+    Then all the rows are written with one bulk_create. The parts that fail
+    don't fail the others, every part has its own result.
+    The subclasses define the field of the parts and the serializers of one object.
+    """
+
+    requires_context = True
+
+    parts_field = None
+    part_field = None
+    model = None
+    storage_class = None
+    part_serializer_class = None
+    model_serializer_class = None
+
+    def validate_part(self, upload_file):
+        """Return the data validated and the errors of one part."""
+        part_serializer = self.part_serializer_class(data = {self.part_field: upload_file})
+
+        if part_serializer.is_valid():
+            return part_serializer.validated_data, []
+
+        return None, [str(error) for errors in part_serializer.errors.values() for error in errors]
+
+    def validate(self, data):
+        """Validate all the parts at once in the uploads pool."""
+        upload_files = data[self.parts_field]
+        validations = uploads_pool.map(self.validate_part, upload_files)
+
+        data['parts'] = []
+        for upload_file, (validation, exception) in zip(upload_files, validations):
+            part_data, errors = validation or (None, ['The file could not be read'])
+
+            data['parts'].append({
+                'name': upload_file.name,
+                'data': part_data,
+                'errors': errors,
+                'status': 'invalid' if errors else None,
+                'instance': None,
+            })
+
+        return data
+
+    def create(self, data):
+        """
+        Create the objects of the valid parts. The contents that the account already
+        uploaded, or that are repeated in the request, are not uploaded again.
+        Return the parts with their status (created, existing, invalid or failed).
+        """
+
+        folder_name = get_upload_folder_name(self.context.get('request'))
+        parts = [part for part in data['parts'] if not part['errors']]
+
+        existing_objects = {
+            instance.content_hash: instance
+            for instance in claim_objects(self.model, list(self.model.objects.filter(
+                owner_scope = folder_name,
+                content_hash__in = {part['data']['content_hash'] for part in parts}
+            )))
+        }
+
+        new_parts = {}
+        for part in parts:
+            content_hash = part['data']['content_hash']
+
+            if content_hash not in existing_objects and content_hash not in new_parts:
+                new_parts[content_hash] = part
+
+        storage = self.storage_class()
+        part_serializer = self.part_serializer_class(context = self.context)
+
+        uploads = uploads_pool.map(
+            lambda part: part_serializer.upload(part['data'], folder_name, storage),
+            new_parts.values()
+        )
+
+        for part, (instance, exception) in zip(new_parts.values(), uploads):
+            if exception is not None:
+                logger.error('The part %s could not be uploaded: %s', part['name'], exception)
+                part.update( status = 'failed', errors = ['The file could not be uploaded to the storage'] )
+            else:
+                part.update( status = 'created', instance = instance )
+
+        created_parts = [part for part in new_parts.values() if part['status'] == 'created']
+
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create([part['instance'] for part in created_parts])
+        except IntegrityError:
+            # A concurrent upload wrote some of the contents first, they are written one by one
+            self.create_one_by_one(created_parts, folder_name, storage)
+
+        for part in parts:
+            if part['status'] is None:
+                content_hash = part['data']['content_hash']
+                same_part = new_parts.get(content_hash)
+
+                part['instance'] = existing_objects.get(content_hash) or same_part['instance']
+                part['status'] = 'existing' if part['instance'] is not None else same_part['status']
+                part['errors'] = [] if part['instance'] is not None else same_part['errors']
+
+        self.on_objects_created([part['instance'] for part in created_parts if part['status'] == 'created'])
+
+        return data['parts']
+
+    def create_one_by_one(self, parts, folder_name, storage):
+        for part in parts:
+            try:
+                with transaction.atomic():
+                    part['instance'].save()
+            except IntegrityError:
+                storage.delete(part['instance'].relative_path)
+                part.update( status = 'existing', instance = self.model.objects.get(
+                    owner_scope = folder_name, content_hash = part['data']['content_hash']
+                ))
+
+    def on_objects_created(self, instances):
+        """Hook for the work that follows the creation of the objects."""
+
+    def to_representation(self, parts):
+        return {
+            'results': [
+                {
+                    'name': part['name'],
+                    'status': part['status'],
+                    self.part_field: part['instance'] and self.model_serializer_class(
+                        part['instance'], context = self.context
+                    ).data,
+                    'errors': part['errors'],
+                }
+                for part in parts
+            ]
+        }
+
+
+class CreateImagesSerializer(BulkUploadSerializer):
+    """Serializer in charge of creating many images of one multipart request."""
+
+    parts_field = 'images'
+    part_field = 'image'
+    model = Image
+    storage_class = ImageStorage
+    part_serializer_class = CreateImageSerializer
+    model_serializer_class = ImageModelSerializer
+
+    images = serializers.ListField(
+        child = serializers.FileField(allow_empty_file = False),
+        allow_empty = False, max_length = settings.MULTIMEDIA_BULK_UPLOAD_MAX_FILES
+    )
+
+    def on_objects_created(self, images):
+        for image in images:
+            transaction.on_commit(lambda image_id = image.id: image_variants_pool.submit(image_id))
+
+
+class CreateFilesSerializer(BulkUploadSerializer):
+    """Serializer in charge of creating many files of one multipart request."""
+
+    parts_field = 'files'
+    part_field = 'file'
+    model = File
+    storage_class = FileStorage
+    part_serializer_class = CreateFileSerializer
+    model_serializer_class = FileModelSerializer
+
+    files = serializers.ListField(
+        child = serializers.FileField(allow_empty_file = False),
+        allow_empty = False, max_length = settings.MULTIMEDIA_BULK_UPLOAD_MAX_FILES
+    )
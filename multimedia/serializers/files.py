@@ -3,11 +3,14 @@
 # OS
 import os
 
+# Utils
+import uuid
+
 # Django rest framework
 from rest_framework import serializers
 
 # Django
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 # Models
 from multimedia.models import File
@@ -15,6 +18,12 @@ from multimedia.models import File
 # Storages
 from multimedia.storages import FileStorage
 
+# Garbage collection
+from multimedia.garbage import claim_objects
+
+# Ingestion
+from multimedia.ingestion import get_content_hash
+
 
 def serialize_file_relative_path(file_relative_path):
     """Method that take the relative path of an uploaded 
@@ -70,9 +79,42 @@ class CreateFileSerializer(serializers.Serializer):
 
     file = serializers.FileField(required = True, allow_empty_file = False)
 
+    def validate(self, data):
+        data['content_hash'] = get_content_hash(data['file'])
+
+        return data
+
+    def upload(self, data, folder_name, file_storage):
+        """Stream the file validated to the bucket, in the folder given, and return its row without saving it.
+            The id doesn't exist until the row is written, so the file is named by a random key."""
+        file_object = data.get("file")
+
+        _, file_extension = os.path.splitext(file_object.name)
+        file_key = uuid.uuid4().hex
+
+        bucket_file_path = '{folder_name}/{file_key}/{file_key}{file_extension}'.format(
+            folder_name = folder_name,
+            file_key = file_key,
+            file_extension = file_extension
+        )
+
+        bucket_file_path = file_storage.save_stream(bucket_file_path, file_object)
+
+        return File(
+            name = file_object.name[:60],
+            relative_path = bucket_file_path,
+            absolute_path = file_storage.url(bucket_file_path).split("?")[0],
+            size = file_object.size, # size in bytes
+            type = file_extension,
+            owner_scope = folder_name,
+            content_hash = data['content_hash'],
+            uploaded = True
+        )
+
     @transaction.atomic
     def create(self, data):
-        """Create and store a new file"""
+        """Create and store a new file. If the account already uploaded
+        the same content, its file is returned without touching the bucket."""
 
         # Define an appropiate folder name
         request = self.context.get('request')
@@ -80,13 +122,28 @@ class CreateFileSerializer(serializers.Serializer):
         username = request.user.username
         folder_name = company_accountname if company_accountname else username
 
+        existing_file = File.objects.filter(
+            owner_scope = folder_name, content_hash = data['content_hash']
+        ).first()
+
+        if existing_file is not None and claim_objects(File, [existing_file]):
+            return existing_file
+
         file_object = data.get("file")
         file_size = file_object.size # size in bytes
 
-        file = File.objects.create(
-            name = file_object.name,
-            size = file_size
-        )
+        try:
+            with transaction.atomic():
+                file = File.objects.create(
+                    name = file_object.name,
+                    size = file_size,
+                    owner_scope = folder_name,
+                    content_hash = data['content_hash']
+                )
+        except IntegrityError:
+            # A concurrent upload of the same content was written first
+            return File.objects.get( owner_scope = folder_name, content_hash = data['content_hash'] )
+
         file_id = file.id
 
         bucket_directory = '{folder_name}/{file_object_id}/'.format( 
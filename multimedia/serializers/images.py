@@ -3,12 +3,15 @@
 # OS
 import os
 
+# Utils
+import uuid
+
 # Django rest framework
 from rest_framework import serializers
 
 # Django
-from django.core.files.images import get_image_dimensions
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
 # Models
 from multimedia.models import Image
@@ -16,21 +19,45 @@ from multimedia.models import Image
 # Storages
 from multimedia.storages import ImageStorage
 
+# Garbage collection
+from multimedia.garbage import claim_objects
+
+# Ingestion
+from multimedia.ingestion import get_image_content_type, probe_uploaded_image
+
+# Variants
+from multimedia.variants import get_image_variant_path, image_variants_pool
+
 
 def serialize_image_relative_path(image_relative_path):
     """Method that take the relative path of an uploaded
-    image in s3 and returns the signed path for that image."""
+    image in s3 and returns the url for that image: unsigned
+    if the image storage is public, signed otherwise."""
 
     image_storage = ImageStorage()
 
+    if image_storage.public:
+        return image_storage.public_url(image_relative_path)
+
     return image_storage.url(image_relative_path)
 
 
 class ImageModelSerializer(serializers.ModelSerializer):
-    """Image model serializer."""
+    """
+    Image model serializer.
+    The path is the one of the variant that fits the width of the variant given
+    (A name of IMAGE_VARIANT_WIDTHS, by argument or in the context as image_variant),
+    and webp_path the one of its WebP version. Without variant it's the original.
+    """
 
     path = serializers.SerializerMethodField()
 
+    webp_path = serializers.SerializerMethodField()
+
+    def __init__(self, *args, variant = None, **kwargs):
+        self.variant = variant
+        super().__init__(*args, **kwargs)
+
     class Meta:
         """Image meta class."""
 
@@ -40,6 +67,7 @@ class ImageModelSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'path',
+            'webp_path',
             'width',
             'height',
             'type',
@@ -51,6 +79,7 @@ class ImageModelSerializer(serializers.ModelSerializer):
         read_only_fields = (
             'id',
             'path',
+            'webp_path',
             'width',
             'height',
             'type',
@@ -59,11 +88,28 @@ class ImageModelSerializer(serializers.ModelSerializer):
             'uploaded'
         )
 
-    def get_path(self, instance):
-        image_path = instance.relative_path
+    def get_variant_width(self):
+        variant = self.variant or self.context.get('image_variant')
+
+        return settings.IMAGE_VARIANT_WIDTHS[variant] if variant else None
+
+    def get_signed_path(self, image_path):
+        # The representations cached sign the paths when they are read
+        if not self.context.get('sign_paths', True) or not image_path:
+            return image_path
 
         return serialize_image_relative_path(image_path)
 
+    def get_path(self, instance):
+        return self.get_signed_path(
+            get_image_variant_path(instance, self.get_variant_width())
+        )
+
+    def get_webp_path(self, instance):
+        return self.get_signed_path(
+            get_image_variant_path(instance, self.get_variant_width(), 'WEBP')
+        )
+
 
 class CreateImageSerializer(serializers.Serializer):
     """
@@ -73,41 +119,35 @@ class CreateImageSerializer(serializers.Serializer):
 
     requires_context = True
     
-    image = serializers.ImageField(required = True, allow_empty_file = False)
+    # The image is validated by its header in validate, without decoding it
+    image = serializers.FileField(required = True, allow_empty_file = False)
 
-    @transaction.atomic
-    def create(self, data):
-        """Create and store a new image"""
+    def validate(self, data):
+        """Probe the format and the dimensions of the image from its header and hash it, in one read."""
+        try:
+            data['format'], data['width'], data['height'], data['content_hash'] = probe_uploaded_image(data['image'])
+        except ValueError as e:
+            raise serializers.ValidationError({'image': [str(e)]})
 
-        # Define an appropiate folder name
-        request = self.context.get('request')
-        company_accountname = request.auth.payload.get('company_accountname')
-        username = request.user.username
-        folder_name = company_accountname if company_accountname else username
+        return data
 
+    def upload(self, data, folder_name, image_storage):
+        """Stream the image validated to the bucket, in the folder given, and return its row without saving it."""
         image_object = data.get("image")
-        
-        image_size = image_object.size # size in bytes
-        image_width = get_image_dimensions(image_object)[0]
-        image_height = get_image_dimensions(image_object)[1]
 
         _, image_extension = os.path.splitext(image_object.name)
+        image_extension = image_extension or '.{}'.format(data['format'].lower())
 
-        image = Image.objects.create(
-            width = image_width,
-            height = image_height,
-            size = image_size,
-            type = image_extension
-        )
-        image_id = image.id
+        # The id doesn't exist until the row is written, so the image is named by a random key
+        image_key = uuid.uuid4().hex
 
-        bucket_directory = '{folder_name}/{image_object_id}/'.format( 
+        bucket_directory = '{folder_name}/{image_key}/'.format( 
             folder_name = folder_name,
-            image_object_id = image_id
+            image_key = image_key
         )
         
-        imagename = '{image_object_id}{image_extension}'.format(
-            image_object_id = image_id,
+        imagename = '{image_key}{image_extension}'.format(
+            image_key = image_key,
             image_extension = image_extension
         )
         
@@ -116,15 +156,56 @@ class CreateImageSerializer(serializers.Serializer):
             imagename
         )
 
+        bucket_image_path = image_storage.save_stream(
+            bucket_image_path, image_object,
+            content_type = get_image_content_type(data['format'])
+        )
+
+        return Image(
+            name = imagename,
+            relative_path = bucket_image_path,
+            absolute_path = image_storage.public_url(bucket_image_path),
+            width = data['width'],
+            height = data['height'],
+            size = image_object.size, # size in bytes
+            type = image_extension,
+            owner_scope = folder_name,
+            content_hash = data['content_hash'],
+            uploaded = True
+        )
+
+    def create(self, data):
+        """
+        Create and store a new image. If the account already uploaded the same
+        content, its image is returned without touching the bucket. Otherwise the
+        image is streamed to the bucket and then the row is written once.
+        """
+
+        # Define an appropiate folder name
+        request = self.context.get('request')
+        company_accountname = request.auth.payload.get('company_accountname')
+        username = request.user.username
+        folder_name = company_accountname if company_accountname else username
+
+        existing_image = Image.objects.filter(
+            owner_scope = folder_name, content_hash = data['content_hash']
+        ).first()
+
+        if existing_image is not None and claim_objects(Image, [existing_image]):
+            return existing_image
+
         image_storage = ImageStorage()
+        image = self.upload(data, folder_name, image_storage)
+
+        try:
+            with transaction.atomic():
+                image.save()
+        except IntegrityError:
+            # A concurrent upload of the same content was written first
+            image_storage.delete(image.relative_path)
 
-        image_storage.save(bucket_image_path, image_object)
-        image.name = imagename
-        image.type = image_extension
-        image.relative_path = bucket_image_path
-        image.absolute_path = image_storage.url(bucket_image_path).split("?")[0]
+            return Image.objects.get( owner_scope = folder_name, content_hash = data['content_hash'] )
 
-        image.uploaded = True
-        image.save()
+        transaction.on_commit(lambda: image_variants_pool.submit(image.id))
 
-        return image
\ No newline at end of file
+        return image
@@ -0,0 +1,264 @@
+# Serializer uploads
+
+# OS
+import os
+
+# Utils
+import uuid
+
+# Django rest framework
+from rest_framework import serializers
+
+# Django
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+
+# Models
+from multimedia.models import File, Image
+
+# Storages
+from multimedia.storages import FileStorage, ImageStorage
+
+# Ingestion
+from multimedia.ingestion import probe_image_stream
+
+# Variants
+from multimedia.variants import image_variants_pool
+
+
+def get_upload_folder_name(request):
+    """Return the folder of the uploads of the requester: its company or its username."""
+    company_accountname = request.auth.payload.get('company_accountname')
+
+    return company_accountname if company_accountname else request.user.username
+
+
+class RequestUploadSerializer(serializers.Serializer):
+    """
+    Serializer in charge of issuing the presigned POST that uploads 
+    an object straight to its bucket, in the folder of the requester.
+    The subclasses define the kind of object, its storage and its limits.
+    """
+
+    requires_context = True
+
+    kind = None
+    storage_class = None
+    max_size = None
+    content_types = None
+
+    name = serializers.CharField(max_length = 120)
+
+    size = serializers.IntegerField(min_value = 1, help_text = "Size of the object in bytes")
+
+    content_type = serializers.CharField(max_length = 100)
+
+    def validate_size(self, size):
+        if size > self.max_size:
+            raise serializers.ValidationError('The maximum size is {} bytes'.format(self.max_size))
+
+        return size
+
+    def validate_content_type(self, content_type):
+        if content_type not in self.content_types:
+            raise serializers.ValidationError('The content types accepted are: {}'.format(
+                ', '.join(self.content_types)
+            ))
+
+        return content_type
+
+    def create(self, data):
+        """Return the presigned POST and the token that finalizes the upload."""
+        folder_name = get_upload_folder_name(self.context.get('request'))
+
+        _, extension = os.path.splitext(data['name'])
+        object_key = uuid.uuid4().hex
+
+        path = '{folder_name}/{object_key}/{object_key}{extension}'.format(
+            folder_name = folder_name,
+            object_key = object_key,
+            extension = extension.lower()
+        )
+
+        # The client uploads to a staging key, finalize moves the object out of it
+        staging_path = '{}/{}'.format(settings.MULTIMEDIA_UPLOAD_STAGING_PREFIX, path)
+
+        presigned_upload = self.storage_class().get_presigned_upload(
+            staging_path, data['content_type'], self.max_size, settings.MULTIMEDIA_UPLOAD_URL_EXPIRATION
+        )
+
+        upload_token = signing.dumps({
+            'path': path,
+            'staging_path': staging_path,
+            'name': data['name'],
+            'content_type': data['content_type'],
+            'folder': folder_name,
+        }, salt = 'multimedia.uploads.{}'.format(self.kind))
+
+        return {
+            'upload_token': upload_token,
+            'url': presigned_upload['url'],
+            'fields': presigned_upload['fields'],
+            'expires_in': settings.MULTIMEDIA_UPLOAD_URL_EXPIRATION,
+        }
+
+
+class FinalizeUploadSerializer(serializers.Serializer):
+    """
+    Serializer in charge of verifying an object uploaded straight to its bucket
+    (HEAD, size and content type) and creating its row in the database.
+    The object is first copied out of the staging key of the presigned POST,
+    which stays valid until it expires, so the object verified can't be
+    overwritten. The objects that don't pass the verification are deleted.
+    The API never reads the whole object, so the rows are created without
+    content hash and collapse_duplicate_media deduplicates them later.
+    The row of an upload already finalized is given as existing.
+    """
+
+    requires_context = True
+
+    kind = None
+    model = None
+    storage_class = None
+    max_size = None
+
+    upload_token = serializers.CharField()
+
+    def validate_upload_token(self, upload_token):
+        try:
+            upload = signing.loads(
+                upload_token, salt = 'multimedia.uploads.{}'.format(self.kind),
+                max_age = settings.MULTIMEDIA_UPLOAD_URL_EXPIRATION * 2
+            )
+        except signing.BadSignature:
+            raise serializers.ValidationError('The upload token is not valid or expired, request the upload again')
+
+        if upload['folder'] != get_upload_folder_name(self.context.get('request')):
+            raise serializers.ValidationError('The upload was requested by another account')
+
+        return upload
+
+    def validate(self, data):
+        upload = data['upload_token']
+        self.storage = self.storage_class()
+
+        data['existing'] = self.model.objects.filter( relative_path = upload['path'] ).first()
+        if data['existing'] is not None:
+            return data
+
+        if self.storage.get_object_metadata(upload['staging_path']) is None:
+            raise serializers.ValidationError({'upload_token': ["The object wasn't uploaded to the storage yet"]})
+
+        self.storage.copy_object(upload['staging_path'], upload['path'])
+        self.storage.delete(upload['staging_path'])
+
+        metadata = self.storage.get_object_metadata(upload['path'])
+
+        if metadata['size'] > self.max_size or metadata['content_type'] != upload['content_type']:
+            self.storage.delete(upload['path'])
+            raise serializers.ValidationError({'upload_token': ["The object uploaded doesn't match the upload requested"]})
+
+        data['size'] = metadata['size']
+
+        return data
+
+
+class RequestImageUploadSerializer(RequestUploadSerializer):
+    """Serializer that issues the presigned POST of an image."""
+
+    kind = 'image'
+    storage_class = ImageStorage
+    max_size = settings.MULTIMEDIA_IMAGE_MAX_SIZE
+    content_types = settings.MULTIMEDIA_IMAGE_CONTENT_TYPES
+
+
+class FinalizeImageUploadSerializer(FinalizeUploadSerializer):
+    """Serializer that verifies an image uploaded to the bucket and creates it."""
+
+    kind = 'image'
+    model = Image
+    storage_class = ImageStorage
+    max_size = settings.MULTIMEDIA_IMAGE_MAX_SIZE
+
+    def validate(self, data):
+        """Probe the format and the dimensions of the image from the header of the object."""
+        data = super().validate(data)
+        if data['existing'] is not None:
+            return data
+
+        path = data['upload_token']['path']
+
+        image_stream = self.storage.open_stream(path)
+        try:
+            data['format'], data['width'], data['height'] = probe_image_stream(image_stream)
+        except ValueError as e:
+            self.storage.delete(path)
+            raise serializers.ValidationError({'upload_token': [str(e)]})
+        finally:
+            image_stream.close()
+
+        return data
+
+    def create(self, data):
+        """Create the image of the upload, or return it if it was already finalized."""
+        path = data['upload_token']['path']
+
+        if data['existing'] is not None:
+            return data['existing']
+
+        imagename = os.path.basename(path)
+        _, image_extension = os.path.splitext(imagename)
+
+        image = Image.objects.create(
+            name = imagename,
+            relative_path = path,
+            absolute_path = self.storage.public_url(path),
+            width = data['width'],
+            height = data['height'],
+            size = data['size'], # size in bytes
+            type = image_extension or '.{}'.format(data['format'].lower()),
+            owner_scope = data['upload_token']['folder'],
+            uploaded = True
+        )
+
+        transaction.on_commit(lambda: image_variants_pool.submit(image.id))
+
+        return image
+
+
+class RequestFileUploadSerializer(RequestUploadSerializer):
+    """Serializer that issues the presigned POST of a file."""
+
+    kind = 'file'
+    storage_class = FileStorage
+    max_size = settings.MULTIMEDIA_FILE_MAX_SIZE
+    content_types = settings.MULTIMEDIA_FILE_CONTENT_TYPES
+
+
+class FinalizeFileUploadSerializer(FinalizeUploadSerializer):
+    """Serializer that verifies a file uploaded to the bucket and creates it."""
+
+    kind = 'file'
+    model = File
+    storage_class = FileStorage
+    max_size = settings.MULTIMEDIA_FILE_MAX_SIZE
+
+    def create(self, data):
+        """Create the file of the upload, or return it if it was already finalized."""
+        path = data['upload_token']['path']
+
+        if data['existing'] is not None:
+            return data['existing']
+
+        _, file_extension = os.path.splitext(path)
+
+        return File.objects.create(
+            name = data['upload_token']['name'][:60],
+            relative_path = path,
+            absolute_path = self.storage.url(path).split("?")[0],
+            size = data['size'], # size in bytes
+            type = file_extension,
+            owner_scope = data['upload_token']['folder'],
+            uploaded = True
+        )
@@ -0,0 +1,342 @@
+# Serializer videos
+
+# OS
+import os
+
+# Utils
+from datetime import timedelta
+import math
+import uuid
+
+# Django rest framework
+from rest_framework import serializers
+
+# Django
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Models
+from multimedia.models import Video, VideoUploadPart, VideoUploadSession
+
+# Storages
+from multimedia.storages import VideoStorage
+
+# Ingestion
+from multimedia.ingestion import probe_video
+
+# Serializers
+from multimedia.serializers.uploads import get_upload_folder_name
+
+
+def serialize_video_relative_path(video_relative_path):
+    """Method that take the relative path of an uploaded
+    video in s3 and returns the signed path for that video."""
+
+    video_storage = VideoStorage()
+
+    return video_storage.url(video_relative_path)
+
+
+def get_chunks_count(session):
+    """Return the amount of chunks of the upload, all of chunk_size except the last one."""
+    return max(math.ceil(session.size / session.chunk_size), 1)
+
+
+def get_chunk_size(session, number):
+    """Return the size in bytes that the chunk with the number given must have."""
+    if number < get_chunks_count(session):
+        return session.chunk_size
+
+    return session.size - session.chunk_size * (number - 1)
+
+
+def is_upload_expired(session):
+    return session.created_date + timedelta(seconds = settings.MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION) < timezone.now()
+
+
+class VideoModelSerializer(serializers.ModelSerializer):
+    """Video model serializer."""
+
+    path = serializers.SerializerMethodField()
+
+    class Meta:
+        """Video meta class."""
+
+        model = Video
+
+        fields = (
+            'id',
+            'name',
+            'path',
+            'type',
+            'size',
+            'length',
+            'created_date',
+            'uploaded'
+        )
+
+        read_only_fields = fields
+
+    def get_path(self, instance):
+        video_path = instance.relative_path
+
+        return serialize_video_relative_path(video_path)
+
+
+class VideoUploadSessionModelSerializer(serializers.ModelSerializer):
+    """
+    Video upload session model serializer. The offset is the amount of bytes
+    received without gaps from the start, an interrupted upload resumes from
+    the chunk offset / chunk_size + 1. The chunks received out of order are
+    listed in received_chunks.
+    """
+
+    chunks_count = serializers.SerializerMethodField()
+
+    received_chunks = serializers.SerializerMethodField()
+
+    offset = serializers.SerializerMethodField()
+
+    expires_date = serializers.SerializerMethodField()
+
+    class Meta:
+        """Video upload session meta class."""
+
+        model = VideoUploadSession
+
+        fields = (
+            'id',
+            'name',
+            'content_type',
+            'size',
+            'chunk_size',
+            'chunks_count',
+            'received_chunks',
+            'offset',
+            'state',
+            'created_date',
+            'expires_date'
+        )
+
+        read_only_fields = fields
+
+    def get_parts_sizes(self, instance):
+        """Return the size of every chunk received (number -> size), read once per session."""
+        if getattr(instance, '_parts_sizes', None) is None:
+            instance._parts_sizes = dict(instance.parts.values_list('number', 'size'))
+
+        return instance._parts_sizes
+
+    def get_chunks_count(self, instance):
+        return get_chunks_count(instance)
+
+    def get_received_chunks(self, instance):
+        return sorted(self.get_parts_sizes(instance))
+
+    def get_offset(self, instance):
+        parts_sizes = self.get_parts_sizes(instance)
+        offset, number = 0, 1
+
+        while number in parts_sizes:
+            offset += parts_sizes[number]
+            number += 1
+
+        return offset
+
+    def get_expires_date(self, instance):
+        return instance.created_date + timedelta(seconds = settings.MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION)
+
+
+class CreateVideoUploadSerializer(serializers.Serializer):
+    """
+    Serializer in charge of starting the resumable upload of a video:
+    a multipart upload in the bucket, in the folder of the requester,
+    and the session that tracks its chunks.
+    """
+
+    requires_context = True
+
+    name = serializers.CharField(max_length = 120)
+
+    size = serializers.IntegerField(min_value = 1, help_text = "Size of the video in bytes")
+
+    content_type = serializers.CharField(max_length = 100)
+
+    def validate_size(self, size):
+        if size > settings.MULTIMEDIA_VIDEO_MAX_SIZE:
+            raise serializers.ValidationError('The maximum size is {} bytes'.format(settings.MULTIMEDIA_VIDEO_MAX_SIZE))
+
+        return size
+
+    def validate_content_type(self, content_type):
+        if content_type not in settings.MULTIMEDIA_VIDEO_CONTENT_TYPES:
+            raise serializers.ValidationError('The content types accepted are: {}'.format(
+                ', '.join(settings.MULTIMEDIA_VIDEO_CONTENT_TYPES)
+            ))
+
+        return content_type
+
+    def create(self, data):
+        folder_name = get_upload_folder_name(self.context.get('request'))
+
+        _, extension = os.path.splitext(data['name'])
+        object_key = uuid.uuid4().hex
+
+        path = '{folder_name}/{object_key}/{object_key}{extension}'.format(
+            folder_name = folder_name,
+            object_key = object_key,
+            extension = extension.lower()
+        )
+
+        upload_id = VideoStorage().create_multipart_upload(path, data['content_type'])
+
+        return VideoUploadSession.objects.create(
+            owner_scope = folder_name,
+            name = data['name'],
+            relative_path = path,
+            content_type = data['content_type'],
+            size = data['size'],
+            chunk_size = settings.MULTIMEDIA_UPLOAD_PART_SIZE,
+            upload_id = upload_id
+        )
+
+
+class UploadVideoChunkSerializer(serializers.Serializer):
+    """
+    Serializer in charge of uploading a chunk of a video upload as the part of
+    its multipart upload with the same number. Every chunk must have chunk_size
+    bytes except the last one. A chunk uploaded again replaces the previous one.
+    The session of the upload is given in the context.
+    """
+
+    requires_context = True
+
+    number = serializers.IntegerField(min_value = 1)
+
+    chunk = serializers.FileField(allow_empty_file = False)
+
+    def validate(self, data):
+        session = self.context['session']
+
+        if session.state != VideoUploadSession.States.UPLOADING:
+            raise serializers.ValidationError('The upload is already {}'.format(session.get_state_display().lower()))
+
+        if is_upload_expired(session):
+            raise serializers.ValidationError('The upload expired, start it again')
+
+        if data['number'] > get_chunks_count(session):
+            raise serializers.ValidationError({'number': ['The upload has {} chunks'.format(get_chunks_count(session))]})
+
+        expected_size = get_chunk_size(session, data['number'])
+        if data['chunk'].size != expected_size:
+            raise serializers.ValidationError({'chunk': ['The chunk {} must have {} bytes'.format(
+                data['number'], expected_size
+            )]})
+
+        return data
+
+    def create(self, data):
+        session = self.context['session']
+
+        etag = VideoStorage().upload_part(
+            session.relative_path, session.upload_id, data['number'], data['chunk'].file
+        )
+
+        VideoUploadPart.objects.update_or_create(
+            session = session, number = data['number'],
+            defaults = {'etag': etag, 'size': data['chunk'].size}
+        )
+
+        return session
+
+
+class FinalizeVideoUploadSerializer(serializers.Serializer):
+    """
+    Serializer in charge of completing the multipart upload of a video once
+    all its chunks are uploaded and creating the video. Its duration is read
+    from the headers of the container with ranged reads, the video is never
+    read whole. The videos that aren't valid are deleted and their upload aborted.
+    Finalizing the same upload again returns the same video.
+    The session of the upload is given in the context.
+    """
+
+    requires_context = True
+
+    def validate(self, data):
+        session = self.context['session']
+
+        if session.state == VideoUploadSession.States.COMPLETED:
+            if not Video.objects.filter( relative_path = session.relative_path ).exists():
+                raise serializers.ValidationError('The video of the upload was deleted, start it again')
+
+            return data
+
+        if session.state == VideoUploadSession.States.ABORTED:
+            raise serializers.ValidationError('The upload was aborted, start it again')
+
+        if is_upload_expired(session):
+            raise serializers.ValidationError('The upload expired, start it again')
+
+        parts = list(session.parts.order_by('number').values_list('number', 'etag'))
+        received_numbers = {number for number, _ in parts}
+        missing_numbers = [
+            number for number in range(1, get_chunks_count(session) + 1) if number not in received_numbers
+        ]
+
+        if missing_numbers:
+            raise serializers.ValidationError('The chunks {} are missing'.format(
+                ', '.join(str(number) for number in missing_numbers)
+            ))
+
+        storage = VideoStorage()
+        path = session.relative_path
+
+        storage.complete_multipart_upload(path, session.upload_id, parts)
+
+        try:
+            metadata = storage.get_object_metadata(path)
+            content_type, length = probe_video(lambda start, size: storage.read_range(path, start, size))
+
+            if metadata is None or metadata['size'] != session.size or content_type != session.content_type:
+                raise ValueError("The video uploaded doesn't match the upload started")
+        except ValueError as e:
+            storage.delete(path)
+
+            session.state = VideoUploadSession.States.ABORTED
+            session.save(update_fields = ['state'])
+
+            raise serializers.ValidationError(str(e))
+
+        data['size'] = metadata['size']
+        data['length'] = length
+
+        return data
+
+    def create(self, data):
+        """Create the video of the upload, or return it if it was already finalized."""
+        session = self.context['session']
+        path = session.relative_path
+
+        with transaction.atomic():
+            video = Video.objects.select_for_update().filter( relative_path = path ).first()
+
+            if video is None:
+                videoname = os.path.basename(path)
+                _, video_extension = os.path.splitext(videoname)
+
+                video = Video.objects.create(
+                    name = videoname,
+                    relative_path = path,
+                    absolute_path = VideoStorage().url(path).split("?")[0],
+                    length = data['length'],
+                    size = data['size'], # size in bytes
+                    type = video_extension,
+                    uploaded = True
+                )
+
+            VideoUploadSession.objects.filter( id = session.id ).update(
+                state = VideoUploadSession.States.COMPLETED
+            )
+
+        return video
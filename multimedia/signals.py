@@ -0,0 +1,7 @@
+# Multimedia / signals.py
+
+from django.dispatch import Signal
+
+post_image_variants_create = Signal(providing_args=["sender", "instance"])
+
+post_image_duplicates_collapse = Signal(providing_args=["sender", "instance"])
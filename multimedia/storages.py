@@ -1,22 +1,267 @@
 # Multimedia storages
 
+# Django
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
+from django.utils.module_loading import import_string
+
 # Storages
 from storages.backends.s3boto3 import S3Boto3Storage
 
+# Utils
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+
+class MultimediaStorageMixin:
+    """
+    Operations over the objects of the multimedia buckets that S3Boto3Storage lacks:
+    streamed uploads, streamed reads, bulk deletes, the uploads straight from the clients
+    and the multipart uploads of the resumable uploads.
+    The objects of the public storages are read with unsigned urls (Through the CDN
+    of public_media_url) and are uploaded with MULTIMEDIA_PUBLIC_CACHE_CONTROL.
+    """
+
+    public = False
+    public_media_url = None
+
+    def get_object_name(self, name):
+        return self._encode_name(self._normalize_name(self._clean_name(name)))
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+
+        # The keys are never overwritten, the content of an url never changes
+        if self.public:
+            params['CacheControl'] = settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL
+
+        return params
+
+    def public_url(self, name):
+        """Return the unsigned url of the object, it never expires. Without public_media_url
+        it's the url of the bucket, only readable if the bucket is public."""
+        media_url = self.public_media_url or 'https://{}/'.format(
+            self.custom_domain or '{}.s3.amazonaws.com'.format(self.bucket_name)
+        )
+
+        return '{}{}'.format(media_url, filepath_to_uri(self.get_object_name(name)))
+
+    def update_cache_control(self, name):
+        """
+        Set MULTIMEDIA_PUBLIC_CACHE_CONTROL to the object uploaded without it, copying it
+        over itself with the same content type and metadata.
+        Return if the object was updated, the ones that already have it are skipped.
+        """
+
+        client = self.connection.meta.client
+        key = self.get_object_name(name)
+
+        response = client.head_object(Bucket = self.bucket_name, Key = key)
+        if response.get('CacheControl') == settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL:
+            return False
+
+        params = self._get_write_parameters(self._normalize_name(self._clean_name(name)))
+        params['CacheControl'] = settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL
+        params['ContentType'] = response.get('ContentType') or params['ContentType']
+
+        client.copy_object(
+            Bucket = self.bucket_name, Key = key, CopySource = {'Bucket': self.bucket_name, 'Key': key},
+            MetadataDirective = 'REPLACE', Metadata = response.get('Metadata', {}), **params
+        )
+
+        return True
+
+    def save_stream(self, name, stream, content_type = None):
+        """
+        Upload the stream given with the name, reading it once and in order.
+        The streams bigger than MULTIMEDIA_UPLOAD_PART_SIZE are uploaded in parts
+        (Multipart upload), so only a few parts are in memory at once.
+        Return the name of the object stored.
+        """
+
+        cleaned_name = self._clean_name(name)
+
+        params = self._get_write_parameters(self._normalize_name(cleaned_name))
+        if content_type:
+            params['ContentType'] = content_type
+
+        transfer_config = TransferConfig(
+            multipart_threshold = settings.MULTIMEDIA_UPLOAD_PART_SIZE,
+            multipart_chunksize = settings.MULTIMEDIA_UPLOAD_PART_SIZE,
+            max_concurrency = settings.MULTIMEDIA_UPLOAD_CONCURRENCY
+        )
+
+        self.bucket.Object(self.get_object_name(cleaned_name)).upload_fileobj(
+            stream, ExtraArgs = params, Config = transfer_config
+        )
+
+        return cleaned_name
+
+    def open_stream(self, name):
+        """Return a stream of the content of the object, read from the bucket as it's consumed."""
+        return self.bucket.Object(self.get_object_name(name)).get()['Body']
+
+    def get_object_metadata(self, name):
+        """Return the size and the content type of the object (HEAD), None if it doesn't exist."""
+        try:
+            response = self.connection.meta.client.head_object(
+                Bucket = self.bucket_name, Key = self.get_object_name(name)
+            )
+        except ClientError as e:
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                return None
+            raise
+
+        return {
+            'size': response['ContentLength'],
+            'content_type': response.get('ContentType'),
+        }
+
+    def delete_objects(self, names):
+        """Delete the objects with the names given with DeleteObjects, up to 1000 keys per request.
+        Return the names of the objects that couldn't be deleted."""
+        names = list(names)
+        failed_names = []
+
+        for start in range(0, len(names), 1000):
+            keys = {self.get_object_name(name): name for name in names[start:start + 1000]}
+
+            response = self.bucket.delete_objects(Delete = {
+                'Objects': [{'Key': key} for key in keys],
+                'Quiet': True
+            })
 
-class FileStorage(S3Boto3Storage):
-    """S3Boto3Storage for the file bucket"""
+            failed_names += [keys[error['Key']] for error in response.get('Errors', [])]
+
+        return failed_names
+
+    def copy_object(self, source_name, name):
+        """Copy the object with the source name to the name given, with its content type and metadata."""
+        params = {'ACL': self.default_acl} if self.default_acl else {}
+
+        self.connection.meta.client.copy_object(
+            Bucket = self.bucket_name, Key = self.get_object_name(name),
+            CopySource = {'Bucket': self.bucket_name, 'Key': self.get_object_name(source_name)}, **params
+        )
+
+    def get_presigned_upload(self, name, content_type, max_size, expires_in):
+        """
+        Return the url and the form fields of a presigned POST that lets a client
+        upload the object with the name straight to the bucket. It only accepts
+        that name, that content type and up to max_size bytes.
+        """
+
+        fields = {'Content-Type': content_type}
+        conditions = [
+            {'Content-Type': content_type},
+            ['content-length-range', 1, max_size],
+        ]
+
+        if self.default_acl:
+            fields['acl'] = self.default_acl
+            conditions.append({'acl': self.default_acl})
+
+        if self.public:
+            fields['Cache-Control'] = settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL
+            conditions.append({'Cache-Control': settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL})
+
+        return self.connection.meta.client.generate_presigned_post(
+            Bucket = self.bucket_name,
+            Key = self.get_object_name(name),
+            Fields = fields,
+            Conditions = conditions,
+            ExpiresIn = expires_in
+        )
+
+
+    def create_multipart_upload(self, name, content_type):
+        """Start a multipart upload of the object with the name. Return the id of the upload."""
+        cleaned_name = self._clean_name(name)
+
+        params = self._get_write_parameters(self._normalize_name(cleaned_name))
+        params['ContentType'] = content_type
+
+        response = self.connection.meta.client.create_multipart_upload(
+            Bucket = self.bucket_name, Key = self.get_object_name(cleaned_name), **params
+        )
+
+        return response['UploadId']
+
+    def upload_part(self, name, upload_id, number, body):
+        """Upload the part with the number given (From 1) of the multipart upload. Return its ETag."""
+        response = self.connection.meta.client.upload_part(
+            Bucket = self.bucket_name, Key = self.get_object_name(name),
+            UploadId = upload_id, PartNumber = number, Body = body
+        )
+
+        return response['ETag']
+
+    def complete_multipart_upload(self, name, upload_id, parts):
+        """Join the parts uploaded, (number, ETag) in order, into the object with the name."""
+        self.connection.meta.client.complete_multipart_upload(
+            Bucket = self.bucket_name, Key = self.get_object_name(name), UploadId = upload_id,
+            MultipartUpload = {'Parts': [{'PartNumber': number, 'ETag': etag} for number, etag in parts]}
+        )
+
+    def abort_multipart_upload(self, name, upload_id):
+        """Abort the multipart upload and delete its parts, if it wasn't completed or aborted already."""
+        try:
+            self.connection.meta.client.abort_multipart_upload(
+                Bucket = self.bucket_name, Key = self.get_object_name(name), UploadId = upload_id
+            )
+        except ClientError as e:
+            if e.response['ResponseMetadata']['HTTPStatusCode'] != 404:
+                raise
+
+    def read_range(self, name, start, length):
+        """Return up to length bytes of the object from the start given (Ranged GET)."""
+        try:
+            response = self.connection.meta.client.get_object(
+                Bucket = self.bucket_name, Key = self.get_object_name(name),
+                Range = 'bytes={}-{}'.format(start, start + length - 1)
+            )
+        except ClientError as e:
+            # The ranges after the end of the object
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 416:
+                return b''
+            raise
+
+        return response['Body'].read()
+
+
+class S3MultimediaStorage(MultimediaStorageMixin, S3Boto3Storage):
+    """Storage of the multimedia in the S3 buckets"""
+
+
+# The backend of the buckets is chosen by settings when the module is loaded
+# (The S3 buckets, or a local directory or the memory in multimedia.backends)
+MultimediaStorage = import_string(settings.MULTIMEDIA_STORAGE_BACKEND)
+
+
+class FileStorage(MultimediaStorage):
+    """Storage for the file bucket"""
 
     bucket_name = 'business-network-profile-files'
 
 
-class ImageStorage(S3Boto3Storage):
-    """S3Boto3Storage for the image bucket"""
+class ImageStorage(MultimediaStorage):
+    """Storage for the image bucket"""
 
     bucket_name = 'business-network-profile-images'
 
+    # The images are shown by the public profiles and products, their keys are unguessable.
+    # The bucket is private, they are read unsigned only through the CDN that can read it
+    public = settings.MULTIMEDIA_PUBLIC_IMAGES_URL is not None
+    public_media_url = settings.MULTIMEDIA_PUBLIC_IMAGES_URL
+
+
+class VideoStorage(MultimediaStorage):
+    """Storage for the video bucket"""
+
+    bucket_name = 'business-network-profile-videos'
 
-class VideoStorage(S3Boto3Storage):
-    """S3Boto3Storage for the video bucket"""
 
-    bucket_name = 'business-network-profile-videos'
\ No newline at end of file
+BUCKET_STORAGES = {
+    storage_class.bucket_name: storage_class
+    for storage_class in (FileStorage, ImageStorage, VideoStorage)
+}
@@ -1,3 +1,1030 @@
-from django.test import TestCase
+# Multimedia tests
 
-# Create your tests here.
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+# Django REST framework
+from rest_framework.test import APIClient
+
+# Models
+from multimedia.models import File, Image, ImageVariant, MediaCollectionCheckpoint, Video, VideoUploadSession
+from suppliers.models import Product, ProductImage
+from users.models import User
+
+# Serializers
+from multimedia.serializers import (
+    RequestImageUploadSerializer, FinalizeImageUploadSerializer,
+    RequestFileUploadSerializer, FinalizeFileUploadSerializer,
+    CreateImagesSerializer, CreateFilesSerializer
+)
+
+# Cache
+from multimedia.cache import get_signed_image_urls
+
+# Ingestion
+from multimedia.ingestion import probe_image_stream, probe_uploaded_image
+
+# Variants
+from multimedia.variants import generate_image_variants, get_image_variant_path
+
+# References
+from multimedia.references import get_stored_paths
+
+# Deduplication
+from multimedia.deduplication import collapse_duplicates
+
+# Garbage collection
+from multimedia.garbage import abort_expired_uploads, collect_orphans
+
+# Storages
+from multimedia.backends import LocalMultimediaStorage, MemoryMultimediaStorage
+from multimedia.storages import BUCKET_STORAGES, FileStorage, ImageStorage, S3MultimediaStorage, VideoStorage
+
+# Fixtures
+from searches.tests import MarketTransactionTestCase
+
+# Pillow
+from PIL import Image as PillowImage
+
+# Utils
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+import hashlib
+import io
+import os
+import struct
+import tempfile
+
+
+class MemoryImageStorage(MemoryMultimediaStorage):
+    bucket_name = ImageStorage.bucket_name
+
+
+class MemoryFileStorage(MemoryMultimediaStorage):
+    bucket_name = FileStorage.bucket_name
+
+
+class MemoryVideoStorage(MemoryMultimediaStorage):
+    bucket_name = VideoStorage.bucket_name
+
+
+class LocalImageStorage(LocalMultimediaStorage):
+    bucket_name = ImageStorage.bucket_name
+
+
+class PresignedUploadsTestCase(TestCase):
+    """
+    Uploads straight to the buckets against the in-memory storage: the client
+    uploads with the presigned POST (multimedia.views.media receives it with
+    the same conditions as S3) and finalizes the upload with its token.
+    """
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+
+        patches = [
+            mock.patch.dict(BUCKET_STORAGES, {
+                MemoryImageStorage.bucket_name: MemoryImageStorage,
+                MemoryFileStorage.bucket_name: MemoryFileStorage,
+            }),
+            mock.patch.object(RequestImageUploadSerializer, 'storage_class', MemoryImageStorage),
+            mock.patch.object(FinalizeImageUploadSerializer, 'storage_class', MemoryImageStorage),
+            mock.patch.object(RequestFileUploadSerializer, 'storage_class', MemoryFileStorage),
+            mock.patch.object(FinalizeFileUploadSerializer, 'storage_class', MemoryFileStorage),
+            # The variants are generated in the background after the commit
+            mock.patch('multimedia.serializers.uploads.image_variants_pool'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user = user, token = SimpleNamespace(payload = {'company_accountname': 'acme'})
+        )
+
+    def get_png(self, color):
+        output = io.BytesIO()
+        PillowImage.new('RGB', (64, 32), color).save(output, 'PNG')
+
+        return output.getvalue()
+
+    def request_upload(self, kind, name, content, content_type):
+        response = self.client.post('/{}s/uploads/'.format(kind), {
+            'name': name, 'size': len(content), 'content_type': content_type
+        }, format = 'json')
+        self.assertEqual(response.status_code, 201)
+
+        return response.data
+
+    def upload(self, upload, content, name):
+        fields = dict(upload['fields'], file = io.BytesIO(content))
+        fields['file'].name = name
+
+        return APIClient().post(upload['url'], fields, format = 'multipart')
+
+    def finalize(self, kind, upload):
+        return self.client.post('/{}s/uploads/finalize/'.format(kind), {
+            'upload_token': upload['upload_token']
+        }, format = 'json')
+
+    def test_finalize_image_upload(self):
+        content = self.get_png('red')
+        upload = self.request_upload('image', 'photo.png', content, 'image/png')
+
+        self.assertEqual(self.upload(upload, content, 'photo.png').status_code, 204)
+        response = self.finalize('image', upload)
+
+        self.assertEqual(response.status_code, 201)
+        image = Image.objects.get( id = response.data['id'] )
+        self.assertEqual((image.width, image.height, image.size), ('64', '32', str(len(content))))
+        self.assertEqual(image.owner_scope, 'acme')
+
+        storage = MemoryImageStorage()
+        self.assertNotEqual(image.relative_path, upload['fields']['key'])
+        self.assertFalse(storage.exists(upload['fields']['key']))
+        self.assertEqual(storage.open_stream(image.relative_path).read(), content)
+
+    def test_upload_after_finalize_does_not_overwrite_the_image(self):
+        content = self.get_png('red')
+        upload = self.request_upload('image', 'photo.png', content, 'image/png')
+        self.upload(upload, content, 'photo.png')
+        image_id = self.finalize('image', upload).data['id']
+
+        # The presigned POST is still valid, but it only covers the staging key
+        other_content = self.get_png('blue') * 2
+        self.assertEqual(self.upload(upload, other_content, 'photo.png').status_code, 204)
+        response = self.finalize('image', upload)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['id'], image_id)
+
+        image = Image.objects.get( id = image_id )
+        self.assertEqual(MemoryImageStorage().open_stream(image.relative_path).read(), content)
+        self.assertEqual(Image.objects.count(), 1)
+
+    def test_finalize_before_upload(self):
+        upload = self.request_upload('image', 'photo.png', b'x' * 10, 'image/png')
+        response = self.finalize('image', upload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('upload_token', response.data)
+
+    def test_finalize_rejects_an_invalid_image(self):
+        content = b'not an image at all'
+        upload = self.request_upload('image', 'photo.png', content, 'image/png')
+        self.upload(upload, content, 'photo.png')
+
+        response = self.finalize('image', upload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Image.objects.exists())
+        self.assertEqual(MemoryMultimediaStorage.buckets[MemoryImageStorage.bucket_name], {})
+
+    def test_upload_rejects_other_content_type(self):
+        content = self.get_png('red')
+        upload = self.request_upload('image', 'photo.png', content, 'image/png')
+        upload['fields']['Content-Type'] = 'image/jpeg'
+
+        self.assertEqual(self.upload(upload, content, 'photo.png').status_code, 403)
+
+    def test_request_rejects_the_uploads_out_of_the_limits(self):
+        response = self.client.post('/images/uploads/', {
+            'name': 'photo.bmp', 'size': settings.MULTIMEDIA_IMAGE_MAX_SIZE + 1, 'content_type': 'image/bmp'
+        }, format = 'json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'size', 'content_type'})
+
+    def test_finalize_by_another_account(self):
+        content = self.get_png('red')
+        upload = self.request_upload('image', 'photo.png', content, 'image/png')
+        self.upload(upload, content, 'photo.png')
+
+        other_user = User.objects.create_user('owner@globex.com', 'x12345678', 'Globex Owner')
+        self.client.force_authenticate(
+            user = other_user, token = SimpleNamespace(payload = {'company_accountname': 'globex'})
+        )
+        response = self.finalize('image', upload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('upload_token', response.data)
+        self.assertFalse(Image.objects.exists())
+
+    def test_finalize_file_upload(self):
+        content = b'%PDF-1.4 document'
+        upload = self.request_upload('file', 'rut.pdf', content, 'application/pdf')
+        self.upload(upload, content, 'rut.pdf')
+
+        response = self.finalize('file', upload)
+
+        self.assertEqual(response.status_code, 201)
+        file = File.objects.get( id = response.data['id'] )
+        self.assertEqual((file.name, file.size), ('rut.pdf', str(len(content))))
+        self.assertFalse(MemoryFileStorage().exists(upload['fields']['key']))
+
+
+class ImageDeduplicationTestCase(TransactionTestCase):
+    """
+    The uploads of a content already uploaded return its image, that the collection
+    of orphans must keep. The objects are deleted from the bucket after the commit,
+    so the transactions are real.
+    """
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+
+        patches = [
+            mock.patch('multimedia.serializers.images.ImageStorage', MemoryImageStorage),
+            mock.patch('multimedia.serializers.images.image_variants_pool'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user = user, token = SimpleNamespace(payload = {'company_accountname': 'acme'})
+        )
+
+    def upload_image(self, content):
+        image_file = io.BytesIO(content)
+        image_file.name = 'photo.png'
+
+        response = self.client.post('/images/', {'image': image_file}, format = 'multipart')
+        self.assertEqual(response.status_code, 201)
+
+        return response.data['id']
+
+    def get_png(self):
+        output = io.BytesIO()
+        PillowImage.new('RGB', (64, 32), 'red').save(output, 'PNG')
+
+        return output.getvalue()
+
+    def collect_image_orphans(self):
+        return collect_orphans(
+            'image', Image, MemoryImageStorage(), settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD, restart = True
+        )
+
+    def test_same_content_returns_the_same_image(self):
+        content = self.get_png()
+
+        self.assertEqual(self.upload_image(content), self.upload_image(content))
+        self.assertEqual(Image.objects.count(), 1)
+
+    def test_old_orphan_uploaded_again_is_not_collected(self):
+        content = self.get_png()
+        image_id = self.upload_image(content)
+
+        # The image was detached from everything long ago
+        old_date = timezone.now() - timedelta(seconds = settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD + 60)
+        Image.objects.filter( id = image_id ).update( created_date = old_date )
+
+        self.assertEqual(self.upload_image(content), image_id)
+        self.collect_image_orphans()
+
+        image = Image.objects.get( id = image_id )
+        self.assertTrue(MemoryImageStorage().exists(image.relative_path))
+
+    def test_old_orphan_is_collected(self):
+        image_id = self.upload_image(self.get_png())
+        image = Image.objects.get( id = image_id )
+
+        old_date = timezone.now() - timedelta(seconds = settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD + 60)
+        Image.objects.filter( id = image_id ).update( created_date = old_date )
+
+        self.assertEqual(self.collect_image_orphans()[0], 1)
+
+        self.assertFalse(Image.objects.filter( id = image_id ).exists())
+        self.assertFalse(MemoryImageStorage().exists(image.relative_path))
+
+
+
+class ImageBatchTestCase(TestCase):
+    """The paths of the images of a batch are signed at once, and the signed urls are cached."""
+
+    def setUp(self):
+        cache.clear()
+
+        patch = mock.patch('multimedia.cache.ImageStorage', MemoryImageStorage)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.images = [
+            Image.objects.create(
+                name = name, relative_path = 'acme/{}'.format(name), width = 64, height = 32, size = 100, type = '.png'
+            )
+            for name in ('logo.png', 'cover.png')
+        ]
+
+    def test_images_batch(self):
+        ids = [image.id for image in self.images]
+
+        with mock.patch.object(MemoryImageStorage, 'url', autospec = True, side_effect = MemoryImageStorage.url) as url:
+            response = self.client.get('/images/batch/', {'ids': '{},0,{}'.format(ids[1], ids[0])})
+            self.client.get('/images/batch/', {'ids': ','.join(map(str, ids))})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results']), [ids[1], 0, ids[0]])
+        self.assertIn('/acme/cover.png?expires=', response.data['results'][ids[1]]['path'])
+        self.assertEqual(response.data['not_found'], [0])
+
+        # Signed once each one
+        self.assertEqual(url.call_count, 2)
+
+    def test_invalid_batch(self):
+        self.assertEqual(self.client.get('/images/batch/', {'ids': 'logo'}).status_code, 400)
+
+
+class ImageIngestionTestCase(TestCase):
+    """The uploaded images are probed from their header and hashed in the same read."""
+
+    def get_image(self, image_format, size = (64, 32)):
+        output = io.BytesIO()
+        PillowImage.new('RGB', size, 'red').save(output, image_format)
+
+        return output.getvalue()
+
+    def test_formats_probed(self):
+        for image_format in ('PNG', 'JPEG', 'GIF', 'WEBP'):
+            content = self.get_image(image_format)
+            image_object = SimpleUploadedFile('photo', content)
+
+            self.assertEqual(
+                probe_uploaded_image(image_object),
+                (image_format, 64, 32, hashlib.sha256(content).hexdigest())
+            )
+
+            # The file is read again by the upload
+            self.assertEqual(image_object.read(), content)
+
+    def test_content_hashed_after_the_header(self):
+        output = io.BytesIO()
+        PillowImage.frombytes('RGB', (512, 512), os.urandom(512 * 512 * 3)).save(output, 'PNG')
+        content = output.getvalue()
+
+        self.assertEqual(
+            probe_uploaded_image(SimpleUploadedFile('photo.png', content), max_header_size = 1024),
+            ('PNG', 512, 512, hashlib.sha256(content).hexdigest())
+        )
+
+    def test_stream_read_until_the_header(self):
+        output = io.BytesIO()
+        PillowImage.frombytes('RGB', (512, 512), os.urandom(512 * 512 * 3)).save(output, 'PNG')
+        output.seek(0)
+
+        self.assertEqual(probe_image_stream(output), ('PNG', 512, 512))
+        self.assertEqual(output.tell(), 1024)
+
+    def test_invalid_images(self):
+        for content in (b'not an image at all', self.get_image('PNG')[:8] + b'corrupted' * 10):
+            with self.assertRaises(ValueError):
+                probe_uploaded_image(SimpleUploadedFile('photo.png', content))
+
+
+class ImageVariantsTestCase(TestCase):
+    """The variants of the images are resized to the widths of IMAGE_VARIANT_WIDTHS, never upscaled."""
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+
+        patch = mock.patch('multimedia.variants.ImageStorage', MemoryImageStorage)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def create_image(self, pillow_image, image_format, extension, **save_options):
+        output = io.BytesIO()
+        pillow_image.save(output, image_format, **save_options)
+        output.seek(0)
+
+        relative_path = MemoryImageStorage().save_stream('acme/key/key{}'.format(extension), output)
+
+        return Image.objects.create(
+            name = 'key{}'.format(extension), relative_path = relative_path, width = pillow_image.width,
+            height = pillow_image.height, size = output.tell(), type = extension
+        )
+
+    def get_variants(self, image):
+        return set(image.variants.values_list('width', 'height', 'format'))
+
+    def test_variants_generated(self):
+        image = self.create_image(PillowImage.new('RGB', (600, 300), 'red'), 'JPEG', '.jpg')
+
+        generate_image_variants(image)
+
+        self.assertEqual(self.get_variants(image), {
+            (160, 80, 'JPEG'), (480, 240, 'JPEG'), (160, 80, 'WEBP'), (480, 240, 'WEBP')
+        })
+
+        variant = image.variants.get( width = 480, format = 'WEBP' )
+        self.assertEqual(variant.relative_path, 'acme/key/key_480.webp')
+        with PillowImage.open(MemoryImageStorage().open(variant.relative_path)) as pillow_image:
+            self.assertEqual((pillow_image.format, pillow_image.size), ('WEBP', (480, 240)))
+
+        # The variants that already exist are skipped
+        self.assertEqual(generate_image_variants(image), [])
+        self.assertEqual(ImageVariant.objects.count(), 4)
+
+    def test_variants_in_the_displayed_orientation(self):
+        # A photo taken rotated, stored as 300 x 600 and displayed as 600 x 300
+        exif = PillowImage.Exif()
+        exif[0x0112] = 6
+        image = self.create_image(PillowImage.new('RGB', (300, 600), 'red'), 'JPEG', '.jpg', exif = exif.tobytes())
+
+        generate_image_variants(image)
+
+        self.assertEqual(self.get_variants(image), {
+            (160, 80, 'JPEG'), (480, 240, 'JPEG'), (160, 80, 'WEBP'), (480, 240, 'WEBP')
+        })
+
+    def test_transparency_kept_in_png(self):
+        image = self.create_image(PillowImage.new('RGBA', (200, 100), (255, 0, 0, 0)), 'PNG', '.png')
+
+        generate_image_variants(image)
+
+        self.assertEqual(self.get_variants(image), {(160, 80, 'PNG'), (160, 80, 'WEBP')})
+
+    def test_narrow_image_gets_only_its_webp(self):
+        image = self.create_image(PillowImage.new('RGB', (100, 50), 'red'), 'PNG', '.png')
+
+        generate_image_variants(image)
+
+        self.assertEqual(self.get_variants(image), {(100, 50, 'WEBP')})
+
+    def test_variant_that_fits_the_width(self):
+        image = self.create_image(PillowImage.new('RGB', (600, 300), 'red'), 'JPEG', '.jpg')
+        generate_image_variants(image)
+
+        self.assertEqual(get_image_variant_path(image, 200), 'acme/key/key_480.jpg')
+        self.assertEqual(get_image_variant_path(image, 200, 'WEBP'), 'acme/key/key_480.webp')
+        self.assertEqual(get_image_variant_path(image, 1280), image.relative_path)
+        self.assertEqual(get_image_variant_path(image, 1280, 'WEBP'), 'acme/key/key_480.webp')
+        self.assertEqual(get_image_variant_path(image), image.relative_path)
+
+
+class ImageDuplicatesCollapseTestCase(MarketTransactionTestCase):
+    """
+    The images with the same content of the same account are collapsed into the oldest one,
+    with the references to the duplicates pointed to it and the caches that show them invalidated.
+    """
+
+    def setUp(self):
+        super().setUp()
+        MemoryMultimediaStorage.buckets.clear()
+
+        patch = mock.patch('multimedia.cache.ImageStorage', MemoryImageStorage)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.storage = MemoryImageStorage()
+        self.images = [
+            self.create_image('acme/{}/photo.png'.format(key), color)
+            for key, color in (('a', 'red'), ('b', 'red'), ('c', 'blue'))
+        ]
+
+    def create_image(self, relative_path, color):
+        output = io.BytesIO()
+        PillowImage.new('RGB', (64, 32), color).save(output, 'PNG')
+        output.seek(0)
+
+        self.storage.save_stream(relative_path, output)
+
+        # Uploaded before the images were hashed
+        return Image.objects.create(
+            name = 'photo.png', relative_path = relative_path, width = 64,
+            height = 32, size = output.tell(), type = '.png', uploaded = True
+        )
+
+    def test_duplicates_collapsed(self):
+        kept_image, duplicate_image, other_image = self.images
+
+        product = self.create_product('Mango', principal_image = duplicate_image)
+        ProductImage.objects.create( product = product, image = kept_image )
+        ProductImage.objects.create( product = product, image = duplicate_image )
+        ProductImage.objects.create( product = product, image = other_image )
+        changed_at = Product.objects.get( id = product.id ).changed_at
+
+        self.assertEqual(collapse_duplicates(Image, self.storage, dry_run = True), (1, 2))
+        self.assertEqual(Image.objects.count(), 3)
+
+        self.assertEqual(collapse_duplicates(Image, self.storage), (1, 2))
+
+        self.assertFalse(Image.objects.filter( id = duplicate_image.id ).exists())
+        self.assertFalse(self.storage.exists(duplicate_image.relative_path))
+
+        product = Product.objects.get( id = product.id )
+        self.assertEqual(product.principal_image_id, kept_image.id)
+        self.assertGreater(product.changed_at, changed_at)
+
+        # The product had both as secondary images, it keeps one
+        self.assertEqual(
+            sorted(ProductImage.objects.filter( product = product ).values_list('image_id', flat = True)),
+            [kept_image.id, other_image.id]
+        )
+
+        kept_image.refresh_from_db()
+        self.assertEqual((kept_image.owner_scope, len(kept_image.content_hash)), ('acme', 64))
+
+        # Everything is written already
+        self.assertEqual(collapse_duplicates(Image, self.storage), (0, 0))
+
+    def test_product_detail_invalidated(self):
+        kept_image, duplicate_image, _ = self.images
+        product = self.create_product('Mango', principal_image = duplicate_image)
+
+        response = self.client.get('/products/{}/'.format(product.id))
+        self.assertEqual(response.data['principal_image']['id'], duplicate_image.id)
+
+        collapse_duplicates(Image, self.storage)
+
+        response = self.client.get('/products/{}/'.format(product.id))
+        self.assertEqual(response.data['principal_image']['id'], kept_image.id)
+
+
+class OrphansCollectionTestCase(MarketTransactionTestCase):
+    """
+    The orphans are checked again by the DELETE, so the ones referenced after they were
+    selected are kept, and their objects are deleted from the bucket only after the commit.
+    """
+
+    def setUp(self):
+        super().setUp()
+        MemoryMultimediaStorage.buckets.clear()
+
+        self.storage = MemoryImageStorage()
+        old_date = timezone.now() - timedelta(seconds = settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD + 60)
+
+        self.images = []
+        for key in ('a', 'b'):
+            relative_path = self.storage.save_stream('acme/{0}/{0}.png'.format(key), io.BytesIO(b'image'))
+            image = Image.objects.create(
+                name = '{}.png'.format(key), relative_path = relative_path, width = 64,
+                height = 32, size = 5, type = '.png', created_date = old_date
+            )
+            ImageVariant.objects.create(
+                image = image, width = 160, height = 80, format = 'WEBP', size = 4,
+                relative_path = self.storage.save_stream('acme/{0}/{0}_160.webp'.format(key), io.BytesIO(b'webp'))
+            )
+            self.images.append(image)
+
+        # An orphan still in the grace period
+        Image.objects.create(
+            name = 'c.png', relative_path = 'acme/c/c.png', width = 64, height = 32, size = 5, type = '.png'
+        )
+
+    def collect_image_orphans(self, **options):
+        return collect_orphans(
+            'image', Image, self.storage, settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD, restart = True, **options
+        )
+
+    def test_orphans_collected(self):
+        self.create_product('Mango', principal_image = self.images[1])
+
+        self.assertEqual(self.collect_image_orphans( dry_run = True ), (1, 2, 5))
+        self.assertEqual(Image.objects.count(), 3)
+
+        self.assertEqual(self.collect_image_orphans(), (1, 2, 5))
+
+        self.assertEqual(sorted(Image.objects.values_list('name', flat = True)), ['b.png', 'c.png'])
+        self.assertEqual(sorted(self.storage.objects), ['acme/b/b.png', 'acme/b/b_160.webp'])
+        self.assertEqual(MediaCollectionCheckpoint.objects.get( model = 'image' ).last_id, 0)
+
+    def test_orphan_referenced_after_its_selection_is_kept(self):
+        image = self.images[0]
+
+        def reference_image(model, ids):
+            # A product gets the image once the collection selected it
+            self.create_product('Mango', principal_image = image)
+            return get_stored_paths(model, ids)
+
+        with mock.patch('multimedia.garbage.get_stored_paths', side_effect = reference_image):
+            self.assertEqual(self.collect_image_orphans(), (1, 2, 5))
+
+        self.assertTrue(Image.objects.filter( id = image.id ).exists())
+        self.assertEqual(image.variants.count(), 1)
+        self.assertTrue(self.storage.exists(image.relative_path))
+        self.assertFalse(self.storage.exists(self.images[1].relative_path))
+
+    def test_objects_kept_when_the_collection_rolls_back(self):
+        try:
+            with transaction.atomic():
+                self.collect_image_orphans()
+                raise ValueError()
+        except ValueError:
+            pass
+
+        self.assertEqual(Image.objects.count(), 3)
+        self.assertEqual(len(self.storage.objects), 4)
+
+
+class OfflineStoragesMixin:
+    """The local and in-memory storages have the semantics of the S3 ones, their urls are served by multimedia.views.media."""
+
+    storage_class = None
+
+    def setUp(self):
+        patch = mock.patch.dict(BUCKET_STORAGES, {self.storage_class.bucket_name: self.storage_class})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.storage = self.storage_class()
+
+    def test_streams(self):
+        name = self.storage.save_stream('/acme/key/photo.png', io.BytesIO(b'image'), content_type = 'image/png')
+
+        self.assertEqual(name, 'acme/key/photo.png')
+        self.assertEqual(self.storage.open_stream(name).read(), b'image')
+        self.assertEqual(self.storage.read_range(name, 1, 3), b'mag')
+        self.assertEqual(self.storage.read_range(name, 10, 3), b'')
+        self.assertEqual(self.storage.get_object_metadata(name), {'size': 5, 'content_type': 'image/png'})
+        self.assertIsNone(self.storage.get_object_metadata('acme/key/missing.png'))
+
+        # The objects are overwritten, as in the buckets
+        self.storage.save_stream(name, io.BytesIO(b'other image'))
+        self.assertEqual(self.storage.open_stream(name).read(), b'other image')
+
+    def test_delete_objects(self):
+        names = [self.storage.save_stream('acme/{}.png'.format(key), io.BytesIO(b'image')) for key in 'ab']
+
+        self.assertEqual(self.storage.delete_objects(names + ['acme/missing.png']), [])
+        self.assertFalse(any(self.storage.exists(name) for name in names))
+
+    def test_multipart_upload(self):
+        upload_id = self.storage.create_multipart_upload('acme/key/video.mp4', 'video/mp4')
+        etags = [
+            self.storage.upload_part('acme/key/video.mp4', upload_id, number, io.BytesIO(chunk))
+            for number, chunk in ((2, b'world'), (1, b'hello '))
+        ]
+
+        self.storage.complete_multipart_upload('acme/key/video.mp4', upload_id, [(1, etags[1]), (2, etags[0])])
+
+        self.assertEqual(self.storage.open_stream('acme/key/video.mp4').read(), b'hello world')
+        self.assertEqual(etags[1], '"{}"'.format(hashlib.md5(b'hello ').hexdigest()))
+        self.assertEqual(self.storage.listdir(self.storage.UPLOADS_PREFIX)[1], [])
+
+    def test_signed_urls(self):
+        name = self.storage.save_stream('acme/key/photo.png', io.BytesIO(b'image'), content_type = 'image/png')
+        url = self.storage.url(name)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'image')
+        self.assertEqual(response['Content-Type'], 'image/png')
+
+        self.assertEqual(self.client.get(url.replace('signature=', 'signature=x')).status_code, 403)
+        self.assertEqual(self.client.get(url.split('?')[0]).status_code, 403)
+
+        with mock.patch('multimedia.backends.time.time', return_value = 0):
+            expired_url = self.storage.url(name)
+        self.assertEqual(self.client.get(expired_url).status_code, 403)
+
+
+class LocalStorageTestCase(OfflineStoragesMixin, TestCase):
+
+    storage_class = LocalImageStorage
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        local_root = override_settings( MULTIMEDIA_LOCAL_STORAGE_ROOT = directory.name )
+        local_root.enable()
+        self.addCleanup(local_root.disable)
+
+        super().setUp()
+
+
+class MemoryStorageTestCase(OfflineStoragesMixin, TestCase):
+
+    storage_class = MemoryImageStorage
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+        super().setUp()
+
+
+class BulkUploadTestCase(TestCase):
+    """The parts of a bulk upload are validated and uploaded concurrently, each one with its own result."""
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+
+        patches = [
+            mock.patch.object(CreateImagesSerializer, 'storage_class', MemoryImageStorage),
+            mock.patch.object(CreateFilesSerializer, 'storage_class', MemoryFileStorage),
+            mock.patch('multimedia.serializers.images.ImageStorage', MemoryImageStorage),
+            mock.patch('multimedia.serializers.files.FileStorage', MemoryFileStorage),
+            mock.patch('multimedia.serializers.bulk.image_variants_pool'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user = user, token = SimpleNamespace(payload = {'company_accountname': 'acme'})
+        )
+
+    def get_part(self, name, content):
+        part = io.BytesIO(content)
+        part.name = name
+
+        return part
+
+    def get_png(self, color):
+        output = io.BytesIO()
+        PillowImage.new('RGB', (64, 32), color).save(output, 'PNG')
+
+        return output.getvalue()
+
+    def bulk_upload(self, kind, parts):
+        return self.client.post('/{}s/bulk/'.format(kind), {
+            '{}s'.format(kind): [self.get_part(name, content) for name, content in parts]
+        }, format = 'multipart')
+
+    def test_images_bulk_upload(self):
+        red_image, blue_image = self.get_png('red'), self.get_png('blue')
+
+        response = self.bulk_upload('image', [
+            ('red.png', red_image), ('red_again.png', red_image), ('blue.png', blue_image), ('notes.txt', b'notes')
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'existing', 'created', 'invalid'])
+        # The ids are only returned by the bulk inserts of PostgreSQL, the names are unique keys
+        self.assertEqual(results[0]['image']['name'], results[1]['image']['name'])
+        self.assertNotEqual(results[0]['image']['name'], results[2]['image']['name'])
+        self.assertIsNone(results[3]['image'])
+        self.assertTrue(results[3]['errors'])
+
+        self.assertEqual(Image.objects.filter( owner_scope = 'acme' ).count(), 2)
+        self.assertEqual(len(MemoryMultimediaStorage.buckets[MemoryImageStorage.bucket_name]), 2)
+
+        # The contents already uploaded by the account are not uploaded again
+        response = self.bulk_upload('image', [('red.png', red_image)])
+        self.assertEqual(response.data['results'][0]['status'], 'existing')
+        self.assertEqual(response.data['results'][0]['image']['name'], results[0]['image']['name'])
+        self.assertEqual(Image.objects.count(), 2)
+
+    def test_upload_failed_does_not_fail_the_others(self):
+        red_image, blue_image = self.get_png('red'), self.get_png('blue')
+        save_stream = MemoryImageStorage.save_stream
+
+        def fail_blue_image(storage, name, stream, content_type = None):
+            if stream.read() == blue_image:
+                raise OSError('The bucket is not available')
+
+            stream.seek(0)
+            return save_stream(storage, name, stream, content_type)
+
+        with mock.patch.object(MemoryImageStorage, 'save_stream', fail_blue_image), \
+            self.assertLogs('multimedia.serializers.bulk', 'ERROR'):
+            response = self.bulk_upload('image', [('red.png', red_image), ('blue.png', blue_image)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'failed'])
+        self.assertEqual(Image.objects.count(), 1)
+
+    def test_files_bulk_upload(self):
+        response = self.bulk_upload('file', [('rut.pdf', b'%PDF-1.4 rut'), ('camara.pdf', b'%PDF-1.4 camara')])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'created'])
+        self.assertEqual(File.objects.count(), 2)
+
+    def test_too_many_parts(self):
+        parts = [('red.png', self.get_png('red'))] * (settings.MULTIMEDIA_BULK_UPLOAD_MAX_FILES + 1)
+        response = self.bulk_upload('image', parts)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Image.objects.exists())
+
+
+@override_settings( MULTIMEDIA_UPLOAD_PART_SIZE = 64 )
+class VideoUploadsTestCase(TestCase):
+    """The videos are uploaded in chunks, the parts of a multipart upload, and finalized once all are uploaded."""
+
+    def setUp(self):
+        MemoryMultimediaStorage.buckets.clear()
+
+        patch = mock.patch('multimedia.serializers.videos.VideoStorage', MemoryVideoStorage)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user = user, token = SimpleNamespace(payload = {'company_accountname': 'acme'})
+        )
+
+    def get_box(self, box_type, content):
+        return struct.pack('>I4s', len(content) + 8, box_type) + content
+
+    def get_mp4(self, timescale = 1000, duration = 90000):
+        movie_header = bytes(12) + struct.pack('>II', timescale, duration) + bytes(80)
+
+        return (
+            self.get_box(b'ftyp', b'isom' + bytes(4) + b'isomiso2') +
+            self.get_box(b'moov', self.get_box(b'mvhd', movie_header)) +
+            self.get_box(b'mdat', bytes(40))
+        )
+
+    def start_upload(self, content, content_type = 'video/mp4'):
+        response = self.client.post('/videos/uploads/', {
+            'name': 'Demo.MP4', 'size': len(content), 'content_type': content_type
+        }, format = 'json')
+        self.assertEqual(response.status_code, 201)
+
+        return response.data
+
+    def upload_chunk(self, session, number, content):
+        chunk = content[(number - 1) * session['chunk_size']:number * session['chunk_size']]
+
+        return self.client.put(
+            '/videos/uploads/{}/chunks/{}/'.format(session['id'], number), chunk,
+            content_type = 'application/octet-stream'
+        )
+
+    def finalize(self, session):
+        return self.client.post('/videos/uploads/{}/finalize/'.format(session['id']))
+
+    def test_video_uploaded_in_chunks(self):
+        content = self.get_mp4()
+        session = self.start_upload(content)
+        self.assertEqual((session['chunk_size'], session['chunks_count']), (64, 3))
+
+        # The chunks are uploaded in any order, the offset counts the ones without gaps
+        response = self.upload_chunk(session, 2, content)
+        self.assertEqual((response.data['received_chunks'], response.data['offset']), ([2], 0))
+
+        self.assertEqual(self.finalize(session).status_code, 400)
+
+        for number in (1, 3):
+            self.assertEqual(self.upload_chunk(session, number, content).status_code, 200)
+
+        response = self.client.get('/videos/uploads/{}/'.format(session['id']))
+        self.assertEqual(response.data['offset'], len(content))
+
+        response = self.finalize(session)
+
+        self.assertEqual(response.status_code, 201)
+        video = Video.objects.get( id = response.data['id'] )
+        self.assertEqual((video.length, int(video.size), video.type), (90.0, len(content), '.mp4'))
+        self.assertEqual(MemoryVideoStorage().open_stream(video.relative_path).read(), content)
+
+        # The parts are deleted, and finalizing again returns the same video
+        self.assertEqual(list(MemoryVideoStorage().objects), [video.relative_path])
+        self.assertEqual(self.finalize(session).data['id'], video.id)
+
+    def test_chunk_of_another_size(self):
+        content = self.get_mp4()
+        session = self.start_upload(content)
+
+        response = self.upload_chunk(session, 1, content[:10])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('chunk', response.data)
+
+    def test_invalid_video_aborted(self):
+        content = bytes(100)
+        session = self.start_upload(content)
+        for number in (1, 2):
+            self.upload_chunk(session, number, content)
+
+        response = self.finalize(session)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Video.objects.exists())
+        self.assertEqual(VideoUploadSession.objects.get( id = session['id'] ).state, VideoUploadSession.States.ABORTED)
+        self.assertEqual(MemoryVideoStorage().objects, {})
+
+    def test_upload_of_another_account(self):
+        session = self.start_upload(self.get_mp4())
+
+        other_user = User.objects.create_user('owner@globex.com', 'x12345678', 'Globex Owner')
+        self.client.force_authenticate(
+            user = other_user, token = SimpleNamespace(payload = {'company_accountname': 'globex'})
+        )
+
+        self.assertEqual(self.client.get('/videos/uploads/{}/'.format(session['id'])).status_code, 404)
+
+    def test_expired_uploads_aborted(self):
+        content = self.get_mp4()
+        session = self.start_upload(content)
+        self.upload_chunk(session, 1, content)
+
+        old_date = timezone.now() - timedelta(seconds = settings.MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION + 60)
+        VideoUploadSession.objects.filter( id = session['id'] ).update( created_date = old_date )
+
+        self.assertEqual(abort_expired_uploads(MemoryVideoStorage(), settings.MULTIMEDIA_VIDEO_UPLOAD_EXPIRATION), 1)
+
+        self.assertFalse(VideoUploadSession.objects.exists())
+        self.assertEqual(MemoryVideoStorage().objects, {})
+
+    def test_videos_never_collected_as_orphans(self):
+        content = self.get_mp4()
+        session = self.start_upload(content)
+        for number in (1, 2, 3):
+            self.upload_chunk(session, number, content)
+        self.finalize(session)
+
+        old_date = timezone.now() - timedelta(seconds = settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD + 60)
+        Video.objects.update( created_date = old_date )
+
+        with self.assertLogs('multimedia.garbage', 'WARNING'):
+            self.assertEqual(
+                collect_orphans('video', Video, MemoryVideoStorage(), settings.MULTIMEDIA_ORPHAN_GRACE_PERIOD),
+                (0, 0, 0)
+            )
+
+        self.assertEqual(Video.objects.count(), 1)
+
+
+class PublicImagesTestCase(TestCase):
+    """
+    The images are read with unsigned urls through the CDN only if it's configured,
+    otherwise they keep their signed urls. The public objects are served immutable.
+    """
+
+    def setUp(self):
+        cache.clear()
+        MemoryMultimediaStorage.buckets.clear()
+
+        patches = [
+            mock.patch('multimedia.cache.ImageStorage', MemoryImageStorage),
+            mock.patch.dict(BUCKET_STORAGES, {MemoryImageStorage.bucket_name: MemoryImageStorage}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        MemoryImageStorage().save_stream('acme/key/logo.png', io.BytesIO(b'image'), content_type = 'image/png')
+
+    def set_public(self, public_media_url = 'https://media.example.com/'):
+        for name, value in (('public', True), ('public_media_url', public_media_url)):
+            patch = mock.patch.object(MemoryImageStorage, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_signed_urls_without_cdn(self):
+        url = get_signed_image_urls(['acme/key/logo.png'])['acme/key/logo.png']
+
+        self.assertIn('/business-network-profile-images/acme/key/logo.png?expires=', url)
+
+        # The unsigned urls of the private storages are not served
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url.split('?')[0]).status_code, 403)
+
+    def test_unsigned_urls_of_the_cdn(self):
+        self.set_public()
+
+        with mock.patch.object(MemoryImageStorage, 'url') as url:
+            urls = get_signed_image_urls(['acme/key/logo.png', 'acme/key/cover photo.png', None])
+
+        self.assertEqual(urls, {
+            'acme/key/logo.png': 'https://media.example.com/acme/key/logo.png',
+            'acme/key/cover photo.png': 'https://media.example.com/acme/key/cover%20photo.png',
+        })
+        url.assert_not_called()
+
+    def test_public_objects_served_immutable(self):
+        self.set_public( public_media_url = None )
+
+        url = MemoryImageStorage().public_url('acme/key/logo.png')
+        response = self.client.get(url)
+
+        self.assertEqual(url, '{}business-network-profile-images/acme/key/logo.png'.format(settings.MULTIMEDIA_MEDIA_URL))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL)
+
+        # The signed urls are still checked, and expire
+        response = self.client.get(MemoryImageStorage().url('acme/key/logo.png'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Cache-Control', response)
+
+        with mock.patch('multimedia.backends.time.time', return_value = 0):
+            expired_url = MemoryImageStorage().url('acme/key/logo.png')
+        self.assertEqual(self.client.get(expired_url).status_code, 403)
+
+    def test_public_objects_uploaded_immutable(self):
+        class PublicImageStorage(S3MultimediaStorage):
+            bucket_name = ImageStorage.bucket_name
+            public = True
+            public_media_url = 'https://media.example.com/'
+
+        self.assertEqual(
+            PublicImageStorage().get_object_parameters('acme/key/logo.png').get('CacheControl'),
+            settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL
+        )
+        self.assertNotIn('CacheControl', S3MultimediaStorage().get_object_parameters('acme/key/logo.png'))
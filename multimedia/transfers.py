@@ -0,0 +1,56 @@
+# multimedia/transfers.py
+
+# Django
+from django.conf import settings
+
+# Utils
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+class UploadsPool:
+    """
+    Pool of threads shared by the whole process that validate and upload the parts
+    of the multi-file uploads. It's bounded, so the concurrent requests queue their
+    parts instead of opening unbounded connections to the buckets. The tasks never
+    touch the database, the rows are written by the request.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the threads the first time they are needed."""
+        if self.executor is not None:
+            return
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers = self.workers, thread_name_prefix = 'uploads'
+                )
+
+    def map(self, function, items):
+        """
+        Run the function over the items in the pool and wait for all of them.
+        Return the (result, exception) of every item, in the order given.
+        """
+
+        self.start()
+        futures = [self.executor.submit(function, item) for item in items]
+
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, e))
+
+        return results
+
+
+uploads_pool = UploadsPool(
+    workers = settings.MULTIMEDIA_UPLOAD_WORKERS
+)
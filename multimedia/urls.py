@@ -7,9 +7,14 @@ from multimedia.views import *
 router = routers.DefaultRouter()
 router.register('files', FileViewSet)
 router.register('images', ImageViewSet)
+router.register('videos', VideoViewSet)
 
 urlpatterns = [
     # path('files/', FileUploadAPIView.as_view(), name = 'files_upload'),
 
     path('', include(router.urls)),
+
+    # Objects of the offline storages (multimedia.backends)
+    path('media/<str:bucket_name>/', MediaUploadView.as_view(), name = 'media_upload'),
+    path('media/<str:bucket_name>/<path:name>', MediaObjectView.as_view(), name = 'media_object'),
 ]
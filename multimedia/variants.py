@@ -0,0 +1,206 @@
+# multimedia/variants.py
+
+# Django
+from django.conf import settings
+from django.db import connection
+
+# Models
+from multimedia.models import Image, ImageVariant
+
+# Storages
+from multimedia.storages import ImageStorage
+
+# Signals
+from multimedia.signals import post_image_variants_create
+
+# Pillow
+from PIL import Image as PillowImage, ImageOps
+
+# Utils
+from concurrent.futures import ThreadPoolExecutor
+import io
+import logging
+import os
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+VARIANT_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+class ImageVariantsPool:
+    """
+    Pool of background threads that generate the variants of the images uploaded,
+    so the requests never wait on the resizing. Pillow releases the GIL while
+    it decodes, resizes and encodes, so the threads run the images in parallel.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def submit(self, image_id):
+        """Generate the variants of the image in the background."""
+        self.start()
+        self.executor.submit(self.run, image_id)
+
+    def start(self):
+        """Start the threads the first time they are needed."""
+        if self.executor is not None:
+            return
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers = self.workers, thread_name_prefix = 'image-variants'
+                )
+
+    def run(self, image_id):
+        try:
+            generate_image_variants(Image.objects.get( id = image_id ))
+        except Exception:
+            logger.exception('The variants of the image {} could not be generated'.format(image_id))
+        finally:
+            connection.close()
+
+
+image_variants_pool = ImageVariantsPool(
+    workers = settings.IMAGE_VARIANT_WORKERS
+)
+
+
+# Values of the EXIF orientation of the images stored rotated 90 or 270 degrees
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def has_transparency(pillow_image):
+    return 'A' in pillow_image.getbands() or 'transparency' in pillow_image.info
+
+
+def get_oriented_size(pillow_image):
+    """Return the size of the image as it's displayed, after applying its EXIF orientation."""
+    width, height = pillow_image.size
+
+    if pillow_image.getexif().get(EXIF_ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS:
+        return height, width
+
+    return width, height
+
+
+def get_variant_image(pillow_image, variant_format):
+    """Return the image in a mode that the format supports."""
+    if variant_format == 'JPEG':
+        mode = 'RGB'
+    else:
+        mode = 'RGBA' if has_transparency(pillow_image) else 'RGB'
+
+    return pillow_image if pillow_image.mode == mode else pillow_image.convert(mode)
+
+
+def generate_image_variants(image):
+    """
+    Generate the variants of the image: one for every width of IMAGE_VARIANT_WIDTHS
+    narrower than the image, in JPEG (PNG for the images with transparency) and WebP.
+    The images narrower than all the widths get a WebP version of their size.
+    The variants that already exist are skipped.
+    """
+
+    image_storage = ImageStorage()
+    existing_variants = set(image.variants.values_list('width', 'format'))
+    variants = []
+
+    with image_storage.open(image.relative_path, 'rb') as image_file:
+        with PillowImage.open(image_file) as pillow_image:
+            original_format = 'PNG' if has_transparency(pillow_image) else 'JPEG'
+
+            # The widths are the ones of the image as it's displayed, the photos taken rotated are stored transposed
+            oriented_width, oriented_height = get_oriented_size(pillow_image)
+            transposed = (oriented_width, oriented_height) != pillow_image.size
+
+            widths = sorted(set(
+                width for width in settings.IMAGE_VARIANT_WIDTHS.values() if width < oriented_width
+            ))
+
+            sizes = [(width, original_format) for width in widths] + [(width, 'WEBP') for width in widths]
+            if not widths:
+                sizes = [(oriented_width, 'WEBP')]
+
+            sizes = [size for size in sizes if size not in existing_variants]
+            if not sizes:
+                return []
+
+            # The JPEGs are decoded at the smallest scale that is still enough for the widest variant
+            widest = max(width for width, _ in sizes)
+            draft_size = (widest, widest * oriented_height // oriented_width)
+            pillow_image.draft('RGB', draft_size[::-1] if transposed else draft_size)
+            pillow_image = ImageOps.exif_transpose(pillow_image)
+
+            path, _ = os.path.splitext(image.relative_path)
+
+            for width, variant_format in sizes:
+                height = max(1, round(pillow_image.height * width / pillow_image.width))
+                resized_image = get_variant_image(pillow_image, variant_format).resize(
+                    (width, height), PillowImage.LANCZOS, reducing_gap = 3.0
+                )
+
+                variant_file = io.BytesIO()
+                resized_image.save(
+                    variant_file, variant_format,
+                    quality = settings.IMAGE_VARIANT_QUALITY, optimize = True
+                )
+                variant_size = variant_file.tell()
+                variant_file.seek(0)
+
+                variant_path = image_storage.save_stream(
+                    '{}_{}{}'.format(path, width, VARIANT_EXTENSIONS[variant_format]), variant_file,
+                    content_type = PillowImage.MIME[variant_format]
+                )
+
+                variants.append(ImageVariant(
+                    image = image,
+                    relative_path = variant_path,
+                    width = width,
+                    height = height,
+                    format = variant_format,
+                    size = variant_size
+                ))
+
+    ImageVariant.objects.bulk_create(variants, ignore_conflicts = True)
+    post_image_variants_create.send(sender = Image, instance = image)
+
+    return variants
+
+
+def get_image_variant_path(image, width = None, variant_format = None):
+    """
+    Return the relative path of the version of the image that fits the width:
+    the narrowest one at least as wide, or the widest one if all are narrower.
+    Without variant_format the original and its JPEG or PNG variants are the
+    candidates, with WEBP the WebP variants. Return None if there's no candidate.
+    """
+
+    candidates = [
+        (variant.width, variant.relative_path) for variant in image.variants.all()
+        if (variant.format == 'WEBP') == (variant_format == 'WEBP')
+    ]
+
+    if variant_format != 'WEBP':
+        if width is None:
+            return image.relative_path
+
+        original_width = int(image.width) if str(image.width).isdigit() else 0
+        candidates.append((original_width, image.relative_path))
+
+    if not candidates:
+        return None
+
+    if width is None:
+        return max(candidates)[1]
+
+    fitting_candidates = [candidate for candidate in candidates if candidate[0] >= width]
+
+    return min(fitting_candidates)[1] if fitting_candidates else max(candidates)[1]
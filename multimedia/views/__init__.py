@@ -1,2 +1,4 @@
 from multimedia.views.files import *
-from multimedia.views.images import *
\ No newline at end of file
+from multimedia.views.images import *
+from multimedia.views.media import *
+from multimedia.views.videos import *
@@ -6,6 +6,7 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 
 # Django REST framework
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -24,7 +25,10 @@ from rest_framework.permissions import (
 )
 
 # Serializer
-from multimedia.serializers import FileModelSerializer, CreateFileSerializer
+from multimedia.serializers import (
+    FileModelSerializer, CreateFileSerializer, CreateFilesSerializer,
+    RequestFileUploadSerializer, FinalizeFileUploadSerializer
+)
 
 
 @method_decorator( name = 'list', decorator = swagger_auto_schema(
@@ -91,4 +95,91 @@ class FileViewSet(mixins.ListModelMixin,
         data = self.get_serializer(file).data
         data_status = status.HTTP_201_CREATED
 
-        return Response(data, status = data_status)
\ No newline at end of file
+        return Response(data, status = data_status)
+
+    @swagger_auto_schema( tags = ["Files"], request_body = CreateFilesSerializer,
+        responses = { 201: openapi.Response("Created", examples = {"application/json": {"results": [
+                {"name": "rut.pdf", "status": "created", "file": {"id": 1}, "errors": []},
+                {"name": "catalog.pdf", "status": "failed", "file": None, "errors": ["The file could not be uploaded to the storage"]}
+            ]} }),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"files": ["This field is required."]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'bulk')
+    def bulk_upload(self, request):
+        """Upload many files\n
+            Endpoint to upload up to 20 files in one request, in the field `files` repeated.\n
+            The files are validated and uploaded concurrently and registered at once.
+            Every file has its own result: `created`, `existing` (Already uploaded by the account),
+            `invalid` or `failed`, so the files that fail don't fail the others.\n
+            The request body schema has to be of `multipart/form-data`.
+        """
+
+        files_serializer = CreateFilesSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        files_serializer.is_valid(raise_exception = True)
+        files_serializer.save()
+
+        return Response(files_serializer.data, status = status.HTTP_201_CREATED)
+
+    @swagger_auto_schema( tags = ["Files"], request_body = RequestFileUploadSerializer,
+        responses = { 201: openapi.Response("Created", examples = {"application/json": {
+                "upload_token": "eyJwYXRoIjoi...", "url": "https://files-bucket.s3.amazonaws.com/",
+                "fields": {"key": "accountname/5f1c.../5f1c...", "Content-Type": "...", "policy": "...", "x-amz-signature": "..."},
+                "expires_in": 900
+            } }),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"size": ["The maximum size is 9437184 bytes"]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'uploads', parser_classes = [JSONParser])
+    def request_upload(self, request):
+        """Request a file upload\n
+            Step 1 of the uploads straight to the bucket, without going through the API.\n
+            Returns a presigned POST: send the `fields` and then the file in the field `file` 
+            as `multipart/form-data` to the `url` before it expires.
+            Then finalize the upload with the `upload_token`.
+        """
+
+        upload_serializer = RequestFileUploadSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        data = upload_serializer.save()
+
+        return Response(data, status = status.HTTP_201_CREATED)
+
+    @swagger_auto_schema( tags = ["Files"], request_body = FinalizeFileUploadSerializer,
+        responses = { 201: FileModelSerializer,
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json":
+                {"upload_token": ["The object wasn't uploaded to the storage yet"]}
+            })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'uploads/finalize', parser_classes = [JSONParser])
+    def finalize_upload(self, request):
+        """Finalize a file upload\n
+            Step 2 of the uploads straight to the bucket.\n
+            Verifies the object uploaded with the `upload_token` and registers the file.
+            Finalizing the same upload again returns the same file.
+        """
+
+        upload_serializer = FinalizeFileUploadSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        file = upload_serializer.save()
+
+        data = self.get_serializer(file).data
+        data_status = status.HTTP_201_CREATED
+
+        return Response(data, status = data_status)
@@ -6,6 +6,8 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 
 # Django REST framework
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -14,6 +16,12 @@ from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Batch requests
+from business_network_API.views import get_batch_data, get_batch_lookups
+
+# Cache
+from multimedia.cache import sign_images_data
+
 # Models
 from multimedia.models import Image
 
@@ -24,7 +32,10 @@ from rest_framework.permissions import (
 )
 
 # Serializer
-from multimedia.serializers import ImageModelSerializer, CreateImageSerializer
+from multimedia.serializers import (
+    ImageModelSerializer, CreateImageSerializer, CreateImagesSerializer,
+    RequestImageUploadSerializer, FinalizeImageUploadSerializer
+)
 
 
 @method_decorator( name = 'list', decorator = swagger_auto_schema( 
@@ -49,7 +60,7 @@ class ImageViewSet(mixins.ListModelMixin,
 
     def get_permissions(self):
         """Assign permissions based on action"""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'batch']:
             permissions = [AllowAny]
         elif self.action in ['create']:
             permissions = [IsAuthenticated]
@@ -58,6 +69,35 @@ class ImageViewSet(mixins.ListModelMixin,
 
         return [permission() for permission in permissions]
 
+    @swagger_auto_schema( operation_id = "Retrieve a batch of images", tags = ["Images"],
+        manual_parameters = [
+            openapi.Parameter(name = "ids", in_ = openapi.IN_QUERY, type = "String", required = True,
+                description = "Comma separated ids of the images. (E.g. 12,15,40)")
+        ],
+        responses = { 400: openapi.Response("Bad request") }, security = []
+    )
+    @action(detail = False, methods = ['get'])
+    def batch(self, request):
+        """Retrieve a batch of images\n
+            Endpoint to retrieve several images by their ids, with their paths signed at once.\n
+            The images are returned in `results` keyed by the id. The ids 
+            not found have null as result and are listed in `not_found`.
+        """
+        try:
+            image_ids = get_batch_lookups(request, 'ids', to_python = int)
+            images = Image.objects.filter( id__in = image_ids )
+
+            images_data = ImageModelSerializer(images, many = True, context = {'sign_paths': False}).data
+            sign_images_data(images_data)
+
+            data = get_batch_data(image_ids, {image['id']: image for image in images_data})
+            data_status = status.HTTP_200_OK
+        except ValidationError as e:
+            data = {"detail": e.detail[0]}
+            data_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data, status = data_status)
+
     def get_object(self):
         image = get_object_or_404(
             Image,
@@ -92,4 +132,91 @@ class ImageViewSet(mixins.ListModelMixin,
         data = self.get_serializer(image).data
         data_status = status.HTTP_201_CREATED
 
-        return Response(data, status = data_status)
\ No newline at end of file
+        return Response(data, status = data_status)
+
+    @swagger_auto_schema( tags = ["Images"], request_body = CreateImagesSerializer,
+        responses = { 201: openapi.Response("Created", examples = {"application/json": {"results": [
+                {"name": "photo.jpg", "status": "created", "image": {"id": 1}, "errors": []},
+                {"name": "notes.txt", "status": "invalid", "image": None, "errors": ["Upload a valid image. The file you uploaded was either not an image or a corrupted image."]}
+            ]} }),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"images": ["This field is required."]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'bulk')
+    def bulk_upload(self, request):
+        """Upload many images\n
+            Endpoint to upload up to 20 images in one request, in the field `images` repeated.\n
+            The images are validated and uploaded concurrently and registered at once.
+            Every image has its own result: `created`, `existing` (Already uploaded by the account),
+            `invalid` or `failed`, so the images that fail don't fail the others.\n
+            The request body schema has to be of `multipart/form-data`.
+        """
+
+        images_serializer = CreateImagesSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        images_serializer.is_valid(raise_exception = True)
+        images_serializer.save()
+
+        return Response(images_serializer.data, status = status.HTTP_201_CREATED)
+
+    @swagger_auto_schema( tags = ["Images"], request_body = RequestImageUploadSerializer,
+        responses = { 201: openapi.Response("Created", examples = {"application/json": {
+                "upload_token": "eyJwYXRoIjoi...", "url": "https://images-bucket.s3.amazonaws.com/",
+                "fields": {"key": "accountname/5f1c.../5f1c...", "Content-Type": "...", "policy": "...", "x-amz-signature": "..."},
+                "expires_in": 900
+            } }),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"size": ["The maximum size is 9437184 bytes"]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'uploads', parser_classes = [JSONParser])
+    def request_upload(self, request):
+        """Request an image upload\n
+            Step 1 of the uploads straight to the bucket, without going through the API.\n
+            Returns a presigned POST: send the `fields` and then the image in the field `file` 
+            as `multipart/form-data` to the `url` before it expires.
+            Then finalize the upload with the `upload_token`.
+        """
+
+        upload_serializer = RequestImageUploadSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        data = upload_serializer.save()
+
+        return Response(data, status = status.HTTP_201_CREATED)
+
+    @swagger_auto_schema( tags = ["Images"], request_body = FinalizeImageUploadSerializer,
+        responses = { 201: ImageModelSerializer,
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json":
+                {"upload_token": ["The object wasn't uploaded to the storage yet"]}
+            })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'uploads/finalize', parser_classes = [JSONParser])
+    def finalize_upload(self, request):
+        """Finalize an image upload\n
+            Step 2 of the uploads straight to the bucket.\n
+            Verifies the object uploaded with the `upload_token` and registers the image.
+            Finalizing the same upload again returns the same image.
+        """
+
+        upload_serializer = FinalizeImageUploadSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        image = upload_serializer.save()
+
+        data = self.get_serializer(image).data
+        data_status = status.HTTP_201_CREATED
+
+        return Response(data, status = data_status)
@@ -0,0 +1,97 @@
+# Views media
+
+# Django
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404
+
+# Django REST framework
+from rest_framework import status
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Storages
+from multimedia.backends import MEDIA_UPLOAD_SALT, SignedMediaMixin, verify_media_signature
+from multimedia.storages import BUCKET_STORAGES
+
+# Utils
+import time
+
+
+def get_offline_storage(bucket_name):
+    """Return the storage of the bucket if it's offline (Local or in memory), the S3 ones serve themselves."""
+    storage_class = BUCKET_STORAGES.get(bucket_name)
+
+    if storage_class is None or not issubclass(storage_class, SignedMediaMixin):
+        raise Http404()
+
+    return storage_class()
+
+
+class MediaObjectView(APIView):
+    """
+    Serve the objects of the offline storages by their signed urls,
+    as the buckets do with the presigned urls. The objects of the public
+    storages are served unsigned too, cacheable as the CDN serves them.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    swagger_schema = None
+
+    def get(self, request, bucket_name, name):
+        storage = get_offline_storage(bucket_name)
+
+        signed = 'signature' in request.query_params
+
+        if (signed or not storage.public) and not verify_media_signature(bucket_name, name,
+            request.query_params.get('expires'), request.query_params.get('signature')):
+            return Response({"detail": "The url is not valid or expired."}, status = status.HTTP_403_FORBIDDEN)
+
+        if not storage.exists(name):
+            raise Http404()
+
+        response = FileResponse(storage.open_stream(name), content_type = storage.get_content_type(name))
+
+        if not signed:
+            response['Cache-Control'] = settings.MULTIMEDIA_PUBLIC_CACHE_CONTROL
+
+        return response
+
+
+class MediaUploadView(APIView):
+    """
+    Receive the uploads to the offline storages with the form fields of their
+    presigned POST, checking the same conditions as the buckets: the key,
+    the content type and the size of the policy signed.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    parser_classes = [MultiPartParser, FormParser]
+    swagger_schema = None
+
+    def post(self, request, bucket_name):
+        storage = get_offline_storage(bucket_name)
+
+        try:
+            policy = signing.loads(request.data.get('policy', ''), salt = MEDIA_UPLOAD_SALT)
+        except signing.BadSignature:
+            return Response({"detail": "The policy is not valid."}, status = status.HTTP_403_FORBIDDEN)
+
+        upload_file = request.data.get('file')
+
+        if (policy['bucket'] != bucket_name or policy['expires'] < time.time() or
+            request.data.get('key') != policy['key'] or
+            request.data.get('Content-Type') != policy['content_type']):
+            return Response({"detail": "The upload doesn't match the policy."}, status = status.HTTP_403_FORBIDDEN)
+
+        if upload_file is None or not 1 <= upload_file.size <= policy['max_size']:
+            return Response({"detail": "The size of the upload is out of the range of the policy."},
+                status = status.HTTP_400_BAD_REQUEST)
+
+        storage.save_stream(policy['key'], upload_file, content_type = policy['content_type'])
+
+        return Response(status = status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,191 @@
+# Views videos
+
+# Django
+from django.utils.decorators import method_decorator
+
+# Django REST framework
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+
+# Documentation
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+# Models
+from multimedia.models import Video, VideoUploadSession
+
+# Parsers
+from multimedia.parsers import ChunkParser
+
+# Permissions
+from rest_framework.permissions import (
+    AllowAny,
+    IsAuthenticated
+)
+
+# Serializer
+from multimedia.serializers import (
+    VideoModelSerializer, VideoUploadSessionModelSerializer, CreateVideoUploadSerializer,
+    UploadVideoChunkSerializer, FinalizeVideoUploadSerializer, get_upload_folder_name
+)
+
+
+@method_decorator( name = 'list', decorator = swagger_auto_schema(
+    operation_id = "List videos", tags = ["Videos"],
+    operation_description = "Endpoint to list all the videos uploaded in the platform",
+    responses = { 404: openapi.Response("Not Found") }, security = []
+))
+@method_decorator( name = 'retrieve', decorator = swagger_auto_schema(
+    operation_id = "Retrieve a video", tags = ["Videos"], security = [],
+    operation_description = "Endpoint to retrieve a video previously uploaded by its id.",
+    responses = { 200: VideoModelSerializer, 404: openapi.Response("Not Found")}
+))
+class VideoViewSet(mixins.ListModelMixin,
+                mixins.RetrieveModelMixin,
+                viewsets.GenericViewSet):
+    """
+    Video view set.
+    The videos are uploaded in chunks with resumable uploads: start the upload,
+    upload every chunk (In any order and again if it fails), check the offset
+    to resume an interrupted upload and finalize it.
+    """
+
+    serializer_class = VideoModelSerializer
+    queryset = Video.objects.all()
+
+    def get_permissions(self):
+        """Assign permissions based on action"""
+        if self.action in ['list', 'retrieve']:
+            permissions = [AllowAny]
+        else:
+            permissions = [IsAuthenticated]
+
+        return [permission() for permission in permissions]
+
+    def get_object(self):
+        video = get_object_or_404(
+            Video,
+            id = self.kwargs['pk']
+        )
+
+        return video
+
+    def get_upload_session(self):
+        """Return the upload session of the url, only the account that started it can see it."""
+        session = get_object_or_404(
+            VideoUploadSession,
+            id = self.kwargs['session_id'],
+            owner_scope = get_upload_folder_name(self.request)
+        )
+
+        return session
+
+    @swagger_auto_schema( tags = ["Videos"], request_body = CreateVideoUploadSerializer,
+        responses = { 201: VideoUploadSessionModelSerializer,
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"size": ["The maximum size is 524288000 bytes"]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = 'uploads', parser_classes = [JSONParser])
+    def create_upload(self, request):
+        """Start a video upload\n
+            Step 1 of the resumable uploads of the videos (MP4 or WebM).\n
+            Returns the upload session: the video is sent in `chunks_count` chunks
+            of `chunk_size` bytes, except the last one, that has the rest.
+            The upload expires at `expires_date`.
+        """
+
+        upload_serializer = CreateVideoUploadSerializer(
+            data = request.data,
+            context = {'request': request}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        session = upload_serializer.save()
+
+        data = VideoUploadSessionModelSerializer(session).data
+
+        return Response(data, status = status.HTTP_201_CREATED)
+
+    @swagger_auto_schema( tags = ["Videos"],
+        responses = { 200: VideoUploadSessionModelSerializer, 404: openapi.Response("Not Found"),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['get'], url_path = r'uploads/(?P<session_id>[0-9]+)')
+    def retrieve_upload(self, request, session_id):
+        """Retrieve a video upload\n
+            Returns the state of the upload: the `offset` is the amount of bytes received
+            without gaps from the start, an interrupted upload resumes from the chunk
+            `offset / chunk_size + 1`. `received_chunks` lists all the chunks received.
+        """
+
+        session = self.get_upload_session()
+        data = VideoUploadSessionModelSerializer(session).data
+
+        return Response(data, status = status.HTTP_200_OK)
+
+    @swagger_auto_schema( tags = ["Videos"],
+        request_body = openapi.Schema(type = openapi.TYPE_STRING, format = openapi.FORMAT_BINARY),
+        responses = { 200: VideoUploadSessionModelSerializer, 404: openapi.Response("Not Found"),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json": {"chunk": ["The chunk 2 must have 8388608 bytes"]} })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['put'], url_path = r'uploads/(?P<session_id>[0-9]+)/chunks/(?P<number>[0-9]+)',
+        parser_classes = [ChunkParser])
+    def upload_chunk(self, request, session_id, number):
+        """Upload a chunk of a video\n
+            Step 2 of the resumable uploads of the videos.\n
+            Uploads the chunk with the number (From 1) of the url. The request body is
+            the bytes of the chunk as `application/octet-stream`. A chunk uploaded
+            again replaces the previous one. Returns the state of the upload.
+        """
+
+        session = self.get_upload_session()
+
+        chunk_serializer = UploadVideoChunkSerializer(
+            data = {'number': number, 'chunk': request.data or None},
+            context = {'request': request, 'session': session}
+        )
+
+        chunk_serializer.is_valid(raise_exception = True)
+        session = chunk_serializer.save()
+
+        data = VideoUploadSessionModelSerializer(session).data
+
+        return Response(data, status = status.HTTP_200_OK)
+
+    @swagger_auto_schema( tags = ["Videos"], request_body = FinalizeVideoUploadSerializer,
+        responses = { 201: VideoModelSerializer, 404: openapi.Response("Not Found"),
+            401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
+            400: openapi.Response("Bad request", examples = {"application/json":
+                {"non_field_errors": ["The chunks 3, 4 are missing"]}
+            })
+        }, security = [{ "api-key": [] }]
+    )
+    @action(detail = False, methods = ['post'], url_path = r'uploads/(?P<session_id>[0-9]+)/finalize')
+    def finalize_upload(self, request, session_id):
+        """Finalize a video upload\n
+            Step 3 of the resumable uploads of the videos.\n
+            Joins the chunks uploaded into the video, reads its duration and registers it.
+            Finalizing the same upload again returns the same video.
+        """
+
+        session = self.get_upload_session()
+
+        upload_serializer = FinalizeVideoUploadSerializer(
+            data = {},
+            context = {'request': request, 'session': session}
+        )
+
+        upload_serializer.is_valid(raise_exception = True)
+        video = upload_serializer.save()
+
+        data = self.get_serializer(video).data
+        data_status = status.HTTP_201_CREATED
+
+        return Response(data, status = data_status)
@@ -0,0 +1 @@
+default_app_config = 'searches.apps.SearchesConfig'
\ No newline at end of file
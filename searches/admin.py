@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+# Models
+from searches.models import SynonymGroup
+
+
+@admin.register(SynonymGroup)
+class SynonymGroupAdmin(admin.ModelAdmin):
+    """Synonym groups admin. The searches use the changes without restarting."""
+
+    list_display = ('name', 'terms', 'changed_at')
+    search_fields = ('name', 'terms')
@@ -0,0 +1,160 @@
+# searches/analytics.py
+
+# Django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# Models
+from searches.models import SearchQueryLog
+
+# Utils
+from business_network_API.utils import normalize_text
+from collections import deque
+import atexit
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class SearchLogBuffer:
+    """
+    In process ring buffer of search logs. The entries are flushed in
+    batches to the search log table by a background thread, so the
+    request path never waits on the write. When the buffer is full
+    the oldest entries are dropped.
+    """
+
+    def __init__(self, size, batch_size, flush_interval):
+        self.entries = deque(maxlen = size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_requested = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def append(self, entry):
+        """Add an entry to the buffer and wake up the writer if a batch is ready."""
+        self.entries.append(entry)
+        self.start()
+
+        if len(self.entries) >= self.batch_size:
+            self.flush_requested.set()
+
+    def start(self):
+        """Start the writer thread the first time it is needed."""
+        if self.thread is not None:
+            return
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target = self.run, name = 'search-log-writer', daemon = True
+                )
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('The search logs could not be written')
+            finally:
+                connection.close()
+
+    def pop_batch(self):
+        batch = []
+
+        while self.entries and len(batch) < self.batch_size:
+            batch.append(self.entries.popleft())
+
+        return batch
+
+    def flush(self):
+        """Write all the entries buffered in batches."""
+        batch = self.pop_batch()
+
+        while batch:
+            SearchQueryLog.objects.bulk_create(
+                [SearchQueryLog(**entry) for entry in batch]
+            )
+            batch = self.pop_batch()
+
+
+search_log_buffer = SearchLogBuffer(
+    size = settings.SEARCH_LOG_BUFFER_SIZE,
+    batch_size = settings.SEARCH_LOG_BATCH_SIZE,
+    flush_interval = settings.SEARCH_LOG_FLUSH_INTERVAL
+)
+
+
+class SearchAnalyticsMixin:
+    """
+    Record every search answered by the view in the search log buffer.
+    The views must define the search_name and can change the query
+    param of the search term with search_query_param.
+    """
+
+    search_name = None
+    search_query_param = 'q'
+
+    def initial(self, request, *args, **kwargs):
+        self.search_started_at = time.perf_counter()
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if getattr(self, 'search_started_at', None) is not None and response.status_code == 200:
+            try:
+                search_log_buffer.append(self.get_search_log_entry(request, response))
+            except Exception:
+                logger.exception('The search could not be logged')
+
+        return response
+
+    def get_search_log_entry(self, request, response):
+        """Return the fields of the search log of the response given."""
+        latency_ms = (time.perf_counter() - self.search_started_at) * 1000
+        created_at = timezone.now()
+
+        filters = {
+            param: values if len(values) > 1 else values[0]
+            for param, values in request.query_params.lists()
+            if param not in (self.search_query_param, 'limit', 'offset')
+        }
+
+        user = request.user
+        company_accountname = None
+        if request.auth is not None and hasattr(request.auth, 'payload'):
+            company_accountname = request.auth.payload.get('company_accountname')
+
+        return {
+            'search': self.search_name,
+            'query': normalize_text(request.query_params.get(self.search_query_param))[:255],
+            'filters': filters,
+            'results_count': self.get_results_count(response.data),
+            'latency_ms': latency_ms,
+            'user_id': user.id if user.is_authenticated else None,
+            'company_accountname': company_accountname,
+            'created_at': created_at,
+            'day': created_at.date(),
+        }
+
+    def get_results_count(self, data):
+        if isinstance(data, dict):
+            if 'count' in data:
+                return data['count']
+            data = data.get('results')
+
+        if isinstance(data, list):
+            return len(data)
+
+        return None
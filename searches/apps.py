@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SearchesConfig(AppConfig):
     name = 'searches'
+
+    def ready(self):
+        import searches.signals
@@ -0,0 +1,54 @@
+# searches/cache.py
+
+# Market
+from market.cache import get_market_generation
+
+# Utils
+from business_network_API.utils import normalize_text
+import hashlib
+import json
+
+
+def normalize_query_params(query_params, exclude = ()):
+    """
+    Return the query params of a search normalized: The query unaccented
+    and lowercased and the query fields sorted, so the equivalent searches
+    share the same representation.
+    """
+
+    normalized_params = {}
+
+    for param in sorted(query_params):
+        if param in exclude:
+            continue
+
+        values = query_params.getlist(param)
+        if param == 'q':
+            values = [normalize_text(value) for value in values]
+        elif param == 'query_fields':
+            values = sorted(
+                field.strip() for value in values for field in value.split(',') if field.strip()
+            )
+
+        normalized_params[param] = values
+
+    return normalized_params
+
+
+def get_market_search_cache_key(prefix, *parts):
+    """Build a cache key over the market search data that expires 
+    when the generation of the market changes."""
+    raw_key = json.dumps(parts, sort_keys = True)
+
+    return 'searches:{prefix}:{generation}:{digest}'.format(
+        prefix = prefix,
+        generation = get_market_generation(),
+        digest = hashlib.sha1(raw_key.encode()).hexdigest()
+    )
+
+
+def get_search_results_cache_key(query_params):
+    """Build the cache key of a page of search results for the normalized query params."""
+    normalized_params = normalize_query_params(query_params, exclude = ('facets',))
+
+    return get_market_search_cache_key('results', normalized_params)
@@ -0,0 +1,81 @@
+# searches/coverage.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Models
+from suppliers.models import SupplierProfile, SupplierSaleLocation
+
+# Cache
+from market.cache import bump_market_generation
+
+# Utils
+from business_network_API.countries import get_country_code
+
+
+COUNTRY_COVERAGE_KEY = 'searches:coverage:{}'
+
+
+def parse_country_param(country):
+    """Return the code of the country given by a query param."""
+    country_code = get_country_code(country)
+
+    if country_code is None:
+        raise Exception("'{}' is not a valid country. Use its ISO 3166-1 alpha-2 code or its name".format(country))
+
+    return country_code
+
+
+def load_country_supplier_ids(country_code):
+    """Read from the sale locations the ids of the suppliers that sell into the country."""
+    supplier_ids = SupplierSaleLocation.objects.filter(
+        country_code = country_code
+    ).exclude(
+        supplier__state = SupplierProfile.States.DELETED
+    ).values_list('supplier_id', flat = True).distinct()
+
+    return frozenset(supplier_ids)
+
+
+def get_country_supplier_ids(country_code):
+    """Return the set of ids of the suppliers that sell into the country, 
+    cached and refreshed when the sale locations of the country change."""
+    cache_key = COUNTRY_COVERAGE_KEY.format(country_code)
+    supplier_ids = cache.get(cache_key)
+
+    if supplier_ids is None:
+        supplier_ids = load_country_supplier_ids(country_code)
+        cache.set(cache_key, supplier_ids, settings.SEARCH_COVERAGE_CACHE_TIMEOUT)
+
+    return supplier_ids
+
+
+def refresh_country_coverage(*country_codes):
+    """
+    Expire the coverage of the countries given and the searches filtered by them.
+    The coverage is reloaded by the next read. It's removed again after the commit,
+    in case a read cached the sale locations before it (Or a rollback).
+    """
+
+    keys = [COUNTRY_COVERAGE_KEY.format(country_code) for country_code in set(country_codes) if country_code]
+
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+        bump_market_generation()
+
+
+def refresh_supplier_coverage(supplier):
+    """Expire the coverage of all the countries where the supplier sells."""
+    refresh_suppliers_coverage([supplier.id])
+
+
+def refresh_suppliers_coverage(supplier_ids):
+    """Expire the coverage of all the countries where the suppliers sell."""
+    country_codes = SupplierSaleLocation.objects.filter(
+        supplier_id__in = supplier_ids
+    ).values_list('country_code', flat = True).distinct()
+
+    refresh_country_coverage(*country_codes)
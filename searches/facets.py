@@ -0,0 +1,176 @@
+# searches/facets.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+# Models
+from market.models import ShowcaseProduct, ShowcaseSection
+from suppliers.models import Currency, Product, SupplierProfile, SupplierSaleLocation
+
+# Cache
+from searches.cache import get_market_search_cache_key, normalize_query_params
+
+
+# Limits of the price buckets in USD, the last bucket is open ended.
+PRICE_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000)
+
+PAGINATION_PARAMS = ('limit', 'offset', 'ordering', 'facets')
+
+
+def get_price_bucket_expression(column):
+    """Return the SQL CASE that classifies a price column in the PRICE_BUCKETS."""
+    conditions = []
+
+    for lower, upper in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]):
+        conditions.append("WHEN {column} < {upper} THEN '{lower}-{upper}'".format(
+            column = column, lower = lower, upper = upper
+        ))
+
+    return "CASE WHEN {column} IS NULL THEN NULL {conditions} ELSE '{last}+' END".format(
+        column = column,
+        conditions = ' '.join(conditions),
+        last = PRICE_BUCKETS[-1]
+    )
+
+
+# Facet name -> SQL expression over the aliases used in the facets query.
+FACETS = {
+    'section': 'sp.showcase_section_id',
+    'currency': 'sp.price_currency_id',
+    'price': get_price_bucket_expression('sp.minimum_price_usd_cents / 100'),
+    'industry': 'sup.industry',
+    'sale_country': 'sl.country_code',
+}
+
+
+def parse_facets_param(facets_param):
+    """Return the list of facets requested in the comma separated param."""
+    if not facets_param:
+        return []
+
+    facets = [facet.strip() for facet in facets_param.split(',') if facet.strip()]
+
+    if 'all' in facets:
+        return list(FACETS)
+
+    for facet in facets:
+        if facet not in FACETS:
+            raise Exception("'{}' is not a valid facet. The possible facets are: {}".format(
+                facet, ', '.join(FACETS)
+            ))
+
+    return sorted(set(facets))
+
+
+def get_facets_cache_key(query_params, facets):
+    """Build the cache key of the facets for the normalized query params."""
+    normalized_params = normalize_query_params(query_params, exclude = PAGINATION_PARAMS)
+
+    return get_market_search_cache_key('facets', normalized_params, facets)
+
+
+def compute_facets(queryset, facets):
+    """
+    Count the products of the queryset grouped by every facet
+    in one single pass with GROUPING SETS.
+    """
+
+    if not facets:
+        return {}
+
+    products_sql, products_params = queryset.order_by().values('id').query.sql_with_params()
+
+    grouping_columns = ', '.join(
+        'GROUPING({})'.format(FACETS[facet]) for facet in facets
+    )
+    facet_columns = ', '.join(FACETS[facet] for facet in facets)
+    grouping_sets = ', '.join('({})'.format(FACETS[facet]) for facet in facets)
+
+    sale_locations_join = ''
+    if 'sale_country' in facets:
+        sale_locations_join = """
+            LEFT OUTER JOIN {sale_location} sl
+                ON sl.supplier_id = sup.id AND sl.state <> 'DEL'
+        """.format(sale_location = SupplierSaleLocation._meta.db_table)
+
+    sql = """
+        SELECT {grouping_columns}, {facet_columns}, COUNT(DISTINCT sp.id)
+        FROM {showcase_product} sp
+            INNER JOIN {product} p ON p.id = sp.product_id
+            INNER JOIN {supplier} sup ON sup.id = p.supplier_id
+            {sale_locations_join}
+        WHERE sp.id IN ({products_sql})
+        GROUP BY GROUPING SETS ({grouping_sets})
+    """.format(
+        grouping_columns = grouping_columns,
+        facet_columns = facet_columns,
+        showcase_product = ShowcaseProduct._meta.db_table,
+        product = Product._meta.db_table,
+        supplier = SupplierProfile._meta.db_table,
+        sale_locations_join = sale_locations_join,
+        products_sql = products_sql,
+        grouping_sets = grouping_sets
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, products_params)
+        rows = cursor.fetchall()
+
+    facets_count = len(facets)
+    results = {facet: [] for facet in facets}
+
+    for row in rows:
+        groupings = row[:facets_count]
+        values = row[facets_count:-1]
+        count = row[-1]
+
+        # Only the column grouped in the grouping set has GROUPING() = 0
+        facet_index = groupings.index(0)
+        value = values[facet_index]
+
+        if value is not None:
+            results[facets[facet_index]].append({'value': value, 'count': count})
+
+    label_facets_values(results)
+
+    for facet in results:
+        results[facet].sort(key = lambda bucket: (-bucket['count'], str(bucket['value'])))
+
+    return results
+
+
+def label_facets_values(results):
+    """Add a readable label to the facets whose values are ids."""
+    labels_sources = (
+        ('section', ShowcaseSection, 'name'),
+        ('currency', Currency, 'code'),
+    )
+
+    for facet, model, label_field in labels_sources:
+        if not results.get(facet):
+            continue
+
+        objects = model.objects.in_bulk([bucket['value'] for bucket in results[facet]])
+
+        for bucket in results[facet]:
+            obj = objects.get(bucket['value'])
+            bucket['label'] = getattr(obj, label_field) if obj else None
+
+
+def get_facets(queryset, query_params):
+    """Return the facets requested in the query params, cached per normalized query."""
+    facets = parse_facets_param(query_params.get('facets'))
+
+    if not facets:
+        return None
+
+    cache_key = get_facets_cache_key(query_params, facets)
+    results = cache.get(cache_key)
+
+    if results is None:
+        results = compute_facets(queryset, facets)
+        cache.set(cache_key, results, settings.SEARCH_FACETS_CACHE_TIMEOUT)
+
+    return results
@@ -0,0 +1,131 @@
+# searches/indexing.py
+
+# Django
+from django.db import transaction
+
+# Models
+from business_network_API.models import VisibilityModel
+from buyers.models import BuyerProfile
+from companies.models import Company, UnregisteredCompany
+from searches.models import SearchEntity
+from suppliers.models import SupplierProfile
+
+# Utils
+from business_network_API.utils import normalize_text
+
+
+def build_search_text(*values):
+    """Join and normalize the searchable values of an entity."""
+    return normalize_text(' '.join(value for value in values if value))
+
+
+def save_search_entity(entity_type, entity_id, **data):
+    """Create or update the search entry of an entity."""
+    data['search_name'] = normalize_text(data['name'])
+
+    SearchEntity.objects.update_or_create(
+        entity_type = entity_type,
+        entity_id = entity_id,
+        defaults = data
+    )
+
+
+def remove_search_entity(entity_type, entity_id):
+    """Remove the search entry of an entity."""
+    SearchEntity.objects.filter(
+        entity_type = entity_type,
+        entity_id = entity_id
+    ).delete()
+
+
+def remove_search_entities(entity_type, entity_ids):
+    """Remove the search entries of the entities of the type given."""
+    SearchEntity.objects.filter(
+        entity_type = entity_type,
+        entity_id__in = entity_ids
+    ).delete()
+
+
+def is_deleted(instance):
+    return instance.state == VisibilityModel.States.DELETED
+
+
+def index_company(company):
+    if is_deleted(company):
+        return remove_search_entity(SearchEntity.Types.COMPANY, company.id)
+
+    save_search_entity(
+        SearchEntity.Types.COMPANY, company.id,
+        name = company.name,
+        accountname = company.accountname,
+        description = company.description,
+        logo_id = company.logo_id,
+        search_text = build_search_text(company.name, company.accountname, company.description)
+    )
+
+
+def index_supplier(supplier):
+    if is_deleted(supplier):
+        return remove_search_entity(SearchEntity.Types.SUPPLIER, supplier.id)
+
+    company = supplier.company
+
+    save_search_entity(
+        SearchEntity.Types.SUPPLIER, supplier.id,
+        name = supplier.display_name,
+        accountname = company.accountname,
+        industry = supplier.industry,
+        description = supplier.description,
+        logo_id = company.logo_id,
+        search_text = build_search_text(
+            supplier.display_name, company.name, supplier.industry, supplier.description
+        )
+    )
+
+
+def index_buyer(buyer):
+    if is_deleted(buyer):
+        return remove_search_entity(SearchEntity.Types.BUYER, buyer.id)
+
+    company = buyer.company
+
+    save_search_entity(
+        SearchEntity.Types.BUYER, buyer.id,
+        name = buyer.display_name,
+        accountname = company.accountname,
+        description = buyer.description,
+        logo_id = company.logo_id,
+        search_text = build_search_text(buyer.display_name, company.name, buyer.description)
+    )
+
+
+def index_unregistered_company(unregistered_company):
+    save_search_entity(
+        SearchEntity.Types.UNREGISTERED_COMPANY, unregistered_company.id,
+        name = unregistered_company.name,
+        industry = unregistered_company.industry,
+        country = unregistered_company.country,
+        search_text = build_search_text(
+            unregistered_company.name, unregistered_company.industry,
+            unregistered_company.email, unregistered_company.country,
+            unregistered_company.city
+        )
+    )
+
+
+@transaction.atomic
+def rebuild_search_index():
+    """Rebuild from scratch the search entries of all the indexed entities."""
+    SearchEntity.objects.all().delete()
+
+    for company in Company.objects.all():
+        index_company(company)
+
+    for supplier in SupplierProfile.objects.select_related('company'):
+        index_supplier(supplier)
+
+    for buyer in BuyerProfile.objects.select_related('company'):
+        index_buyer(buyer)
+
+    for unregistered_company in UnregisteredCompany.objects.all():
+        index_unregistered_company(unregistered_company)
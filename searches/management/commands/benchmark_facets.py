@@ -0,0 +1,80 @@
+# searches/management/commands/benchmark_facets.py
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+# Models
+from market.models import ShowcaseProduct
+
+# Facets
+from searches.facets import FACETS, compute_facets
+
+# Utils
+import time
+
+
+class Command(BaseCommand):
+    """
+    Compare the single pass facets query against
+    the separate count query per facet value.
+    """
+
+    help = 'Benchmark the product search facets against one count query per facet value.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('q', help = 'Search term used to filter the showcase products.')
+        parser.add_argument('--iterations', type = int, default = 10)
+
+    def handle(self, *args, **options):
+        query = options['q']
+        iterations = options['iterations']
+        facets = list(FACETS)
+
+        queryset = ShowcaseProduct.objects.filter(
+            Q(name__unaccent__icontains = query) |
+            Q(description__unaccent__icontains = query) |
+            Q(tariff_heading__unaccent__icontains = query) |
+            Q(supplier_name__unaccent__icontains = query)
+        )
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            grouped_results = compute_facets(queryset, facets)
+        grouped_time = (time.perf_counter() - start) / iterations
+
+        lookups = {
+            'section': 'showcase_section_id',
+            'currency': 'price_currency_id',
+            'industry': 'product__supplier__industry',
+            'sale_country': 'product__supplier__suppliersalelocation__country_code',
+        }
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            count_queries = 0
+            for facet in facets:
+                for bucket in grouped_results[facet]:
+                    if facet == 'price':
+                        lookup = self.get_price_lookup(bucket['value'])
+                    else:
+                        lookup = {lookups[facet]: bucket['value']}
+
+                    queryset.filter(**lookup).distinct().count()
+                    count_queries += 1
+        separate_time = (time.perf_counter() - start) / iterations
+
+        self.stdout.write('Facets: {}'.format(', '.join(facets)))
+        self.stdout.write('Grouped query: {:.2f} ms (1 query)'.format(grouped_time * 1000))
+        self.stdout.write('Separate counts: {:.2f} ms ({} queries)'.format(
+            separate_time * 1000, count_queries
+        ))
+
+
+    def get_price_lookup(self, bucket):
+        """Return the lookup that filters the products of a price bucket (Ej: '10-50', '5000+')."""
+        if bucket.endswith('+'):
+            return {'minimum_price_usd_cents__gte': int(bucket[:-1]) * 100}
+
+        lower, upper = bucket.split('-')
+        return {'minimum_price_usd_cents__gte': int(lower) * 100, 'minimum_price_usd_cents__lt': int(upper) * 100}
@@ -0,0 +1,109 @@
+# searches/management/commands/benchmark_proximity.py
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# Models
+from suppliers.models import SupplierLocation, SupplierProfile
+
+# Geo
+from suppliers.geo import encode_geohash, get_haversine_distance, get_proximity_filter
+
+# Utils
+import random
+import time
+
+
+class Command(BaseCommand):
+    """
+    Compare the proximity search prefiltered by geohash and bounding box
+    against the haversine distance computed over all the locations.
+    The locations generated are rolled back at the end.
+    """
+
+    help = 'Benchmark the nearby suppliers search over random supplier locations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('supplier', help = 'Accountname of the supplier owner of the locations generated.')
+        parser.add_argument('--count', type = int, default = 1000000, help = 'Locations to generate.')
+        parser.add_argument('--radius', type = float, default = 200, help = 'Radius of the search in km.')
+        parser.add_argument('--iterations', type = int, default = 5)
+        parser.add_argument('--seed', type = int, default = 0)
+
+    def handle(self, *args, **options):
+        try:
+            supplier = SupplierProfile.objects.get( company__accountname = options['supplier'] )
+        except SupplierProfile.DoesNotExist:
+            raise CommandError("There's no supplier with the accountname {}".format(options['supplier']))
+
+        randomizer = random.Random(options['seed'])
+
+        with transaction.atomic():
+            self.generate_locations(supplier, options['count'], randomizer)
+
+            latitude, longitude, radius = 6.2442, -75.5812, options['radius'] # Medellín
+            distance = get_haversine_distance(latitude, longitude)
+
+            prefiltered_queryset = SupplierLocation.objects.filter(
+                get_proximity_filter(latitude, longitude, radius)
+            ).annotate( distance = distance ).filter( distance__lte = radius ).order_by('distance')
+
+            full_scan_queryset = SupplierLocation.objects.annotate(
+                distance = distance
+            ).filter( distance__lte = radius ).order_by('distance')
+
+            prefiltered_time, prefiltered_results = self.measure(prefiltered_queryset, options['iterations'])
+            full_scan_time, full_scan_results = self.measure(full_scan_queryset, options['iterations'])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write('Locations: {}, radius: {} km, results: {}'.format(
+            options['count'], radius, prefiltered_results
+        ))
+        self.stdout.write('Geohash and bounding box prefilter: {:.2f} ms'.format(prefiltered_time * 1000))
+        self.stdout.write('Haversine over all the locations: {:.2f} ms'.format(full_scan_time * 1000))
+
+        if prefiltered_results != full_scan_results:
+            self.stderr.write('The prefiltered search missed {} locations'.format(
+                full_scan_results - prefiltered_results
+            ))
+
+    def generate_locations(self, supplier, count, randomizer, batch_size = 10000):
+        """Create the locations with random coordinates, a tenth of them around Medellín."""
+        created = 0
+
+        while created < count:
+            locations = []
+
+            for _ in range(min(batch_size, count - created)):
+                if randomizer.random() < 0.1:
+                    latitude = randomizer.uniform(2.0, 10.0)
+                    longitude = randomizer.uniform(-80.0, -71.0)
+                else:
+                    latitude = randomizer.uniform(-60.0, 70.0)
+                    longitude = randomizer.uniform(-180.0, 180.0)
+
+                latitude, longitude = round(latitude, 6), round(longitude, 6)
+
+                locations.append(SupplierLocation(
+                    country = 'Benchmark',
+                    latitude = latitude,
+                    longitude = longitude,
+                    geohash = encode_geohash(latitude, longitude),
+                    supplier = supplier
+                ))
+
+            SupplierLocation.objects.bulk_create(locations)
+            created += len(locations)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE {}'.format(SupplierLocation._meta.db_table))
+
+    def measure(self, queryset, iterations):
+        """Return the mean time of the query and the amount of results."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            results = len(list(queryset.values_list('id', 'distance')))
+
+        return (time.perf_counter() - start) / iterations, results
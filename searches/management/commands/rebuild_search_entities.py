@@ -0,0 +1,21 @@
+# searches/management/commands/rebuild_search_entities.py
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from searches.models import SearchEntity
+
+# Indexing
+from searches.indexing import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Rebuild the unified search table from the indexed entities."""
+
+    help = 'Rebuild the search entries of companies, suppliers, buyers and unregistered companies.'
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+
+        self.stdout.write('Search entities indexed: {}'.format(SearchEntity.objects.count()))
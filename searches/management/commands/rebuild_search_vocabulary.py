@@ -0,0 +1,26 @@
+# searches/management/commands/rebuild_search_vocabulary.py
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Models
+from market.models import ShowcaseProduct
+from searches.models import SearchTerm
+
+# Vocabulary
+from searches.vocabulary import rebuild_vocabulary
+
+
+class Command(BaseCommand):
+    """Rebuild the vocabulary of the search suggestions from the showcase products."""
+
+    help = 'Rebuild the vocabulary used to correct the misspelled market searches.'
+
+    def handle(self, *args, **options):
+        showcase_products = ShowcaseProduct.objects.select_related('showcase_section').iterator()
+
+        with transaction.atomic():
+            rebuild_vocabulary(showcase_products)
+
+        self.stdout.write('Search terms indexed: {}'.format(SearchTerm.objects.count()))
@@ -0,0 +1,85 @@
+# searches/management/commands/rollup_search_logs.py
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+# Models
+from searches.models import SearchQueryLog
+
+# Utils
+from datetime import timedelta
+
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class Command(BaseCommand):
+    """
+    Roll up the search logs of the last days in the top queries,
+    the queries without results and the latency percentiles.
+    """
+
+    help = 'Report the top queries, zero result queries and latency percentiles of the searches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type = int, default = 7, help = 'Days of logs to roll up.')
+        parser.add_argument('--search', help = 'Roll up only the logs of this search (products, entities...).')
+        parser.add_argument('--limit', type = int, default = 20, help = 'Queries to list in each ranking.')
+
+    def handle(self, *args, **options):
+        since = timezone.now().date() - timedelta(days = options['days'] - 1)
+        logs = SearchQueryLog.objects.filter( day__gte = since )
+
+        if options['search']:
+            logs = logs.filter( search = options['search'] )
+
+        limit = options['limit']
+
+        top_queries = logs.values('search', 'query').annotate(
+            searches = Count('id'), 
+            avg_results = Avg('results_count')
+        ).order_by('-searches')[:limit]
+
+        self.stdout.write('Top queries since {}:'.format(since))
+        for row in top_queries:
+            self.stdout.write('  [{search}] "{query}": {searches} searches, {avg_results:.1f} results on average'.format(
+                search = row['search'], query = row['query'], searches = row['searches'],
+                avg_results = row['avg_results'] or 0
+            ))
+
+        zero_result_queries = logs.filter( results_count = 0 ).values('search', 'query').annotate(
+            searches = Count('id')
+        ).order_by('-searches')[:limit]
+
+        self.stdout.write('Queries without results:')
+        for row in zero_result_queries:
+            self.stdout.write('  [{search}] "{query}": {searches} searches'.format(**row))
+
+        self.stdout.write('Latency percentiles (ms):')
+        for search, percentiles in self.get_latency_percentiles(logs):
+            self.stdout.write('  [{}] {}'.format(search, ', '.join(
+                'p{:g}={:.1f}'.format(percentile * 100, value)
+                for percentile, value in zip(PERCENTILES, percentiles)
+            )))
+
+    def get_latency_percentiles(self, logs):
+        """Compute the latency percentiles by search in the database."""
+        logs_sql, logs_params = logs.order_by().values('id').query.sql_with_params()
+
+        sql = """
+            SELECT search, percentile_cont(%s) WITHIN GROUP (ORDER BY latency_ms)
+            FROM {search_query_log}
+            WHERE id IN ({logs_sql})
+            GROUP BY search
+            ORDER BY search
+        """.format(
+            search_query_log = SearchQueryLog._meta.db_table,
+            logs_sql = logs_sql
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [list(PERCENTILES), *logs_params])
+            return cursor.fetchall()
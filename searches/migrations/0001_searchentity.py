@@ -0,0 +1,49 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:18
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('multimedia', '0001_initial'),
+        ('searches', 'add_trigram_and_unaccent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entity_type', models.CharField(choices=[('company', 'Company'), ('supplier', 'Supplier'), ('buyer', 'Buyer'), ('unregistered_company', 'Unregistered company')], max_length=20)),
+                ('entity_id', models.BigIntegerField(help_text='Id of the entity in its own table')),
+                ('name', models.CharField(help_text='Name of the entity as is displayed', max_length=60)),
+                ('accountname', models.CharField(blank=True, help_text='Accountname of the company owner of the entity, if it is registered', max_length=60, null=True)),
+                ('industry', models.CharField(blank=True, max_length=60, null=True)),
+                ('description', models.CharField(blank=True, max_length=155, null=True)),
+                ('country', models.CharField(blank=True, max_length=50, null=True)),
+                ('search_name', models.CharField(help_text='Name normalized (lowercase and unaccented) for searching', max_length=60)),
+                ('search_text', models.TextField(help_text='All the searchable text of the entity normalized for searching')),
+                ('logo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='multimedia.Image')),
+            ],
+            options={
+                'db_table': 'search_entity',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchentity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_name'], name='search_entity_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='searchentity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='search_entity_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchentity',
+            unique_together={('entity_type', 'entity_id')},
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:21
+
+from django.conf import settings
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('searches', '0001_searchentity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('search', models.CharField(help_text='Name of the search executed (products, entities, companies...)', max_length=30)),
+                ('query', models.CharField(blank=True, help_text='Search term normalized (lowercase and unaccented)', max_length=255)),
+                ('filters', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, help_text='Query params of the search apart from the search term')),
+                ('results_count', models.IntegerField(null=True)),
+                ('latency_ms', models.FloatField(help_text='Milliseconds spent by the server answering the search')),
+                ('company_accountname', models.CharField(blank=True, help_text='Accountname of the company the user searched with', max_length=60, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('day', models.DateField(help_text='Day of the search, the partition key of the log')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'search_query_log',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchquerylog',
+            index=models.Index(fields=['day', 'search'], name='search_query_log_day_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:30
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searches', '0002_searchquerylog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('term', models.CharField(help_text='Word normalized (lowercase and unaccented)', max_length=60, unique=True)),
+                ('frequency', models.PositiveIntegerField(default=0, help_text='Showcase products that contain the word')),
+            ],
+            options={
+                'db_table': 'search_term',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['term'], name='search_term_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searches', '0003_searchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SynonymGroup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='Name to identify the group in the admin', max_length=60)),
+                ('terms', models.TextField(help_text='Equivalent terms (Words or phrases) separated by commas')),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'synonym_group',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searches', '0004_synonymgroup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchquerylog',
+            name='day',
+            field=models.DateField(help_text='Day of the search, the rollups read the log by day'),
+        ),
+    ]
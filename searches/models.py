@@ -1,3 +1,184 @@
+# Searches models
+
+# Django
+from django.conf import settings
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+# Models
+from multimedia.models import Image
+
+# Utils
+from business_network_API.utils import normalize_text
+
+
+class SearchEntity(models.Model):
+    """
+    Denormalized entry of an entity that can be searched in the
+    platform (Companies, suppliers, buyers and unregistered companies).
+    It is kept in sync on write of every indexed entity.
+    """
+
+    class Types(models.TextChoices):
+        """Enum for the types of entities indexed."""
+
+        COMPANY = 'company', 'Company'
+        SUPPLIER = 'supplier', 'Supplier'
+        BUYER = 'buyer', 'Buyer'
+        UNREGISTERED_COMPANY = 'unregistered_company', 'Unregistered company'
+
+    id = models.BigAutoField(primary_key=True)
+
+    entity_type = models.CharField(max_length = 20, choices = Types.choices)
+
+    entity_id = models.BigIntegerField(
+        help_text = _('Id of the entity in its own table')
+    )
+
+    name = models.CharField(
+        help_text = _('Name of the entity as is displayed'),
+        max_length = 60
+    )
+
+    accountname = models.CharField(
+        help_text = _('Accountname of the company owner of the entity, if it is registered'),
+        max_length = 60, blank = True, null = True
+    )
+
+    industry = models.CharField(max_length = 60, blank = True, null = True)
+
+    description = models.CharField(max_length = 155, blank = True, null = True)
+
+    country = models.CharField(max_length = 50, blank = True, null = True)
+
+    logo = models.ForeignKey(Image, models.SET_NULL, blank = True, null = True)
+
+    search_name = models.CharField(
+        help_text = _('Name normalized (lowercase and unaccented) for searching'),
+        max_length = 60
+    )
+
+    search_text = models.TextField(
+        help_text = _('All the searchable text of the entity normalized for searching')
+    )
+
+    class Meta:
+        db_table = 'search_entity'
+        unique_together = (('entity_type', 'entity_id'),)
+        indexes = [
+            GinIndex(fields = ['search_name'], name = 'search_entity_name_trgm', opclasses = ['gin_trgm_ops']),
+            GinIndex(fields = ['search_text'], name = 'search_entity_text_trgm', opclasses = ['gin_trgm_ops']),
+        ]
+
+
+class SearchQueryLog(models.Model):
+    """
+    Append only record of a search executed in the platform.
+    It is written in batches out of the request path. The rollups
+    read the days they report through the index on the day.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    search = models.CharField(
+        help_text = _('Name of the search executed (products, entities, companies...)'),
+        max_length = 30
+    )
+
+    query = models.CharField(
+        help_text = _('Search term normalized (lowercase and unaccented)'),
+        max_length = 255, blank = True
+    )
+
+    filters = JSONField(
+        help_text = _('Query params of the search apart from the search term'),
+        default = dict, blank = True
+    )
+
+    results_count = models.IntegerField(null = True)
+
+    latency_ms = models.FloatField(
+        help_text = _('Milliseconds spent by the server answering the search')
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, models.SET_NULL, 
+        blank = True, null = True, db_constraint = False
+    )
+
+    company_accountname = models.CharField(
+        help_text = _('Accountname of the company the user searched with'),
+        max_length = 60, blank = True, null = True
+    )
+
+    created_at = models.DateTimeField()
+
+    day = models.DateField(
+        help_text = _('Day of the search, the rollups read the log by day')
+    )
+
+    class Meta:
+        db_table = 'search_query_log'
+        indexes = [
+            models.Index(fields = ['day', 'search'], name = 'search_query_log_day_idx'),
+        ]
+
+
+class SearchTerm(models.Model):
+    """
+    Word of the vocabulary of the market, taken from the names, 
+    sections and suppliers of the showcase products. Used to 
+    suggest corrections of the misspelled searches.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    term = models.CharField(
+        help_text = _('Word normalized (lowercase and unaccented)'),
+        max_length = 60, unique = True
+    )
+
+    frequency = models.PositiveIntegerField(
+        help_text = _('Showcase products that contain the word'),
+        default = 0
+    )
+
+    class Meta:
+        db_table = 'search_term'
+        indexes = [
+            GinIndex(fields = ['term'], name = 'search_term_trgm', opclasses = ['gin_trgm_ops']),
+        ]
+
+
+class SynonymGroup(models.Model):
+    """
+    Group of equivalent terms (Ej: aguacate, avocado, palta) used to
+    expand the market searches, so the buyers can find in english
+    the products listed in spanish and the other way around.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    name = models.CharField(
+        help_text = _('Name to identify the group in the admin'),
+        max_length = 60
+    )
+
+    terms = models.TextField(
+        help_text = _('Equivalent terms (Words or phrases) separated by commas')
+    )
+
+    changed_at = models.DateTimeField(auto_now = True)
+
+    class Meta:
+        db_table = 'synonym_group'
+
+    def __str__(self):
+        return self.name
 
-# Create your models here.
+    def get_terms(self):
+        """Return the terms of the group normalized."""
+        terms = (normalize_text(term) for term in self.terms.split(','))
+        return sorted({term for term in terms if term})
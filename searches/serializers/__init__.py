@@ -0,0 +1,2 @@
+from searches.serializers.entities import *
+from searches.serializers.suppliers import *
@@ -0,0 +1,35 @@
+# searches/serializers/entities.py
+
+# Django rest framework
+from rest_framework import serializers
+
+# Models
+from searches.models import SearchEntity
+
+# Serializers
+from multimedia.serializers import ImageModelSerializer
+
+
+class SearchEntityModelSerializer(serializers.ModelSerializer):
+    """Search entity model serializer."""
+
+    logo = ImageModelSerializer( variant = 'thumbnail' )
+
+    rank = serializers.FloatField(read_only = True)
+
+    class Meta:
+        """Search entity meta class."""
+
+        model = SearchEntity
+
+        fields = (
+            'entity_type',
+            'entity_id',
+            'name',
+            'accountname',
+            'industry',
+            'description',
+            'country',
+            'logo',
+            'rank'
+        )
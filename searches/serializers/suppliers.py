@@ -0,0 +1,51 @@
+# searches/serializers/suppliers.py
+
+# Django rest framework
+from rest_framework import serializers
+
+# Models
+from suppliers.models import SupplierLocation, SupplierProfile
+
+
+class NearbySupplierModelSerializer(serializers.ModelSerializer):
+    """Model serializer for display the supplier of a nearby location."""
+
+    accountname = serializers.CharField(source = "company.accountname")
+
+    class Meta:
+
+        model = SupplierProfile
+
+        fields = (
+            'id',
+            'display_name',
+            'accountname',
+            'industry'
+        )
+
+
+class NearbySupplierLocationSerializer(serializers.ModelSerializer):
+    """Supplier location found by a proximity search."""
+
+    supplier = NearbySupplierModelSerializer()
+
+    distance = serializers.FloatField(
+        read_only = True, help_text = "Distance in km to the point searched."
+    )
+
+    class Meta:
+        """Nearby supplier location meta class."""
+
+        model = SupplierLocation
+
+        fields = (
+            'id',
+            'country',
+            'city',
+            'region',
+            'address',
+            'latitude',
+            'longitude',
+            'supplier',
+            'distance'
+        )
@@ -0,0 +1,131 @@
+# searches/signals.py
+
+# Models
+from buyers.models import BuyerProfile
+from companies.models import Company, UnregisteredCompany
+from searches.models import SearchEntity, SynonymGroup
+from suppliers.models import SupplierProfile, SupplierSaleLocation
+
+# Indexing
+from searches.indexing import (
+    index_buyer, index_company, index_supplier,
+    index_unregistered_company, remove_search_entities, remove_search_entity
+)
+
+# Coverage
+from searches.coverage import refresh_country_coverage, refresh_supplier_coverage, refresh_suppliers_coverage
+
+# Synonyms
+from searches.synonyms import bump_synonyms_version
+
+# Cache
+from market.cache import bump_market_generation
+
+# Signals
+from django.db.models.signals import post_delete, post_save, pre_save
+from business_network_API.signals import post_queryset_delete
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=Company)
+def sync_search_company(sender, instance, **kwargs):
+    index_company(instance)
+
+    # The supplier and buyer entries denormalize the accountname and logo
+    supplier = SupplierProfile.objects.filter( company = instance ).first()
+    if supplier:
+        index_supplier(supplier)
+
+    buyer = BuyerProfile.objects.filter( company = instance ).first()
+    if buyer:
+        index_buyer(buyer)
+
+
+@receiver(pre_save, sender=SupplierProfile)
+def track_supplier_state(sender, instance, **kwargs):
+    """Keep the state the supplier had, its coverage only changes when it's deleted or restored."""
+    instance.previous_state = SupplierProfile.all_objects.filter(
+        pk = instance.pk
+    ).values_list('state', flat = True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=SupplierProfile)
+def sync_search_supplier(sender, instance, **kwargs):
+    index_supplier(instance)
+
+    was_deleted = getattr(instance, 'previous_state', None) == SupplierProfile.States.DELETED
+    if was_deleted != (instance.state == SupplierProfile.States.DELETED):
+        refresh_supplier_coverage(instance)
+
+
+@receiver(post_save, sender=BuyerProfile)
+def sync_search_buyer(sender, instance, **kwargs):
+    index_buyer(instance)
+
+
+@receiver(post_save, sender=UnregisteredCompany)
+def sync_search_unregistered_company(sender, instance, **kwargs):
+    index_unregistered_company(instance)
+
+
+@receiver(post_delete, sender=Company)
+def sync_search_delete_company(sender, instance, **kwargs):
+    remove_search_entity(SearchEntity.Types.COMPANY, instance.id)
+
+
+@receiver(post_delete, sender=SupplierProfile)
+def sync_search_delete_supplier(sender, instance, **kwargs):
+    remove_search_entity(SearchEntity.Types.SUPPLIER, instance.id)
+
+
+@receiver(post_delete, sender=BuyerProfile)
+def sync_search_delete_buyer(sender, instance, **kwargs):
+    remove_search_entity(SearchEntity.Types.BUYER, instance.id)
+
+
+@receiver(post_delete, sender=UnregisteredCompany)
+def sync_search_delete_unregistered_company(sender, instance, **kwargs):
+    remove_search_entity(SearchEntity.Types.UNREGISTERED_COMPANY, instance.id)
+
+
+@receiver(post_queryset_delete, sender=Company)
+def sync_search_delete_companies(sender, ids, **kwargs):
+    remove_search_entities(SearchEntity.Types.COMPANY, ids)
+
+
+@receiver(post_queryset_delete, sender=SupplierProfile)
+def sync_search_delete_suppliers(sender, ids, **kwargs):
+    remove_search_entities(SearchEntity.Types.SUPPLIER, ids)
+    refresh_suppliers_coverage(ids)
+
+
+@receiver(post_queryset_delete, sender=BuyerProfile)
+def sync_search_delete_buyers(sender, ids, **kwargs):
+    remove_search_entities(SearchEntity.Types.BUYER, ids)
+
+
+@receiver(pre_save, sender=SupplierSaleLocation)
+def track_sale_location_country(sender, instance, **kwargs):
+    """Keep the country the location had, to refresh its coverage too."""
+    instance.previous_country_code = SupplierSaleLocation.all_objects.filter(
+        pk = instance.pk
+    ).values_list('country_code', flat = True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=SupplierSaleLocation)
+def sync_coverage_sale_location(sender, instance, **kwargs):
+    refresh_country_coverage(getattr(instance, 'previous_country_code', None), instance.country_code)
+
+
+@receiver(post_delete, sender=SupplierSaleLocation)
+def sync_coverage_delete_sale_location(sender, instance, **kwargs):
+    refresh_country_coverage(instance.country_code)
+
+
+@receiver(post_save, sender=SynonymGroup)
+@receiver(post_delete, sender=SynonymGroup)
+def reload_synonyms(sender, instance, **kwargs):
+    bump_synonyms_version()
+
+    # The cached search results were expanded with the previous synonyms
+    bump_market_generation()
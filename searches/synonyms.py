@@ -0,0 +1,135 @@
+# searches/synonyms.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Models
+from searches.models import SynonymGroup
+
+# Utils
+from business_network_API.utils import normalize_text
+import hashlib
+import itertools
+import threading
+import time
+
+
+SYNONYMS_VERSION_KEY = 'searches:synonyms:version'
+
+
+class SynonymsDictionary:
+    """
+    Synonyms held in memory as a hash map of normalized term (Word
+    or phrase) -> equivalent terms. The phrases are matched greedily
+    by the longest amount of words, so it works like a trie of words.
+    """
+
+    def __init__(self, synonyms, version = None):
+        self.synonyms = synonyms
+        self.version = version
+        self.max_words = max((len(term.split()) for term in synonyms), default = 0)
+
+    @classmethod
+    def load(cls, version = None):
+        """Read the synonym groups from the database."""
+        synonyms = {}
+
+        for synonym_group in SynonymGroup.objects.all().iterator():
+            terms = synonym_group.get_terms()
+
+            for term in terms:
+                equivalents = synonyms.setdefault(term, set())
+                equivalents.update(equivalent for equivalent in terms if equivalent != term)
+
+        return cls({term: sorted(equivalents) for term, equivalents in synonyms.items()}, version)
+
+    def match(self, words):
+        """Split the words in segments, each one with its equivalent terms (Empty if it has none)."""
+        segments = []
+        position = 0
+
+        while position < len(words):
+            for length in range(min(self.max_words, len(words) - position), 0, -1):
+                term = ' '.join(words[position:position + length])
+
+                if term in self.synonyms:
+                    segments.append((term, self.synonyms[term]))
+                    position += length
+                    break
+            else:
+                segments.append((words[position], []))
+                position += 1
+
+        return segments
+
+    def expand(self, query, limit):
+        """Return the query normalized and up to limit - 1 alternatives with the synonyms of its terms."""
+        words = normalize_text(query).split()
+
+        if not self.synonyms or not words:
+            return [' '.join(words)]
+
+        options = [[term] + equivalents for term, equivalents in self.match(words)]
+
+        return [
+            ' '.join(combination) 
+            for combination in itertools.islice(itertools.product(*options), limit)
+        ]
+
+
+_dictionary = None
+_dictionary_lock = threading.Lock()
+
+
+def get_synonyms_version():
+    """Return the version of the synonyms. When it's missing (Ej: evicted) it's seeded
+    with a value never used before, so every process reloads the synonyms."""
+    version = cache.get(SYNONYMS_VERSION_KEY)
+
+    if version is None:
+        version = time.time_ns()
+        cache.add(SYNONYMS_VERSION_KEY, version, None)
+        version = cache.get(SYNONYMS_VERSION_KEY, version)
+
+    return version
+
+
+def get_synonyms_dictionary():
+    """Return the dictionary of the process, reloaded when there is a new version."""
+    global _dictionary
+
+    version = get_synonyms_version()
+
+    if _dictionary is None or _dictionary.version != version:
+        with _dictionary_lock:
+            if _dictionary is None or _dictionary.version != version:
+                _dictionary = SynonymsDictionary.load(version)
+
+    return _dictionary
+
+
+def bump_synonyms_version():
+    """Make all the processes reload the synonyms."""
+    try:
+        cache.incr(SYNONYMS_VERSION_KEY)
+    except ValueError:
+        cache.add(SYNONYMS_VERSION_KEY, time.time_ns(), None)
+
+
+def expand_query(query):
+    """Return the expansions of the query with synonyms, cached by normalized query and version."""
+    dictionary = get_synonyms_dictionary()
+    normalized_query = normalize_text(query)
+
+    cache_key = 'searches:synonyms:{version}:{digest}'.format(
+        version = dictionary.version,
+        digest = hashlib.sha1(normalized_query.encode()).hexdigest()
+    )
+    expansions = cache.get(cache_key)
+
+    if expansions is None:
+        expansions = dictionary.expand(query, settings.SEARCH_SYNONYMS_MAX_EXPANSIONS)
+        cache.set(cache_key, expansions, settings.SEARCH_SYNONYMS_CACHE_TIMEOUT)
+
+    return expansions
@@ -1,3 +1,571 @@
-from django.test import TestCase
+# Searches tests
 
-# Create your tests here.
+# Django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+# Django REST framework
+from rest_framework.test import APIClient
+
+# Models
+from companies.models import Company, UnregisteredCompany
+from suppliers.models import Currency, ExchangeRate, Product, SupplierLocation, SupplierProfile, SupplierSaleLocation
+from market.models import ShowcaseProduct
+from searches.models import SearchEntity, SearchQueryLog, SearchTerm, SynonymGroup
+from users.models import User
+
+# Market
+from market.signals import create_showcase_product
+
+# Signals
+from suppliers.signals import post_product_delete, post_product_update
+
+# Cache
+from market.cache import get_market_generation
+from searches.cache import get_search_results_cache_key
+
+# Analytics
+from searches.analytics import SearchLogBuffer, search_log_buffer
+
+# Coverage
+from searches.coverage import COUNTRY_COVERAGE_KEY, get_country_supplier_ids
+
+# Vocabulary
+from searches.vocabulary import compute_query_suggestions, get_query_suggestions, get_terms
+
+# Synonyms
+from searches.synonyms import SynonymsDictionary, expand_query
+
+# Facets
+from searches.facets import compute_facets, get_facets_cache_key, get_price_bucket_expression, parse_facets_param
+
+# Utils
+from datetime import timedelta
+from unittest import mock, skipUnless
+import io
+
+
+postgresql_only = skipUnless(connection.vendor == 'postgresql', 'It runs only over PostgreSQL')
+
+
+class MarketMixin:
+    """Market with a supplier that sells products in COP, the searches run over their showcase products."""
+
+    def setUp(self):
+        # The ids of the sections and the search results are cached between tests
+        cache.clear()
+
+        # The views and the searches are written by background threads
+        for patch in (
+            mock.patch('market.popularity.popularity_counters.start'),
+            mock.patch('searches.analytics.search_log_buffer.start'),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        user = User.objects.create_user('owner@acme.com', 'x12345678', 'Acme Owner')
+        self.company, _ = Company.objects.create(user, name = 'Acme', legal_identifier = '900123')
+        self.supplier = SupplierProfile.objects.create( company = self.company, display_name = 'Acme', industry = 'Agro' )
+        self.currency = Currency.objects.create( name = 'Peso', code = 'COP', region = 'CO' )
+        ExchangeRate.objects.create( currency = self.currency, usd_rate = '0.00025' )
+
+    def create_product(self, name, category = 'Alimentos > Frutas', minimum_price = 40000, **fields):
+        fields.setdefault('price_currency', self.currency)
+
+        product = Product.objects.create(
+            supplier = self.supplier,
+            name = name,
+            category = category,
+            minimum_price = minimum_price,
+            **fields
+        )
+        create_showcase_product(product)
+
+        return product
+
+
+class MarketTestCase(MarketMixin, TestCase):
+    pass
+
+
+class MarketTransactionTestCase(MarketMixin, TransactionTestCase):
+    """The market with real transactions, for the writes that are done again after the commit."""
+
+
+class FacetsTestCase(MarketTestCase):
+
+    def test_parse_facets_param(self):
+        self.assertEqual(parse_facets_param(None), [])
+        self.assertEqual(parse_facets_param('price, section,price'), ['price', 'section'])
+        self.assertEqual(sorted(parse_facets_param('all')), sorted(['section', 'currency', 'price', 'industry', 'sale_country']))
+
+        with self.assertRaises(Exception):
+            parse_facets_param('section,color')
+
+    def test_price_buckets(self):
+        buckets = {}
+        for price in ('0', '9.99', '10', '75', '5000', 'NULL'):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT {}'.format(get_price_bucket_expression(price)))
+                buckets[price] = cursor.fetchone()[0]
+
+        self.assertEqual(buckets, {
+            '0': '0-10', '9.99': '0-10', '10': '10-50', '75': '50-100', '5000': '5000+', 'NULL': None
+        })
+
+    def test_cache_key_ignores_the_pagination(self):
+        facets = ['price', 'section']
+        first_page = QueryDict('q=Café&facets=price,section&limit=10&offset=0')
+        second_page = QueryDict('facets=section,price&offset=10&q=cafe&limit=10')
+        other_query = QueryDict('q=te&facets=price,section')
+
+        self.assertEqual(get_facets_cache_key(first_page, facets), get_facets_cache_key(second_page, facets))
+        self.assertNotEqual(get_facets_cache_key(first_page, facets), get_facets_cache_key(other_query, facets))
+
+    @postgresql_only
+    def test_compute_facets_in_one_pass(self):
+        self.create_product('Mango', minimum_price = 40000) # 10 USD
+        self.create_product('Banano', minimum_price = 20000) # 5 USD
+        self.create_product('Cafe', category = 'Bebidas', minimum_price = 200000) # 50 USD
+
+        with self.assertNumQueries(3): # The facets, the sections and the currencies labels
+            facets = compute_facets(ShowcaseProduct.objects.all(), ['currency', 'price', 'section'])
+
+        self.assertEqual(facets['currency'], [{'value': self.currency.id, 'count': 3, 'label': 'COP'}])
+        self.assertEqual(facets['price'], [
+            {'value': '0-10', 'count': 1}, {'value': '10-50', 'count': 1}, {'value': '50-100', 'count': 1}
+        ])
+        self.assertEqual(
+            [(bucket['label'], bucket['count']) for bucket in facets['section']],
+            [('Frutas', 2), ('Bebidas', 1)]
+        )
+
+
+@postgresql_only
+class ProductSearchTestCase(MarketTestCase):
+    """The product search matches unaccented, so it runs only over PostgreSQL."""
+
+    def search(self, **params):
+        response = APIClient().get('/search/products/', params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.data
+
+    def get_names(self, data):
+        return sorted(product['name'] for product in data['results'])
+
+    def test_price_range(self):
+        self.create_product('Mango', minimum_price = 40000) # 10 USD
+        self.create_product('Maracuya', minimum_price = 200000) # 50 USD
+
+        self.assertEqual(self.get_names(self.search( q = 'ma', min_price = '20' )), ['Maracuya'])
+        self.assertEqual(self.get_names(self.search( q = 'ma', max_price = '10.00' )), ['Mango'])
+        self.assertEqual(self.get_names(self.search( q = 'ma', min_price = '5', max_price = '60' )), ['Mango', 'Maracuya'])
+
+
+class SearchIndexTestCase(MarketTestCase):
+    """The entities are indexed in SearchEntity on every write, for the federated search."""
+
+    def get_entity(self, entity_type, entity_id):
+        return SearchEntity.objects.filter( entity_type = entity_type, entity_id = entity_id ).first()
+
+    def test_entities_indexed_on_save(self):
+        company_entity = self.get_entity(SearchEntity.Types.COMPANY, self.company.id)
+        supplier_entity = self.get_entity(SearchEntity.Types.SUPPLIER, self.supplier.id)
+
+        self.assertEqual(company_entity.search_name, 'acme')
+        self.assertEqual((supplier_entity.accountname, supplier_entity.industry), (self.company.accountname, 'Agro'))
+
+    def test_company_rename_reindexes_its_supplier(self):
+        self.supplier.display_name = 'Café Acme'
+        self.supplier.save()
+        self.company.description = 'Exportadora de Café'
+        self.company.save()
+
+        self.assertEqual(self.get_entity(SearchEntity.Types.SUPPLIER, self.supplier.id).search_name, 'cafe acme')
+        self.assertIn('exportadora de cafe', self.get_entity(SearchEntity.Types.COMPANY, self.company.id).search_text)
+
+    def test_deleted_entities_are_removed(self):
+        self.supplier.delete()
+        self.assertIsNone(self.get_entity(SearchEntity.Types.SUPPLIER, self.supplier.id))
+
+        # The queryset delete is an update that sends no post_delete
+        Company.objects.filter( id = self.company.id ).delete()
+        self.assertIsNone(self.get_entity(SearchEntity.Types.COMPANY, self.company.id))
+
+    def test_invalid_types(self):
+        response = APIClient().get('/search/entities/', {'q': 'acme', 'types': 'supplier,bank'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'bank' is not a valid type", response.data['detail'])
+
+    @postgresql_only
+    def test_ranked_search(self):
+        UnregisteredCompany.objects.create( name = 'Acme Logistics', industry = 'Transporte', country = 'CO' )
+
+        response = APIClient().get('/search/entities/', {'q': 'acme'})
+
+        self.assertEqual(response.status_code, 200)
+        results = [(entity['entity_type'], entity['name']) for entity in response.data['results']]
+
+        # The exact names first, then the ones that start with the query
+        self.assertEqual(results[-1], (SearchEntity.Types.UNREGISTERED_COMPANY, 'Acme Logistics'))
+        self.assertCountEqual(results[:2], [(SearchEntity.Types.COMPANY, 'Acme'), (SearchEntity.Types.SUPPLIER, 'Acme')])
+
+
+class SearchResultsCacheTestCase(MarketTestCase):
+
+    def test_equivalent_searches_share_the_key(self):
+        key = get_search_results_cache_key(QueryDict('q=Café Orgánico&query_fields=name,description&limit=10'))
+
+        self.assertEqual(key, get_search_results_cache_key(
+            QueryDict('limit=10&query_fields=description, name&q=cafe organico&facets=price')
+        ))
+        self.assertNotEqual(key, get_search_results_cache_key(
+            QueryDict('q=cafe organico&query_fields=name,description&limit=10&offset=10')
+        ))
+
+    def test_market_writes_change_the_key(self):
+        query_params = QueryDict('q=mango')
+        key = get_search_results_cache_key(query_params)
+
+        self.create_product('Mango')
+        self.assertEqual(get_search_results_cache_key(query_params), key)
+
+        post_product_update.send( sender = Product, instance = Product.objects.get(), created = False )
+        self.assertNotEqual(get_search_results_cache_key(query_params), key)
+
+    def test_evicted_generation_is_never_reused(self):
+        generation = get_market_generation()
+
+        cache.clear()
+        self.assertNotEqual(get_market_generation(), generation)
+
+    @postgresql_only
+    def test_cached_results_until_a_write(self):
+        self.create_product('Mango')
+        self.assertEqual(self.search_names(), ['Mango'])
+
+        # Created without the signals, so the market isn't written
+        product = self.create_product('Mango Azucar')
+        self.assertEqual(self.search_names(), ['Mango'])
+
+        post_product_update.send( sender = Product, instance = product, created = False )
+        self.assertEqual(sorted(self.search_names()), ['Mango', 'Mango Azucar'])
+
+    def search_names(self):
+        response = APIClient().get('/search/products/', {'q': 'mango'})
+
+        return [product['name'] for product in response.data['results']]
+
+
+class SearchResultsCacheCommitTestCase(MarketTransactionTestCase):
+    """The reads between the invalidation and the commit can cache the old data, so it's invalidated again after the commit."""
+
+    def test_generation_bumped_again_after_the_commit(self):
+        query_params = QueryDict('q=mango')
+
+        with transaction.atomic():
+            product = self.create_product('Mango')
+            post_product_update.send( sender = Product, instance = product, created = False )
+
+            # A concurrent search, that still reads the old products
+            key = get_search_results_cache_key(query_params)
+            cache.set(key, {'ids': [], 'count': 0})
+
+        self.assertNotEqual(get_search_results_cache_key(query_params), key)
+
+
+class SearchLogBufferTestCase(TestCase):
+
+    def get_entry(self, query, **fields):
+        created_at = fields.pop('created_at', timezone.now())
+
+        return dict({
+            'search': 'products', 'query': query, 'filters': {}, 'results_count': 1, 'latency_ms': 10.0,
+            'created_at': created_at, 'day': created_at.date()
+        }, **fields)
+
+    def test_full_buffer_drops_the_oldest(self):
+        buffer = SearchLogBuffer( size = 3, batch_size = 2, flush_interval = 60 )
+        buffer.start = mock.Mock()
+
+        for query in ('mango', 'banano', 'cafe', 'te'):
+            buffer.append(self.get_entry(query))
+
+        self.assertEqual([entry['query'] for entry in buffer.entries], ['banano', 'cafe', 'te'])
+        self.assertTrue(buffer.flush_requested.is_set())
+        self.assertEqual(buffer.start.call_count, 4)
+
+    def test_flush_in_batches(self):
+        buffer = SearchLogBuffer( size = 10, batch_size = 2, flush_interval = 60 )
+        buffer.start = mock.Mock()
+
+        for query in ('mango', 'banano', 'cafe'):
+            buffer.append(self.get_entry(query))
+
+        with mock.patch.object(SearchQueryLog.objects, 'bulk_create') as bulk_create:
+            buffer.flush()
+
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 1])
+        self.assertEqual(len(buffer.entries), 0)
+
+    def test_entities_search_not_logged_when_invalid(self):
+        with mock.patch.object(search_log_buffer, 'append') as append:
+            APIClient().get('/search/entities/', {'q': 'Café', 'types': 'bank'})
+
+        append.assert_not_called()
+
+    @postgresql_only
+    def test_search_logged_normalized(self):
+        with mock.patch.object(search_log_buffer, 'append') as append:
+            APIClient().get('/search/entities/', {'q': 'Café', 'types': 'supplier', 'limit': 5})
+
+        entry = append.call_args.args[0]
+        self.assertEqual((entry['search'], entry['query'], entry['filters']), ('entities', 'cafe', {'types': 'supplier'}))
+        self.assertEqual(entry['results_count'], 0)
+
+    @postgresql_only
+    def test_rollup(self):
+        old_date = timezone.now() - timedelta( days = 10 )
+        SearchQueryLog.objects.bulk_create([
+            SearchQueryLog(**self.get_entry('mango')),
+            SearchQueryLog(**self.get_entry('mango', latency_ms = 30.0)),
+            SearchQueryLog(**self.get_entry('pitahaya', results_count = 0)),
+            SearchQueryLog(**self.get_entry('cafe', created_at = old_date)),
+        ])
+
+        output = io.StringIO()
+        call_command('rollup_search_logs', days = 7, stdout = output)
+        report = output.getvalue()
+
+        self.assertIn('[products] "mango": 2 searches', report)
+        self.assertIn('Queries without results:\n  [products] "pitahaya": 1 searches', report)
+        self.assertNotIn('cafe', report)
+        self.assertIn('[products] p50=10.0', report)
+
+
+class NearbySuppliersTestCase(MarketTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        for city, latitude, longitude in (
+            ('Bogota', '4.710989', '-74.072090'),
+            ('Medellin', '6.244203', '-75.581215'),
+            ('Lima', '-12.046374', '-77.042793'),
+        ):
+            SupplierLocation.objects.create(
+                supplier = self.supplier, country = 'Colombia', city = city, latitude = latitude, longitude = longitude
+            )
+
+    def search(self, **params):
+        return APIClient().get('/search/suppliers/nearby/', params)
+
+    def get_cities(self, response):
+        self.assertEqual(response.status_code, 200)
+
+        return [location['city'] for location in response.data['results']]
+
+    def test_locations_inside_the_radius_by_distance(self):
+        response = self.search( latitude = '4.6', longitude = '-74.1', radius = '300' )
+
+        self.assertEqual(self.get_cities(response), ['Bogota', 'Medellin'])
+        self.assertLess(response.data['results'][0]['distance'], 15)
+
+        response = self.search( latitude = '4.6', longitude = '-74.1', radius = '300', ordering = '-distance' )
+        self.assertEqual(self.get_cities(response), ['Medellin', 'Bogota'])
+
+    def test_default_radius(self):
+        self.assertEqual(self.get_cities(self.search( latitude = '6.2', longitude = '-75.6' )), ['Medellin'])
+
+    def test_deleted_suppliers_excluded(self):
+        SupplierProfile.objects.filter( id = self.supplier.id ).update( state = SupplierProfile.States.DELETED )
+
+        self.assertEqual(self.get_cities(self.search( latitude = '4.6', longitude = '-74.1' )), [])
+
+    def test_across_the_antimeridian(self):
+        SupplierLocation.objects.create(
+            supplier = self.supplier, country = 'Fiji', city = 'Taveuni', latitude = '-16.85', longitude = '-179.95'
+        )
+
+        self.assertEqual(self.get_cities(self.search( latitude = '-16.8', longitude = '179.9', radius = '50' )), ['Taveuni'])
+
+    def test_invalid_point(self):
+        for params in (
+            {'latitude': '4.6'},
+            {'latitude': '4.6', 'longitude': 'east'},
+            {'latitude': '91', 'longitude': '-74.1'},
+            {'latitude': '4.6', 'longitude': '-74.1', 'radius': '5000'},
+            {'latitude': '4.6', 'longitude': '-74.1', 'ordering': 'name'},
+        ):
+            self.assertEqual(self.search(**params).status_code, 400)
+
+
+class CountryCoverageTestCase(MarketTransactionTestCase):
+    """The suppliers that sell into each country are cached, the writes of the sale locations expire them."""
+
+    def setUp(self):
+        super().setUp()
+        SupplierSaleLocation.objects.create( supplier = self.supplier, country = 'Colombia' )
+
+    def create_supplier(self, name):
+        user = User.objects.create_user('owner@{}.com'.format(name.lower()), 'x12345678', name + ' Owner')
+        company, _ = Company.objects.create(user, name = name, legal_identifier = name)
+
+        return SupplierProfile.objects.create( company = company, display_name = name )
+
+    def test_coverage_cached(self):
+        self.assertEqual(get_country_supplier_ids('CO'), {self.supplier.id})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_country_supplier_ids('CO'), {self.supplier.id})
+
+        self.assertEqual(get_country_supplier_ids('PE'), set())
+
+    def test_sale_location_writes_expire_the_coverage(self):
+        self.assertEqual(get_country_supplier_ids('PE'), set())
+        other_supplier = self.create_supplier('Andes')
+
+        sale_location = SupplierSaleLocation.objects.create( supplier = other_supplier, country = 'Peru' )
+        self.assertEqual(get_country_supplier_ids('PE'), {other_supplier.id})
+
+        # Moved to another country, both are expired
+        sale_location.country = 'Colombia'
+        sale_location.save()
+        self.assertEqual(get_country_supplier_ids('PE'), set())
+        self.assertEqual(get_country_supplier_ids('CO'), {self.supplier.id, other_supplier.id})
+
+    def test_deleted_suppliers_expire_the_coverage(self):
+        self.assertEqual(get_country_supplier_ids('CO'), {self.supplier.id})
+
+        self.supplier.delete()
+        self.assertEqual(get_country_supplier_ids('CO'), set())
+
+        other_supplier = self.create_supplier('Andes')
+        SupplierSaleLocation.objects.create( supplier = other_supplier, country = 'CO' )
+        self.assertEqual(get_country_supplier_ids('CO'), {other_supplier.id})
+
+        SupplierProfile.objects.filter( id = other_supplier.id ).delete()
+        self.assertEqual(get_country_supplier_ids('CO'), set())
+
+    def test_coverage_expired_again_after_the_commit(self):
+        with transaction.atomic():
+            SupplierSaleLocation.objects.create( supplier = self.supplier, country = 'Peru' )
+
+            # A concurrent read, that still sees the sale locations before the commit
+            cache.set(COUNTRY_COVERAGE_KEY.format('PE'), frozenset())
+
+        self.assertEqual(get_country_supplier_ids('PE'), {self.supplier.id})
+
+    def test_suppliers_that_sell_to(self):
+        self.create_supplier('Andes')
+
+        response = APIClient().get('/suppliers/', {'sells_to': 'colombia'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([supplier['id'] for supplier in response.data['results']], [self.supplier.id])
+
+        response = APIClient().get('/suppliers/', {'sells_to': 'Atlantis'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'Atlantis' is not a valid country", response.data['detail'])
+
+
+class VocabularyTestCase(MarketTestCase):
+    """The words of the showcase products, with the spelling corrections of the searches over them."""
+
+    def get_frequencies(self):
+        return dict(SearchTerm.objects.values_list('term', 'frequency'))
+
+    def test_get_terms(self):
+        self.assertEqual(get_terms('Café de Colombia', None, 'Té verde'), {'cafe', 'colombia', 'verde'})
+
+    def test_vocabulary_follows_the_products(self):
+        self.create_product('Mango Tommy')
+        product = self.create_product('Mango Azucar')
+
+        frequencies = self.get_frequencies()
+        self.assertEqual((frequencies['mango'], frequencies['tommy'], frequencies['frutas']), (2, 1, 2))
+
+        post_product_delete.send( sender = Product, instance = product )
+
+        frequencies = self.get_frequencies()
+        self.assertEqual(frequencies['mango'], 1)
+        self.assertNotIn('azucar', frequencies)
+
+    def test_rebuild_vocabulary(self):
+        self.create_product('Mango Tommy')
+        SearchTerm.objects.all().delete()
+
+        call_command('rebuild_search_vocabulary', stdout = io.StringIO())
+
+        self.assertEqual(self.get_frequencies(), {'mango': 1, 'tommy': 1, 'frutas': 1, 'acme': 1})
+
+    def test_known_words_have_no_suggestions(self):
+        self.create_product('Mango Tommy')
+
+        self.assertEqual(compute_query_suggestions('Mango tommy', 3), [])
+
+    @postgresql_only
+    def test_suggestions(self):
+        self.create_product('Mango Tommy')
+        self.create_product('Manga de riego', category = 'Agricultura > Riego')
+
+        self.assertEqual(get_query_suggestions('mnago tommy')[0], 'mango tommy')
+
+    @postgresql_only
+    def test_search_autocorrected(self):
+        self.create_product('Mango Tommy')
+
+        response = APIClient().get('/search/products/', {'q': 'mnago'})
+        self.assertEqual(response.data['corrected_query'], 'mango')
+        self.assertEqual([product['name'] for product in response.data['results']], ['Mango Tommy'])
+
+        response = APIClient().get('/search/products/', {'q': 'mnago', 'autocorrect': 'false'})
+        self.assertEqual(response.data['results'], [])
+        self.assertIn('mango', response.data['suggestions'])
+
+
+class SynonymsTestCase(MarketTestCase):
+
+    def setUp(self):
+        super().setUp()
+        SynonymGroup.objects.create( name = 'Aguacate', terms = 'Aguacate, avocado, palta' )
+        SynonymGroup.objects.create( name = 'Maracuya', terms = 'maracuyá, passion fruit' )
+
+    def test_phrases_matched_by_the_longest(self):
+        dictionary = SynonymsDictionary({'passion fruit': ['maracuya'], 'fruit': ['fruta']})
+
+        self.assertEqual(dictionary.match(['fresh', 'passion', 'fruit']), [
+            ('fresh', []), ('passion fruit', ['maracuya'])
+        ])
+        self.assertEqual(dictionary.expand('Fresh Passion Fruit', 8), ['fresh passion fruit', 'fresh maracuya'])
+
+    def test_expansions_limited(self):
+        dictionary = SynonymsDictionary({'a': ['b', 'c'], 'd': ['e', 'f']})
+
+        self.assertEqual(dictionary.expand('a d', 4), ['a d', 'a e', 'a f', 'b d'])
+
+    def test_expand_query(self):
+        self.assertEqual(expand_query('Avocado Hass'), ['avocado hass', 'aguacate hass', 'palta hass'])
+        self.assertEqual(expand_query('Passion Fruit'), ['passion fruit', 'maracuya'])
+        self.assertEqual(expand_query('Mango'), ['mango'])
+
+    def test_synonyms_writes_reload_the_dictionary(self):
+        self.assertEqual(expand_query('mango'), ['mango'])
+
+        group = SynonymGroup.objects.create( name = 'Mango', terms = 'mango, manga' )
+        self.assertEqual(expand_query('mango'), ['mango', 'manga'])
+
+        group.delete()
+        self.assertEqual(expand_query('mango'), ['mango'])
+
+    @postgresql_only
+    def test_search_with_synonyms(self):
+        self.create_product('Aguacate Hass')
+
+        response = APIClient().get('/search/products/', {'q': 'avocado'})
+        self.assertEqual([product['name'] for product in response.data['results']], ['Aguacate Hass'])
@@ -10,6 +10,8 @@ router = routers.DefaultRouter()
 router.register('companies', SearchCompaniesViewSet, basename="search__companies")
 router.register('unregistered-companies', SearchUnregisteredCompaniesViewSet, basename="search__unregistered_companies")
 router.register('products', SearchShowcaseProductsViewSet, basename="search__products")
+router.register('entities', SearchEntitiesViewSet, basename="search__entities")
+router.register('suppliers/nearby', SearchNearbySuppliersViewSet, basename="search__nearby_suppliers")
 
 urlpatterns = [
     path('', include(router.urls)),
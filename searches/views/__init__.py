@@ -1,2 +1,4 @@
 from searches.views.companies import *
-from searches.views.products import *
\ No newline at end of file
+from searches.views.entities import *
+from searches.views.products import *
+from searches.views.suppliers import *
@@ -17,6 +17,9 @@ from companies.models import Company, UnregisteredCompany
     # Serializers
 from companies.serializers import CompanyModelSerializer, UnregisteredCompanyModelSerializer
 
+# Analytics
+from searches.analytics import SearchAnalyticsMixin
+
 
 @method_decorator(name = 'list', decorator = swagger_auto_schema(
     operation_id = "Search Companies", tags = ["Search"],
@@ -27,12 +30,14 @@ from companies.serializers import CompanyModelSerializer, UnregisteredCompanyMod
     ],
     responses = { 404: openapi.Response("Not Found") }, security = []
 ))
-class SearchCompaniesViewSet(viewsets.GenericViewSet,
+class SearchCompaniesViewSet(SearchAnalyticsMixin,
+                            viewsets.GenericViewSet,
                             generics.ListAPIView):
     """
     Search view in charge of searching queries in companies model.
     """
 
+    search_name = 'companies'
     queryset = Company.objects.all()
     serializer_class = CompanyModelSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
@@ -48,12 +53,14 @@ class SearchCompaniesViewSet(viewsets.GenericViewSet,
     ],
     responses = { 404: openapi.Response("Not Found") }, security = []
 ))
-class SearchUnregisteredCompaniesViewSet(viewsets.GenericViewSet,
+class SearchUnregisteredCompaniesViewSet(SearchAnalyticsMixin,
+                                        viewsets.GenericViewSet,
                                         generics.ListAPIView):
     """
     Search view in charge of searching queries in unregistered companies model.
     """
 
+    search_name = 'unregistered_companies'
     queryset = UnregisteredCompany.objects.all()
     serializer_class = UnregisteredCompanyModelSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
@@ -0,0 +1,144 @@
+# searches/views/entities.py
+
+# Django
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+# django rest framework
+from rest_framework import mixins, status, viewsets, generics
+from rest_framework.response import Response
+
+# Documentation
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+# Models
+from searches.models import SearchEntity
+from suppliers.models import SupplierProfile
+
+# Serializers
+from searches.serializers import SearchEntityModelSerializer
+
+# Analytics
+from searches.analytics import SearchAnalyticsMixin
+
+# Coverage
+from searches.coverage import get_country_supplier_ids, parse_country_param
+
+# Utils
+from business_network_API.utils import normalize_text
+
+
+class SearchEntitiesViewSet(SearchAnalyticsMixin,
+                            viewsets.GenericViewSet,
+                            generics.ListAPIView):
+    """
+    Search view in charge of searching queries over all the entities
+    of the platform (companies, suppliers, buyers and unregistered companies).
+    """
+
+    search_name = 'entities'
+    serializer_class = SearchEntityModelSerializer
+
+    def get_types(self):
+        """Return the list of entity types to search."""
+        types_str = self.request.query_params.get("types")
+
+        if not types_str:
+            return None
+
+        types = [entity_type.strip() for entity_type in types_str.split(",") if entity_type.strip()]
+
+        for entity_type in types:
+            if entity_type not in SearchEntity.Types.values:
+                raise Exception("'{}' is not a valid type. The possible types are: {}".format(
+                    entity_type, ", ".join(SearchEntity.Types.values)
+                ))
+
+        return types
+
+    def get_queryset(self):
+        """Match the normalized query over the search entries 
+            and rank them by similarity with the query.
+        """
+        query = self.request.query_params.get("q")
+
+        if query is None:
+            raise Exception("q query param is needed to search")
+
+        query = normalize_text(query)
+
+        queryset = SearchEntity.objects.filter(
+            Q(search_text__contains = query) | Q(search_name__trigram_similar = query)
+        ).annotate(
+            rank = Greatest(
+                Case(
+                    When(search_name = query, then = Value(2.0)),
+                    When(search_name__startswith = query, then = Value(1.0)),
+                    default = Value(0.0), output_field = FloatField()
+                ) + TrigramSimilarity('search_name', query),
+                TrigramSimilarity('search_text', query)
+            )
+        ).select_related('logo').order_by('-rank', 'name')
+
+        types = self.get_types()
+        if types:
+            queryset = queryset.filter( entity_type__in = types )
+
+        industry = self.request.query_params.get("industry")
+        if industry:
+            queryset = queryset.filter( industry__iexact = industry )
+
+        sells_to = self.request.query_params.get("sells_to")
+        if sells_to:
+            supplier_ids = get_country_supplier_ids(parse_country_param(sells_to))
+            queryset = queryset.filter(
+                Q(entity_type = SearchEntity.Types.SUPPLIER, entity_id__in = supplier_ids) |
+                Q(
+                    entity_type = SearchEntity.Types.COMPANY, 
+                    entity_id__in = SupplierProfile.objects.filter( id__in = supplier_ids ).values('company_id')
+                )
+            )
+
+        return queryset
+
+    @swagger_auto_schema( tags = ["Search"], responses = { 404: openapi.Response("Not Found") }, security = [],
+        manual_parameters = [
+            openapi.Parameter(name = "q", in_ = openapi.IN_QUERY, type = "String", description = "Search term."),
+            openapi.Parameter(name = "types", in_ = openapi.IN_QUERY, type = "String", 
+                description = """
+                    Types of entities where the query `q` is going to be executed.\n
+                    This param accepts a list of types separated by commas. (Ej: `types=supplier,buyer`)\n
+                    The possible types are: `company, supplier, buyer and unregistered_company`.\n
+                    If this param isnt specified the query is going to be executed over all the types."""
+            ),
+            openapi.Parameter(name = "industry", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the search by industry."),
+            openapi.Parameter(name = "sells_to", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the suppliers (And its companies) that sell into a country. (Code or name)")
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Search Entities\n
+            Endpoint to search with one query over the companies, suppliers, buyers and unregistered companies.\n
+            Returns a single list ranked by relevance where each result has its `entity_type`.
+        """
+
+        try:
+            entities_queryset = self.get_queryset()
+
+            page = self.paginate_queryset(entities_queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            res_data = {
+                "results": self.get_serializer(entities_queryset, many=True).data
+            }
+            res_status = status.HTTP_200_OK
+        except Exception as e:
+            res_data = {"detail": str(e)}
+            res_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(res_data, res_status)
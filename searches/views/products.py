@@ -1,7 +1,10 @@
 # searches/views/products.py
 
 # Django
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 
 # django rest framework
 from django_filters.rest_framework import DjangoFilterBackend
@@ -18,17 +21,59 @@ from market.models import ShowcaseProduct
 # Serializers
 from market.serializers.showcases import ShowcaseProductModelSerializer
 
+# Facets
+from searches.facets import get_facets
 
-class SearchShowcaseProductsViewSet(viewsets.GenericViewSet,
+# Analytics
+from searches.analytics import SearchAnalyticsMixin
+
+# Tariffs
+from suppliers.tariffs import normalize_tariff_heading
+
+# Coverage
+from searches.coverage import get_country_supplier_ids, parse_country_param
+
+# Vocabulary
+from searches.vocabulary import get_query_suggestions
+
+# Synonyms
+from searches.synonyms import expand_query
+
+# Popularity
+from market.popularity import record_views
+
+# Cache
+from market.cache import get_showcase_products_data
+from searches.cache import get_search_results_cache_key
+
+# Utils
+from decimal import Decimal, InvalidOperation
+
+
+class SearchShowcaseProductsViewSet(SearchAnalyticsMixin,
+                                    viewsets.GenericViewSet,
                                     generics.ListAPIView):
     """
     Search view in charge of searching queries in showcase products
     """
 
+    search_name = 'products'
     serializer_class = ShowcaseProductModelSerializer
+    corrected_query = None
     filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+    ordering_fields = ShowcaseProductModelSerializer.Meta.fields + ('trending',)
     filterset_fields = ['name', 'tariff_heading', 'supplier_name', 'supplier_accountname']
 
+    def get_search_params(self):
+        """Return the query params of the search, with the query corrected if it was."""
+        query_params = self.request.query_params
+
+        if self.corrected_query is not None:
+            query_params = query_params.copy()
+            query_params["q"] = self.corrected_query
+
+        return query_params
+
     def get_query_fields(self):
         """Return the list of query_fields"""
         query_fields_str = self.request.query_params.get("query_fields")
@@ -62,12 +107,88 @@ class SearchShowcaseProductsViewSet(viewsets.GenericViewSet,
         """Obtain the query_fields and execute the query over them.
             Then return all the matched results.
         """
-        query = self.request.query_params.get("q")
+        query = self.get_search_params().get("q")
         
         if query is None:
             raise Exception("q query param is needed to search")
 
-        return ShowcaseProduct.objects.filter( self.get_query_statement(query) )
+        # The query and its alternatives with synonyms (Ej: avocado -> aguacate)
+        query_statement = Q(pk__in=[])
+        for expanded_query in expand_query(query):
+            query_statement |= self.get_query_statement(expanded_query)
+
+        queryset = ShowcaseProduct.objects.filter( query_statement )
+
+        queryset = self.filter_price_range(queryset)
+        queryset = self.filter_hs_code(queryset)
+        queryset = self.annotate_trending(queryset)
+
+        return self.filter_sale_country(queryset)
+
+    def annotate_trending(self, queryset):
+        """Annotate the trending score to sort by it, only if it is requested.
+            The products without views have the lowest score."""
+        ordering = self.request.query_params.get("ordering", "")
+
+        if 'trending' in ordering:
+            queryset = queryset.annotate(
+                trending = Coalesce('trending_score__score', Value(0.0))
+            )
+
+        return queryset
+
+    def filter_price_range(self, queryset):
+        """Filter the products by the min_price and max_price params (In USD)
+            over the minimum price normalized of each product."""
+        min_price = self.request.query_params.get("min_price")
+        max_price = self.request.query_params.get("max_price")
+
+        try:
+            if min_price:
+                queryset = queryset.filter( minimum_price_usd_cents__gte = int(Decimal(min_price) * 100) )
+            if max_price:
+                queryset = queryset.filter( minimum_price_usd_cents__lte = int(Decimal(max_price) * 100) )
+        except InvalidOperation:
+            raise Exception("min_price and max_price query params must be numbers")
+
+        return queryset
+
+    def filter_hs_code(self, queryset):
+        """Filter the products classified inside the tariff heading of the hs_code param."""
+        hs_code = normalize_tariff_heading(self.request.query_params.get("hs_code"))
+
+        if hs_code:
+            queryset = queryset.filter( hs_code__startswith = hs_code )
+
+        return queryset
+
+    def filter_sale_country(self, queryset):
+        """Filter the products of the suppliers that sell into the country of the sells_to param."""
+        sells_to = self.request.query_params.get("sells_to")
+
+        if sells_to:
+            supplier_ids = get_country_supplier_ids(parse_country_param(sells_to))
+            queryset = queryset.filter( product__supplier_id__in = supplier_ids )
+
+        return queryset
+
+    def get_page_cached(self, queryset):
+        """Return the ids and the total count of the page of results requested,
+            cached by the normalized query until the market changes."""
+        cache_key = get_search_results_cache_key(self.get_search_params())
+        cached_page = cache.get(cache_key)
+
+        if cached_page is None:
+            page = self.paginate_queryset(queryset.values_list('id', flat = True))
+            cached_page = {'ids': list(page), 'count': self.paginator.count}
+            cache.set(cache_key, cached_page, settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+        else:
+            self.paginator.request = self.request
+            self.paginator.limit = self.paginator.get_limit(self.request)
+            self.paginator.offset = self.paginator.get_offset(self.request)
+            self.paginator.count = cached_page['count']
+
+        return cached_page['ids']
 
 
     @swagger_auto_schema( tags = ["Search"], responses = { 404: openapi.Response("Not Found") }, security = [],
@@ -87,26 +208,81 @@ class SearchShowcaseProductsViewSet(viewsets.GenericViewSet,
             openapi.Parameter(name = "supplier_name", in_ = openapi.IN_QUERY, type = "String", 
                 description = "Param for filter the search by supplier name. (Exact match)"),
             openapi.Parameter(name = "supplier_username", in_ = openapi.IN_QUERY, type = "String", 
-                description = "Param for filter the search by supplier username. (Exact match)")
+                description = "Param for filter the search by supplier username. (Exact match)"),
+            openapi.Parameter(name = "min_price", in_ = openapi.IN_QUERY, type = "Number", 
+                description = "Param for filter the search by a minimum price in USD."),
+            openapi.Parameter(name = "max_price", in_ = openapi.IN_QUERY, type = "Number", 
+                description = "Param for filter the search by a maximum price in USD."),
+            openapi.Parameter(name = "sells_to", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the products of suppliers that sell into a country. (Code or name)"),
+            openapi.Parameter(name = "hs_code", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the products inside a tariff heading. (Ej: `09`, `0901` or `0901.11`)"),
+            openapi.Parameter(name = "ordering", in_ = openapi.IN_QUERY, type = "String", 
+                description = """
+                    Param for sort the search results. (Ej: `ordering=-minimum_price_usd_cents`)\n
+                    `ordering=-trending` sorts the results from the most to the least popular recently."""
+            ),
+            openapi.Parameter(name = "autocorrect", in_ = openapi.IN_QUERY, type = "Boolean", 
+                description = """
+                    If the search has no results it is executed again with the best spelling correction 
+                    of the query, returned in `corrected_query`. Enabled by default, `autocorrect=false` disables it."""
+            ),
+            openapi.Parameter(name = "facets", in_ = openapi.IN_QUERY, type = "String", 
+                description = """
+                    Facets to count over the results of the search, returned in the `facets` attribute.\n
+                    This param accepts a list of facets separated by commas. (Ej: `facets=section,price`)\n
+                    The possible facets are: `section, currency, price, industry and sale_country` or `all`."""
+            )
         ]
     )
     def list(self, request, *args, **kwargs):
         """Search Products in the Market\n
             Endpoint to search a showcase product (A product in the platform market).\n
-            In this endpoint is possible to select over which fields is going to be executed the query with the `query_fields` param.
+            In this endpoint is possible to select over which fields is going to be executed the query with the `query_fields` param.\n
+            With the `facets` param the counts of the results by each facet value are returned along the results.\n
+            The searches with few results have spelling corrections of the query in `suggestions`.
         """
 
         try:
             products_queryset = self.filter_queryset(self.get_queryset())
 
-            page = self.paginate_queryset(products_queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
+            if self.paginator is not None:
+                page_ids = self.get_page_cached(products_queryset)
+
+                suggestions = None
+                if self.paginator.count <= settings.SEARCH_SUGGESTIONS_MAX_RESULTS:
+                    suggestions = get_query_suggestions(request.query_params.get("q"))
+
+                    autocorrect = request.query_params.get("autocorrect", "true").lower() != "false"
+                    if self.paginator.count == 0 and suggestions and autocorrect:
+                        self.corrected_query = suggestions[0]
+                        products_queryset = self.filter_queryset(self.get_queryset())
+                        page_ids = self.get_page_cached(products_queryset)
+
+                facets = get_facets(products_queryset, self.get_search_params())
+                response = self.get_paginated_response(get_showcase_products_data(page_ids))
+                record_views(ShowcaseProduct, page_ids)
+
+                if facets is not None:
+                    response.data['facets'] = facets
+
+                if suggestions is not None:
+                    response.data['suggestions'] = suggestions
+
+                if self.corrected_query is not None:
+                    response.data['corrected_query'] = self.corrected_query
+
+                return response
+
+            facets = get_facets(products_queryset, request.query_params)
 
             res_data = {
                 "results": self.get_serializer(products_queryset, many=True).data
             }
+
+            if facets is not None:
+                res_data['facets'] = facets
+
             res_status = status.HTTP_200_OK
         except Exception as e:
             res_data = {"detail": str(e)}
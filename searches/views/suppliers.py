@@ -0,0 +1,125 @@
+# searches/views/suppliers.py
+
+# Django
+from django.conf import settings
+from django.db.models import Q
+
+# django rest framework
+from rest_framework import mixins, status, viewsets, generics
+from rest_framework.response import Response
+
+# Documentation
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+# Models
+from market.models import ShowcaseProduct
+from suppliers.models import SupplierLocation
+
+# Serializers
+from searches.serializers import NearbySupplierLocationSerializer
+
+# Analytics
+from searches.analytics import SearchAnalyticsMixin
+
+# Geo
+from suppliers.geo import get_haversine_distance, get_proximity_filter
+
+
+class SearchNearbySuppliersViewSet(SearchAnalyticsMixin,
+                                   viewsets.GenericViewSet,
+                                   generics.ListAPIView):
+    """
+    Search view in charge of searching the supplier 
+    locations near to a point, sorted by distance.
+    """
+
+    search_name = 'nearby_suppliers'
+    serializer_class = NearbySupplierLocationSerializer
+
+    def get_point(self):
+        """Return the latitude, longitude and radius (In km) of the search."""
+        try:
+            latitude = float(self.request.query_params["latitude"])
+            longitude = float(self.request.query_params["longitude"])
+            radius = float(self.request.query_params.get("radius", settings.SEARCH_NEARBY_DEFAULT_RADIUS))
+        except KeyError:
+            raise Exception("latitude and longitude query params are needed to search")
+        except ValueError:
+            raise Exception("latitude, longitude and radius query params must be numbers")
+
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise Exception("latitude must be between -90 and 90 and longitude between -180 and 180")
+
+        if not 0 < radius <= settings.SEARCH_NEARBY_MAX_RADIUS:
+            raise Exception("radius must be greater than 0 and lower than {} km".format(
+                settings.SEARCH_NEARBY_MAX_RADIUS
+            ))
+
+        return latitude, longitude, radius
+
+    def get_products_statement(self, query):
+        """Return the Q statement over the showcase products that match the query."""
+        return (
+            Q(name__unaccent__icontains = query) |
+            Q(description__unaccent__icontains = query) |
+            Q(tariff_heading__unaccent__icontains = query)
+        )
+
+    def get_queryset(self):
+        """Prefilter the locations by the bounding box of the radius
+            and rank the candidates by the exact haversine distance.
+        """
+        latitude, longitude, radius = self.get_point()
+
+        queryset = SupplierLocation.objects.filter(
+            get_proximity_filter(latitude, longitude, radius)
+        ).exclude(
+            supplier__state = SupplierLocation.States.DELETED
+        ).annotate(
+            distance = get_haversine_distance(latitude, longitude)
+        ).filter(
+            distance__lte = radius
+        ).select_related('supplier__company')
+
+        query = self.request.query_params.get("q")
+        if query:
+            products = ShowcaseProduct.objects.filter( self.get_products_statement(query) )
+            queryset = queryset.filter( supplier_id__in = products.values('product__supplier_id') )
+
+        industry = self.request.query_params.get("industry")
+        if industry:
+            queryset = queryset.filter( supplier__industry__iexact = industry )
+
+        ordering = self.request.query_params.get("ordering", "distance")
+        if ordering not in ("distance", "-distance"):
+            raise Exception("ordering must be distance or -distance")
+
+        return queryset.order_by(ordering, 'id')
+
+    @swagger_auto_schema( tags = ["Search"], responses = { 404: openapi.Response("Not Found") }, security = [],
+        manual_parameters = [
+            openapi.Parameter(name = "latitude", in_ = openapi.IN_QUERY, type = "Number", 
+                description = "Latitude of the point to search around."),
+            openapi.Parameter(name = "longitude", in_ = openapi.IN_QUERY, type = "Number", 
+                description = "Longitude of the point to search around."),
+            openapi.Parameter(name = "radius", in_ = openapi.IN_QUERY, type = "Number", 
+                description = "Max distance in km to the point. By default {} km.".format(settings.SEARCH_NEARBY_DEFAULT_RADIUS)),
+            openapi.Parameter(name = "q", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the suppliers that have showcase products matching the term."),
+            openapi.Parameter(name = "industry", in_ = openapi.IN_QUERY, type = "String", 
+                description = "Param for filter the suppliers by industry."),
+            openapi.Parameter(name = "ordering", in_ = openapi.IN_QUERY, type = "String", 
+                description = "`distance` (Default) or `-distance`.")
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Search Suppliers near to a point\n
+            Endpoint to search the supplier locations inside a radius (In km) around a point.\n
+            Each result has the `distance` in km to the point.
+        """
+
+        try:
+            return super().list(request, *args, **kwargs)
+        except Exception as e:
+            return Response({"detail": str(e)}, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,129 @@
+# searches/vocabulary.py
+
+# Django
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db.models import F
+
+# Models
+from searches.models import SearchTerm
+
+# Cache
+from searches.cache import get_market_search_cache_key
+
+# Utils
+from business_network_API.utils import normalize_text
+import re
+
+
+WORD_PATTERN = re.compile(r'[a-z]{3,}')
+
+
+def get_terms(*values):
+    """Return the set of normalized words of the values given."""
+    terms = set()
+
+    for value in values:
+        terms.update(term[:60] for term in WORD_PATTERN.findall(normalize_text(value)))
+
+    return terms
+
+
+def get_showcase_product_terms(showcase_product):
+    """Return the words of the vocabulary that the showcase product contains."""
+    return get_terms(
+        showcase_product.name,
+        showcase_product.showcase_section.name,
+        showcase_product.supplier_name
+    )
+
+
+def update_vocabulary(previous_terms, terms):
+    """Update the frequency of the words that a showcase product added or removed."""
+    added = set(terms) - set(previous_terms)
+    removed = set(previous_terms) - set(terms)
+
+    if added:
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term = term) for term in added], ignore_conflicts = True
+        )
+        SearchTerm.objects.filter( term__in = added ).update( frequency = F('frequency') + 1 )
+
+    if removed:
+        SearchTerm.objects.filter( term__in = removed, frequency__gt = 0 ).update(
+            frequency = F('frequency') - 1
+        )
+        SearchTerm.objects.filter( term__in = removed, frequency = 0 ).delete()
+
+
+def get_term_corrections(word, limit):
+    """Return the words of the vocabulary most similar to the word given."""
+    return list(
+        SearchTerm.objects.filter(
+            term__trigram_similar = word
+        ).annotate(
+            similarity = TrigramSimilarity('term', word)
+        ).order_by('-similarity', '-frequency').values_list('term', flat = True)[:limit]
+    )
+
+
+def compute_query_suggestions(query, limit):
+    """
+    Return the queries that result of replacing the words of the query that
+    aren't in the vocabulary with the most similar ones. The first one is the
+    best correction. Empty if all the words are known or have no corrections.
+    """
+
+    words = normalize_text(query).split()
+    known_terms = set(
+        SearchTerm.objects.filter( term__in = words ).values_list('term', flat = True)
+    )
+
+    corrections = {}
+    for word in words:
+        if word not in known_terms and WORD_PATTERN.fullmatch(word):
+            candidates = get_term_corrections(word, limit)
+            if candidates:
+                corrections[word] = candidates
+
+    if not corrections:
+        return []
+
+    best_query = [corrections[word][0] if word in corrections else word for word in words]
+    suggestions = [' '.join(best_query)]
+
+    # Alternatives changing the correction of one word at a time
+    for position, word in enumerate(words):
+        for candidate in corrections.get(word, [])[1:]:
+            alternative = best_query[:position] + [candidate] + best_query[position + 1:]
+            suggestions.append(' '.join(alternative))
+
+    return suggestions[:limit]
+
+
+def get_query_suggestions(query):
+    """Return the suggestions of the query, cached until the market changes."""
+    cache_key = get_market_search_cache_key('suggestions', normalize_text(query))
+    suggestions = cache.get(cache_key)
+
+    if suggestions is None:
+        suggestions = compute_query_suggestions(query, settings.SEARCH_SUGGESTIONS_LIMIT)
+        cache.set(cache_key, suggestions, settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+    return suggestions
+
+
+def rebuild_vocabulary(showcase_products):
+    """Replace the vocabulary with the words of the showcase products given."""
+    frequencies = {}
+
+    for showcase_product in showcase_products:
+        for term in get_showcase_product_terms(showcase_product):
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+    SearchTerm.objects.all().delete()
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(term = term, frequency = frequency) for term, frequency in frequencies.items()],
+        batch_size = 1000
+    )
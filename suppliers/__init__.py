@@ -0,0 +1 @@
+default_app_config = 'suppliers.apps.CompaniesConfig'
\ No newline at end of file
@@ -5,4 +5,5 @@ class CompaniesConfig(AppConfig):
     name = 'suppliers'
 
     def ready(self):
-        import suppliers.signals
\ No newline at end of file
+        import suppliers.signals
+        import suppliers.receivers
\ No newline at end of file
@@ -0,0 +1,137 @@
+# suppliers/cache.py
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Models
+from suppliers.models import Product
+
+# Serializers
+from suppliers.serializers import ProductDetailModelSerializer
+
+# Cache
+from multimedia.cache import sign_images_data
+
+# Utils
+import uuid
+
+
+PRODUCT_DETAIL_KEY = 'suppliers:product_detail:{}'
+
+PRODUCT_DETAIL_VERSION_KEY = 'suppliers:product_detail_version:{}'
+
+
+def get_product_detail_images(product_data):
+    """Return the serialized images inside the detail of a product."""
+    images = [product_data['principal_image']] + list(product_data['secondary_images'])
+    images += [certificate['logo'] for certificate in product_data['certificates']]
+
+    return [image for image in images if image]
+
+
+def sign_products_detail_images(products_data):
+    """Return a copy of the products detail given with the paths of all their images signed at once."""
+    signed_products_data = []
+
+    for product_data in products_data:
+        product_data = dict(product_data)
+        product_data['principal_image'] = product_data['principal_image'] and dict(product_data['principal_image'])
+        product_data['secondary_images'] = [dict(image) for image in product_data['secondary_images']]
+        product_data['certificates'] = [
+            dict(certificate, logo = certificate['logo'] and dict(certificate['logo']))
+            for certificate in product_data['certificates']
+        ]
+        signed_products_data.append(product_data)
+
+    sign_images_data([
+        image for product_data in signed_products_data
+        for image in get_product_detail_images(product_data)
+    ])
+
+    return signed_products_data
+
+
+def get_products_detail_data(product_ids):
+    """
+    Return the serialized detail of the products with the ids given (id -> detail),
+    read through the per product cache. The products missing in the cache are read
+    with one query. The products that don't exist are not in the result.
+    """
+
+    keys = {PRODUCT_DETAIL_KEY.format(product_id): product_id for product_id in product_ids}
+    cached_data = cache.get_many(keys.keys())
+    products_data = {keys[key]: product_data for key, product_data in cached_data.items()}
+
+    missing_ids = [product_id for product_id in product_ids if product_id not in products_data]
+    if missing_ids:
+        products = Product.objects.select_related(
+            'price_currency__exchange_rate', 'principal_image', 'supplier__company'
+        ).prefetch_related(
+            'certificates__logo__variants', 'secondary_images__variants', 'principal_image__variants'
+        ).filter( id__in = missing_ids )
+
+        missing_data = {
+            product.id: ProductDetailModelSerializer(product, context = {'sign_paths': False}).data
+            for product in products
+        }
+        cache.set_many(
+            {PRODUCT_DETAIL_KEY.format(product_id): product_data for product_id, product_data in missing_data.items()},
+            settings.PRODUCT_DETAIL_CACHE_TIMEOUT
+        )
+        products_data.update(missing_data)
+
+    product_ids = list(products_data)
+    signed_products_data = sign_products_detail_images([products_data[product_id] for product_id in product_ids])
+
+    return dict(zip(product_ids, signed_products_data))
+
+
+def get_product_detail_data(product_id):
+    """
+    Return the serialized detail of the product, read through a per product cache.
+    The images are cached with their relative paths and signed on every read.
+    Return None if the product doesn't exist.
+    """
+
+    return get_products_detail_data([product_id]).get(product_id)
+
+
+def product_detail_exists(product_id):
+    """Return if the product exists, without a query when its detail is cached."""
+    if PRODUCT_DETAIL_KEY.format(product_id) in cache:
+        return True
+
+    return Product.objects.filter( id = product_id ).exists()
+
+
+def get_products_detail_versions(product_ids):
+    """Return the versions of the detail of the products with the ids given (In the same order),
+    they change every time the detail is invalidated. The missing versions are read at once."""
+    keys = [PRODUCT_DETAIL_VERSION_KEY.format(product_id) for product_id in product_ids]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def get_product_detail_version(product_id):
+    """Return the version of the detail of the product, it changes every time the detail is invalidated."""
+    return get_products_detail_versions([product_id])[0]
+
+
+def invalidate_products_detail(ids):
+    """Remove from the cache the detail of the products with the ids given and their version.
+        Are removed again after the commit, in case a read cached the old detail meanwhile."""
+    keys = []
+    for product_id in ids:
+        keys += [PRODUCT_DETAIL_KEY.format(product_id), PRODUCT_DETAIL_VERSION_KEY.format(product_id)]
+
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,177 @@
+# suppliers/geo.py
+
+# Django
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+# Utils
+import math
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Of the same sphere as the haversine distance, so the bounding box is never tighter than it
+KM_PER_LATITUDE_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+GEOHASH_PRECISION = 12
+
+
+def encode_geohash(latitude, longitude, precision = GEOHASH_PRECISION):
+    """Return the geohash of the coordinates given with the precision (length) given."""
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    geohash = []
+    bits = 0
+    bits_count = 0
+    even_bit = True
+
+    while len(geohash) < precision:
+        coordinate_range, coordinate = (
+            (longitude_range, longitude) if even_bit else (latitude_range, latitude)
+        )
+        middle = (coordinate_range[0] + coordinate_range[1]) / 2
+
+        if coordinate >= middle:
+            bits = (bits << 1) | 1
+            coordinate_range[0] = middle
+        else:
+            bits = bits << 1
+            coordinate_range[1] = middle
+
+        even_bit = not even_bit
+        bits_count += 1
+
+        if bits_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bits_count = 0
+
+    return ''.join(geohash)
+
+
+def get_geohash_cell_size(precision):
+    """Return the (height, width) in degrees of the geohash cells of the precision given."""
+    total_bits = 5 * precision
+    longitude_bits = (total_bits + 1) // 2
+    latitude_bits = total_bits // 2
+
+    return 180.0 / 2 ** latitude_bits, 360.0 / 2 ** longitude_bits
+
+
+def get_bounding_box(latitude, longitude, radius):
+    """
+    Return the (min_latitude, max_latitude, min_longitude, max_longitude)
+    of the box that contains the circle of the radius (In km) given.
+    The longitudes are not wrapped, so they can be out of [-180, 180].
+    """
+
+    latitude_delta = radius / KM_PER_LATITUDE_DEGREE
+    min_latitude = max(latitude - latitude_delta, -90.0)
+    max_latitude = min(latitude + latitude_delta, 90.0)
+
+    # The box contains a pole, so it covers all the longitudes
+    if min_latitude == -90.0 or max_latitude == 90.0:
+        return min_latitude, max_latitude, -180.0, 180.0
+
+    widest_latitude = max(abs(min_latitude), abs(max_latitude))
+    longitude_delta = radius / (KM_PER_LATITUDE_DEGREE * math.cos(math.radians(widest_latitude)))
+
+    if longitude_delta >= 180.0:
+        return min_latitude, max_latitude, -180.0, 180.0
+
+    return min_latitude, max_latitude, longitude - longitude_delta, longitude + longitude_delta
+
+
+def get_covering_geohashes(bounding_box):
+    """
+    Return the geohash cells (prefixes) that cover the bounding box, the
+    cells are the biggest that need 9 or less of them. Return None when the
+    box is so big that the cells would be as big as the whole world.
+    """
+
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box
+    box_height = max_latitude - min_latitude
+    box_width = max_longitude - min_longitude
+
+    precision = 0
+    while precision < GEOHASH_PRECISION:
+        cell_height, cell_width = get_geohash_cell_size(precision + 1)
+        if cell_height < box_height or cell_width < box_width:
+            break
+        precision += 1
+
+    if precision == 0:
+        return None
+
+    geohashes = set()
+
+    for latitude in (min_latitude, (min_latitude + max_latitude) / 2, max_latitude):
+        for longitude in (min_longitude, (min_longitude + max_longitude) / 2, max_longitude):
+            wrapped_longitude = (longitude + 180.0) % 360.0 - 180.0
+            geohashes.add(encode_geohash(latitude, wrapped_longitude, precision))
+
+    return sorted(geohashes)
+
+
+def get_proximity_filter(latitude, longitude, radius, prefix = ''):
+    """
+    Return the Q statement that prefilters the locations inside the bounding
+    box of the radius (In km) using the geohash and the latitude/longitude indexes.
+    The prefix is the path of the location relation if the filter is over another model.
+    """
+
+    bounding_box = get_bounding_box(latitude, longitude, radius)
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box
+
+    statement = Q(**{
+        prefix + 'latitude__gte': min_latitude,
+        prefix + 'latitude__lte': max_latitude,
+    })
+
+    if min_longitude < -180.0:
+        statement &= (
+            Q(**{prefix + 'longitude__gte': min_longitude + 360.0}) |
+            Q(**{prefix + 'longitude__lte': max_longitude})
+        )
+    elif max_longitude > 180.0:
+        statement &= (
+            Q(**{prefix + 'longitude__gte': min_longitude}) |
+            Q(**{prefix + 'longitude__lte': max_longitude - 360.0})
+        )
+    elif min_longitude > -180.0 or max_longitude < 180.0:
+        statement &= Q(**{
+            prefix + 'longitude__gte': min_longitude,
+            prefix + 'longitude__lte': max_longitude,
+        })
+
+    geohashes = get_covering_geohashes(bounding_box)
+
+    if geohashes:
+        geohash_statement = Q()
+        for geohash in geohashes:
+            geohash_statement |= Q(**{prefix + 'geohash__startswith': geohash})
+
+        statement &= geohash_statement
+
+    return statement
+
+
+def get_haversine_distance(latitude, longitude, prefix = ''):
+    """Return the expression of the great circle distance in km from the coordinates given."""
+    origin_latitude = Radians(Value(float(latitude), output_field = FloatField()))
+    origin_longitude = Radians(Value(float(longitude), output_field = FloatField()))
+    location_latitude = Radians(F(prefix + 'latitude'), output_field = FloatField())
+    location_longitude = Radians(F(prefix + 'longitude'), output_field = FloatField())
+
+    haversine = (
+        Power(Sin((location_latitude - origin_latitude) / 2), 2) +
+        Cos(origin_latitude) * Cos(location_latitude) *
+        Power(Sin((location_longitude - origin_longitude) / 2), 2)
+    )
+
+    # Least avoids the rounding errors out of the ASin domain
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(haversine, Value(1.0, output_field = FloatField()))))
@@ -0,0 +1,92 @@
+# suppliers/management/commands/load_tariff_headings.py
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+# Models
+from market.models import ShowcaseProduct
+from suppliers.models import TariffHeading
+
+# Tariffs
+from suppliers.tariffs import (
+    TARIFF_HEADING_LEVELS, TariffNomenclature, bump_tariff_nomenclature_version,
+    get_tariff_heading_ancestors, normalize_tariff_heading
+)
+
+# Utils
+import csv
+
+
+class Command(BaseCommand):
+    """
+    Replace the HS nomenclature with the one in a CSV file
+    and recount the showcase products of every tariff heading.
+    """
+
+    help = 'Load the HS nomenclature from a CSV file with the columns code and description.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help = 'Path of the CSV file.')
+        parser.add_argument('--delimiter', default = ',')
+
+    def handle(self, *args, **options):
+        descriptions = self.read_nomenclature(options['path'], options['delimiter'])
+        codes = sorted(descriptions)
+        nomenclature = TariffNomenclature(tuple(codes), tuple(descriptions[code] for code in codes))
+
+        products_count = self.count_products(nomenclature)
+
+        tariff_headings = [
+            TariffHeading(
+                code = code,
+                description = descriptions[code],
+                level = len(code),
+                parent_code = nomenclature.get_closest_heading(code[:-2]) if len(code) > 2 else None,
+                products_count = products_count.get(code, 0)
+            )
+            for code in codes
+        ]
+
+        with transaction.atomic():
+            TariffHeading.objects.all().delete()
+            TariffHeading.objects.bulk_create(tariff_headings, batch_size = 1000)
+
+        bump_tariff_nomenclature_version()
+
+        self.stdout.write('Tariff headings loaded: {}'.format(len(tariff_headings)))
+
+    def read_nomenclature(self, path, delimiter):
+        """Return the descriptions of the nomenclature by code."""
+        descriptions = {}
+
+        try:
+            with open(path, newline = '', encoding = 'utf-8-sig') as nomenclature_file:
+                for row in csv.DictReader(nomenclature_file, delimiter = delimiter):
+                    code = normalize_tariff_heading(row.get('code'))
+
+                    if code is None or len(code) not in TARIFF_HEADING_LEVELS:
+                        self.stderr.write('Skipped invalid code: {}'.format(row.get('code')))
+                        continue
+
+                    descriptions[code] = (row.get('description') or '').strip()
+        except OSError as e:
+            raise CommandError(str(e))
+
+        return descriptions
+
+    def count_products(self, nomenclature):
+        """Count the showcase products of every tariff heading and its ancestors."""
+        products_count = {}
+
+        products_by_code = ShowcaseProduct.objects.exclude( hs_code = None ).values('hs_code').annotate(
+            count = Count('id')
+        )
+
+        for row in products_by_code:
+            for ancestor in get_tariff_heading_ancestors(row['hs_code']):
+                if ancestor in nomenclature:
+                    products_count[ancestor] = products_count.get(ancestor, 0) + row['count']
+
+        return products_count
@@ -0,0 +1,26 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('usd_rate', models.DecimalField(decimal_places=8, help_text='Amount of USD that equals one unit of the currency', max_digits=18)),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+                ('currency', models.OneToOneField(help_text='Currency that is converted with the rate', on_delete=django.db.models.deletion.CASCADE, related_name='exchange_rate', to='suppliers.Currency')),
+            ],
+            options={
+                'db_table': 'exchange_rate',
+            },
+        ),
+    ]
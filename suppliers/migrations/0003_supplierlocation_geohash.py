@@ -0,0 +1,39 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:23
+
+from django.db import migrations, models
+from suppliers.geo import encode_geohash
+
+
+def set_locations_geohash(apps, schema_editor):
+    """Compute the geohash of the locations with coordinates."""
+    SupplierLocation = apps.get_model('suppliers', 'SupplierLocation')
+
+    locations = SupplierLocation.objects.filter( latitude__isnull = False, longitude__isnull = False )
+
+    for location in locations.iterator():
+        location.geohash = encode_geohash(location.latitude, location.longitude)
+        location.save(update_fields = ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0002_exchangerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplierlocation',
+            name='geohash',
+            field=models.CharField(blank=True, help_text='Geohash of the coordinates, maintained on save for the proximity searches.', max_length=12, null=True),
+        ),
+        migrations.RunPython(set_locations_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='supplierlocation',
+            index=models.Index(fields=['geohash'], name='supplier_location_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='supplierlocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='supplier_location_lat_lng_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:25
+
+from django.db import migrations, models
+from business_network_API.countries import get_country_code
+
+
+def set_sale_locations_country_code(apps, schema_editor):
+    """Normalize the country of the sale locations to its code."""
+    SupplierSaleLocation = apps.get_model('suppliers', 'SupplierSaleLocation')
+
+    for location in SupplierSaleLocation.objects.iterator():
+        location.country_code = get_country_code(location.country)
+        location.save(update_fields = ['country_code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0003_supplierlocation_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suppliersalelocation',
+            name='country_code',
+            field=models.CharField(blank=True, help_text='ISO 3166-1 alpha-2 code of the country, maintained on save for the coverage index.', max_length=2, null=True),
+        ),
+        migrations.RunPython(set_sale_locations_country_code, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='suppliersalelocation',
+            index=models.Index(fields=['country_code', 'supplier'], name='sale_location_country_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:28
+
+from django.db import migrations, models
+from suppliers.models.tariffs import normalize_tariff_heading
+
+
+def set_products_hs_code(apps, schema_editor):
+    """Normalize the tariff heading of the products to its digits."""
+    Product = apps.get_model('suppliers', 'Product')
+
+    for product in Product.objects.exclude( tariff_heading = None ).iterator():
+        hs_code = normalize_tariff_heading(product.tariff_heading)
+        product.hs_code = hs_code[:10] if hs_code else None
+        product.save(update_fields = ['hs_code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0004_suppliersalelocation_country_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TariffHeading',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('code', models.CharField(help_text='Digits of the tariff heading without separators', max_length=10, unique=True)),
+                ('description', models.TextField()),
+                ('level', models.PositiveSmallIntegerField(help_text='Number of digits of the code')),
+                ('parent_code', models.CharField(blank=True, help_text='Code of the nearest tariff heading that contains this one', max_length=10, null=True)),
+                ('products_count', models.PositiveIntegerField(default=0, help_text='Showcase products classified in this tariff heading or in its descendants')),
+            ],
+            options={
+                'db_table': 'tariff_heading',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='hs_code',
+            field=models.CharField(blank=True, help_text='Digits of the tariff heading, maintained on save for browsing by HS code.', max_length=10, null=True),
+        ),
+        migrations.RunPython(set_products_hs_code, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['hs_code'], name='product_hs_code_idx', opclasses=['text_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='tariffheading',
+            index=models.Index(fields=['parent_code', 'code'], name='tariff_heading_parent_idx'),
+        ),
+    ]
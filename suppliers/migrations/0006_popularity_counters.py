@@ -0,0 +1,23 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0005_tariffheading_product_hs_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times the detail of the product has been viewed.'),
+        ),
+        migrations.AddField(
+            model_name='supplierprofile',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times the profile of the supplier has been viewed.'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.0.5 on 2026-10-19 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0006_popularity_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, help_text='Date when the product was created. Empty for the products created before tracking it.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['changed_at', 'id'], name='product_changed_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierprofile',
+            index=models.Index(fields=['changed_at', 'id'], name='supplier_changed_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0007_changes_feed'),
+        # The counters are copied to their table before removing them
+        ('market', '0009_popularity_counter_table'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='product',
+            name='views_count',
+        ),
+        migrations.RemoveField(
+            model_name='supplierprofile',
+            name='views_count',
+        ),
+    ]
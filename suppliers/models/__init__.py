@@ -2,4 +2,5 @@ from .suppliers import *
 from .dna import *
 from .certificates import *
 from .locations import *
-from .products import *
\ No newline at end of file
+from .products import *
+from .tariffs import *
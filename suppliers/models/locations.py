@@ -11,6 +11,12 @@ from django.utils.translation import ugettext_lazy as _
 from suppliers.models import SupplierProfile
 from multimedia.models import Image
 
+# Geo
+from suppliers.geo import encode_geohash
+
+# Utils
+from business_network_API.countries import get_country_code
+
 
 class SupplierLocation(VisibilityModel):
     """Location where a supplier operates."""
@@ -45,10 +51,28 @@ class SupplierLocation(VisibilityModel):
         blank=True, null=True
     )
     
+    geohash = models.CharField(
+        help_text = _("Geohash of the coordinates, maintained on save for the proximity searches."),
+        max_length = 12, blank = True, null = True
+    )
+    
     supplier = models.ForeignKey(SupplierProfile, models.PROTECT)
 
     class Meta:
         db_table = 'supplier_location'
+        indexes = [
+            models.Index(fields = ['geohash'], name = 'supplier_location_geohash_idx', opclasses = ['varchar_pattern_ops']),
+            models.Index(fields = ['latitude', 'longitude'], name = 'supplier_location_lat_lng_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep the geohash in sync with the coordinates."""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+
+        super().save(*args, **kwargs)
 
     @transaction.atomic
     def delete(self):
@@ -76,8 +100,21 @@ class SupplierSaleLocation(VisibilityModel):
     city = models.CharField(max_length=50, blank=True, null=True)
     
     region = models.CharField(max_length=45, blank=True, null=True)
+
+    country_code = models.CharField(
+        help_text = _("ISO 3166-1 alpha-2 code of the country, maintained on save for the coverage index."),
+        max_length = 2, blank = True, null = True
+    )
     
     supplier = models.ForeignKey(SupplierProfile, models.PROTECT)
 
     class Meta:
-        db_table = 'supplier_sale_location'
\ No newline at end of file
+        db_table = 'supplier_sale_location'
+        indexes = [
+            models.Index(fields = ['country_code', 'supplier'], name = 'sale_location_country_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep the country code in sync with the country."""
+        self.country_code = get_country_code(self.country)
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -9,6 +9,7 @@ from django.utils.translation import ugettext_lazy as _
 
 # Models
 from suppliers.models import Certificate, SupplierProfile
+from suppliers.models.tariffs import normalize_tariff_heading
 from multimedia.models import Image
 
 # Signals
@@ -42,6 +43,36 @@ class Currency(models.Model):
         db_table = 'currency'
 
 
+class ExchangeRate(models.Model):
+    """Exchange rate of a currency to the reference 
+    currency of the platform (USD). Used to normalize prices."""
+
+    id = models.BigAutoField(primary_key=True)
+
+    currency = models.OneToOneField(
+        Currency, models.CASCADE,
+        related_name = 'exchange_rate',
+        help_text = _('Currency that is converted with the rate')
+    )
+
+    usd_rate = models.DecimalField(
+        help_text = _('Amount of USD that equals one unit of the currency'),
+        max_digits=18, decimal_places=8
+    )
+
+    changed_at = models.DateTimeField(auto_now = True)
+
+    class Meta:
+        db_table = 'exchange_rate'
+
+    def to_usd_cents(self, amount):
+        """Convert an amount in the currency to USD cents."""
+        if amount is None:
+            return None
+
+        return int(round(amount * self.usd_rate * 100))
+
+
 class Product(VisibilityModel):
     """
     Product that a supplier offers in the platform.
@@ -89,6 +120,11 @@ class Product(VisibilityModel):
         help_text = _('Value that is used in foreign trade to identify uniquely a product.'),
         max_length = 20, blank = True, null = True
     )
+
+    hs_code = models.CharField(
+        help_text = _('Digits of the tariff heading, maintained on save for browsing by HS code.'),
+        max_length = 10, blank = True, null = True
+    )
     
     minimum_purchase = models.CharField(
         help_text = _('minimum amount for which the product owner is willing to sell the product.'),
@@ -119,8 +155,24 @@ class Product(VisibilityModel):
         help_text = _('Secondary images that shows the details of the product.')
     )
 
+    created_at = models.DateTimeField(
+        help_text = _('Date when the product was created. Empty for the products created before tracking it.'),
+        auto_now_add = True, null = True
+    )
+
     class Meta:
         db_table = 'product'
+        indexes = [
+            models.Index(fields = ['hs_code'], name = 'product_hs_code_idx', opclasses = ['text_pattern_ops']),
+            models.Index(fields = ['changed_at', 'id'], name = 'product_changed_at_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep the HS code in sync with the tariff heading."""
+        hs_code = normalize_tariff_heading(self.tariff_heading)
+        self.hs_code = hs_code[:10] if hs_code else None
+
+        super().save(*args, **kwargs)
 
     @transaction.atomic
     def delete(self):
@@ -91,4 +91,7 @@ class SupplierProfile(VisibilityModel):
     objects = SupplierManager()
 
     class Meta:
-        db_table = 'supplier_profile'
\ No newline at end of file
+        db_table = 'supplier_profile'
+        indexes = [
+            models.Index(fields = ['changed_at', 'id'], name = 'supplier_changed_at_idx'),
+        ]
@@ -0,0 +1,55 @@
+# Models tariffs
+
+# Django
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+def normalize_tariff_heading(tariff_heading):
+    """Return only the digits of the tariff heading (Ej: 0901.11.00 -> 09011100) or None."""
+    if not tariff_heading:
+        return None
+
+    digits = ''.join(char for char in str(tariff_heading) if char.isdigit())
+
+    return digits or None
+
+
+class TariffHeading(models.Model):
+    """
+    Node of the harmonized system (HS) nomenclature used in foreign
+    trade to classify the products: chapter (2 digits), heading (4),
+    subheading (6) and the national subheadings (8 and 10).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    code = models.CharField(
+        help_text = _('Digits of the tariff heading without separators'),
+        max_length = 10, unique = True
+    )
+
+    description = models.TextField()
+
+    level = models.PositiveSmallIntegerField(
+        help_text = _('Number of digits of the code')
+    )
+
+    parent_code = models.CharField(
+        help_text = _('Code of the nearest tariff heading that contains this one'),
+        max_length = 10, blank = True, null = True
+    )
+
+    products_count = models.PositiveIntegerField(
+        help_text = _('Showcase products classified in this tariff heading or in its descendants'),
+        default = 0
+    )
+
+    class Meta:
+        db_table = 'tariff_heading'
+        indexes = [
+            models.Index(fields = ['parent_code', 'code'], name = 'tariff_heading_parent_idx'),
+        ]
+
+    def __str__(self):
+        return self.code
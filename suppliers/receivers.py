@@ -0,0 +1,74 @@
+# suppliers/receivers.py
+# The receivers are apart from suppliers.signals because the models import it.
+
+# Models
+from companies.models import Company
+from multimedia.models import Image
+from suppliers.models import (
+    Certificate, ExchangeRate, Product, ProductCertificate, 
+    ProductImage, SupplierProfile
+)
+
+# Cache
+from suppliers.cache import invalidate_products_detail
+
+# Signals
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from multimedia.signals import post_image_duplicates_collapse, post_image_variants_create
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_detail(sender, instance, **kwargs):
+    invalidate_products_detail([instance.id])
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductCertificate)
+@receiver(post_delete, sender=ProductCertificate)
+def invalidate_product_media_detail(sender, instance, **kwargs):
+    invalidate_products_detail([instance.product_id])
+
+
+@receiver(post_save, sender=SupplierProfile)
+def invalidate_supplier_products_detail(sender, instance, **kwargs):
+    """The detail of the products contains the name and contact of the supplier."""
+    invalidate_products_detail(
+        Product.all_objects.filter( supplier = instance ).values_list('id', flat = True)
+    )
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_products_detail(sender, instance, **kwargs):
+    """The detail of the products contains the accountname of the company."""
+    invalidate_products_detail(
+        Product.all_objects.filter( supplier__company = instance ).values_list('id', flat = True)
+    )
+
+
+@receiver(post_save, sender=Certificate)
+def invalidate_certificate_products_detail(sender, instance, **kwargs):
+    invalidate_products_detail(
+        ProductCertificate.objects.filter( certificate = instance ).values_list('product_id', flat = True)
+    )
+
+
+@receiver(post_save, sender=ExchangeRate)
+def invalidate_currency_products_detail(sender, instance, **kwargs):
+    """The detail of the products contains the rate of their currency."""
+    invalidate_products_detail(
+        Product.all_objects.filter( price_currency_id = instance.currency_id ).values_list('id', flat = True)
+    )
+
+
+@receiver(post_image_variants_create, sender=Image)
+@receiver(post_image_duplicates_collapse, sender=Image)
+def invalidate_image_products_detail(sender, instance, **kwargs):
+    """The detail of the products shows the variants of their images."""
+    invalidate_products_detail(
+        set(Product.all_objects.filter( principal_image = instance ).values_list('id', flat = True)) |
+        set(ProductImage.objects.filter( image = instance ).values_list('product_id', flat = True)) |
+        set(ProductCertificate.objects.filter( certificate__logo = instance ).values_list('product_id', flat = True))
+    )
@@ -4,4 +4,5 @@ from .suppliers import *
 from .currencies import *
 from .dnaelements import *
 from .products import *
-from .profiles import *
\ No newline at end of file
+from .profiles import *
+from .tariffs import *
@@ -16,7 +16,7 @@ from multimedia.serializers.images import ImageModelSerializer
 class CertificateModelSerializer(serializers.ModelSerializer):
     """Certificate model serializer."""
 
-    logo = ImageModelSerializer()
+    logo = ImageModelSerializer( variant = 'thumbnail' )
 
     class Meta:
         """Certificate meta class."""
@@ -8,12 +8,21 @@ from django.db.utils import IntegrityError
 from rest_framework import serializers
 
 # Models
-from ..models import Currency
+from ..models import Currency, ExchangeRate
+
+# Signals
+from .. import signals
 
 
 class CurrencyModelSerializer(serializers.ModelSerializer):
     """Currency model serializer."""
 
+    usd_rate = serializers.DecimalField(
+        source = 'exchange_rate.usd_rate',
+        max_digits = 18, decimal_places = 8,
+        read_only = True, allow_null = True
+    )
+
     class Meta:
         """Currency meta class."""
 
@@ -24,4 +33,58 @@ class CurrencyModelSerializer(serializers.ModelSerializer):
             'name',
             'code',
             'region',
-        )
\ No newline at end of file
+            'usd_rate',
+        )
+
+
+class ExchangeRateModelSerializer(serializers.ModelSerializer):
+    """Create and update the exchange rate of a currency."""
+
+    usd_rate = serializers.DecimalField(
+        max_digits = 18, decimal_places = 8,
+        help_text = "Amount of USD that equals one unit of the currency."
+    )
+
+    class Meta:
+        """Exchange rate meta class."""
+
+        model = ExchangeRate
+
+        fields = (
+            'currency',
+            'usd_rate',
+            'changed_at'
+        )
+
+        read_only_fields = (
+            'currency',
+            'changed_at'
+        )
+
+    def validate_usd_rate(self, data):
+        """Verify the rate is a positive amount."""
+        if data <= 0:
+            raise serializers.ValidationError('The exchange rate must be greater than zero')
+
+        return data
+
+    @transaction.atomic
+    def create(self, data):
+        """Create the exchange rate of the currency in the context."""
+        exchange_rate = ExchangeRate.objects.create(
+            currency = self.context['currency'],
+            **data
+        )
+
+        signals.post_exchange_rate_update.send(sender = ExchangeRate, instance = exchange_rate)
+
+        return exchange_rate
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Update the rate and recompute the prices normalized with it."""
+        exchange_rate = super().update(instance, validated_data)
+
+        signals.post_exchange_rate_update.send(sender = ExchangeRate, instance = exchange_rate)
+
+        return exchange_rate
@@ -18,6 +18,9 @@ from multimedia.serializers.images import ImageModelSerializer
 # Signals
 from .. import signals
 
+# Tariffs
+from .. import tariffs
+
 
 class ProductOverviewModelSerializer(serializers.ModelSerializer):
     """Product model serializer."""
@@ -26,7 +29,7 @@ class ProductOverviewModelSerializer(serializers.ModelSerializer):
     maximum_price = serializers.DecimalField(max_digits=15, decimal_places=2, allow_null = True)
     
     price_currency = CurrencyModelSerializer(allow_null = True)
-    principal_image = ImageModelSerializer()
+    principal_image = ImageModelSerializer( variant = 'card' )
 
     class Meta:
 
@@ -56,8 +59,8 @@ class ProductDetailModelSerializer(serializers.ModelSerializer):
 
     price_currency = CurrencyModelSerializer(allow_null = True)
     certificates = CertificateModelSerializer(many = True)
-    principal_image = ImageModelSerializer()
-    secondary_images = ImageModelSerializer(many = True)
+    principal_image = ImageModelSerializer( variant = 'large' )
+    secondary_images = ImageModelSerializer( many = True, variant = 'large' )
 
     supplier = ProductSupplierModelSerializer()
 
@@ -91,6 +94,29 @@ class ProductDetailModelSerializer(serializers.ModelSerializer):
         )
 
 
+class ProductChangeModelSerializer(serializers.ModelSerializer):
+    """Compact product for the changes feed."""
+
+    class Meta:
+
+        model = Product
+
+        fields = (
+            'id',
+            'supplier',
+            'name',
+            'category',
+            'minimum_price',
+            'maximum_price',
+            'price_currency',
+            'measurement_unit',
+            'tariff_heading',
+            'minimum_purchase',
+            'principal_image',
+            'changed_at',
+        )
+
+
 class HandleSupplierProductSerializer(serializers.ModelSerializer):
     """Create and update a supplier product"""
 
@@ -191,6 +217,15 @@ class HandleSupplierProductSerializer(serializers.ModelSerializer):
             'secondary_images'
         )
 
+    def validate_tariff_heading(self, data):
+        """Verify the tariff heading exists in the HS nomenclature."""
+        try:
+            tariffs.validate_tariff_heading(data)
+        except Exception as e:
+            raise serializers.ValidationError(str(e))
+
+        return data
+
     @transaction.atomic
     def create(self, data):
         """Create new supplier product."""
@@ -34,7 +34,7 @@ class ProfileSupplierModelSerializer(serializers.ModelSerializer):
 
     accountname = serializers.CharField(source = "company.accountname")
     is_verified = serializers.BooleanField(source = "company.is_verified")
-    logo = ImageModelSerializer(source = "company.logo")
+    logo = ImageModelSerializer( source = "company.logo", variant = 'thumbnail' )
 
     class Meta:
 
@@ -156,7 +156,7 @@ class SupplierProfileSerializer(serializers.Serializer):
 
         supplier_products = Product.objects.filter(
             supplier = supplier
-        )[:6]
+        ).select_related('price_currency', 'principal_image').prefetch_related('principal_image__variants')[:6]
         return ProductOverviewModelSerializer(supplier_products, many = True).data
 
     def get_certificates(self, instance):
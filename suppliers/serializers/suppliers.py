@@ -102,6 +102,30 @@ class ProductSupplierModelSerializer(serializers.ModelSerializer):
         )
 
 
+class SupplierChangeModelSerializer(serializers.ModelSerializer):
+    """Compact supplier for the changes feed."""
+
+    accountname = serializers.CharField(source="company.accountname")
+
+    class Meta:
+
+        model = SupplierProfile
+
+        fields = (
+            'id',
+            'company',
+            'accountname',
+            'display_name',
+            'description',
+            'industry',
+            'contact_area_code',
+            'contact_phone',
+            'contact_email',
+            'principal_location',
+            'changed_at',
+        )
+
+
 class UpdateSupplierSerializer(serializers.ModelSerializer):
     """Update a supplier"""
 
@@ -0,0 +1,39 @@
+# Serializers tariffs
+
+# Django rest framework
+from rest_framework import serializers
+
+# Models
+from ..models import TariffHeading
+
+
+class TariffHeadingModelSerializer(serializers.ModelSerializer):
+    """Tariff heading model serializer."""
+
+    class Meta:
+        """Tariff heading meta class."""
+
+        model = TariffHeading
+
+        fields = (
+            'code',
+            'description',
+            'level',
+            'parent_code',
+            'products_count'
+        )
+
+
+class TariffHeadingDetailSerializer(TariffHeadingModelSerializer):
+    """Tariff heading with the next level of headings inside it."""
+
+    children = serializers.SerializerMethodField()
+
+    class Meta(TariffHeadingModelSerializer.Meta):
+
+        fields = TariffHeadingModelSerializer.Meta.fields + ('children',)
+
+    def get_children(self, instance):
+        children = TariffHeading.objects.filter( parent_code = instance.code ).order_by('code')
+
+        return TariffHeadingModelSerializer(children, many = True).data
@@ -6,4 +6,6 @@ post_product_delete = Signal(providing_args=["sender", "instance"])
 
 post_product_create = Signal(providing_args=["sender", "instance", "created"])
 
-post_product_update = Signal(providing_args=["sender", "instance", "created"])
\ No newline at end of file
+post_product_update = Signal(providing_args=["sender", "instance", "created"])
+
+post_exchange_rate_update = Signal(providing_args=["sender", "instance"])
\ No newline at end of file
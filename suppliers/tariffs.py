@@ -0,0 +1,161 @@
+# suppliers/tariffs.py
+
+# Django
+from django.core.cache import cache
+from django.db.models import F
+
+# Models
+from suppliers.models import TariffHeading
+from suppliers.models.tariffs import normalize_tariff_heading
+
+# Utils
+import bisect
+import threading
+import time
+
+
+TARIFF_HEADING_LEVELS = (2, 4, 6, 8, 10)
+
+TARIFF_NOMENCLATURE_VERSION_KEY = 'suppliers:tariff_nomenclature:version'
+
+
+def get_tariff_heading_ancestors(code):
+    """Return the codes of all the levels that contain the code, including itself."""
+    if not code:
+        return []
+
+    return [code[:level] for level in TARIFF_HEADING_LEVELS if level <= len(code)]
+
+
+class TariffNomenclature:
+    """
+    HS nomenclature held in memory as a sorted array of codes, 
+    searched with bisect.
+    """
+
+    def __init__(self, codes, descriptions, version = None):
+        self.codes = codes
+        self.descriptions = descriptions
+        self.version = version
+
+    @classmethod
+    def load(cls, version = None):
+        """Read the nomenclature from the tariff headings table."""
+        rows = TariffHeading.objects.order_by('code').values_list('code', 'description')
+        codes, descriptions = [], []
+
+        for code, description in rows.iterator():
+            codes.append(code)
+            descriptions.append(description)
+
+        return cls(tuple(codes), tuple(descriptions), version)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def index(self, code):
+        position = bisect.bisect_left(self.codes, code)
+
+        if position < len(self.codes) and self.codes[position] == code:
+            return position
+
+        return None
+
+    def __contains__(self, code):
+        return self.index(code) is not None
+
+    def get_description(self, code):
+        position = self.index(code)
+        return self.descriptions[position] if position is not None else None
+
+    def get_closest_heading(self, code):
+        """Return the longest code of the nomenclature that contains the code given."""
+        for ancestor in reversed(get_tariff_heading_ancestors(code)):
+            if ancestor in self:
+                return ancestor
+
+        return None
+
+
+_nomenclature = None
+_nomenclature_lock = threading.Lock()
+
+
+def get_tariff_nomenclature():
+    """Return the nomenclature of the process, reloaded when a new version is loaded."""
+    global _nomenclature
+
+    version = get_tariff_nomenclature_version()
+
+    if _nomenclature is None or _nomenclature.version != version:
+        with _nomenclature_lock:
+            if _nomenclature is None or _nomenclature.version != version:
+                _nomenclature = TariffNomenclature.load(version)
+
+    return _nomenclature
+
+
+def get_tariff_nomenclature_version():
+    """Return the version of the nomenclature. When it's missing (Ej: evicted) it's seeded
+    with a value never used before, so every process reloads the nomenclature."""
+    version = cache.get(TARIFF_NOMENCLATURE_VERSION_KEY)
+
+    if version is None:
+        version = time.time_ns()
+        cache.add(TARIFF_NOMENCLATURE_VERSION_KEY, version, None)
+        version = cache.get(TARIFF_NOMENCLATURE_VERSION_KEY, version)
+
+    return version
+
+
+def bump_tariff_nomenclature_version():
+    """Make all the processes reload the nomenclature."""
+    try:
+        cache.incr(TARIFF_NOMENCLATURE_VERSION_KEY)
+    except ValueError:
+        cache.add(TARIFF_NOMENCLATURE_VERSION_KEY, time.time_ns(), None)
+
+
+def validate_tariff_heading(tariff_heading):
+    """
+    Return the tariff heading normalized. Raise an exception if it doesn't
+    have a valid length or its heading doesn't exist in the nomenclature.
+    """
+
+    code = normalize_tariff_heading(tariff_heading)
+
+    if code is None:
+        return None
+
+    if len(code) not in TARIFF_HEADING_LEVELS:
+        raise Exception("The tariff heading must have 2, 4, 6, 8 or 10 digits")
+
+    nomenclature = get_tariff_nomenclature()
+
+    # The national subheadings (8 and 10 digits) are validated by their HS subheading
+    if len(nomenclature) and code[:6] not in nomenclature:
+        raise Exception("The tariff heading {} doesn't exist in the HS nomenclature".format(code[:6]))
+
+    return code
+
+
+def update_tariff_headings_count(previous_code, code):
+    """Move a product from the tariff heading previous_code to code, updating
+    the products count of all the levels in a single query per change."""
+    if previous_code == code:
+        return
+
+    previous_ancestors = set(get_tariff_heading_ancestors(previous_code))
+    ancestors = set(get_tariff_heading_ancestors(code))
+
+    removed = previous_ancestors - ancestors
+    if removed:
+        TariffHeading.objects.filter( code__in = removed, products_count__gt = 0 ).update(
+            products_count = F('products_count') - 1
+        )
+
+    added = ancestors - previous_ancestors
+    if added:
+        TariffHeading.objects.filter( code__in = added ).update(
+            products_count = F('products_count') + 1
+        )
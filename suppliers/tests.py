@@ -1,3 +1,406 @@
-from django.test import TestCase
+# Suppliers tests
 
-# Create your tests here.
+# Django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+# Django REST framework
+from rest_framework.test import APIClient
+
+# Models
+from suppliers.models import ExchangeRate, Product, SupplierLocation, TariffHeading
+from suppliers.models.tariffs import normalize_tariff_heading
+
+# Geo
+from suppliers.geo import encode_geohash, get_bounding_box, get_covering_geohashes, get_haversine_distance
+
+# Cache
+from suppliers.cache import PRODUCT_DETAIL_KEY, get_product_detail_data, invalidate_products_detail
+
+# Changes
+from business_network_API.views import decode_changes_token, encode_changes_token
+
+# Tariffs
+from suppliers.tariffs import validate_tariff_heading
+
+# Signals
+from suppliers.signals import post_product_update
+
+# Fixtures
+from searches.tests import MarketTestCase, MarketTransactionTestCase
+
+# Utils
+from datetime import timedelta
+from rest_framework.exceptions import ValidationError
+import io
+import os
+import tempfile
+
+
+class GeoTestCase(MarketTestCase):
+
+    def test_encode_geohash(self):
+        self.assertEqual(encode_geohash(42.6, -5.6, 5), 'ezs42')
+        self.assertEqual(encode_geohash('4.710989', '-74.072090')[:5], encode_geohash(4.710989, -74.07209, 5))
+
+    def test_bounding_box_across_the_antimeridian(self):
+        min_latitude, max_latitude, min_longitude, max_longitude = get_bounding_box(-17.7, 179.9, 50)
+
+        self.assertLess(min_latitude, -17.7)
+        self.assertGreater(max_latitude, -17.7)
+        self.assertGreater(max_longitude, 180.0)
+        self.assertLess(min_longitude, 179.9)
+
+    def test_bounding_box_around_a_pole(self):
+        self.assertEqual(get_bounding_box(89.9, 10.0, 100)[1:], (90.0, -180.0, 180.0))
+
+    def test_covering_geohashes(self):
+        geohashes = get_covering_geohashes(get_bounding_box(4.71, -74.07, 10))
+
+        self.assertLessEqual(len(geohashes), 9)
+        self.assertTrue(any(encode_geohash(4.71, -74.07).startswith(geohash) for geohash in geohashes))
+        self.assertIsNone(get_covering_geohashes(get_bounding_box(0, 0, 15000)))
+
+    def test_geohash_maintained_on_save(self):
+        location = SupplierLocation.objects.create(
+            supplier = self.supplier, country = 'Colombia', latitude = '4.710989', longitude = '-74.072090'
+        )
+        self.assertEqual(location.geohash, encode_geohash('4.710989', '-74.072090'))
+
+        location.latitude = None
+        location.save()
+        self.assertIsNone(location.geohash)
+
+    def test_haversine_distance(self):
+        SupplierLocation.objects.create(
+            supplier = self.supplier, country = 'Colombia', latitude = '6.244203', longitude = '-75.581215'
+        )
+
+        distance = SupplierLocation.objects.annotate(
+            distance = get_haversine_distance(4.710989, -74.072090)
+        ).get().distance
+
+        # Bogota - Medellin
+        self.assertAlmostEqual(distance, 239.5, delta = 1)
+
+
+class TariffHeadingsTestCase(MarketTestCase):
+
+    NOMENCLATURE = (
+        'code,description\n'
+        '09,"Cafe, te, yerba mate y especias"\n'
+        '0901,"Cafe, incluso tostado o descafeinado"\n'
+        '0901.11,Cafe sin tostar sin descafeinar\n'
+        '0901.21,Cafe tostado sin descafeinar\n'
+        '0902,Te\n'
+        '090,Invalid\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.create_product('Cafe verde', tariff_heading = '0901.11.00')
+
+        nomenclature_file = tempfile.NamedTemporaryFile('w', suffix = '.csv', delete = False)
+        nomenclature_file.write(self.NOMENCLATURE)
+        nomenclature_file.close()
+        self.addCleanup(os.remove, nomenclature_file.name)
+
+        call_command('load_tariff_headings', nomenclature_file.name, stdout = io.StringIO(), stderr = io.StringIO())
+
+    def get_count(self, code):
+        return TariffHeading.objects.get( code = code ).products_count
+
+    def test_normalize_tariff_heading(self):
+        self.assertEqual(normalize_tariff_heading('0901.11.00'), '09011100')
+        self.assertIsNone(normalize_tariff_heading('Cafe'))
+        self.assertIsNone(normalize_tariff_heading(None))
+
+    def test_nomenclature_loaded_with_the_products_count(self):
+        self.assertEqual(TariffHeading.objects.count(), 5)
+        self.assertEqual(TariffHeading.objects.get( code = '090111' ).parent_code, '0901')
+        self.assertIsNone(TariffHeading.objects.get( code = '09' ).parent_code)
+        self.assertEqual([self.get_count(code) for code in ('09', '0901', '090111', '090121')], [1, 1, 1, 0])
+
+    def test_validate_tariff_heading(self):
+        self.assertEqual(validate_tariff_heading('0901.21'), '090121')
+
+        # The national subheadings are validated by their HS subheading
+        self.assertEqual(validate_tariff_heading('0901.21.10.00'), '0901211000')
+        self.assertIsNone(validate_tariff_heading(''))
+
+        with self.assertRaisesMessage(Exception, '2, 4, 6, 8 or 10 digits'):
+            validate_tariff_heading('090')
+
+        with self.assertRaisesMessage(Exception, "090190 doesn't exist"):
+            validate_tariff_heading('0901.90')
+
+    def test_products_count_moved_between_headings(self):
+        self.create_product('Cafe tostado', tariff_heading = '0901.21')
+        self.assertEqual([self.get_count(code) for code in ('09', '0901', '090121')], [2, 2, 1])
+
+        product = self.create_product('Te negro', tariff_heading = '0902')
+        product.tariff_heading = '0901.21'
+        product.save()
+        post_product_update.send( sender = Product, instance = product, created = False )
+
+        self.assertEqual([self.get_count(code) for code in ('09', '0901', '090121', '0902')], [3, 3, 2, 0])
+
+    def test_browse_the_nomenclature(self):
+        response = APIClient().get('/tariff-headings/')
+        self.assertEqual([heading['code'] for heading in response.data['results']], ['09'])
+
+        response = APIClient().get('/tariff-headings/', {'parent': '09'})
+        self.assertEqual([heading['code'] for heading in response.data['results']], ['0901', '0902'])
+
+        response = APIClient().get('/tariff-headings/0901/')
+        self.assertEqual(response.data['products_count'], 1)
+        self.assertEqual([heading['code'] for heading in response.data['children']], ['090111', '090121'])
+
+
+class ProductDetailCacheTestCase(MarketTransactionTestCase):
+    """The detail of the products is cached and invalidated by the writes of everything it contains."""
+
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product('Mango')
+
+    def get_detail(self):
+        response = APIClient().get('/products/{}/'.format(self.product.id))
+        self.assertEqual(response.status_code, 200)
+
+        return response.data
+
+    def test_detail_read_through_the_cache(self):
+        self.get_detail()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_detail()['name'], 'Mango')
+
+        self.assertEqual(APIClient().get('/products/0/').status_code, 404)
+
+    def test_writes_of_the_detail_invalidate_it(self):
+        self.get_detail()
+
+        self.product.name = 'Mango Tommy'
+        self.product.save()
+        self.assertEqual(self.get_detail()['name'], 'Mango Tommy')
+
+        self.supplier.display_name = 'Acme Frutas'
+        self.supplier.save()
+        self.assertEqual(self.get_detail()['supplier']['display_name'], 'Acme Frutas')
+
+        exchange_rate = ExchangeRate.objects.get( currency = self.currency )
+        exchange_rate.usd_rate = '0.0003'
+        exchange_rate.save()
+        self.assertEqual(self.get_detail()['price_currency']['usd_rate'], '0.00030000')
+
+    def test_detail_invalidated_again_after_the_commit(self):
+        self.get_detail()
+
+        with transaction.atomic():
+            self.product.name = 'Mango Tommy'
+            self.product.save()
+
+            # A concurrent read, that still sees the product before the commit
+            cache.set(PRODUCT_DETAIL_KEY.format(self.product.id), dict(get_product_detail_data(self.product.id), name = 'Mango'))
+
+        self.assertEqual(self.get_detail()['name'], 'Mango Tommy')
+
+
+class ConditionalProductsTestCase(MarketTestCase):
+    """The products are answered with 304 when the client already has them."""
+
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product('Mango')
+        self.list_path = '/suppliers/{}/products/'.format(self.company.accountname)
+
+    def test_products_list_not_modified(self):
+        response = self.client.get(self.list_path)
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+        response = self.client.get(self.list_path, HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Other page is other data
+        self.assertEqual(self.client.get(self.list_path + '?limit=1', HTTP_IF_NONE_MATCH = etag).status_code, 200)
+
+    def test_products_list_modified(self):
+        etag = self.client.get(self.list_path)['ETag']
+
+        self.product.name = 'Mango Tommy'
+        self.product.save()
+        response = self.client.get(self.list_path, HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.product.delete()
+        response = self.client.get(self.list_path, HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+    def test_product_relations_modify_the_list(self):
+        etag = self.client.get(self.list_path)['ETag']
+
+        # The images and certificates are written without a new changed_at of the product
+        invalidate_products_detail([self.product.id])
+
+        self.assertEqual(self.client.get(self.list_path, HTTP_IF_NONE_MATCH = etag).status_code, 200)
+
+    def test_product_detail_not_modified(self):
+        path = '/products/{}/'.format(self.product.id)
+        response = self.client.get(path)
+        etag = response['ETag']
+
+        # Validated by the version of the detail only
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH = etag).status_code, 304)
+
+        self.product.name = 'Mango Tommy'
+        self.product.save()
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH = etag).status_code, 200)
+
+    def test_missing_product_not_found(self):
+        self.assertEqual(self.client.get('/products/0/', HTTP_IF_NONE_MATCH = '*').status_code, 404)
+
+
+class ProductChangesTestCase(MarketTestCase):
+    """The products feed returns the changes in (changed_at, id) order, a page after the other."""
+
+    def setUp(self):
+        super().setUp()
+        self.started_at = timezone.now() - timedelta( hours = 1 )
+        self.products = [self.create_product(name) for name in ('Mango', 'Banano', 'Cafe')]
+
+        for minutes, product in enumerate(self.products):
+            self.set_changed_at(product, minutes, created = True)
+
+    def set_changed_at(self, product, minutes, created = False):
+        changed_at = self.started_at + timedelta( minutes = minutes )
+        fields = {'changed_at': changed_at, 'created_at': changed_at} if created else {'changed_at': changed_at}
+
+        Product.all_objects.filter( id = product.id ).update(**fields)
+
+    def get_changes(self, **params):
+        response = APIClient().get('/products/changes/', params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.data
+
+    def test_changes_token(self):
+        position = (self.started_at, 7)
+
+        self.assertEqual(decode_changes_token(encode_changes_token(*position)), position)
+        self.assertIsNone(decode_changes_token(''))
+
+        with self.assertRaises(ValidationError):
+            decode_changes_token('not-a-token')
+
+        response = APIClient().get('/products/changes/', {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_changes_paginated(self):
+        changes = self.get_changes( limit = 2 )
+
+        self.assertEqual(changes['created'], [self.products[0].id, self.products[1].id])
+        self.assertTrue(changes['has_more'])
+
+        changes = self.get_changes( since = changes['next'], limit = 2 )
+        self.assertEqual(changes['created'], [self.products[2].id])
+        self.assertFalse(changes['has_more'])
+
+        # Nothing changed since
+        next_token = changes['next']
+        changes = self.get_changes( since = next_token )
+        self.assertEqual((changes['results'], changes['next']), ([], next_token))
+
+    def test_updates_and_deletes(self):
+        next_token = self.get_changes()['next']
+
+        Product.all_objects.filter( id = self.products[0].id ).update( name = 'Mango Tommy' )
+        self.set_changed_at(self.products[0], 10)
+        self.products[1].delete()
+        self.set_changed_at(self.products[1], 11)
+
+        changes = self.get_changes( since = next_token )
+
+        self.assertEqual((changes['updated'], changes['deleted']), ([self.products[0].id], [self.products[1].id]))
+        self.assertEqual([product['name'] for product in changes['results']], ['Mango Tommy'])
+
+    def test_same_changed_at_by_id(self):
+        for product in self.products:
+            self.set_changed_at(product, 0)
+
+        changes = self.get_changes( limit = 1 )
+        ids = [product['id'] for product in changes['results']]
+
+        while changes['has_more']:
+            changes = self.get_changes( since = changes['next'], limit = 1 )
+            ids += [product['id'] for product in changes['results']]
+
+        self.assertEqual(ids, sorted(product.id for product in self.products))
+
+    def test_recent_changes_left_for_the_next_sync(self):
+        next_token = self.get_changes()['next']
+
+        # Its transaction could be committing along with others of the same time
+        self.products[0].name = 'Mango Tommy'
+        self.products[0].save()
+
+        self.assertEqual(self.get_changes( since = next_token )['updated'], [])
+
+
+class BatchTestCase(MarketTestCase):
+    """The batches are read with the same queries whatever their size."""
+
+    def setUp(self):
+        super().setUp()
+        self.products = [self.create_product(name) for name in ('Mango', 'Banano', 'Cafe')]
+
+    def get_batch(self, path, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get(path, params)
+
+        return response, len(queries)
+
+    def test_products_batch(self):
+        ids = [product.id for product in self.products]
+
+        response, queries_count = self.get_batch('/products/batch/', ids = '{},{},0,{}'.format(ids[1], ids[0], ids[1]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results']), [ids[1], ids[0], 0])
+        self.assertEqual(response.data['results'][ids[0]]['name'], 'Mango')
+        self.assertEqual((response.data['results'][0], response.data['not_found']), (None, [0]))
+
+        cache.clear()
+        _, all_queries_count = self.get_batch('/products/batch/', ids = ','.join(map(str, ids)))
+        self.assertEqual(all_queries_count, queries_count)
+
+        # Read through the cache of the detail
+        with self.assertNumQueries(0):
+            get_product_detail_data(ids[0])
+
+    def test_suppliers_batch(self):
+        response, _ = self.get_batch('/suppliers/batch/', accountnames = '{},nobody'.format(self.company.accountname))
+
+        self.assertEqual(response.data['results'][self.company.accountname]['display_name'], 'Acme')
+        self.assertEqual(response.data['not_found'], ['nobody'])
+
+    @override_settings( BATCH_MAX_SIZE = 2 )
+    def test_invalid_batch(self):
+        for params in ({'ids': ''}, {'ids': '1,x'}, {'ids': '1,2,3'}):
+            response, _ = self.get_batch('/products/batch/', **params)
+            self.assertEqual(response.status_code, 400)
+
+        response, _ = self.get_batch('/products/batch/', ids = '1,1,2,2')
+        self.assertEqual(response.status_code, 200)
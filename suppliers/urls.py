@@ -9,7 +9,8 @@ from .views import (
     SupplierCertificateViewSet, CurrencyViewSet, CertificateDetailView,
     SupplierProfileView,
     DnaelementDetailView, ProductDetailView, DeleteProductCertificateView,
-    DeleteProductImageView,
+    DeleteProductImageView, TariffHeadingViewSet,
+    ProductChangesView, SupplierChangesView, ProductBatchDetailView,
 )
 
 
@@ -52,7 +53,20 @@ router.register(
     basename = 'currencies'
 )
 
+router.register(
+    'tariff-headings',
+    TariffHeadingViewSet,
+    basename = 'tariff-headings'
+)
+
 urlpatterns = [
+    # Before the router, that would take changes as an accountname
+    path('suppliers/changes/', SupplierChangesView.as_view()),
+
+    path('products/changes/', ProductChangesView.as_view()),
+
+    path('products/batch/', ProductBatchDetailView.as_view()),
+
     path('', include(router.urls)),
 
     path('certificates/<int:pk>/', CertificateDetailView.as_view()),
@@ -5,4 +5,5 @@ from .dnaelements import *
 from .operative_locations import *
 from .sale_locations import *
 from .products import *
-from .profiles import *
\ No newline at end of file
+from .profiles import *
+from .tariffs import *
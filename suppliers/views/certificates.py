@@ -15,6 +15,9 @@ from django.http import Http404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import ConditionalResponseMixin
+
 # Models
 from ..models import SupplierProfile, Certificate, SupplierCertificate, ProductCertificate
 
@@ -49,7 +52,8 @@ from ..serializers import (
     responses = { 200: SupplierCertificateModelSerializer, 404: openapi.Response("Not Found")}
 ))
 @method_decorator(name='update', decorator = swagger_auto_schema(auto_schema = None))
-class SupplierCertificateViewSet(mixins.ListModelMixin,
+class SupplierCertificateViewSet(ConditionalResponseMixin,
+                                mixins.ListModelMixin,
                                 mixins.RetrieveModelMixin,
                                 mixins.CreateModelMixin,
                                 mixins.UpdateModelMixin,
@@ -59,6 +63,7 @@ class SupplierCertificateViewSet(mixins.ListModelMixin,
 
     serializer_class = SupplierCertificateModelSerializer
     supplier = None
+    cache_control = {'public': True, 'max_age': 60}
 
     def dispatch(self, request, *args, **kwargs):
         """Verify that the supplier exists"""
@@ -17,13 +17,13 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # Models
-from ..models import Currency
+from ..models import Currency, ExchangeRate
  
 # Permissions
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
  
 # Serializers
-from ..serializers import CurrencyModelSerializer
+from ..serializers import CurrencyModelSerializer, ExchangeRateModelSerializer
 
 
 @method_decorator(name='list', decorator = swagger_auto_schema( 
@@ -50,6 +50,8 @@ class CurrencyViewSet(mixins.ListModelMixin,
         """Assign permission based on action"""
         if self.action in ['list', 'retrieve']:
             permissions = [AllowAny]
+        elif self.action in ['exchange_rate']:
+            permissions = [IsAuthenticated, IsAdminUser]
         else:
             permissions = [IsAuthenticated]
         
@@ -57,7 +59,7 @@ class CurrencyViewSet(mixins.ListModelMixin,
 
     def get_queryset(self):
         """Return all the active currencies"""
-        return Currency.objects.filter(is_active = True)
+        return Currency.objects.filter(is_active = True).select_related('exchange_rate')
 
     def get_object(self):
         """Return the currency by the id"""
@@ -116,4 +118,39 @@ class CurrencyViewSet(mixins.ListModelMixin,
             data = {"detail": str(e)}
             data_status = status.HTTP_400_BAD_REQUEST
         
+        return Response(data, status = data_status)
+
+    @swagger_auto_schema( tags = ["Currencies"], request_body = ExchangeRateModelSerializer,
+        responses = { 200: ExchangeRateModelSerializer, 404: openapi.Response("Not Found"),
+            400: openapi.Response("Bad request", examples = {"application/json":
+                {"detail": "{'usd_rate': [ErrorDetail(string='The exchange rate must be greater than zero', code='invalid')]}"}
+            })
+        }, security = [{ "api-key": ["Is Admin needed"] }]
+    )
+    @action(detail = True, methods = ['put'], url_path = 'exchange-rate')
+    def exchange_rate(self, request, *args, **kwargs):
+        """Set the exchange rate of a currency\n
+            Endpoint to create or update the USD exchange rate of a currency.\n
+            When the rate changes, the normalized prices of the products in the market 
+            that are configured in the currency are recomputed.
+        """
+
+        try:
+            currency = self.get_object()
+            exchange_rate = ExchangeRate.objects.filter( currency = currency ).first()
+
+            exchange_rate_serializer = ExchangeRateModelSerializer(
+                instance = exchange_rate,
+                data = request.data,
+                context = {'currency': currency}
+            )
+            exchange_rate_serializer.is_valid(raise_exception = True)
+            exchange_rate = exchange_rate_serializer.save()
+
+            data = ExchangeRateModelSerializer(exchange_rate).data
+            data_status = status.HTTP_200_OK
+        except Exception as e:
+            data = {"detail": str(e)}
+            data_status = status.HTTP_400_BAD_REQUEST
+
         return Response(data, status = data_status)
\ No newline at end of file
@@ -14,6 +14,9 @@ from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import ConditionalResponseMixin
+
 # Models
 from ..models import SupplierProfile, DNAElement
 
@@ -34,7 +37,8 @@ from ..serializers import DnaelementModelSerializer, HandleSupplierDnaelementSer
     responses = { 404: openapi.Response("Not Found") }, security = [{ "api-key": [] }]
 ))
 @method_decorator(name='update', decorator = swagger_auto_schema(auto_schema = None))
-class DnaelementViewSet(mixins.ListModelMixin,
+class DnaelementViewSet(ConditionalResponseMixin,
+                      mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.DestroyModelMixin,
@@ -43,6 +47,7 @@ class DnaelementViewSet(mixins.ListModelMixin,
 
     serializer_class = DnaelementModelSerializer
     supplier = None
+    cache_control = {'public': True, 'max_age': 60}
 
     def dispatch(self, request, *args, **kwargs):
         """Verifiy that the company exists"""
@@ -142,12 +147,16 @@ class DnaelementViewSet(mixins.ListModelMixin,
         return Response(data, status = data_status)
 
 
-class DnaelementDetailView(APIView):
+class DnaelementDetailView(ConditionalResponseMixin, APIView):
     """
         Retrieve the detail of a DNAElement.
     """
 
     permission_classes = [AllowAny]
+    cache_control = {'public': True, 'max_age': 60}
+
+    def get_conditional_querysets(self):
+        return [DNAElement.objects.filter( id = self.kwargs['pk'] )]
 
     @swagger_auto_schema( tags = ["Supplier DNA"],
         responses = { 200: DnaelementModelSerializer, 404: openapi.Response("Not Found")}, security = []
@@ -14,6 +14,9 @@ from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import ConditionalResponseMixin
+
 # Models
 from ..models import SupplierProfile, SupplierLocation
 
@@ -36,7 +39,8 @@ from distutils.util import strtobool
     }
 ))
 @method_decorator(name = 'update', decorator = swagger_auto_schema(auto_schema = None))
-class SupplierLocationViewSet(mixins.ListModelMixin,
+class SupplierLocationViewSet(ConditionalResponseMixin,
+                            mixins.ListModelMixin,
                             mixins.CreateModelMixin,
                             mixins.RetrieveModelMixin,
                             mixins.UpdateModelMixin,
@@ -46,6 +50,7 @@ class SupplierLocationViewSet(mixins.ListModelMixin,
 
     serializer_class = SupplierLocationModelSerializer
     supplier = None
+    cache_control = {'public': True, 'max_age': 60}
     principal_param = None
 
     def dispatch(self, request, *args, **kwargs):
@@ -16,6 +16,12 @@ from django.http import Http404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import CHANGES_PARAMETERS, ChangesAPIView, ConditionalResponseMixin
+
+# Batch requests
+from business_network_API.views import get_batch_data, get_batch_lookups
+
 # Models
 from ..models import SupplierProfile, Product, ProductCertificate, ProductImage
 from multimedia.models import Image
@@ -25,7 +31,20 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from ..permissions import IsSupplierMemberWithEditPermission
 
 # Serializers
-from ..serializers import ProductDetailModelSerializer, ProductOverviewModelSerializer, HandleSupplierProductSerializer
+from ..serializers import (
+    ProductChangeModelSerializer, ProductDetailModelSerializer, 
+    ProductOverviewModelSerializer, HandleSupplierProductSerializer
+)
+
+# Cache
+from ..cache import (
+    get_product_detail_data, get_product_detail_version, 
+    get_products_detail_data, get_products_detail_versions,
+    product_detail_exists
+)
+
+# Popularity
+from market.popularity import record_views
 
 
 @method_decorator( name = 'destroy', decorator = swagger_auto_schema( operation_id = "Delete a product", tags = ["Products"],
@@ -35,7 +54,8 @@ from ..serializers import ProductDetailModelSerializer, ProductOverviewModelSeri
         }, security = [{ "api-key": [] }]
 ))
 @method_decorator( name = 'update', decorator = swagger_auto_schema(auto_schema = None))
-class ProductViewSet(mixins.ListModelMixin,
+class ProductViewSet(ConditionalResponseMixin,
+                      mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.DestroyModelMixin,
@@ -44,6 +64,7 @@ class ProductViewSet(mixins.ListModelMixin,
 
     serializer_class = ProductDetailModelSerializer
     supplier = None
+    cache_control = {'public': True, 'max_age': 60}
 
     def dispatch(self, request, *args, **kwargs):
         """Verifiy that the company exists"""
@@ -75,7 +96,17 @@ class ProductViewSet(mixins.ListModelMixin,
         """Return supplier products"""
         return Product.objects.filter(
             supplier = self.supplier
-        )
+        ).select_related('price_currency', 'principal_image').prefetch_related('principal_image__variants')
+
+    def get_conditional_version(self):
+        """The products change with their relations (Images, certificates...) without a new changed_at,
+        so the list is validated with the versions of the detail of its products too."""
+        if self.action != 'list':
+            return None
+
+        product_ids = self.filter_queryset(self.get_queryset()).order_by('id').values_list('id', flat = True)
+
+        return get_products_detail_versions(list(product_ids))
 
     def get_object(self):
         """Return the product by the id"""
@@ -172,37 +203,100 @@ class ProductViewSet(mixins.ListModelMixin,
         return Response(data, status = data_status)
 
 
-class ProductDetailView(APIView):
+class ProductDetailView(ConditionalResponseMixin, APIView):
     """
         Retrieve the detail of a product.
     """
 
     permission_classes = [AllowAny]
+    cache_control = {'public': True, 'max_age': 60}
+
+    def get_conditional_version(self):
+        """The detail changes with the product relations, so it has its own version.
+            The products that don't exist have none, they are answered with 404."""
+        if not product_detail_exists(self.kwargs['pk']):
+            return None
+
+        return get_product_detail_version(self.kwargs['pk'])
 
     @swagger_auto_schema( operation_id = "Retrieve a product", tags = ["Products"],
         responses = { 200: ProductDetailModelSerializer, 404: openapi.Response("Not Found")}, security = [])
     def get(self, request, pk, format = None):
         """Endpoint to retrieve the product by the id"""
 
-        try:
-            product = self.get_object(pk)
-            serializer = ProductDetailModelSerializer(product)
+        data = get_product_detail_data(pk)
 
-            data = serializer.data
+        if data is not None:
             data_status = status.HTTP_200_OK
-        except Http404:
+
+            record_views(Product, [pk])
+        else:
             data = {"detail": "Product not found with the id provided"}
             data_status = status.HTTP_404_NOT_FOUND
 
         return Response(data, status = data_status)
 
-    def get_object(self, pk):
-        product = get_object_or_404(
-            Product,
-            id = pk
-        )
 
-        return product
+class ProductBatchDetailView(APIView):
+    """
+        Retrieve the detail of several products at once.
+    """
+
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema( operation_id = "Retrieve a batch of products", tags = ["Products"],
+        manual_parameters = [
+            openapi.Parameter(name = "ids", in_ = openapi.IN_QUERY, type = "String", required = True,
+                description = "Comma separated ids of the products. (E.g. 12,15,40)")
+        ],
+        responses = { 400: openapi.Response("Bad request") }, security = [])
+    def get(self, request, format = None):
+        """Endpoint to retrieve the detail of several products by their ids\n
+            The details are returned in `results` keyed by the product id. 
+            The ids of the products that don't exist have null as result and are listed in `not_found`.
+        """
+
+        try:
+            product_ids = get_batch_lookups(request, 'ids', to_python = int)
+
+            data = get_batch_data(product_ids, get_products_detail_data(product_ids))
+            data_status = status.HTTP_200_OK
+        except ValidationError as e:
+            data = {"detail": e.detail[0]}
+            data_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data, status = data_status)
+
+
+@method_decorator( name = 'get', decorator = swagger_auto_schema( 
+    operation_id = "List the product changes", tags = ["Products"],
+    operation_description = """
+        Endpoint to sync the products incrementally. Returns the ids of the products created, 
+        updated and deleted since the token `since`, with the compact data of the created and 
+        updated ones in `results`. The param `supplier` limits the changes to the catalogue 
+        of a supplier (Accountname).\n
+        Request again with the token `next` while `has_more` is true.""",
+    manual_parameters = CHANGES_PARAMETERS + [
+        openapi.Parameter(name = "supplier", in_ = openapi.IN_QUERY, type = "String",
+            description = "Accountname of the supplier owner of the products.")
+    ],
+    responses = { 400: openapi.Response("Bad request") }, security = []
+))
+class ProductChangesView(ChangesAPIView):
+    """Changes feed of the products."""
+
+    queryset = Product.all_objects.all()
+    serializer_class = ProductChangeModelSerializer
+    created_field = 'created_at'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        supplier = self.request.query_params.get('supplier')
+
+        if supplier:
+            queryset = queryset.filter( supplier__company__accountname = supplier )
+
+        return queryset
 
 
 class DeleteProductImageView(APIView):
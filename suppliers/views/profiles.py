@@ -22,6 +22,9 @@ from rest_framework.permissions import AllowAny
 # Serializers
 from ..serializers import SupplierProfileSerializer, DocumentationSupplierProfileSerializer
 
+# Popularity
+from market.popularity import record_views
+
 
 class SupplierProfileView(APIView):
     """View for request the profile of a supplier."""
@@ -50,6 +53,8 @@ class SupplierProfileView(APIView):
 
             data = profile_serializer.data
             data_status = status.HTTP_200_OK
+
+            record_views(SupplierProfile, [supplier.id])
         except Http404:
             data = {"detail": "Supplier not found with the accountname provided"}
             data_status = status.HTTP_404_NOT_FOUND
@@ -14,6 +14,9 @@ from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import ConditionalResponseMixin
+
 # Models
 from ..models import SupplierProfile, SupplierSaleLocation
 
@@ -46,7 +49,8 @@ from distutils.util import strtobool
     responses = { 200: SupplierSaleLocationModelSerializer, 404: openapi.Response("Not Found")}
 ))
 @method_decorator(name = 'update', decorator = swagger_auto_schema(auto_schema = None))
-class SupplierSaleLocationViewSet(mixins.ListModelMixin,
+class SupplierSaleLocationViewSet(ConditionalResponseMixin,
+                                mixins.ListModelMixin,
                                 mixins.CreateModelMixin,
                                 mixins.RetrieveModelMixin,
                                 mixins.UpdateModelMixin,
@@ -56,6 +60,7 @@ class SupplierSaleLocationViewSet(mixins.ListModelMixin,
 
     serializer_class = SupplierSaleLocationModelSerializer
     supplier = None
+    cache_control = {'public': True, 'max_age': 60}
 
     def dispatch(self, request, *args, **kwargs):
         """Verifiy that the supplier exists"""
@@ -7,12 +7,19 @@ from django.utils.decorators import method_decorator
 from rest_framework import mixins, status, viewsets, serializers
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
 
 # Documentation
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Conditional requests
+from business_network_API.views import CHANGES_PARAMETERS, ChangesAPIView, ConditionalResponseMixin
+
+# Batch requests
+from business_network_API.views import get_batch_data, get_batch_lookups
+
 # Models
 from companies.models import Company
 from ..models import SupplierProfile
@@ -24,16 +31,28 @@ from ..permissions import IsSupplierMemberWithEditPermission
 # Serializers
 from ..serializers import (
     ActivateSupplierSerializer,
+    SupplierChangeModelSerializer,
     SupplierProfileModelSerializer, 
     UpdateSupplierSerializer, 
     SupplierSummarySerializer, 
     UpdateSupplierSummarySerializer
 )
 
+# Coverage
+from searches.coverage import get_country_supplier_ids, parse_country_param
+
 
 @method_decorator(name = 'list', decorator = swagger_auto_schema( operation_id = "List suppliers", tags = ["Suppliers"],
     operation_description = "Endpoint to list all the supplier registered in the platform",
-    responses = { 404: openapi.Response("Not Found") }, security = []
+    manual_parameters = [
+        openapi.Parameter(name = "sells_to", in_ = openapi.IN_QUERY, type = "String",
+            description = "Param for filter the suppliers that sell into a country. (Code or name)")
+    ],
+    responses = { 404: openapi.Response("Not Found"),
+        400: openapi.Response("Bad request", examples = {"application/json":
+            {"detail": "'Atlantis' is not a valid country. Use its ISO 3166-1 alpha-2 code or its name"}
+        })
+    }, security = []
 ))
 @method_decorator(name = 'retrieve', decorator = swagger_auto_schema( 
     operation_id = "Retrieve a supplier", tags = ["Suppliers"],
@@ -42,7 +61,8 @@ from ..serializers import (
     responses = { 200: SupplierProfileModelSerializer, 404: openapi.Response("Not Found")}, security = []
 ))
 @method_decorator(name='update', decorator = swagger_auto_schema(auto_schema = None))
-class SupplierViewSet(mixins.RetrieveModelMixin,
+class SupplierViewSet(ConditionalResponseMixin,
+                    mixins.RetrieveModelMixin,
                     mixins.ListModelMixin,
                     mixins.UpdateModelMixin, 
                     viewsets.GenericViewSet):
@@ -50,16 +70,27 @@ class SupplierViewSet(mixins.RetrieveModelMixin,
 
     serializer_class = SupplierProfileModelSerializer
     lookup_field = 'accountname'
+    cache_control = {'public': True, 'no_cache': True}
     lookup_value_regex = "[\\w.]+"
 
     def get_queryset(self):
         """Return suppliers."""
+        queryset = SupplierProfile.objects.all()
 
-        return SupplierProfile.objects.all()
+        sells_to = self.request.query_params.get("sells_to")
+        if self.action == 'list' and sells_to:
+            try:
+                country_code = parse_country_param(sells_to)
+            except Exception as e:
+                raise ParseError(str(e))
+
+            queryset = queryset.filter( id__in = get_country_supplier_ids(country_code) )
+
+        return queryset
 
     def get_permissions(self):
         """Assign permission based on action"""
-        if self.action in ['retrieve', 'list']:
+        if self.action in ['retrieve', 'list', 'batch']:
             permissions = [AllowAny]
         else:
             permissions = [IsAuthenticated, IsSupplierMemberWithEditPermission]
@@ -86,6 +117,13 @@ class SupplierViewSet(mixins.RetrieveModelMixin,
             company__accountname = self.kwargs['accountname']
         )
 
+    def get_conditional_querysets(self):
+        """The suppliers are retrieved by the accountname of their company."""
+        if self.action == 'retrieve':
+            return [SupplierProfile.objects.filter( company__accountname = self.kwargs['accountname'] )]
+
+        return super().get_conditional_querysets()
+
     @swagger_auto_schema( operation_id = "Partial update a supplier", tags = ["Suppliers"], request_body = UpdateSupplierSerializer,
         responses = { 200: SupplierProfileModelSerializer, 404: openapi.Response("Not Found"),
             401: openapi.Response("Unauthorized", examples = {"application/json": {"detail": "Invalid token."} }),
@@ -115,6 +153,37 @@ class SupplierViewSet(mixins.RetrieveModelMixin,
         
         return Response(data, status = data_status)
 
+    @swagger_auto_schema( operation_id = "Retrieve a batch of suppliers", tags = ["Suppliers"],
+        manual_parameters = [
+            openapi.Parameter(name = "accountnames", in_ = openapi.IN_QUERY, type = "String", required = True,
+                description = "Comma separated accountnames of the companies of the suppliers.")
+        ],
+        responses = { 400: openapi.Response("Bad request") }, security = []
+    )
+    @action(detail = False, methods = ['get'])
+    def batch(self, request):
+        """Retrieve a batch of suppliers\n
+        Endpoint to retrieve several suppliers by the accountnames of their companies.\n
+        The suppliers are returned in `results` keyed by the accountname. The accountnames 
+        without supplier have null as result and are listed in `not_found`.
+        """
+        try:
+            accountnames = get_batch_lookups(request, 'accountnames')
+            suppliers = SupplierProfile.objects.select_related('company').filter(
+                company__accountname__in = accountnames
+            )
+
+            data = get_batch_data(accountnames, {
+                supplier.company.accountname: self.get_serializer(supplier).data
+                for supplier in suppliers
+            })
+            data_status = status.HTTP_200_OK
+        except ValidationError as e:
+            data = {"detail": e.detail[0]}
+            data_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(data, status = data_status)
+
     @swagger_auto_schema( tags = ["Companies", "Suppliers"], request_body = serializers.Serializer(),
         manual_parameters = [
             openapi.Parameter(name = "accountname", in_ = openapi.IN_PATH, type = "String",
@@ -216,4 +285,21 @@ class SupplierSummaryViewSet(mixins.RetrieveModelMixin,
             data = {"detail": str(e)}
             data_status = status.HTTP_400_BAD_REQUEST
         
-        return Response(data, status = data_status)
\ No newline at end of file
+        return Response(data, status = data_status)
+
+@method_decorator( name = 'get', decorator = swagger_auto_schema( 
+    operation_id = "List the supplier changes", tags = ["Suppliers"],
+    operation_description = """
+        Endpoint to sync the suppliers incrementally. Returns the ids of the suppliers created, 
+        updated and deleted since the token `since`, with the compact data of the created and 
+        updated ones in `results`.\n
+        Request again with the token `next` while `has_more` is true.""",
+    manual_parameters = CHANGES_PARAMETERS,
+    responses = { 400: openapi.Response("Bad request") }, security = []
+))
+class SupplierChangesView(ChangesAPIView):
+    """Changes feed of the suppliers."""
+
+    queryset = SupplierProfile.all_objects.select_related('company')
+    serializer_class = SupplierChangeModelSerializer
+    created_field = 'activation_date'
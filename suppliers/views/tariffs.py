@@ -0,0 +1,69 @@
+# Views tariffs
+
+# Django REST framework
+from rest_framework import mixins, viewsets
+
+# Django
+from django.utils.decorators import method_decorator
+
+# Documentation
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+# Models
+from ..models import TariffHeading
+ 
+# Permissions
+from rest_framework.permissions import AllowAny
+ 
+# Serializers
+from ..serializers import TariffHeadingModelSerializer, TariffHeadingDetailSerializer
+
+# Tariffs
+from ..tariffs import normalize_tariff_heading
+
+
+@method_decorator(name='list', decorator = swagger_auto_schema( 
+    operation_id = "List tariff headings", tags = ["Tariff headings"],
+    operation_description = """Endpoint to browse the HS nomenclature. Lists the chapters or,
+        with the `parent` param, the headings inside a tariff heading. Each one with its products count.""",
+    manual_parameters = [
+        openapi.Parameter(name = "parent", in_ = openapi.IN_QUERY, type = "String",
+            description = "Code of the tariff heading whose children are listed. (Ej: `09` or `0901`)")
+    ],
+    responses = { 404: openapi.Response("Not Found") }, security = []
+))
+@method_decorator(name='retrieve', decorator = swagger_auto_schema( 
+    operation_id = "Retrieve tariff heading", tags = ["Tariff headings"],
+    operation_description = "Endpoint to retrieve a tariff heading with the headings inside it and its products count",
+    responses = { 404: openapi.Response("Not Found")}, security = []
+))
+class TariffHeadingViewSet(mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """Tariff heading view set."""
+
+    lookup_field = 'code'
+    lookup_value_regex = "[\\d.]+"
+    permission_classes = [AllowAny]
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return TariffHeadingDetailSerializer
+
+        return TariffHeadingModelSerializer
+
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return TariffHeading.objects.all()
+
+        parent_code = normalize_tariff_heading(self.request.query_params.get("parent"))
+
+        if parent_code:
+            return TariffHeading.objects.filter( parent_code = parent_code ).order_by('code')
+
+        return TariffHeading.objects.filter( parent_code = None ).order_by('code')
+
+    def get_object(self):
+        self.kwargs[self.lookup_field] = normalize_tariff_heading(self.kwargs[self.lookup_field])
+        return super().get_object()